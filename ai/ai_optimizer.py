@@ -33,6 +33,13 @@ except Exception:
 from .providers import get_chat_callable
 from .tools import collect_phase_context, format_context_text
 
+try:
+    from modules.schedule_engine import compile_network
+    from modules.resource_schedule import RULES, capacity_array, demand_matrix, level
+except ImportError:
+    from schedule_engine import compile_network  # type: ignore
+    from resource_schedule import RULES, capacity_array, demand_matrix, level  # type: ignore
+
 # ---------- Namespaced keys ----------
 if "AI_OPT_NS" not in st.session_state:
     st.session_state["AI_OPT_NS"] = f"opt_{uuid.uuid4().hex[:8]}"
@@ -274,6 +281,43 @@ def extract_solution(tasks: Dict[str, Task], vars: dict) -> pd.DataFrame:
         })
     return pd.DataFrame(rows).sort_values(["start_period", "finish_period", "task_id"])
 
+# ---------- Heuristic: priority-rule resource leveling (modules/resource_schedule.py) ----------
+def heuristic_solution(
+    tasks: Dict[str, Task],
+    resources_df: pd.DataFrame,
+    calendar_step_days: int = 7,
+    rule: str = "LFT",
+    scheme: str = "serial",
+) -> Tuple[pd.DataFrame, dict]:
+    """
+    Resource-feasible schedule (same columns as extract_solution) in seconds for
+    thousands of tasks. Honors precedence and resource caps only: no budget
+    caps, AI hard constraints or objective weights.
+    """
+    step_days = calendar_step_days
+    ids = list(tasks)
+    dur_p = [math.ceil(max(1, t.duration_days) / step_days) for t in tasks.values()]
+    links = [(p, t_id, "FS", 0.0) for t_id, t in tasks.items() for p in (t.predecessor_ids or []) if p in tasks]
+    names, demand = demand_matrix([t.resource for t in tasks.values()], [t.resource_qty for t in tasks.values()])
+    caps = {}
+    if resources_df is not None and not resources_df.empty:
+        caps = {str(r.resource): float(r.capacity_qty or 0.0) for _, r in resources_df.iterrows()}
+    res = level(compile_network(ids, dur_p, links), demand, capacity_array(names, caps), rule=rule, scheme=scheme,
+                resources=names)
+    rows = []
+    for t_id, sp, comp in zip(ids, res.start.tolist(), res.finish.tolist()):
+        t = tasks[t_id]
+        rows.append({
+            "task_id": t_id, "name": t.name,
+            "start_period": int(sp), "finish_period": int(comp),
+            "start_day": sp * step_days, "finish_day": comp * step_days,
+            "duration_days": t.duration_days, "resource": t.resource,
+            "is_production": t.is_production
+        })
+    periods = list(range(max(len(periods_from_schedule(tasks, step_days)), res.makespan + 1)))
+    sol = pd.DataFrame(rows).sort_values(["start_period", "finish_period", "task_id"])
+    return sol, {"periods": periods, "step_days": step_days, "makespan": res.makespan, "seconds": res.seconds}
+
 # ---------- Metrics: cashflows & NPV ----------
 def cashflow_series(
     tasks: Dict[str, Task],
@@ -420,6 +464,13 @@ def render():
     st.markdown("### 3) Run optimization")
     calendar_step_days = st.number_input("Calendar step size (days per period)", 1, 30, 7, 1, key=k("cfg","stepdays"))
     discount_rate = st.number_input("Annual discount rate (for NPV)", 0.0, 1.0, 0.10, 0.005, key=k("cfg","disc"))
+    solver = st.radio("Solver", ["MILP (PuLP)", "Priority-rule heuristic"], index=0 if _PULP_OK else 1,
+                      horizontal=True, key=k("cfg","solver"))
+    heuristic = solver != "MILP (PuLP)"
+    if heuristic:
+        rule = st.selectbox("Priority rule", RULES, key=k("cfg","rule"), help="LFT = min late finish, FLOAT = min total float")
+        st.caption("Levels thousands of tasks in seconds. Honors precedence and resource caps only "
+                   "(not budget caps, AI constraints or objective weights). The MILP is practical up to a few dozen tasks.")
 
     if st.button("Run Optimization", use_container_width=True, key=k("btn","run")):
         # Parse inputs
@@ -444,26 +495,36 @@ def render():
 
         ai_hard = (st.session_state.get(k("ai","props")) or {}).get("hard_constraints", [])
 
-        if not _PULP_OK:
-            st.error("PuLP not installed. Run: pip install pulp")
-            return
-
-        # Build + solve
-        try:
-            model, vars_ = build_model(tasks, res_df, bud_df if not bud_df.empty else None, weights, ai_hard, calendar_step_days)
-        except Exception as e:
-            st.error(f"Model build failed: {e}")
-            return
+        if heuristic:
+            try:
+                sol, vars_ = heuristic_solution(tasks, res_df, calendar_step_days, rule)
+            except ValueError as e:
+                st.error(f"Leveling failed: {e}")
+                return
+            obj = None
+            st.write(f"**Leveled schedule:** makespan {vars_['makespan']} periods ({vars_['seconds']:.2f} s)")
+        else:
+            if not _PULP_OK:
+                st.error("PuLP not installed. Run: pip install pulp")
+                return
+
+            # Build + solve
+            try:
+                model, vars_ = build_model(tasks, res_df, bud_df if not bud_df.empty else None, weights, ai_hard, calendar_step_days)
+            except Exception as e:
+                st.error(f"Model build failed: {e}")
+                return
 
-        status, obj = solve_model(model)
-        st.write(f"**Solver status:** {status}")
-        st.write(f"**Scalarized objective:** {obj:.4f}" if obj is not None else "**Scalarized objective:** (n/a)")
-        if status not in ("Optimal", "Feasible"):
-            st.warning("Solution not optimal; consider relaxing constraints or adjusting weights.")
+            status, obj = solve_model(model)
+            st.write(f"**Solver status:** {status}")
+            st.write(f"**Scalarized objective:** {obj:.4f}" if obj is not None else "**Scalarized objective:** (n/a)")
+            if status not in ("Optimal", "Feasible"):
+                st.warning("Solution not optimal; consider relaxing constraints or adjusting weights.")
 
         # Extract solution + metrics
         try:
-            sol = extract_solution(tasks, vars_)
+            if not heuristic:
+                sol = extract_solution(tasks, vars_)
             st.dataframe(sol, use_container_width=True)
             st.session_state[k("sol","df")] = sol
 
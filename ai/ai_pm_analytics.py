@@ -18,7 +18,7 @@ Install (if needed):
 """
 
 from __future__ import annotations
-import io, uuid, math, json, random
+import io, os, uuid, math, json, random
 from dataclasses import dataclass
 from typing import Optional, Dict, List, Tuple
 
@@ -37,6 +37,13 @@ except Exception:
 from .providers import get_chat_callable
 from .tools import collect_phase_context, format_context_text
 
+try:
+    from modules.schedule_engine import cpm_frame
+    from modules.schedule_risk import events_from_risks, simulate_frame
+except ImportError:
+    from schedule_engine import cpm_frame  # type: ignore
+    from schedule_risk import events_from_risks, simulate_frame  # type: ignore
+
 # -----------------------------
 # Namespaced keys (avoid collisions)
 # -----------------------------
@@ -119,155 +126,55 @@ def anomaly_flags(series: pd.Series, z_thresh: float = 2.5) -> pd.Series:
 # -----------------------------
 def critical_path(tasks_df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
     """
-    Simple longest-path by finish_day over DAG from predecessor_ids.
+    CPM over the DAG from predecessor_ids (shared schedule engine; FS/SS/FF/SF
+    and lags accepted as e.g. "T1, T2 SS+3").
     Expects: task_id, duration_days, predecessor_ids (comma-separated)
-    Returns: tasks with ES/EF/LS/LF and critical bool; and the critical chain IDs.
+    Returns: tasks with ES/EF/LS/LF, floats and critical bool; and the critical chain IDs.
     """
     if tasks_df.empty or "task_id" not in tasks_df.columns:
         return pd.DataFrame(), []
     df = tasks_df.copy()
+    df["task_id"] = df["task_id"].astype(str)
     df["duration_days"] = df["duration_days"].fillna(0).astype(int)
-    # parse predecessors
-    preds = {}
-    for _, r in df.iterrows():
-        s = str(r.get("predecessor_ids", "") or "").strip()
-        preds[r["task_id"]] = [p.strip() for p in s.split(",") if p.strip()]
-    # Topo order (Kahn)
-    nodes = set(df["task_id"].tolist())
-    indeg = {n: 0 for n in nodes}
-    for n, ps in preds.items():
-        for p in ps:
-            if p in nodes:
-                indeg[n] += 1
-    Q = [n for n in nodes if indeg[n] == 0]
-    order = []
-    while Q:
-        x = Q.pop(0)
-        order.append(x)
-        for n, ps in preds.items():
-            if x in ps:
-                indeg[n] -= 1
-                if indeg[n] == 0:
-                    Q.append(n)
-    if len(order) != len(nodes):
-        # cycle detected or missing predecessors; bail gracefully
+    if "predecessor_ids" not in df.columns:
+        df["predecessor_ids"] = ""
+    try:
+        net, res = cpm_frame(df, "task_id", "duration_days", "predecessor_ids")
+    except ValueError:
+        # cycle or duplicate task ids; bail gracefully
         return pd.DataFrame(), []
 
-    # Forward pass (ES/EF)
-    ES, EF = {}, {}
-    for t_id in order:
-        dur = int(df.loc[df["task_id"]==t_id, "duration_days"].iloc[0] or 0)
-        es = 0
-        for p in preds[t_id]:
-            es = max(es, EF.get(p, 0))
-        ES[t_id] = es
-        EF[t_id] = es + dur
-
-    # Backward pass (LS/LF)
-    proj_finish = max(EF.values()) if EF else 0
-    LS, LF = {}, {}
-    for t_id in reversed(order):
-        dur = int(df.loc[df["task_id"]==t_id, "duration_days"].iloc[0] or 0)
-        # if no successors, LF = proj_finish
-        succs = [n for n, ps in preds.items() if t_id in ps]
-        if not succs:
-            LF[t_id] = proj_finish
-        else:
-            LF[t_id] = min(LS.get(s, proj_finish) for s in succs)
-        LS[t_id] = LF[t_id] - dur
-
-    out = df[["task_id","name","duration_days"]].copy()
-    out["ES"] = out["task_id"].map(ES)
-    out["EF"] = out["task_id"].map(EF)
-    out["LS"] = out["task_id"].map(LS)
-    out["LF"] = out["task_id"].map(LF)
-    out["TotalFloat"] = out["LS"] - out["ES"]
-    out["is_critical"] = out["TotalFloat"] <= 0
-    crit_chain = []
-    # reconstruct one critical chain (greedy by EF)
-    cur = None
-    # pick task with EF == proj_finish and is critical
-    cand = out[out["is_critical"] & (out["EF"] == proj_finish)]
-    if not cand.empty:
-        cur = cand.iloc[0]["task_id"]
-        crit_chain.append(cur)
-        while True:
-            prevs = preds[cur]
-            prev_crit = out[out["task_id"].isin(prevs) & out["is_critical"]]
-            if prev_crit.empty:
-                break
-            nxt = prev_crit.sort_values("EF", ascending=False).iloc[0]["task_id"]
-            crit_chain.append(nxt)
-            cur = nxt
-        crit_chain.reverse()
-    return out.sort_values("ES"), crit_chain
+    out = df[[c for c in ("task_id", "name", "duration_days") if c in df.columns]].copy()
+    out["ES"], out["EF"], out["LS"], out["LF"] = res.es, res.ef, res.ls, res.lf
+    out["TotalFloat"] = res.total_float
+    out["FreeFloat"] = res.free_float
+    out["is_critical"] = res.total_float <= 0
+    return out.sort_values("ES"), net.critical_chain(res)
 
 # -----------------------------
 # Monte Carlo schedule risk
 # -----------------------------
-def triangular_sample(a, m, b):
-    return np.random.triangular(a, m, b)
-
-def simulate_schedule(tasks_df: pd.DataFrame, iters: int = 1000) -> pd.DataFrame:
+def simulate_schedule(tasks_df: pd.DataFrame, iters: int = 1000, seed: Optional[int] = None, **options) -> pd.DataFrame:
     """
-    PERT/triangular simulation over durations.
+    Triangular duration simulation over the task network (modules/schedule_risk.py).
     If optimistic/most_likely/pessimistic not provided, fall back to +/- 20% around duration_days.
     Returns a dataframe with simulated project finish (days) per iteration.
     """
-    if tasks_df.empty:
-        return pd.DataFrame()
-    df = tasks_df.copy()
-    df["duration_days"] = df["duration_days"].fillna(0).astype(float)
-
-    # Parse predecessors
-    preds = {}
-    for _, r in df.iterrows():
-        s = str(r.get("predecessor_ids", "") or "").strip()
-        preds[r["task_id"]] = [p.strip() for p in s.split(",") if p.strip()]
-
-    finishes = []
-    for _ in range(iters):
-        # sample durations
-        dur = {}
-        for _, r in df.iterrows():
-            base = float(r["duration_days"])
-            a = float(r.get("optimistic_days", np.nan))
-            m = float(r.get("most_likely_days", np.nan))
-            b = float(r.get("pessimistic_days", np.nan))
-            if np.isnan(a) or np.isnan(m) or np.isnan(b) or a <= 0 or b <= 0:
-                # fallback +/-20%
-                a = max(1.0, 0.8 * base)
-                m = max(1.0, base)
-                b = max(1.0, 1.2 * base)
-            dur[r["task_id"]] = triangular_sample(a, m, b)
-
-        # topo + forward pass to compute finish
-        nodes = set(df["task_id"].tolist())
-        indeg = {n: 0 for n in nodes}
-        for n, ps in preds.items():
-            for p in ps:
-                if p in nodes:
-                    indeg[n] += 1
-        Q = [n for n in nodes if indeg[n]==0]
-        order = []
-        while Q:
-            x = Q.pop(0)
-            order.append(x)
-            for n, ps in preds.items():
-                if x in ps:
-                    indeg[n] -= 1
-                    if indeg[n]==0:
-                        Q.append(n)
-        ES, EF = {}, {}
-        for t_id in order:
-            es = 0.0
-            for p in preds[t_id]:
-                es = max(es, EF.get(p, 0.0))
-            ES[t_id] = es
-            EF[t_id] = es + float(dur[t_id])
-        finishes.append(max(EF.values()) if EF else 0.0)
-
-    return pd.DataFrame({"iteration": np.arange(1, len(finishes)+1), "finish_days": finishes})
+    res = schedule_risk(tasks_df, iters, seed, **options)
+    return res.to_frame() if res is not None else pd.DataFrame()
+
+def schedule_risk(tasks_df: pd.DataFrame, iters: int = 1000, seed: Optional[int] = None, **options):
+    """
+    Full QSRA result (finish distribution, criticality, sensitivity); None if not simulable.
+    options: workers (process pool), events (risk events), keep_finishes, progress callback.
+    """
+    if tasks_df.empty or not {"task_id", "duration_days"}.issubset(tasks_df.columns):
+        return None
+    try:
+        return simulate_frame(tasks_df, iterations=iters, seed=seed, **options)
+    except ValueError:
+        # cycle or duplicate task ids
+        return None
 
 # -----------------------------
 # AI PM narrative
@@ -411,27 +318,57 @@ def render():
         st.dataframe(issues.sort_values("severity", ascending=False), use_container_width=True)
 
     st.markdown("### 5) Monte Carlo schedule risk (optional)")
-    iters = st.slider("Iterations", 200, 3000, 1000, 100, key=k("mc","iters"))
+    mc1, mc2, mc3 = st.columns(3)
+    iters = mc1.number_input("Iterations", 200, 5_000_000, 1000, 1000, key=k("mc","iters"))
+    seed = mc2.number_input("Seed", 0, 2**31 - 1, 42, key=k("mc","seed"))
+    workers = mc3.number_input("Worker processes", 1, max(os.cpu_count() or 1, 1), 1, key=k("mc","workers"),
+                               help="Same result for any worker count with the same seed.")
+    events = events_from_risks(risks)
+    use_events = bool(events) and st.checkbox(f"Include {len(events)} risk events from risks.csv (task_id, probability, impact_days)",
+                                              value=True, key=k("mc","events"))
+    stream = int(iters) > 100_000
+    if stream:
+        st.caption("Large run: per-iteration finishes are not kept; percentiles come from a streaming histogram.")
     if not tasks.empty and st.button("Run Simulation", key=k("mc","run"), use_container_width=True):
-        sims = simulate_schedule(tasks, iters=iters)
-        if sims.empty:
+        bar = st.progress(0.0, text="Simulating…")
+        res = schedule_risk(tasks, iters=int(iters), seed=int(seed), workers=int(workers),
+                            events=events if use_events else None, keep_finishes=not stream,
+                            progress=lambda done, total: bar.progress(min(done / max(total, 1), 1.0),
+                                                                      text=f"{done:,} / {total:,} iterations"))
+        bar.empty()
+        if res is None or not res.iterations:
             st.info("Provide tasks with duration and predecessors to simulate.")
         else:
-            p50 = np.percentile(sims["finish_days"], 50)
-            p80 = np.percentile(sims["finish_days"], 80)
-            p90 = np.percentile(sims["finish_days"], 90)
-            st.write(f"**Finish (days):** P50={p50:.0f}, P80={p80:.0f}, P90={p90:.0f}")
+            sims = res.to_frame()
+            pct = res.percentiles((10, 50, 80, 90))
+            st.write(f"**Finish (days):** deterministic={res.deterministic:.0f}, P10={pct['P10']:.0f}, "
+                     f"P50={pct['P50']:.0f}, P80={pct['P80']:.0f}, P90={pct['P90']:.0f}")
+            st.caption(f"{res.iterations:,} iterations × {len(res.ids):,} tasks in {res.seconds:.2f} s "
+                       f"({int(workers)} worker(s))")
 
             try:
                 import plotly.express as px
-                hfig = px.histogram(sims, x="finish_days", nbins=30, title="Completion Distribution (days)")
+                if res.finish is not None:
+                    hfig = px.histogram(sims, x="finish_days", nbins=30, title="Completion Distribution (days)")
+                else:
+                    hfig = px.bar(sims, x="finish_days", y="count", title="Completion Distribution (days)")
                 st.plotly_chart(hfig, use_container_width=True)
             except Exception:
                 pass
 
+            drivers = res.task_table()
+            if "name" in tasks.columns:
+                drivers.insert(1, "name", drivers["task_id"].map(dict(zip(tasks["task_id"].astype(str), tasks["name"]))))
+            st.markdown("**Risk drivers** — criticality index (share of iterations on the critical path) "
+                        "and sensitivity (duration–finish correlation)")
+            st.dataframe(drivers.head(25), use_container_width=True)
+
             buf = io.BytesIO(); sims.to_csv(buf, index=False)
             st.download_button("Download simulation.csv", data=buf.getvalue(),
                                file_name="schedule_simulation.csv", mime="text/csv", key=k("dl","sim"))
+            buf = io.BytesIO(); drivers.to_csv(buf, index=False)
+            st.download_button("Download risk_drivers.csv", data=buf.getvalue(),
+                               file_name="schedule_risk_drivers.csv", mime="text/csv", key=k("dl","drv"))
 
     st.markdown("### 6) AI PM Narrative & Next Actions")
     if not evm.empty:
@@ -468,7 +405,7 @@ def render():
         "progress.csv": ["date","planned_value","earned_value","actual_cost"],
         "tasks.csv": ["task_id","name","start","finish","duration_days","percent_complete",
                       "optimistic_days?","most_likely_days?","pessimistic_days?","predecessor_ids?"],
-        "risks.csv": ["risk_id","description","probability","impact_cost","impact_days","owner","status"],
+        "risks.csv": ["risk_id","description","probability","impact_cost","impact_days","owner","status","task_id?"],
         "issues.csv": ["issue_id","title","severity","opened_on","closed_on","owner","status"],
         "timesheets.csv": ["date","person","task_id","hours"],
         "costs.csv": ["date","category","amount","type"]
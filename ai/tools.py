@@ -9,12 +9,12 @@ def get_project_ids():
 def collect_phase_context(project_id: str, phase_id: str) -> Dict:
     """Collect latest artifacts for the active phase into a compact dict."""
     try:
-        from artifact_registry import get_latest, list_required_artifacts
+        from artifact_registry import get_latest_many, list_required_artifacts
     except Exception:
-        get_latest = list_required_artifacts = None
+        get_latest_many = list_required_artifacts = None
 
     result = {"project_id": project_id, "phase_id": phase_id, "artifacts": []}
-    if not get_latest:
+    if not get_latest_many:
         return result
 
     # Try both OPS and FEL requirements
@@ -34,13 +34,14 @@ def collect_phase_context(project_id: str, phase_id: str) -> Dict:
         if c not in seen:
             reqs.append({"workstream": "—", "type": c})
 
+    # one bulk lookup instead of a round trip per type
+    try:
+        latest = get_latest_many(project_id, [r.get("type") for r in reqs], phase_id)
+    except Exception:
+        latest = {}
     for r in reqs:
         t = r.get("type")
-        rec = None
-        try:
-            rec = get_latest(project_id, t, phase_id)
-        except Exception:
-            pass
+        rec = latest.get(t)
         if rec:
             result["artifacts"].append({
                 "type": t,
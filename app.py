@@ -7,6 +7,10 @@
 # - FEL Governance (team, reviewers, approvers, deliverables, artifact status, gate move)
 # - Resilient Firebase init
 
+# Optional import-time/memory profiler (DECISIONMATE_PROFILE_STARTUP=1); must run before the heavy imports
+from utils.startup_profiler import install_from_env as _install_startup_profiler
+_install_startup_profiler()
+
 import json, hashlib, time, sys, pathlib
 from typing import Dict, Any, Optional, Callable
 import importlib.util
@@ -17,7 +21,7 @@ from services.artifact_helpers import artifact_status_summary, required_artifact
 from frontdoor import render_frontdoor  # NEW
 
 # ---- Rev3 dynamic discovery helpers ----
-import importlib, pkgutil, inspect, os
+import importlib, pkgutil, inspect
 import inspect  # for checking a function’s signature
 # --- Rev-3 Quick Modules catalog + runner (uses Rev-3 calling convention) ---
 import importlib, inspect
@@ -31,7 +35,8 @@ from workflows.pm_common.action_tracker import render_action_tracker_panel
 # app.py (top-level imports, with your other workflow imports)
 
 
-from services.history import append_snapshot, get_history
+from services.history import get_history
+from services.write_behind import enqueue as autosave_enqueue, flush as autosave_flush
 from services.industries import route as industries_route
 from services.industry_gate_requirements import list_required_artifacts_industry_aware
 from services.rev3_module_launcher import REV3_GROUPS
@@ -43,7 +48,7 @@ from services.industry_gate_requirements import (
 
     MANUFACTURING_GATE_CHECK,
 )
-from services.rev3_module_launcher import run_legacy, discover_rev3_packages, discover_rev3_packages_cached
+from services.rev3_module_launcher import run_legacy
 from services import stakeholders as _stake
 from services import action_center as _ac  # optional: used for “Create actions”
 # --- PM Hub renderers (add this next to the other industry hub imports) ---
@@ -146,69 +151,6 @@ REV3_T["group_titles"] = {
 
 
 
-def _rev3_title_from_mod(name: str) -> str:
-    # “foo_bar” -> “Foo Bar”
-    return name.split(".")[-1].replace("_", " ").title()
-
-def _try_register_module(index: dict, module_path: str):
-    """
-    Try to import a module and find a callable entry point.
-    Accepted names: run, main, <module_basename>
-    """
-    try:
-        mod = importlib.import_module(module_path)
-    except Exception:
-        return
-    entry = None
-    for cand in ("run", "main", module_path.split(".")[-1]):
-        fn = getattr(mod, cand, None)
-        if callable(fn):
-            entry = cand
-            break
-    if not entry:
-        return
-    # Optional: reject obviously non-UI libs
-    if getattr(mod, "__file__", "").endswith("__init__.py"):
-        # Still fine, keep it if it has a callable
-        pass
-    title = _rev3_title_from_mod(module_path)
-        # Skip Ops Hub packages in the Modules catalog
-    leaf = module_path.split(".")[-1]
-    if leaf.startswith(("ops_", "ops")):
-        return
-
-    index[title] = (module_path, entry)
-
-def discover_rev3_packages(package_names: list[str]) -> dict[str, tuple[str, str]]:
-    """
-    Walk packages and register any module that exposes a callable entry point.
-    Returns: {Nice Title: (module_path, entry_name)}
-    """
-    index: dict[str, tuple[str, str]] = {}
-    for pkg_name in package_names:
-        try:
-            pkg = importlib.import_module(pkg_name)
-        except Exception:
-            continue
-        pkg_path = os.path.dirname(getattr(pkg, "__file__", "") or "")
-        if not pkg_path:
-            continue
-        # Scan python modules under this package
-        for m in pkgutil.walk_packages([pkg_path], prefix=pkg_name + "."):
-            name = m.name
-            # Skip obvious non-apps
-            if any(seg in name for seg in (".tests", ".test", ".fixtures", ".unit_operations")):
-                # keep unit_operations for Eng sim only; most are not standalone screens
-                continue
-            _try_register_module(index, name)
-    return index
-# Cache the (slow) package scan so the UI feels snappy
-@st.cache_data(show_spinner=False)
-def discover_rev3_packages_cached(package_names: list[str]) -> dict[str, tuple[str, str]]:
-    return discover_rev3_packages(package_names)
-# (optional) use a TTL if you edit modules often:
-# @st.cache_data(ttl=60, show_spinner=False)
-
 # --- Make sure local package imports work even if launched from IDE/CWD elsewhere
 sys.path.insert(0, str(pathlib.Path(__file__).parent.resolve()))
 
@@ -219,9 +161,11 @@ from artifact_registry import (
     save_artifact,
     approve_artifact,
     get_latest,
+    get_latest_many,
     list_required_artifacts,
     publish_event,
     read_events,
+    read_events_since,
 )
 # ---------- BEGIN: industry-aware gate requirements ----------
 # === IT modules & contracts (robust imports; works with or without a 'modules' package) ===
@@ -331,7 +275,6 @@ def required_artifacts_for_phase(phase_code: str) -> list[dict]:
 # =============================================================================
 # Services
 # =============================================================================
-from services.history import append_snapshot, get_history
 # app.py (near the top)
 try:
     from config.modules_config import TAXONOMY
@@ -586,9 +529,10 @@ def render_requirements(industry: str, phase_code: str, proj_type: str = None):
 
     cols = st.columns(2)
     done = 0
+    latest = get_latest_many(project_id, [r.get("type", "?") for r in reqs], phase_id) if get_latest else {}
     for i, r in enumerate(reqs):
         ws, typ = r.get("workstream","?"), r.get("type","?")
-        rec = get_latest(project_id, typ, phase_id) if get_latest else None
+        rec = latest.get(typ)
         status = (rec or {}).get("status", "Missing")
         is_ok  = status == "Approved"
         if is_ok: done += 1
@@ -608,7 +552,7 @@ def render_requirements(industry: str, phase_code: str, proj_type: str = None):
                     _safe_rerun()
 
     st.caption(f"Progress: {done}/{len(reqs)} approved")
-# --- lightweight event loop (works with artifact_registry.read_events) ---
+# --- lightweight event loop (works with artifact_registry.read_events_since) ---
 _EVENT_HANDLERS = st.session_state.setdefault("_event_handlers", {})
 
 def register_handler(event_type: str, fn):
@@ -618,26 +562,17 @@ def register_handler(event_type: str, fn):
 def drain_events(project_id: str):
     """Fetch recent events and dispatch to any registered handlers (safe no-ops if none)."""
     try:
-        from artifact_registry import read_events  # uses in-memory fallback when no Firestore
+        from artifact_registry import read_events_since  # uses in-memory fallback when no Firestore
     except Exception:
-        read_events = None
-    if not read_events:
         return
-
-    last_ts = int(st.session_state.get("_last_event_ts", 0))
-    evts = read_events(project_id) or []
-
-    # process in chronological order and skip already-seen
-    for e in sorted(evts, key=lambda x: int(x.get("ts", 0))):
-        ts = int(e.get("ts", 0))
-        if ts <= last_ts:
-            continue
+    cursors = st.session_state.setdefault("_event_cursors_ops", {})
+    evts, cursors[project_id] = read_events_since(project_id, cursors.get(project_id))
+    for e in evts:  # oldest first
         for fn in _EVENT_HANDLERS.get(e.get("event_type", ""), []):
             try:
                 fn(e)
             except Exception:
                 pass  # keep UI resilient
-        st.session_state["_last_event_ts"] = ts
 
 # === Ops Hub router (daily_ops, small_projects, call_center) ===
 import importlib
@@ -848,11 +783,9 @@ except Exception as exc:
 # Optional Firebase init (falls back to in-memory if not configured)
 # =============================================================================
 try:
-    import firebase_admin
-    from firebase_admin import credentials, firestore as _fs
-    if not firebase_admin._apps:
-        cred = credentials.Certificate(dict(st.secrets["firebase"]))
-        firebase_admin.initialize_app(cred)
+    # resolved once per process and shared by data/firestore, artifact_registry, pm_bridge
+    from data.storage_clients import get_firestore as _get_firestore
+    _get_firestore()
 except Exception:
     # No firebase secrets / SDK → artifact_registry uses in-memory fallback
     pass
@@ -869,34 +802,31 @@ CASCADE_MODE = "manual"
 # Event Bus (in-app)
 # =============================================================================
 EVENT_HANDLERS: Dict[str, Callable[[dict], None]] = {}
-if "_processed_events" not in st.session_state:
-    st.session_state["_processed_events"] = set()
+# per-project high-water mark; only events after it are fetched and dispatched
+if "_event_cursors" not in st.session_state:
+    st.session_state["_event_cursors"] = {}
 
 def register_handler(event_type: str, fn: Callable[[dict], None]):
     EVENT_HANDLERS[event_type] = fn
 
-def process_events(project_id: str):
-    """Pull recent events from registry and dispatch unseen ones."""
-    events = read_events(project_id)  # latest first
+def process_events(project_id: str) -> int:
+    """Fetch events newer than this session's cursor, dispatch them in order, return how many."""
+    cursors = st.session_state["_event_cursors"]
+    events, cursor = read_events_since(project_id, cursors.get(project_id))  # oldest first
     for e in events:
-        key = f"{e.get('ts')}::{e.get('event_type')}::{e.get('payload',{}).get('artifact_id','_')}"
-        if key in st.session_state["_processed_events"]:
-            continue
         handler = EVENT_HANDLERS.get(e.get("event_type"))
         if handler:
             try:
                 handler(e)
             except Exception as ex:
                 st.warning(f"Handler error for {e.get('event_type')}: {ex}")
-        st.session_state["_processed_events"].add(key)
+    cursors[project_id] = cursor
+    return len(events)
 
 def drain_events(project_id: str, max_iters: int = 5):
     """Process events repeatedly so cascaded events are handled in the same run."""
     for _ in range(max_iters):
-        before = len(st.session_state["_processed_events"])
-        process_events(project_id)
-        after = len(st.session_state["_processed_events"])
-        if after == before:
+        if process_events(project_id) == 0:
             break
 
 # =============================================================================
@@ -1089,11 +1019,12 @@ def render_swimlane(project_id: str, phase_code: str, phase_id: str):
         by_ws.setdefault(r["workstream"], []).append(r["type"])
 
     st.markdown("### Phase Swimlane")
+    latest_by_type = get_latest_many(project_id, [r["type"] for r in required], phase_id)
     for ws, types in by_ws.items():
         st.markdown(f"#### {ws}")
         st.write("<div class='dm-row'>", unsafe_allow_html=True)
         for t in types:
-            latest = get_latest(project_id, t, phase_id)
+            latest = latest_by_type.get(t)
             status = artifact_status_label(latest)
             color = STATUS_COLORS.get(status, "#9AA0A6")
             chip = f"<span class='dm-chip'><span class='dot' style='background:{color}'></span>{t} — {status}</span>"
@@ -1105,8 +1036,9 @@ def check_gate_ready(project_id: str, phase_code: str, phase_id: str) -> dict:
     req = required_artifacts_for_phase(phase_code)
 
     missing, drafts = [], []
+    latest_by_type = get_latest_many(project_id, [r["type"] for r in req], phase_id)
     for r in req:
-        latest = get_latest(project_id, r["type"], phase_id)
+        latest = latest_by_type.get(r["type"])
         if not latest:
             missing.append(f"{r['workstream']} — {r['type']}")
         elif latest.get("status") != "Approved":
@@ -1966,6 +1898,7 @@ with st.sidebar:
     mode_locked = (st.session_state.active_project_id is not None and st.session_state.active_namespace == namespace)
     if mode_locked: st.caption("Group locked to this project. Choose “— none —” to switch.")
     if st.button("Reset (unlock)", key="btn_reset_unlock"):
+        autosave_flush(st.session_state.active_project_id)  # leaving the project: write queued autosaves now
         st.session_state.active_project_id = None
         st.session_state.active_namespace = None
         st.session_state.qp_applied = False
@@ -2001,6 +1934,7 @@ with st.sidebar:
 
     if st.button(load_label, key=f"btn_load_{namespace}"):
         if st.session_state.active_project_id:
+            autosave_flush(st.session_state.active_project_id)
             payload = load_project_doc(username, namespace, st.session_state.active_project_id, doc_key)
             st.success("Loaded (if found). See JSON below.")
             if payload: st.json(payload)
@@ -2259,23 +2193,25 @@ if st.session_state["view"] == "PM Hub":
         st.caption("Pipeline = guided path: " + " → ".join(_labels) + ". Uses the same artifacts shown here.")
 
 
+    _kpi_latest = get_latest_many(PROJECT_ID, ["WBS", "Schedule_Network", "Cost_Model"], PHASE_ID)
     col1, col2, col3 = st.columns(3)
     with col1:
-        wbs = get_latest(PROJECT_ID, "WBS", PHASE_ID)
+        wbs = _kpi_latest["WBS"]
         st.metric("WBS nodes", len(wbs.get("data", {}).get("nodes", [])) if wbs else 0)
     with col2:
-        sched = get_latest(PROJECT_ID, "Schedule_Network", PHASE_ID)
+        sched = _kpi_latest["Schedule_Network"]
         st.metric("Critical Path (days)", len(sched.get("data", {}).get("critical_path_ids", [])) if sched else 0)
     with col3:
-        cost = get_latest(PROJECT_ID, "Cost_Model", PHASE_ID)
+        cost = _kpi_latest["Cost_Model"]
         st.metric("CAPEX items", len(cost.get("data", {}).get("capex_breakdown", [])) if cost else 0)
 
     st.divider()
     st.markdown("### Required Artifacts for Phase")
     req = required_artifacts_for_phase(PHASE_CODE)
 
+    latest_by_type = get_latest_many(PROJECT_ID, [r["type"] for r in req], PHASE_ID)
     for r in req:
-        latest = get_latest(PROJECT_ID, r["type"], PHASE_ID)
+        latest = latest_by_type.get(r["type"])
         status = latest.get("status") if latest else "Missing"
         st.write(f"**{r['workstream']} – {r['type']}**: {status}")
 
@@ -2620,8 +2556,9 @@ if st.session_state["view"] == "PM Hub":
     st.markdown("### Action Center (Pending Artifacts)")
     _pending_types = ["PFD_Package","Equipment_List","Utilities_Load","WBS","Schedule_Network","Long_Lead_List","Cost_Model","Risk_Register","QA_Scorecard","Coaching_Plan","Shift_Handover","KPI_Snapshot"]
     cols = st.columns(3); idx = 0
+    _pending_latest = get_latest_many(PROJECT_ID, _pending_types, PHASE_ID)
     for _t in _pending_types:
-        rec = get_latest(PROJECT_ID, _t, PHASE_ID)
+        rec = _pending_latest.get(_t)
         if rec and rec.get("status") == "Pending":
             with cols[idx % 3]:
                 st.write(f"**{_t}** — Pending")
@@ -2724,17 +2661,15 @@ if autosave_enabled and st.session_state.get("active_project_id"):
         fingerprint = hashlib.md5(snap.encode("utf-8")).hexdigest()
         last_key = f"last_snapshot__{ns}__{doc_key_current}"
         if st.session_state.get(last_key) != fingerprint:
-            status = save_project_doc(username, ns, st.session_state.active_project_id, doc_key_current, data)
-            try:
-                if st.session_state.mode == "projects":
-                    hist_key = (st.session_state.get("__pm_overview_doc_key") or doc_key_current)
-                else:
-                    hist_key = f"ops_overview_{st.session_state.ops_mode}"
-                append_snapshot(username, ns, st.session_state.active_project_id, hist_key, data)
-            except Exception:
-                pass
+            if st.session_state.mode == "projects":
+                hist_key = (st.session_state.get("__pm_overview_doc_key") or doc_key_current)
+            else:
+                hist_key = f"ops_overview_{st.session_state.ops_mode}"
+            # write-behind: doc + history snapshot are coalesced and written off the render path
+            autosave_enqueue(username, ns, st.session_state.active_project_id, doc_key_current, data,
+                             hist_key=hist_key, serialized=snap)
             st.session_state[last_key] = fingerprint
-            st.caption(f"Autosaved ({status.get('mode','local')}).")
+            st.caption("Autosave queued.")
     except Exception:
         pass
 
@@ -1,38 +1,59 @@
 # artifact_registry.py
 from __future__ import annotations
-import time
+import hashlib, time
 from typing import Any, Dict, List, Optional
-from google.cloud.firestore_v1 import FieldFilter
 
 try:
     import firebase_admin
     from firebase_admin import firestore
+    from google.cloud.firestore_v1 import FieldFilter
 except Exception:
     firebase_admin = None
     firestore = None
+    FieldFilter = None
+
+try:
+    from google.api_core.exceptions import FailedPrecondition  # missing composite index
+except Exception:
+    class FailedPrecondition(Exception):  # type: ignore[no-redef]
+        pass
+
+try:
+    from data.storage_clients import get_firestore
+except Exception:
+    from storage_clients import get_firestore
+
+try:
+    from utils.ids import new_id
+except Exception:
+    from ids import new_id
 
 # === Firestore helpers ===
 
 def _get_db():
-    if firebase_admin and firebase_admin._apps:
-        return firestore.client()
-    return None
+    # shared, process-wide client (see data/storage_clients.py)
+    if firestore is None:
+        return None
+    return get_firestore()
 
 # In-memory fallback so the app still runs without Firebase
-_INMEMORY = {
-    "artifacts": [],
-    "events": [],
-    "baselines": [],
-}
+# (indexed store + event log, journaled to disk; see artifact_store.py)
+from artifact_store import get_store as _mem
 
 # === Core API ===
 
 def save_artifact(project_id: str, phase_id: str, workstream: str, a_type: str, data: Dict[str, Any],
                   status: str = "Draft", sources: Optional[List[str]] = None, tags: Optional[List[str]] = None,
-                  created_by: str = "system") -> Dict[str, Any]:
+                  created_by: str = "system", idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Save a new artifact. Artifact ids are ULID-style ("A-<ulid>"), so they are
+    unique and sort by creation time. Passing `idempotency_key` makes retries
+    safe: a second save with the same key (per project) returns the first
+    artifact unchanged and emits no events.
+    """
     now = int(time.time())
     payload = {
-        "artifact_id": f"A-{now}",
+        "artifact_id": new_id("A-"),
         "project_id": project_id,
         "phase_id": phase_id,
         "workstream": workstream,
@@ -47,13 +68,27 @@ def save_artifact(project_id: str, phase_id: str, workstream: str, a_type: str,
         "created_at": now,
         "updated_at": now,
     }
+    if idempotency_key:
+        payload["idempotency_key"] = idempotency_key
     db = _get_db()
     if db:
-        doc_ref = db.collection("projects").document(project_id).collection("artifacts").document()
-        payload["artifact_id"] = doc_ref.id
-        doc_ref.set(payload)
+        col = db.collection("projects").document(project_id).collection("artifacts")
+        if idempotency_key:
+            # deterministic doc id: create() fails if a retry already wrote it
+            doc_ref = col.document("idem-" + hashlib.sha1(idempotency_key.encode("utf-8")).hexdigest())
+            try:
+                doc_ref.create(payload)
+            except Exception:
+                snap = doc_ref.get()
+                if not snap.exists:
+                    raise
+                return snap.to_dict()
+        else:
+            col.document(payload["artifact_id"]).set(payload)
     else:
-        _mem()["artifacts"].append(payload)
+        stored, created = _mem().put_if_absent(payload)
+        if not created:
+            return stored
 
     # always emit a lightweight created event (optional)
     publish_event(project_id, "artifact.created", {
@@ -103,16 +138,16 @@ def approve_artifact(project_id: str, artifact_id: str) -> Optional[Dict[str, An
         publish_event(project_id, "artifact.approved", {"artifact_id": data["artifact_id"], "type": data["type"], "phase_id": data["phase_id"], "workstream": data["workstream"]})
         return data
     # in-memory
-    for i, a in enumerate(_INMEMORY["artifacts"]):
-        if a["artifact_id"] == artifact_id and a["project_id"] == project_id:
-            a = dict(a)
-            a["status"] = "Approved"
-            a["version"] = int(a.get("version", 1)) + 1
-            a["updated_at"] = now
-            _INMEMORY["artifacts"][i] = a
-            publish_event(project_id, "artifact.approved", {"artifact_id": a["artifact_id"], "type": a["type"], "phase_id": a["phase_id"], "workstream": a["workstream"]})
-            return a
-    return None
+    a = _mem().get(artifact_id)
+    if not a or a["project_id"] != project_id:
+        return None
+    a = dict(a)
+    a["status"] = "Approved"
+    a["version"] = int(a.get("version", 1)) + 1
+    a["updated_at"] = now
+    _mem().put_artifact(a)
+    publish_event(project_id, "artifact.approved", {"artifact_id": a["artifact_id"], "type": a["type"], "phase_id": a["phase_id"], "workstream": a["workstream"]})
+    return a
 
 
 # 🔧 HOTFIX: avoid composite-index requirement by sorting client-side
@@ -136,11 +171,38 @@ def get_latest(project_id: str, a_type: str, phase_id: Optional[str] = None) ->
         if not items:
             return None
         return max(items, key=lambda x: x.get("updated_at", 0))
-    # in-memory
-    candidates = [a for a in _INMEMORY["artifacts"] if a["project_id"] == project_id and a["type"] == a_type and (phase_id is None or a["phase_id"] == phase_id)]
-    if not candidates:
-        return None
-    return sorted(candidates, key=lambda x: x.get("updated_at", 0), reverse=True)[0]
+    # in-memory: latest per (project, type, phase) is maintained on write
+    return _mem().latest(project_id, a_type, phase_id)
+
+
+def get_latest_many(project_id: str, types: List[str], phase_id: Optional[str] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Latest artifact per type in one pass: {type: artifact or None}.
+    Firestore: one `type IN [...]` query per 10 types (the IN limit) instead
+    of one query per type; results are reduced to the newest per type.
+    """
+    wanted = list(dict.fromkeys(t for t in types if t))
+    out: Dict[str, Optional[Dict[str, Any]]] = {t: None for t in wanted}
+    if not wanted:
+        return out
+    db = _get_db()
+    if db:
+        col = db.collection("projects").document(project_id).collection("artifacts")
+        for i in range(0, len(wanted), 10):
+            q = col.where(filter=FieldFilter("type", "in", wanted[i:i + 10]))
+            if phase_id:
+                q = q.where(filter=FieldFilter("phase_id", "==", phase_id))
+            for d in q.stream():
+                item = d.to_dict()
+                t = item.get("type")
+                cur = out.get(t)
+                if t in out and (cur is None or item.get("updated_at", 0) > cur.get("updated_at", 0)):
+                    out[t] = item
+        return out
+    mem = _mem()
+    for t in wanted:
+        out[t] = mem.latest(project_id, t, phase_id)
+    return out
 
 
 def list_required_artifacts(phase_code: str) -> List[Dict[str, str]]:
@@ -202,11 +264,13 @@ def publish_event(project_id: str, event_type: str, payload: Dict[str, Any]):
         "event_type": event_type,
         "payload": payload,
         "ts": int(time.time()),
+        # ULID: breaks same-second ties for cursor reads (read_events_since)
+        "event_id": new_id("E-"),
     }
     if db:
         db.collection("projects").document(project_id).collection("events").add(event)
     else:
-        _INMEMORY["events"].append(event)
+        _mem().append_event(event)
 
 
 def read_events(project_id: str, event_type: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -216,4 +280,77 @@ def read_events(project_id: str, event_type: Optional[str] = None) -> List[Dict[
         docs = list(q.stream())
         items = [d.to_dict() for d in docs]
         return [e for e in items if not event_type or e.get("event_type") == event_type]
-    return [e for e in reversed(_INMEMORY["events"]) if e["project_id"] == project_id and (not event_type or e["event_type"] == event_type)]
\ No newline at end of file
+    return _mem().events(project_id, event_type)
+
+
+def _event_pos(e: Dict[str, Any]):
+    return (int(e.get("ts", 0)), str(e.get("event_id", "")))
+
+
+def _cursor_for(e: Dict[str, Any]) -> Dict[str, Any]:
+    return {"ts": int(e.get("ts", 0)), "seq": int(e.get("seq", 0)), "id": str(e.get("event_id", ""))}
+
+
+def _events_after_by_ts(col, ts: int, eid: str, limit: int) -> List[Dict[str, Any]]:
+    """
+    Events after (ts, eid) using single-field ts queries only: the rest of the
+    cursor's second in full, then the next `limit` events. The last second of
+    that page is read in full as well, so a page never ends on a partial second.
+    """
+    items = [e for e in (d.to_dict() for d in col.where(filter=FieldFilter("ts", "==", ts)).stream())
+             if _event_pos(e) > (ts, eid)]
+    later = [d.to_dict() for d in col.where(filter=FieldFilter("ts", ">", ts)).order_by("ts").limit(limit).stream()]
+    if len(later) == limit:
+        edge = int(later[-1].get("ts", 0))
+        later = [e for e in later if int(e.get("ts", 0)) != edge]
+        later += [d.to_dict() for d in col.where(filter=FieldFilter("ts", "==", edge)).stream()]
+    items = sorted(items + later, key=_event_pos)
+    n = min(limit, len(items))
+    while 0 < n < len(items) and _event_pos(items[n]) == _event_pos(items[n - 1]):
+        n += 1   # events without event_id tie on their second: keep them on one page
+    return items[:n]
+
+
+def read_events_since(project_id: str, cursor: Optional[Dict[str, Any]] = None,
+                      limit: int = 100, backlog: int = 100):
+    """
+    Incremental read for event consumers. Returns (events oldest-first, cursor).
+    Pass the returned cursor back in to get only newer events; cursor=None
+    starts with the latest `backlog` events (what a fresh session used to see).
+    The cursor is a high-water mark {"ts", "seq", "id"}: the in-memory log
+    uses its per-project seq, Firestore orders by (ts, event_id) server-side
+    and starts after the cursor. That query needs the composite index in
+    firestore.indexes.json; until it exists, and while the cursor sits on
+    events written before event_id was added (they are not in that index),
+    the read falls back to single-field ts queries.
+    """
+    db = _get_db()
+    if db:
+        col = db.collection("projects").document(project_id).collection("events")
+        if cursor is None:
+            docs = col.order_by("ts", direction=firestore.Query.DESCENDING).limit(backlog).stream()
+            items = sorted((d.to_dict() for d in docs), key=_event_pos)
+        else:
+            ts, eid = int(cursor.get("ts", 0)), str(cursor.get("id", ""))
+            items = None
+            if eid:
+                # keyset paging on (ts, event_id): a full page may end inside a second,
+                # and the next page resumes right after its last event
+                q = col.order_by("ts").order_by("event_id").start_after({"ts": ts, "event_id": eid})
+                try:
+                    items = [d.to_dict() for d in q.limit(limit).stream()]
+                except FailedPrecondition:
+                    items = None
+            if items is None:
+                items = _events_after_by_ts(col, ts, eid, limit)
+    else:
+        mem = _mem()
+        start = max(0, mem.last_seq(project_id) - backlog) if cursor is None else int(cursor.get("seq", 0))
+        items = mem.events_after(project_id, start)[:limit]
+        if not items and cursor is None:
+            cursor = {"ts": 0, "seq": start, "id": ""}
+
+    if items:
+        return items, _cursor_for(items[-1])
+    return [], cursor or {"ts": 0, "seq": 0, "id": ""}
+
@@ -0,0 +1,202 @@
+# artifact_store.py
+"""
+In-process artifact/event store used by artifact_registry when Firebase
+is not configured.
+
+- artifacts are indexed by id and by (project_id, type, phase_id); the
+  latest version per key is maintained on write, so get_latest is O(1)
+- events are an append-only log per project; each event gets a per-project
+  `seq`, and events_after(project_id, seq) returns only newer ones
+- an optional journal (JSON lines) replays state after a restart
+"""
+from __future__ import annotations
+import json, os, threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Listener = Callable[[str, Dict[str, Any]], None]
+
+
+class MemoryArtifactStore:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.artifacts: Dict[str, Dict[str, Any]] = {}
+        self.by_project: Dict[str, List[str]] = {}
+        # (project_id, type, phase_id) -> artifact_id; phase_id None = any phase
+        self.latest_ids: Dict[Tuple[str, str, Optional[str]], str] = {}
+        # (project_id, idempotency_key) -> artifact_id
+        self.idempotency: Dict[Tuple[str, str], str] = {}
+        self.events_by_project: Dict[str, List[Dict[str, Any]]] = {}
+        self._listeners: List[Listener] = []
+
+    # ---- persistence hook ----
+    def add_listener(self, fn: Listener) -> None:
+        """fn(kind, record) is called after every write; kind is "artifact" or "event"."""
+        self._listeners.append(fn)
+
+    def _notify(self, kind: str, record: Dict[str, Any]) -> None:
+        for fn in self._listeners:
+            try:
+                fn(kind, record)
+            except Exception:
+                pass  # persistence must never break the UI
+
+    # ---- artifacts ----
+    def _index_latest(self, key: Tuple[str, str, Optional[str]], a: Dict[str, Any]) -> None:
+        cur_id = self.latest_ids.get(key)
+        if cur_id is None or cur_id == a["artifact_id"]:
+            self.latest_ids[key] = a["artifact_id"]
+            return
+        cur = self.artifacts[cur_id]
+        # ties go to the most recent write
+        if a.get("updated_at", 0) >= cur.get("updated_at", 0):
+            self.latest_ids[key] = a["artifact_id"]
+
+    def put_artifact(self, a: Dict[str, Any], notify: bool = True) -> Dict[str, Any]:
+        """Insert or replace an artifact (matched by artifact_id)."""
+        with self._lock:
+            aid = a["artifact_id"]
+            if aid not in self.artifacts:
+                self.by_project.setdefault(a["project_id"], []).append(aid)
+            self.artifacts[aid] = a
+            if a.get("idempotency_key"):
+                self.idempotency.setdefault((a["project_id"], a["idempotency_key"]), aid)
+            self._index_latest((a["project_id"], a["type"], a.get("phase_id")), a)
+            self._index_latest((a["project_id"], a["type"], None), a)
+        if notify:
+            self._notify("artifact", a)
+        return a
+
+    def get(self, artifact_id: str) -> Optional[Dict[str, Any]]:
+        return self.artifacts.get(artifact_id)
+
+    def by_idempotency_key(self, project_id: str, key: str) -> Optional[Dict[str, Any]]:
+        aid = self.idempotency.get((project_id, key))
+        return self.artifacts.get(aid) if aid else None
+
+    def put_if_absent(self, a: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Atomic idempotent insert: (stored, created). Matches on idempotency_key."""
+        key = a.get("idempotency_key")
+        with self._lock:
+            if key:
+                existing = self.by_idempotency_key(a["project_id"], key)
+                if existing is not None:
+                    return existing, False
+            self.put_artifact(a)
+        return a, True
+
+    def latest(self, project_id: str, a_type: str, phase_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        aid = self.latest_ids.get((project_id, a_type, phase_id))
+        return self.artifacts.get(aid) if aid else None
+
+    def list_project(self, project_id: str) -> List[Dict[str, Any]]:
+        return [self.artifacts[i] for i in self.by_project.get(project_id, [])]
+
+    # ---- events ----
+    def append_event(self, event: Dict[str, Any], notify: bool = True) -> Dict[str, Any]:
+        with self._lock:
+            log = self.events_by_project.setdefault(event["project_id"], [])
+            if "seq" not in event:
+                event["seq"] = len(log) + 1
+            log.append(event)
+        if notify:
+            self._notify("event", event)
+        return event
+
+    def events(self, project_id: str, event_type: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Latest first (same order as the Firestore path)."""
+        out: List[Dict[str, Any]] = []
+        for e in reversed(self.events_by_project.get(project_id, [])):
+            if event_type and e["event_type"] != event_type:
+                continue
+            out.append(e)
+            if limit is not None and len(out) >= limit:
+                break
+        return out
+
+    def events_after(self, project_id: str, seq: int = 0) -> List[Dict[str, Any]]:
+        """Events with seq > `seq`, oldest first. Seqs are 1-based list positions."""
+        log = self.events_by_project.get(project_id, [])
+        return log[max(0, int(seq)):]
+
+    def last_seq(self, project_id: str) -> int:
+        return len(self.events_by_project.get(project_id, []))
+
+
+class JsonlJournal:
+    """Append-only JSON-lines journal; replay() rebuilds a store after a restart."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, kind: str, record: Dict[str, Any]) -> None:
+        line = json.dumps({"k": kind, "r": record}, ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def replay(self, store: MemoryArtifactStore) -> int:
+        if not os.path.exists(self.path):
+            return 0
+        lines = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for raw in f:
+                try:
+                    row = json.loads(raw)
+                except Exception:
+                    continue  # torn last line after a crash
+                lines += 1
+                if row.get("k") == "artifact":
+                    store.put_artifact(row["r"], notify=False)
+                elif row.get("k") == "event":
+                    store.append_event(row["r"], notify=False)
+        # artifacts are re-journaled on every approval; compact when mostly superseded
+        if lines > 2 * (len(store.artifacts) + sum(len(v) for v in store.events_by_project.values())):
+            self.compact(store)
+        return lines
+
+    def compact(self, store: MemoryArtifactStore) -> None:
+        tmp = self.path + ".tmp"
+        with self._lock:
+            with open(tmp, "w", encoding="utf-8") as f:
+                for a in store.artifacts.values():
+                    f.write(json.dumps({"k": "artifact", "r": a}, ensure_ascii=False, default=str) + "\n")
+                for log in store.events_by_project.values():
+                    for e in log:
+                        f.write(json.dumps({"k": "event", "r": e}, ensure_ascii=False, default=str) + "\n")
+            os.replace(tmp, self.path)
+
+
+def _journal_path() -> Optional[str]:
+    """DECISIONMATE_ARTIFACT_JOURNAL=<path> or "off"; defaults to data/local_store/artifact_journal.jsonl."""
+    path = os.environ.get("DECISIONMATE_ARTIFACT_JOURNAL")
+    if path is not None and path.strip().lower() in ("", "off", "0", "false"):
+        return None
+    if path:
+        return path
+    base = os.path.join(os.getcwd(), "data", "local_store")
+    os.makedirs(base, exist_ok=True)
+    return os.path.join(base, "artifact_journal.jsonl")
+
+
+_STORE: Optional[MemoryArtifactStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_store() -> MemoryArtifactStore:
+    """Process-wide store, replayed from the journal on first use."""
+    global _STORE
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                store = MemoryArtifactStore()
+                path = _journal_path()
+                if path:
+                    journal = JsonlJournal(path)
+                    try:
+                        journal.replay(store)
+                    except Exception:
+                        pass
+                    store.add_listener(journal)
+                _STORE = store
+    return _STORE
@@ -13,73 +13,139 @@ def _local_path(username: str, doc: str) -> str:
     safe_doc = doc.replace("/", "_")
     return os.path.join(_local_dir(), f"{safe_user}__{safe_doc}.json")
 
-def _has_firebase_secrets() -> bool:
+def _local_backend() -> str:
+    """'sqlite' (default) or 'json'; set DECISIONMATE_LOCAL_BACKEND to choose."""
+    backend = os.environ.get("DECISIONMATE_LOCAL_BACKEND", "sqlite").strip().lower()
+    return backend if backend in ("sqlite", "json") else "sqlite"
+
+def _sqlite():
     try:
-        import streamlit as st  # type: ignore
-        _ = st.secrets["firebase"]
-        return True
+        from data import sqlite_store  # type: ignore
     except Exception:
-        return False
+        import sqlite_store  # type: ignore
+    return sqlite_store
+
+def _local_save(username: str, doc: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    if _local_backend() == "sqlite":
+        store = _sqlite()
+        store.put_doc(username, doc, data)
+        return {"ok": True, "mode": "local", "backend": "sqlite", "path": store.db_path()}
+    path = _local_path(username, doc)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"data": data, "updated_at": time.time()}, f, ensure_ascii=False, indent=2)
+    return {"ok": True, "mode": "local", "path": path}
+
+def _local_load_json(username: str, doc: str) -> Optional[Dict[str, Any]]:
+    path = _local_path(username, doc)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+            return payload.get("data")
+    return None
+
+def _local_load(username: str, doc: str) -> Optional[Dict[str, Any]]:
+    if _local_backend() == "sqlite":
+        store = _sqlite()
+        data = store.get_doc(username, doc)
+        if data is None:
+            # read-through for JSON files written before the SQLite backend existed
+            data = _local_load_json(username, doc)
+            if data is not None:
+                store.put_doc(username, doc, data)
+        return data
+    return _local_load_json(username, doc)
+
+def _clients():
+    try:
+        from data import storage_clients  # type: ignore
+    except Exception:
+        import storage_clients  # type: ignore
+    return storage_clients
+
+def _db():
+    """Shared Firestore client (resolved once per process) or None."""
+    return _clients().get_firestore()
+
+def _docs_col(db, username: str):
+    return db.collection("rev4_projects").document(username).collection("docs")
 
 # --- Public API ---
 def save_doc(username: str, doc: str, data: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Saves a document either to Firestore (if configured) or to local JSON.
+    Saves a document either to Firestore (if configured) or to the local store.
     Returns a small status dict.
     """
-    if _has_firebase_secrets():
+    clients = _clients()
+    db = _db()
+    if db is not None:
         try:
-            import firebase_admin  # type: ignore
-            from firebase_admin import credentials, firestore  # type: ignore
-            import streamlit as st  # type: ignore
-
-            if not firebase_admin._apps:
-                cred = credentials.Certificate(dict(st.secrets["firebase"]))
-                firebase_admin.initialize_app(cred)
-
-            db = firestore.client()
-            db.collection("rev4_projects").document(username).collection("docs").document(doc).set({
-                "data": data,
-                "updated_at": time.time(),
-            })
+            with clients.timed("firestore.save_doc"):
+                _docs_col(db, username).document(doc).set({
+                    "data": data,
+                    "updated_at": time.time(),
+                })
             return {"ok": True, "mode": "firestore"}
-        except Exception as e:
+        except Exception:
             # fallback to local if Firestore fails
             pass
 
     # Local fallback
-    path = _local_path(username, doc)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump({"data": data, "updated_at": time.time()}, f, ensure_ascii=False, indent=2)
-    return {"ok": True, "mode": "local", "path": path}
+    with clients.timed(f"{_local_backend()}.save_doc"):
+        return _local_save(username, doc, data)
+
+def save_docs(username: str, docs: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Saves several documents in one go: a Firestore batch when configured,
+    otherwise a single SQLite transaction (all-or-nothing).
+    """
+    if not docs:
+        return {"ok": True, "mode": "noop"}
+    clients = _clients()
+    db = _db()
+    if db is not None:
+        try:
+            with clients.timed("firestore.save_docs"):
+                batch = db.batch()
+                now = time.time()
+                col = _docs_col(db, username)
+                for doc, data in docs.items():
+                    batch.set(col.document(doc), {"data": data, "updated_at": now})
+                batch.commit()
+            return {"ok": True, "mode": "firestore", "count": len(docs)}
+        except Exception:
+            pass
+
+    with clients.timed(f"{_local_backend()}.save_docs"):
+        if _local_backend() == "sqlite":
+            store = _sqlite()
+            store.put_docs(username, docs)
+            return {"ok": True, "mode": "local", "backend": "sqlite", "count": len(docs)}
+        for doc, data in docs.items():
+            _local_save(username, doc, data)
+        return {"ok": True, "mode": "local", "count": len(docs)}
 
 def load_doc(username: str, doc: str) -> Optional[Dict[str, Any]]:
     """
-    Loads a document from Firestore when configured; otherwise from local JSON.
+    Loads a document from Firestore when configured; otherwise from the local store.
     """
-    if _has_firebase_secrets():
+    clients = _clients()
+    db = _db()
+    if db is not None:
         try:
-            import firebase_admin  # type: ignore
-            from firebase_admin import credentials, firestore  # type: ignore
-            import streamlit as st  # type: ignore
-
-            if not firebase_admin._apps:
-                cred = credentials.Certificate(dict(st.secrets["firebase"]))
-                firebase_admin.initialize_app(cred)
-            db = firestore.client()
-            ref = db.collection("rev4_projects").document(username).collection("docs").document(doc).get()
+            with clients.timed("firestore.load_doc"):
+                ref = _docs_col(db, username).document(doc).get()
             if ref.exists:
                 payload = ref.to_dict()
                 return payload.get("data") if payload else None
         except Exception:
             pass
 
-    path = _local_path(username, doc)
-    if os.path.exists(path):
-        with open(path, "r", encoding="utf-8") as f:
-            payload = json.load(f)
-            return payload.get("data")
-    return None
+    with clients.timed(f"{_local_backend()}.load_doc"):
+        return _local_load(username, doc)
+
+def migrate_local_json(remove: bool = False) -> Dict[str, int]:
+    """One-shot import of data/local_store/*.json into the SQLite backend."""
+    return _sqlite().migrate_json_dir(_local_dir(), remove=remove)
 # ------- PROJECT INDEX HELPERS -------
 
 # ------- PROJECT INDEX HELPERS (namespaced) -------
@@ -108,5 +174,9 @@ def save_project_doc(username: str, namespace: str, project_id: str, doc: str, d
     # namespace all saved docs so PM and Ops don’t collide
     return save_doc(username, f"{namespace}__{project_id}__{doc}", data)
 
+def save_project_docs(username: str, namespace: str, project_id: str, docs: Dict[str, Dict[str, Any]]):
+    """Transactional multi-doc write for one project: {doc: data}."""
+    return save_docs(username, {f"{namespace}__{project_id}__{doc}": data for doc, data in docs.items()})
+
 def load_project_doc(username: str, namespace: str, project_id: str, doc: str):
     return load_doc(username, f"{namespace}__{project_id}__{doc}")
@@ -0,0 +1,188 @@
+# data/sqlite_store.py
+"""
+Embedded SQLite (WAL) backend for the local mode of data/firestore.py.
+
+All docs live in one database file instead of one JSON file per doc.
+Rows are keyed by (username, namespace, project_id, doc); plain
+`save_doc(username, doc)` keys that are not project-scoped are stored
+with an empty namespace/project_id.
+"""
+from __future__ import annotations
+import json, os, sqlite3, threading, time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    username   TEXT NOT NULL,
+    namespace  TEXT NOT NULL DEFAULT '',
+    project_id TEXT NOT NULL DEFAULT '',
+    doc        TEXT NOT NULL,
+    data       TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (username, namespace, project_id, doc)
+) WITHOUT ROWID;
+"""
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialised: set = set()
+
+
+def db_path() -> str:
+    """DB location; override with DECISIONMATE_SQLITE_PATH."""
+    path = os.environ.get("DECISIONMATE_SQLITE_PATH")
+    if path:
+        return path
+    base = os.path.join(os.getcwd(), "data", "local_store")
+    os.makedirs(base, exist_ok=True)
+    return os.path.join(base, "decisionmate.db")
+
+
+def split_doc_key(doc: str) -> Tuple[str, str, str]:
+    """
+    "oil_gas:projects__pid__gate_FEL1" -> ("oil_gas:projects", "pid", "gate_FEL1").
+    Keys that are not namespaced project docs map to ("", "", doc).
+    """
+    parts = doc.split("__", 2)
+    if len(parts) == 3 and ":" in parts[0]:
+        return parts[0], parts[1], parts[2]
+    return "", "", doc
+
+
+def _connect() -> sqlite3.Connection:
+    """One connection per thread (Streamlit runs sessions on worker threads)."""
+    path = db_path()
+    conns: Dict[str, sqlite3.Connection] = getattr(_local, "conns", None) or {}
+    conn = conns.get(path)
+    if conn is not None:
+        return conn
+
+    conn = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    with _init_lock:
+        if path not in _initialised:
+            conn.executescript(_SCHEMA)
+            _initialised.add(path)
+    conns[path] = conn
+    _local.conns = conns
+    return conn
+
+
+@contextmanager
+def transaction() -> Iterator[sqlite3.Connection]:
+    """
+    Group several writes into one atomic transaction:
+
+        with transaction() as conn:
+            put_doc(..., conn=conn); put_doc(..., conn=conn)
+    """
+    conn = _connect()
+    if conn.in_transaction:
+        # nested use joins the outer transaction
+        yield conn
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    else:
+        conn.execute("COMMIT")
+
+
+def put_doc(username: str, doc: str, data: Dict[str, Any],
+            updated_at: Optional[float] = None,
+            conn: Optional[sqlite3.Connection] = None) -> None:
+    namespace, project_id, name = split_doc_key(doc)
+    blob = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+    (conn or _connect()).execute(
+        "INSERT OR REPLACE INTO docs (username, namespace, project_id, doc, data, updated_at) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (username, namespace, project_id, name, blob, updated_at if updated_at is not None else time.time()),
+    )
+
+
+def put_docs(username: str, docs: Dict[str, Dict[str, Any]]) -> None:
+    """Write several docs for one user atomically."""
+    now = time.time()
+    with transaction() as conn:
+        for doc, data in docs.items():
+            put_doc(username, doc, data, updated_at=now, conn=conn)
+
+
+def get_doc(username: str, doc: str) -> Optional[Dict[str, Any]]:
+    namespace, project_id, name = split_doc_key(doc)
+    row = _connect().execute(
+        "SELECT data FROM docs WHERE username=? AND namespace=? AND project_id=? AND doc=?",
+        (username, namespace, project_id, name),
+    ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def list_docs(username: str, namespace: str, project_id: str) -> List[str]:
+    """Doc names saved for one project (served from the primary-key index)."""
+    rows = _connect().execute(
+        "SELECT doc FROM docs WHERE username=? AND namespace=? AND project_id=? ORDER BY doc",
+        (username, namespace, project_id),
+    ).fetchall()
+    return [r[0] for r in rows]
+
+
+def migrate_json_dir(json_dir: str, remove: bool = False) -> Dict[str, int]:
+    """
+    One-shot import of the legacy `<user>__<doc>.json` files.
+    Existing rows with a newer `updated_at` are kept. Returns counters.
+    """
+    stats = {"imported": 0, "skipped": 0, "failed": 0}
+    if not os.path.isdir(json_dir):
+        return stats
+    migrated: List[str] = []
+
+    with transaction() as conn:
+        for fname in sorted(os.listdir(json_dir)):
+            if not fname.endswith(".json") or "__" not in fname:
+                continue
+            path = os.path.join(json_dir, fname)
+            username, doc = fname[:-len(".json")].split("__", 1)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    payload = json.load(f)
+                data = payload.get("data")
+                ts = float(payload.get("updated_at") or os.path.getmtime(path))
+            except Exception:
+                stats["failed"] += 1
+                continue
+            if data is None:
+                stats["skipped"] += 1
+                continue
+            migrated.append(path)
+
+            namespace, project_id, name = split_doc_key(doc)
+            row = conn.execute(
+                "SELECT updated_at FROM docs WHERE username=? AND namespace=? AND project_id=? AND doc=?",
+                (username, namespace, project_id, name),
+            ).fetchone()
+            if row and row[0] >= ts:
+                stats["skipped"] += 1
+                continue
+            put_doc(username, doc, data, updated_at=ts, conn=conn)
+            stats["imported"] += 1
+
+    if remove:
+        for path in migrated:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    return stats
+
+
+if __name__ == "__main__":  # python -m data.sqlite_store [json_dir] [--remove]
+    import sys
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    src = args[0] if args else os.path.join(os.getcwd(), "data", "local_store")
+    print(migrate_json_dir(src, remove="--remove" in sys.argv))
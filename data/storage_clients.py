@@ -0,0 +1,137 @@
+# data/storage_clients.py
+"""
+Process-wide storage-client registry.
+
+Resolves Firebase credentials once per process, initialises firebase_admin
+at most once, and hands the same Firestore client to every caller
+(data/firestore.py, artifact_registry.py, services/pm_bridge.py, app.py).
+Module state survives Streamlit reruns and is shared by all sessions.
+
+Also keeps simple per-operation call/error/latency counters:
+
+    with timed("firestore.save_doc"):
+        ...
+    stats()   # {"firestore.save_doc": {"calls", "errors", "avg_ms", "max_ms", ...}}
+    health()  # {"firestore": "ready" | "unconfigured" | "error", ...}
+"""
+from __future__ import annotations
+import threading, time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+RETRY_AFTER_S = 30.0  # back-off after a failed initialisation
+
+_lock = threading.RLock()
+_state: Dict[str, Any] = {
+    "status": "unresolved",   # unresolved | unconfigured | ready | error
+    "client": None,
+    "last_error": None,
+    "failed_at": 0.0,
+    "init_ms": None,
+}
+_counters: Dict[str, Dict[str, float]] = {}
+
+
+def _resolve_credentials() -> Optional[Dict[str, Any]]:
+    """Service-account dict from st.secrets["firebase"], or None."""
+    try:
+        import streamlit as st  # type: ignore
+        return dict(st.secrets["firebase"])
+    except Exception:
+        return None
+
+
+def _init_client():
+    import firebase_admin  # type: ignore
+    from firebase_admin import credentials, firestore  # type: ignore
+
+    if not firebase_admin._apps:
+        creds = _resolve_credentials()
+        if creds is None:
+            return None
+        firebase_admin.initialize_app(credentials.Certificate(creds))
+    return firestore.client()
+
+
+def get_firestore():
+    """Shared Firestore client, or None when Firebase is not configured/available."""
+    state = _state
+    if state["status"] == "ready":
+        return state["client"]
+    if state["status"] == "unconfigured":
+        return None
+    if state["status"] == "error" and time.time() - state["failed_at"] < RETRY_AFTER_S:
+        return None
+
+    with _lock:
+        if state["status"] == "ready":
+            return state["client"]
+        t0 = time.perf_counter()
+        try:
+            client = _init_client()
+        except ImportError as e:
+            state.update(status="unconfigured", client=None, last_error=str(e))
+            return None
+        except Exception as e:
+            state.update(status="error", client=None, last_error=str(e), failed_at=time.time())
+            return None
+        state["init_ms"] = (time.perf_counter() - t0) * 1000.0
+        if client is None:
+            state.update(status="unconfigured", client=None)
+            return None
+        state.update(status="ready", client=client, last_error=None)
+        return client
+
+
+def firebase_ready() -> bool:
+    return get_firestore() is not None
+
+
+def reset() -> None:
+    """Forget the cached client (tests, or after rotating credentials)."""
+    with _lock:
+        _state.update(status="unresolved", client=None, last_error=None, failed_at=0.0, init_ms=None)
+        _counters.clear()
+
+
+# ---- counters ----
+
+def record(op: str, seconds: float, ok: bool = True) -> None:
+    with _lock:
+        c = _counters.setdefault(op, {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0})
+        ms = seconds * 1000.0
+        c["calls"] += 1
+        c["errors"] += 0 if ok else 1
+        c["total_ms"] += ms
+        c["last_ms"] = ms
+        c["max_ms"] = max(c["max_ms"], ms)
+
+
+@contextmanager
+def timed(op: str) -> Iterator[None]:
+    t0 = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        record(op, time.perf_counter() - t0, ok)
+
+
+def stats() -> Dict[str, Dict[str, float]]:
+    with _lock:
+        out = {}
+        for op, c in _counters.items():
+            row = dict(c)
+            row["avg_ms"] = c["total_ms"] / c["calls"] if c["calls"] else 0.0
+            out[op] = row
+        return out
+
+
+def health() -> Dict[str, Any]:
+    return {
+        "firestore": _state["status"],
+        "last_error": _state["last_error"],
+        "init_ms": _state["init_ms"],
+        "ops": stats(),
+    }
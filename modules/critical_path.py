@@ -3,7 +3,12 @@ import pandas as pd
 import io
 from fpdf import FPDF
 from firebase_db import save_project, load_project_data
-import networkx as nx
+import numpy as np
+
+try:
+    from modules.schedule_engine import CycleError, compile_network
+except ImportError:
+    from schedule_engine import CycleError, compile_network  # type: ignore
 
 def run(T):
     title = T.get("critical_path_title", "Critical Path Analyzer")
@@ -30,60 +35,36 @@ def run(T):
         st.subheader(T.get("activity_table", "Activity Table"))
         st.dataframe(df)
 
-        # Build network graph
-        G = nx.DiGraph()
-        for index, row in df.iterrows():
-            G.add_node(row["Activity"], duration=row["Duration"])
-            for dep in row["Dependencies"]:
-                G.add_edge(dep, row["Activity"])
-
+        # Compile the network (a repeated activity name keeps its last duration and all its links)
+        acts = {}
+        for row in st.session_state.cpm_data:
+            prev = acts.get(row["Activity"], {"Dependencies": []})
+            acts[row["Activity"]] = {"Duration": row["Duration"],
+                                     "Dependencies": list(dict.fromkeys(prev["Dependencies"] + list(row["Dependencies"])))}
         try:
-            topological_order = list(nx.topological_sort(G))
-        except:
+            net = compile_network(list(acts), [a["Duration"] for a in acts.values()],
+                                  [(dep, name, "FS", 0) for name, a in acts.items() for dep in a["Dependencies"]])
+        except CycleError:
             st.error(T.get("cycle_error", "Cycle detected in dependencies. Check inputs."))
             return
+        if net.dropped:
+            st.warning(T.get("unknown_dependency", "Ignored dependencies on undefined activities") + ": "
+                       + ", ".join(sorted({p for p, _, _, _ in net.dropped})))
+
+        cpm = net.cpm()
+        results = pd.DataFrame({
+            "Activity": cpm.ids,
+            "Duration": cpm.duration,
+            "ES": cpm.es,
+            "EF": cpm.ef,
+            "LS": cpm.ls,
+            "LF": cpm.lf,
+            "Slack": cpm.total_float,
+            "Free Float": cpm.free_float,
+            "Critical": np.where(cpm.critical, "Yes", "No"),
+        })
 
-        early_start = {}
-        early_finish = {}
-
-        for node in topological_order:
-            preds = list(G.predecessors(node))
-            if preds:
-                early_start[node] = max(early_finish[p] for p in preds)
-            else:
-                early_start[node] = 0
-            early_finish[node] = early_start[node] + G.nodes[node]["duration"]
-
-        late_finish = {}
-        late_start = {}
-
-        reversed_order = reversed(topological_order)
-        max_finish_time = max(early_finish.values())
-
-        for node in reversed_order:
-            succs = list(G.successors(node))
-            if succs:
-                late_finish[node] = min(late_start[s] for s in succs)
-            else:
-                late_finish[node] = max_finish_time
-            late_start[node] = late_finish[node] - G.nodes[node]["duration"]
-
-        critical_path = [node for node in G.nodes if early_start[node] == late_start[node]]
-
-        results = []
-        for node in G.nodes:
-            results.append({
-                "Activity": node,
-                "Duration": G.nodes[node]["duration"],
-                "ES": early_start[node],
-                "EF": early_finish[node],
-                "LS": late_start[node],
-                "LF": late_finish[node],
-                "Slack": late_start[node] - early_start[node],
-                "Critical": "Yes" if node in critical_path else "No"
-            })
-
-        result_df = pd.DataFrame(results).sort_values("ES").reset_index(drop=True)
+        result_df = results.sort_values("ES").reset_index(drop=True)
         st.success(T.get("critical_path_result", "Critical Path Identified"))
         st.dataframe(result_df)
 
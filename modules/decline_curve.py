@@ -2,6 +2,17 @@ import streamlit as st
 import numpy as np
 import matplotlib.pyplot as plt
 
+try:
+    from modules.reserves_engine import Uncertain, arps_cum, monte_carlo
+except ImportError:
+    from reserves_engine import Uncertain, arps_cum, monte_carlo
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _decline_mc(specs: tuple, n: int, seed: int, t_max: float, q_econ: float):
+    """Monte Carlo EUR, rerun only when a range, the draws or the seed change."""
+    return monte_carlo("decline", {k: Uncertain(*v) for k, v in specs}, n=n, seed=seed, t_max=t_max, q_econ=q_econ)
+
 def run(T):
     st.header("📉 Decline Curve Analyzer")
 
@@ -22,7 +33,8 @@ def run(T):
     elif decline_type == "Hyperbolic":
         q = q_i * (1 + b * D * t) ** (-1 / b)
 
-    cumulative = np.trapz(q, t) * 365  # barrels
+    b_eff = {"Exponential": 0.0, "Harmonic": 1.0}.get(decline_type, b)
+    cumulative = float(arps_cum(q_i, D, b_eff, t_max))  # barrels (closed form, 365 d/yr)
 
     st.markdown(f"**Estimated Cumulative Production:** {cumulative:,.2f} barrels")
 
@@ -33,3 +45,51 @@ def run(T):
     ax.set_title(f"{decline_type} Decline Curve")
     ax.grid(True)
     st.pyplot(fig)
+
+    # ----- Probabilistic EUR (P90 / P50 / P10) -----
+    st.markdown("### Probabilistic EUR (Monte Carlo)")
+    st.caption("Triangular ranges around the inputs above; one vectorised pass over all draws.")
+    u1, u2, u3 = st.columns(3)
+    with u1:
+        qi_rng = st.slider("qi range (× input)", 0.1, 3.0, (0.8, 1.25), 0.05)
+    with u2:
+        d_rng = st.slider("D range (× input)", 0.1, 3.0, (0.7, 1.4), 0.05)
+    with u3:
+        b_rng = st.slider("b range", 0.0, 1.0, (max(0.0, b - 0.3), min(1.0, b + 0.3)) if decline_type == "Hyperbolic" else (b_eff, b_eff), 0.05)
+    m1, m2, m3 = st.columns(3)
+    with m1:
+        n_draws = st.select_slider("Draws", [10_000, 50_000, 100_000, 250_000, 500_000], 100_000)
+    with m2:
+        q_econ = st.number_input("Economic limit rate (bbl/day)", min_value=0.0, value=10.0)
+    with m3:
+        seed = st.number_input("Seed", min_value=0, value=42, step=1)
+
+    specs = (
+        ("qi", (q_i * qi_rng[0], q_i, q_i * qi_rng[1])),
+        ("Di", (D * d_rng[0], D, D * d_rng[1])),
+        ("b", (b_rng[0], min(max(b_eff, b_rng[0]), b_rng[1]), b_rng[1])),
+    )
+    res = _decline_mc(specs, int(n_draws), int(seed), float(t_max), float(q_econ))
+    p = res.percentiles
+    k1, k2, k3, k4 = st.columns(4)
+    k1.metric("P90 EUR (bbl)", f"{p['P90']:,.0f}")
+    k2.metric("P50 EUR (bbl)", f"{p['P50']:,.0f}")
+    k3.metric("P10 EUR (bbl)", f"{p['P10']:,.0f}")
+    k4.metric("Mean EUR (bbl)", f"{p['mean']:,.0f}")
+    st.caption(f"{int(n_draws):,} draws in {res.seconds * 1000:.0f} ms")
+
+    fig2, (ax_h, ax_t) = plt.subplots(1, 2, figsize=(10, 3.5))
+    ax_h.hist(res.eur, bins=60, color="steelblue")
+    for key, ls in (("P90", "--"), ("P50", "-"), ("P10", "--")):
+        ax_h.axvline(p[key], color="k", linestyle=ls)
+    ax_h.set_xlabel("EUR (bbl)")
+    ax_h.set_title("EUR distribution")
+    tor = res.tornado.iloc[::-1]
+    base = float(tor["base"].iloc[0]) if len(tor) else 0.0
+    ax_t.barh(tor["input"], tor["eur_high"] - base, left=base, color="seagreen")
+    ax_t.barh(tor["input"], tor["eur_low"] - base, left=base, color="indianred")
+    ax_t.axvline(base, color="k")
+    ax_t.set_title("Tornado (P10/P90 swing)")
+    fig2.tight_layout()
+    st.pyplot(fig2)
+    st.dataframe(res.tornado, use_container_width=True)
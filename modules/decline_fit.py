@@ -0,0 +1,225 @@
+# modules/decline_fit.py
+"""
+Vectorised Arps decline fitting for the Subsurface module (modules/subsurface.py).
+
+All wells are fitted together on padded (well × point) arrays:
+- exponential start: masked least squares of ln q on t, closed form per well
+- candidate grid: b ∈ [0.1..1] × Di, qi multipliers around the exponential fit,
+  every candidate's log-error evaluated in one broadcast
+- refinement: bounded Levenberg–Marquardt steps on (ln qi, Di, b), batched
+  3×3 normal equations; a step is kept only where it lowers the error
+
+    qi, Di, b = fit_arps(dates, q)                          # one well
+    params = fit_arps_long(df, well_col="well", rate_col="oil_rate")  # many wells
+
+Errors are mean squared log residuals over the positive-rate points, as in the
+original grid search. tests/test_decline_fit.py keeps that search as the
+reference; `python scripts/bench_decline_fit.py` times both on a synthetic field.
+"""
+from __future__ import annotations
+import math
+from datetime import date
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+B_GRID = np.linspace(0.1, 1.0, 10)
+MULTIPLIERS = np.array([0.5, 0.75, 1.0, 1.25, 1.5])
+B_BOUNDS = (0.01, 1.0)
+DI_MIN = 1e-6
+MIN_POINTS = 3
+GRID_CHUNK = 2_000_000    # grid elements evaluated per chunk of wells
+LN_FLOOR = math.log(1e-9)
+
+
+def _month_index(dates: Sequence[date]) -> np.ndarray:
+    return np.array([d.year * 12 + d.month for d in dates], dtype=np.int64)
+
+
+def _pad(series: List[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(W, N) years since first positive rate, ln q and validity mask from (month index, q>0) pairs."""
+    n = max((len(m) for m, _ in series), default=0)
+    T = np.zeros((len(series), n))
+    Y = np.zeros((len(series), n))
+    M = np.zeros((len(series), n), dtype=bool)
+    for w, (m, q) in enumerate(series):
+        T[w, :len(m)], Y[w, :len(m)], M[w, :len(m)] = (m - m[0]) / 12.0, np.log(q), True
+    return T, Y, M
+
+
+def _ln_rate(lnqi, Di, b, t):
+    """ln of the Arps rate (array-valued b, b≈0 → exponential), floored at ln 1e-9 like the error metric."""
+    b = np.asarray(b, dtype=float)
+    expo = np.abs(b) < 1e-6
+    if expo.any():
+        b_safe = np.where(expo, 1.0, b)
+        ln_f = np.where(expo, lnqi - Di * t, lnqi - np.log1p(b_safe * Di * t) / b_safe)
+    else:
+        ln_f = lnqi - np.log1p(b * Di * t) / b
+    return np.maximum(ln_f, LN_FLOOR)
+
+
+def _mse(Y: np.ndarray, M: np.ndarray, lnf: np.ndarray) -> np.ndarray:
+    """Mean squared log residual over valid points (last axis)."""
+    r = (Y - lnf) * M
+    return np.einsum("...n,...n->...", r, r) / np.maximum(M.sum(axis=-1), 1)
+
+
+def _fit_exp_batch(T: np.ndarray, Y: np.ndarray, M: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-well least squares of ln q = ln qi - Di·t."""
+    n = M.sum(axis=1)
+    w = M.astype(float)
+    st, sy = (w * T).sum(1), (w * Y).sum(1)
+    stt, sty = (w * T * T).sum(1), (w * T * Y).sum(1)
+    den = n * stt - st ** 2
+    slope = np.where(den > 0, (n * sty - st * sy) / np.where(den > 0, den, 1.0), 0.0)
+    icpt = (sy - slope * st) / np.maximum(n, 1)
+    return icpt, -slope
+
+
+def _refine(T, Y, M, lnqi, Di, b, iters: int = 30):
+    """Bounded Levenberg–Marquardt on (ln qi, Di, b), all wells at once."""
+    p = np.stack([lnqi, Di, b], axis=1)
+    err = _mse(Y, M, _ln_rate(p[:, :1], p[:, 1:2], p[:, 2:], T))
+    lam = np.full(len(p), 1e-3)
+    w = M.astype(float)
+    for _ in range(iters):
+        lq, D, bb = p[:, :1], p[:, 1:2], p[:, 2:]
+        u = 1.0 + bb * D * T
+        lu = np.log1p(bb * D * T)
+        r = np.where(M, Y - (lq - lu / bb), 0.0)
+        J = np.stack([
+            np.ones_like(T),
+            -T / u,
+            lu / bb ** 2 - D * T / (bb * u),
+        ], axis=-1) * w[..., None]                                      # d(ln f)/dp, (W, N, 3)
+        JtJ = np.einsum("wni,wnj->wij", J, J)
+        Jtr = np.einsum("wni,wn->wi", J, r)
+        A = JtJ + lam[:, None, None] * (np.eye(3) * np.diagonal(JtJ, axis1=1, axis2=2)[:, None, :] + 1e-12 * np.eye(3))
+        try:
+            dp = np.linalg.solve(A, Jtr[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            break
+        cand = p + dp
+        cand[:, 1] = np.maximum(cand[:, 1], DI_MIN)
+        cand[:, 2] = np.clip(cand[:, 2], *B_BOUNDS)
+        cerr = _mse(Y, M, _ln_rate(cand[:, :1], cand[:, 1:2], cand[:, 2:], T))
+        ok = np.isfinite(cerr) & (cerr < err)
+        p = np.where(ok[:, None], cand, p)
+        err = np.where(ok, cerr, err)
+        lam = np.where(ok, lam * 0.3, lam * 10.0)
+        if np.all(lam > 1e8):
+            break
+    return p[:, 0], p[:, 1], p[:, 2], err
+
+
+def fit_arps_batch(
+    series: List[Tuple[Sequence[date], np.ndarray]],
+    prefer_hyperbolic: bool = True,
+    refine: bool = True,
+) -> np.ndarray:
+    """
+    Fit many wells at once. `series` holds (dates, rates) per well, where dates
+    may also be an integer month index (year·12 + month); returns a (W, 4)
+    array of qi, Di, b and the mean squared log error.
+    """
+    out = np.zeros((len(series), 4))
+    fit_idx, prepared = [], []
+    for w, (dates, q) in enumerate(series):
+        q = np.asarray(q, dtype=float)
+        mask = q > 0
+        if mask.sum() < MIN_POINTS:
+            out[w] = (float(q[mask][0] if mask.any() else 1000.0), 0.8, 0.0, np.nan)
+            continue
+        m = dates if isinstance(dates, np.ndarray) and dates.dtype.kind in "iu" else _month_index(dates)
+        fit_idx.append(w)
+        prepared.append((m[mask], q[mask]))
+    if not prepared:
+        return out
+
+    T, Y, M = _pad(prepared)
+    lnqi, Di = _fit_exp_batch(T, Y, M)
+    qi_exp = np.exp(lnqi)
+    best = np.stack([qi_exp, Di, np.zeros_like(Di)], axis=1)
+    best_err = _mse(Y, M, lnqi[:, None] - Di[:, None] * T)
+
+    if prefer_hyperbolic:
+        # (W, b, Di-mult, qi-mult) candidate grid. qi only shifts ln f, so with
+        # r0 = residual at qi_exp the qi axis is  mean(r0²) - 2c·mean(r0) + c²,  c = ln(mult)
+        err = np.empty((len(T), len(B_GRID), len(MULTIPLIERS), len(MULTIPLIERS)))
+        c = np.log(MULTIPLIERS)
+        n = np.maximum(M.sum(axis=1), 1)
+        step_w = max(1, GRID_CHUNK // max(1, T.shape[1] * len(B_GRID) * len(MULTIPLIERS)))
+        for a in range(0, len(T), step_w):
+            sl = slice(a, a + step_w)
+            Dg = np.maximum(DI_MIN, Di[sl, None, None] * MULTIPLIERS[None, None, :])[..., None]
+            r0 = (Y[sl, None, None, :] - _ln_rate(lnqi[sl, None, None, None], Dg, B_GRID[None, :, None, None],
+                                                 T[sl, None, None, :])) * M[sl, None, None, :]
+            m1 = r0.sum(axis=-1) / n[sl, None, None]
+            m2 = np.einsum("...n,...n->...", r0, r0) / n[sl, None, None]
+            err[sl] = m2[..., None] - 2.0 * c * m1[..., None] + c ** 2
+        err = err.reshape(len(T), -1)
+        k = np.argmin(err, axis=1)
+        kb, kd, kq = np.unravel_index(k, (len(B_GRID), len(MULTIPLIERS), len(MULTIPLIERS)))
+        g_err = err[np.arange(len(T)), k]
+        better = g_err < best_err
+        g = np.stack([qi_exp * MULTIPLIERS[kq], np.maximum(DI_MIN, Di * MULTIPLIERS[kd]), B_GRID[kb]], axis=1)
+        best = np.where(better[:, None], g, best)
+        best_err = np.where(better, g_err, best_err)
+
+        if refine:
+            start = np.where(better, best[:, 2], 0.5)
+            r_lnqi, r_Di, r_b, r_err = _refine(T, Y, M, np.log(np.where(better, best[:, 0], qi_exp)),
+                                               np.maximum(DI_MIN, np.where(better, best[:, 1], Di)), start)
+            take = np.isfinite(r_err) & (r_err < best_err)
+            best = np.where(take[:, None], np.stack([np.exp(r_lnqi), r_Di, r_b], axis=1), best)
+            best_err = np.where(take, r_err, best_err)
+
+    out[fit_idx, :3] = best
+    out[fit_idx, 3] = best_err
+    return out
+
+
+def fit_arps(dates: List[date], q: np.ndarray, prefer_hyperbolic: bool = True) -> Tuple[float, float, float]:
+    qi, Di, b, _ = fit_arps_batch([(dates, q)], prefer_hyperbolic=prefer_hyperbolic)[0]
+    return float(qi), float(Di), float(b)
+
+
+def fit_arps_long(
+    df: pd.DataFrame,
+    well_col: str = "well",
+    date_col: str = "date",
+    rate_col: str = "oil_rate",
+    prefer_hyperbolic: bool = True,
+) -> pd.DataFrame:
+    """
+    Fit every well in a long-format frame (one row per well and month).
+    Returns one row per well: well, qi, Di, b, mse_log, n_points.
+    """
+    for c in (well_col, date_col, rate_col):
+        if c not in df.columns:
+            raise ValueError(f"CSV must have a '{c}' column")
+    d = df[[well_col, date_col, rate_col]].copy()
+    d[date_col] = pd.to_datetime(d[date_col], errors="coerce")
+    if d[date_col].isna().any():
+        raise ValueError("Could not parse some dates; expected YYYY-MM or YYYY-MM-DD")
+    d[rate_col] = pd.to_numeric(d[rate_col], errors="coerce").fillna(0.0)
+    d = d.sort_values([well_col, date_col])
+
+    months = (d[date_col].dt.year * 12 + d[date_col].dt.month).to_numpy(dtype=np.int64)
+    rates = d[rate_col].to_numpy(dtype=float)
+    ids = d[well_col].to_numpy()
+    cuts = np.flatnonzero(d[well_col].ne(d[well_col].shift()).to_numpy())
+    bounds = list(zip(cuts, list(cuts[1:]) + [len(d)]))
+
+    wells = [ids[a] for a, _ in bounds]
+    series = [(months[a:b], rates[a:b]) for a, b in bounds]
+    counts = [int((rates[a:b] > 0).sum()) for a, b in bounds]
+    res = fit_arps_batch(series, prefer_hyperbolic=prefer_hyperbolic)
+    return pd.DataFrame({
+        well_col: wells,
+        "qi": res[:, 0], "Di": res[:, 1], "b": res[:, 2], "mse_log": res[:, 3],
+        "n_points": counts,
+    })
+
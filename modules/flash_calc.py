@@ -1,8 +1,62 @@
 import streamlit as st
 import math
+import time
+import matplotlib.pyplot as plt
 import io
 from fpdf import FPDF
 from firebase_db import save_project, load_project_data
+import numpy as np
+import pandas as pd
+
+try:
+    from modules.flash_engine import DEFAULT_GAS, flash, known_components, phase_grid, reservoir_composition
+except ImportError:
+    from flash_engine import DEFAULT_GAS, flash, known_components, phase_grid, reservoir_composition  # type: ignore
+
+
+def _multicomponent(T, pressure, temperature):
+    """Wilson-K / Rachford–Rice flash of a mixture plus a P–T vapour-fraction map."""
+    st.subheader(T.get("multicomponent_flash", "Multicomponent Flash"))
+    source = st.radio(T.get("composition_source", "Composition"),
+                      ["Reservoir_Profiles gas", "Reservoir_Profiles oil", "Default gas"], horizontal=True)
+    z = {}
+    if source.startswith("Reservoir_Profiles"):
+        z = reservoir_composition(source.split()[-1])
+        if not z:
+            st.info(T.get("no_reservoir_comp", "No Reservoir_Profiles composition found; using the default gas."))
+    z = z or dict(DEFAULT_GAS)
+    edited = st.data_editor(pd.DataFrame({"component": list(z), "z": list(z.values())}),
+                            key=f"flash_z_{source}", num_rows="dynamic")
+    z = {str(r.component): float(r.z) for r in edited.itertuples() if r.component and r.z and r.z > 0}
+    if not known_components(z):
+        st.warning(T.get("flash_no_data", "Composition has components without flash data."))
+        return None
+
+    res = flash(pressure, temperature, z)
+    st.markdown(f"**{T.get('phase_state', 'Predicted Phase State')}:** {res.phase[0]} — "
+                f"vapour fraction {res.beta[0]:.4f} mol/mol ({res.vapor_mass_fraction()[0] * 100:.1f} wt%)")
+    st.dataframe(pd.DataFrame({"component": res.components, "z": res.z[0], "K (Wilson)": res.K[0],
+                               "x (liquid)": res.x[0], "y (vapour)": res.y[0]}).round(5))
+
+    with st.expander(T.get("phase_map", "Phase map (P–T sweep)")):
+        c1, c2, c3 = st.columns(3)
+        p_max = c1.number_input("Max P (bar)", min_value=1.0, value=200.0)
+        t_lo, t_hi = c2.slider("T range (°C)", -150.0, 400.0, (-100.0, 200.0))
+        n = int(c3.number_input("Grid points per axis", min_value=20, max_value=400, value=200, step=20))
+        P_axis, T_axis = np.linspace(0.5, p_max, n), np.linspace(t_lo, t_hi, n)
+        t0 = time.perf_counter()
+        beta = phase_grid(z, P_axis, T_axis)
+        dt = time.perf_counter() - t0
+        fig, ax = plt.subplots()
+        cs = ax.contourf(T_axis, P_axis, beta, levels=np.linspace(0, 1, 11), cmap="viridis")
+        ax.contour(T_axis, P_axis, (beta > 0) & (beta < 1), levels=[0.5], colors="w", linewidths=1)
+        ax.plot(temperature, pressure, "r*", ms=10)
+        ax.set_xlabel("T (°C)")
+        ax.set_ylabel("P (bar)")
+        fig.colorbar(cs, label="vapour fraction")
+        st.pyplot(fig)
+        st.caption(f"{n * n:,} flashes in {dt * 1e3:.0f} ms")
+    return res
 
 def run(T):
     st.header(T.get("flash_calc_title", "Flash Calculation"))
@@ -39,6 +93,8 @@ def run(T):
 
     st.success(f"{T.get('phase_state', 'Predicted Phase State')}: {phase}")
 
+    mix = _multicomponent(T, pressure, temperature)
+
     if st.button(T.get("save", "Save")):
         save_project(st.session_state.username, T.get("flash_calc_title", "Flash Calculation"), {
             "component": component,
@@ -46,7 +102,9 @@ def run(T):
             "temperature": temperature,
             "psat_bar": Psat_bar,
             "k_value": K_value,
-            "phase_prediction": phase
+            "phase_prediction": phase,
+            **({"mixture": {c: float(v) for c, v in zip(mix.components, mix.z[0])},
+                "vapor_fraction": float(mix.beta[0])} if mix is not None else {}),
         })
         st.success(T.get("save_success", "Project saved successfully."))
 
@@ -0,0 +1,233 @@
+# modules/flash_engine.py
+"""
+Multicomponent isothermal flash for the process tools (flash_calc.py,
+separator_sim.py, stream_calculator.py and the process-flow Separator).
+
+Every call is a batch over n cases of (P, T, z):
+- K-values: Wilson correlation  K = Pc/P · exp(5.373·(1+ω)·(1 - Tc/T))
+- vapour fraction β: Rachford–Rice  Σ z(K-1)/(1+β(K-1)) = 0, solved for all
+  cases at once with Newton steps safeguarded by a shrinking bisection
+  bracket; single-phase cases are detected from the sign at β = 0 and β = 1
+- phase compositions  x = z/(1+β(K-1)),  y = K·x
+
+    res = flash(P_bar=[10, 20], T_C=[40, 40], z={"C1": 0.8, "C2": 0.1, "C3": 0.1})
+    res.beta, res.y, res.vapor_mass_fraction()
+    grid = phase_grid(z, P_bar=np.linspace(1, 200, 200), T_C=np.linspace(-100, 200, 200))
+
+Component names follow the Subsurface composition tables (N2, CO2, H2S,
+C1..nC5, C6+) with common aliases (Methane, Ethane, ...). `python
+scripts/bench_flash_grid.py` times a 40 000-point phase sweep.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Tc [K], Pc [bar], acentric factor, MW [g/mol]
+COMPONENTS: Dict[str, Tuple[float, float, float, float]] = {
+    "N2":       (126.2,  33.98, 0.037,  28.014),
+    "CO2":      (304.1,  73.80, 0.225,  44.010),
+    "H2S":      (373.5,  89.63, 0.094,  34.080),
+    "C1":       (190.6,  45.99, 0.011,  16.043),
+    "C2":       (305.3,  48.72, 0.099,  30.070),
+    "C3":       (369.8,  42.48, 0.152,  44.097),
+    "iC4":      (408.1,  36.48, 0.181,  58.123),
+    "nC4":      (425.1,  37.96, 0.200,  58.123),
+    "iC5":      (460.4,  33.80, 0.227,  72.150),
+    "nC5":      (469.7,  33.70, 0.252,  72.150),
+    "nC6":      (507.6,  30.25, 0.301,  86.177),
+    "C4+":      (425.1,  37.96, 0.200,  58.123),   # lumped as nC4
+    "C6+":      (540.2,  27.40, 0.350, 100.204),   # lumped as nC7
+    "C7+":      (620.0,  23.00, 0.500, 140.000),   # heavy pseudo-component
+    "Water":    (647.1, 220.64, 0.344,  18.015),
+    "Methanol": (512.6,  80.97, 0.565,  32.042),
+    "Ethanol":  (513.9,  61.48, 0.645,  46.069),
+    "Benzene":  (562.0,  48.98, 0.210,  78.114),
+}
+ALIASES = {
+    "nitrogen": "N2", "carbon dioxide": "CO2", "hydrogen sulfide": "H2S",
+    "methane": "C1", "ethane": "C2", "propane": "C3",
+    "isobutane": "iC4", "i-butane": "iC4", "butane": "nC4", "n-butane": "nC4",
+    "isopentane": "iC5", "i-pentane": "iC5", "pentane": "nC5", "n-pentane": "nC5",
+    "hexane": "nC6", "n-hexane": "nC6", "c6": "nC6", "h2o": "Water",
+}
+_CANON = {k.lower(): k for k in COMPONENTS}
+
+R_BAR = 0.08314462618   # bar·m³/(kmol·K)
+
+
+def canonical(name: str) -> Optional[str]:
+    """Database key for a component name, or None when unknown."""
+    key = str(name).strip().lower()
+    return _CANON.get(key) or ALIASES.get(key)
+
+
+def component_props(components: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """(Tc, Pc, omega, MW) arrays; raises KeyError naming unknown components."""
+    keys = [canonical(c) for c in components]
+    missing = [c for c, k in zip(components, keys) if k is None]
+    if missing:
+        raise KeyError(f"No flash data for component(s): {', '.join(map(str, missing))}")
+    data = np.array([COMPONENTS[k] for k in keys], dtype=float).reshape(-1, 4)
+    return data[:, 0], data[:, 1], data[:, 2], data[:, 3]
+
+
+def wilson_k(P_bar, T_C, components: Sequence[str]) -> np.ndarray:
+    """(n, c) Wilson K-values for n (P, T) cases."""
+    Tc, Pc, w, _ = component_props(components)
+    P = np.atleast_1d(np.asarray(P_bar, dtype=float))[:, None]
+    T = np.atleast_1d(np.asarray(T_C, dtype=float))[:, None] + 273.15
+    return Pc / P * np.exp(5.373 * (1.0 + w) * (1.0 - Tc / T))
+
+
+def rachford_rice(z: np.ndarray, K: np.ndarray, tol: float = 1e-12, max_iter: int = 100) -> np.ndarray:
+    """
+    Vapour fraction β ∈ [0, 1] for each row of (n, c) z and K. Newton steps
+    that leave the bracket are replaced by bisection; the bracket shrinks on
+    the sign of the residual every iteration.
+    """
+    Km1 = K - 1.0
+    f0 = (z * Km1).sum(axis=1)                  # residual at β = 0
+    f1 = (z * Km1 / K).sum(axis=1)              # residual at β = 1
+    beta = np.where(f0 <= 0.0, 0.0, 1.0)        # subcooled liquid / superheated vapour
+    two = (f0 > 0.0) & (f1 < 0.0)
+    if not two.any():
+        return beta
+
+    z2, k2 = z[two], Km1[two]
+    # asymptotes bound the root: 1/(1-Kmax) < β < 1/(1-Kmin)
+    with np.errstate(divide="ignore"):
+        lo = np.maximum(0.0, 1.0 / (1.0 - (k2 + 1.0).max(axis=1)))
+        hi = np.minimum(1.0, 1.0 / (1.0 - (k2 + 1.0).min(axis=1)))
+    b = 0.5 * (lo + hi)
+    active = np.ones(len(b), dtype=bool)
+    for _ in range(max_iter):
+        d = 1.0 + b[:, None] * k2
+        f = (z2 * k2 / d).sum(axis=1)
+        df = -(z2 * k2 ** 2 / d ** 2).sum(axis=1)
+        lo = np.where(f > 0.0, b, lo)            # f decreases in β
+        hi = np.where(f < 0.0, b, hi)
+        step = np.where(df != 0.0, f / np.where(df != 0.0, df, 1.0), 0.0)
+        b_new = b - step
+        outside = (b_new <= lo) | (b_new >= hi) | ~np.isfinite(b_new)
+        b_new = np.where(outside, 0.5 * (lo + hi), b_new)
+        active = np.abs(b_new - b) > tol
+        b = np.where(active, b_new, b)
+        if not active.any():
+            break
+    beta[two] = b
+    return beta
+
+
+@dataclass
+class FlashResult:
+    components: Tuple[str, ...]
+    P_bar: np.ndarray      # (n,)
+    T_C: np.ndarray        # (n,)
+    z: np.ndarray          # (n, c)
+    K: np.ndarray          # (n, c)
+    beta: np.ndarray       # (n,) molar vapour fraction
+    x: np.ndarray          # (n, c) liquid
+    y: np.ndarray          # (n, c) vapour
+
+    @property
+    def phase(self) -> np.ndarray:
+        return np.where(self.beta >= 1.0, "vapor", np.where(self.beta <= 0.0, "liquid", "two-phase"))
+
+    def molar_masses(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(feed, vapour, liquid) molar mass in g/mol."""
+        MW = component_props(self.components)[3]
+        return self.z @ MW, self.y @ MW, self.x @ MW
+
+    def vapor_mass_fraction(self) -> np.ndarray:
+        mw_f, mw_v, _ = self.molar_masses()
+        return np.where(mw_f > 0, self.beta * mw_v / np.where(mw_f > 0, mw_f, 1.0), 0.0)
+
+    def vapor_density(self) -> np.ndarray:
+        """Ideal-gas vapour density, kg/m³."""
+        return self.P_bar * self.molar_masses()[1] / (R_BAR * (self.T_C + 273.15))
+
+
+def _z_array(z, components: Optional[Sequence[str]]) -> Tuple[np.ndarray, Tuple[str, ...]]:
+    if isinstance(z, Mapping):
+        components = tuple(z.keys()) if components is None else tuple(components)
+        z = np.array([float(z.get(c, 0.0)) for c in components])
+    if components is None:
+        raise ValueError("components are required when z is an array")
+    z = np.atleast_2d(np.asarray(z, dtype=float))
+    s = z.sum(axis=1, keepdims=True)
+    return np.where(s > 0, z / np.where(s > 0, s, 1.0), z), tuple(components)
+
+
+def flash(P_bar, T_C, z, components: Optional[Sequence[str]] = None) -> FlashResult:
+    """
+    Batch PT flash. P_bar and T_C are scalars or (n,) arrays; z is a
+    {component: fraction} mapping, a (c,) or an (n, c) array (normalised per row).
+    """
+    z, comps = _z_array(z, components)
+    P = np.atleast_1d(np.asarray(P_bar, dtype=float))
+    T = np.atleast_1d(np.asarray(T_C, dtype=float))
+    n = max(len(P), len(T), len(z))
+    P, T = np.broadcast_to(P, (n,)).copy(), np.broadcast_to(T, (n,)).copy()
+    z = np.broadcast_to(z, (n, z.shape[1])).copy()
+    K = wilson_k(P, T, comps)
+    beta = rachford_rice(z, K)
+    x = z / (1.0 + beta[:, None] * (K - 1.0))
+    y = K * x
+    x /= np.maximum(x.sum(axis=1, keepdims=True), 1e-300)
+    y /= np.maximum(y.sum(axis=1, keepdims=True), 1e-300)
+    one = beta >= 1.0
+    zero = beta <= 0.0
+    y[zero], x[one] = z[zero], z[one]             # incipient phases
+    return FlashResult(comps, P, T, z, K, beta, x, y)
+
+
+def phase_grid(z, P_bar: Sequence[float], T_C: Sequence[float],
+               components: Optional[Sequence[str]] = None) -> np.ndarray:
+    """Vapour fraction on a P × T grid, shape (len(P_bar), len(T_C)); one batch flash."""
+    P, T = np.meshgrid(np.asarray(P_bar, dtype=float), np.asarray(T_C, dtype=float), indexing="ij")
+    return flash(P.ravel(), T.ravel(), z, components).beta.reshape(P.shape)
+
+
+def known_components(components: Sequence[str]) -> bool:
+    """True when every component has flash data (a mapping checks its keys)."""
+    return len(components) > 0 and all(canonical(c) is not None for c in components)
+
+
+def composition_from_payload(obj) -> Dict[str, float]:
+    """{component: z} from a Reservoir_Profiles composition entry (list of rows or dict)."""
+    out: Dict[str, float] = {}
+    if isinstance(obj, Mapping):
+        items = obj.items()
+    elif isinstance(obj, list):
+        items = [(r.get("component") or r.get("name") or r.get("comp"),
+                  next((r[k] for k in ("z", "value", "fraction") if r.get(k) is not None), None))
+                 for r in obj if isinstance(r, Mapping)]
+    else:
+        return out
+    for k, v in items:
+        try:
+            if k is not None and float(v) > 0:
+                out[str(k)] = float(v)
+        except (TypeError, ValueError):
+            pass
+    return out
+
+
+def reservoir_composition(stream: str = "gas") -> Dict[str, float]:
+    """Latest approved Reservoir_Profiles composition for the current project/phase ({} if none)."""
+    try:
+        import streamlit as st
+        from artifact_registry import get_latest
+        project_id = st.session_state.get("current_project_id", "P-DEMO")
+        phase_id = st.session_state.get("current_phase_id", "PH-FEL1")
+        rp = get_latest(project_id, "Reservoir_Profiles", phase_id) or {}
+    except Exception:
+        return {}
+    return composition_from_payload((rp.get("data") or {}).get("composition", {}).get(stream))
+
+
+DEFAULT_GAS = {"N2": 0.01, "CO2": 0.01, "C1": 0.74, "C2": 0.08, "C3": 0.07, "iC4": 0.02,
+               "nC4": 0.02, "iC5": 0.02, "nC5": 0.02, "C6+": 0.01}
+
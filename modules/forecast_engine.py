@@ -0,0 +1,250 @@
+# modules/forecast_engine.py
+"""
+Batch production-forecast engine for the Subsurface module (modules/subsurface.py).
+
+Every scenario in a sweep shares the fitted oil/gas Arps parameters and the
+forecast horizon; drilling and injection cases differ per scenario. Rates are
+built as (scenario × month) arrays in one pass:
+- decline: arps_rate broadcast over a per-scenario effective Di(t)
+- new wells: (scenario × well) start months / qi factors, one pass per well slot
+- water cut: linear ramp or WOR-vs-Np, with water-injection damping
+- gas: Arps decline or GOR time trend; cumulatives via cumsum along months
+
+    fits = {"oil": (qi, Di, b), "gas": (qi, Di, b)}
+    sweep = sweep_grid(gas_supports=[0.0, 0.3], well_counts=[0, 2, 4], well_start="2027-01")
+    df = simulate_batch(date(2026, 11, 1), 240, fits["oil"], fits["gas"], sweep)
+    summary = summarize_sweep(df)
+
+tests/test_forecast_engine.py keeps the original month-by-month loop as the
+parity reference; `python scripts/bench_forecast_sweep.py` times a sweep.
+"""
+from __future__ import annotations
+import itertools
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+DAYS_PER_MONTH = 30.437
+WC_MAX = 0.98
+WC_RAMP = 0.2            # base water cut rises linearly by this much over the horizon
+MIN_D_FACTOR = 0.1       # injection support can cut the decline rate to at most 10 %
+
+Fit = Tuple[float, float, float]
+RATE_COLUMNS = ["oil_rate", "gas_rate", "water_rate", "cum_oil", "cum_gas", "cum_water"]
+
+
+# ---------- Small utils ----------
+def to_date(x) -> Optional[date]:
+    if isinstance(x, (datetime, date)):
+        return x.date() if isinstance(x, datetime) else x
+    for fmt in ("%Y-%m-%d", "%Y-%m"):
+        try:
+            return datetime.strptime(str(x), fmt).date()
+        except Exception:
+            pass
+    return None
+
+
+def _months_between(a: date, b: date) -> int:
+    return (b.year - a.year) * 12 + (b.month - a.month)
+
+
+def arps_rate(qi, Di, b: float, t_years: np.ndarray) -> np.ndarray:
+    """Arps rate; qi and Di may be arrays that broadcast against t_years."""
+    if abs(b) < 1e-6:
+        return qi * np.exp(-Di * t_years)
+    return qi / np.power(1.0 + b * Di * t_years, 1.0 / b)
+
+
+@dataclass
+class ForecastScenario:
+    """One drilling/injection case; same fields as simulate_scenarios' arguments."""
+    name: str = "Base"
+    base_wc: float = 0.1
+    inj_rules: Dict[str, dict] = field(default_factory=dict)   # {"gas"|"oil"|"water": {"start", "support"}}
+    new_wells: List[Dict[str, object]] = field(default_factory=list)  # [{"start", "qi_factor"}]
+    wor_model: Optional[Dict[str, float]] = None               # WOR = a + b·Np
+    gor_model: Optional[Dict[str, float]] = None               # GOR = a + b·month
+
+
+def _start_month(start_date: date, rule: Optional[dict], months: int) -> int:
+    """First month index a rule applies to; `months` (never) when there is no rule."""
+    if not rule:
+        return months
+    return max(0, _months_between(start_date, rule.get("start") or start_date))
+
+
+def _decline_factor(start_date: date, months: int, rules: List[Optional[dict]]) -> np.ndarray:
+    """(S, T) multiplier on Di: max(0.1, 1 - support) from the injection start month on."""
+    i0 = np.array([_start_month(start_date, r, months) for r in rules])[:, None]
+    fac = np.array([max(MIN_D_FACTOR, 1.0 - float(r.get("support", 0.0))) if r else 1.0 for r in rules])[:, None]
+    return np.where(np.arange(months)[None, :] >= i0, fac, 1.0)
+
+
+def _well_table(start_date: date, months: int, scenarios: Sequence[ForecastScenario]) -> Tuple[np.ndarray, np.ndarray]:
+    """(S, W) start month and qi factor per well slot; empty slots start at `months`."""
+    rows = []
+    for sc in scenarios:
+        wells = []
+        for w in sc.new_wells or []:
+            sdt = to_date(w.get("start"))
+            if sdt:
+                wells.append((max(0, _months_between(start_date, sdt)), float(w.get("qi_factor", 1.0))))
+        rows.append(wells)
+    n_w = max((len(r) for r in rows), default=0)
+    i0 = np.full((len(rows), n_w), months, dtype=np.int64)
+    qf = np.zeros((len(rows), n_w))
+    for s, wells in enumerate(rows):
+        for k, (a, f) in enumerate(wells):
+            i0[s, k], qf[s, k] = a, f
+    return i0, qf
+
+
+def _model_coeffs(models: List[Optional[Dict[str, float]]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    has = np.array([bool(m) for m in models])
+    a = np.array([float(m["a"]) if m else 0.0 for m in models])[:, None]
+    b = np.array([float(m["b"]) if m else 0.0 for m in models])[:, None]
+    return has, a, b
+
+
+def simulate_batch(
+    start_date: date,
+    months: int,
+    oil_fit: Fit,
+    gas_fit: Fit,
+    scenarios: Sequence[ForecastScenario],
+) -> pd.DataFrame:
+    """
+    Tidy monthly profiles for all scenarios: one row per (scenario, month) with
+    scenario, date, month, oil/gas/water rates, water_cut, gor and cumulatives.
+    Matches simulate_scenarios() scenario by scenario.
+    """
+    scenarios = list(scenarios)
+    months = int(months)
+    qi_o, Di_o, b_o = oil_fit
+    qi_g, Di_g, b_g = gas_fit
+    S, T = len(scenarios), months
+    if S == 0 or T <= 0:
+        return pd.DataFrame(columns=["scenario", "date", "month", "water_cut", "gor"] + RATE_COLUMNS)
+
+    t_idx = np.arange(T)
+    t_years = t_idx / 12.0
+
+    oil_rules = [sc.inj_rules.get("oil") or sc.inj_rules.get("gas") for sc in scenarios]
+    Do = Di_o * _decline_factor(start_date, T, oil_rules)
+    Dg = Di_g * _decline_factor(start_date, T, [sc.inj_rules.get("gas") for sc in scenarios])
+    oil = arps_rate(qi_o, Do, b_o, t_years[None, :])
+    gas = arps_rate(qi_g, Dg, b_g, t_years[None, :])
+
+    # new wells clone the oil decline from their own start month
+    w_i0, w_qf = _well_table(start_date, T, scenarios)
+    for k in range(w_i0.shape[1]):
+        i0 = w_i0[:, k:k + 1]
+        on = t_idx[None, :] >= i0
+        t_rel = np.where(on, (t_idx[None, :] - i0) / 12.0, 0.0)
+        oil = oil + np.where(on, arps_rate(qi_o * w_qf[:, k:k + 1], Do, b_o, t_rel), 0.0)
+
+    # water cut: WOR vs Np where a model is given, else the base ramp
+    has_wor, wor_a, wor_b = _model_coeffs([sc.wor_model for sc in scenarios])
+    WOR = wor_a + wor_b * np.cumsum(oil * DAYS_PER_MONTH, axis=1)
+    wc_wor = np.clip(WOR / (1.0 + np.maximum(WOR, 1e-9)), 0.0, WC_MAX)
+
+    base_wc = np.array([float(sc.base_wc) for sc in scenarios])[:, None]
+    wc_ramp = np.clip(base_wc + np.linspace(0, WC_RAMP, T)[None, :], 0.0, WC_MAX)
+    water_rules = [sc.inj_rules.get("water") for sc in scenarios]
+    wi0 = np.array([_start_month(start_date, r, T) for r in water_rules])[:, None]
+    w_support = np.array([float(r.get("support", 0.2)) if r else 0.0 for r in water_rules])[:, None]
+    wc_at_i0 = np.take_along_axis(wc_ramp, np.minimum(wi0, T - 1), axis=1)
+    wc_ramp = np.where(t_idx[None, :] >= wi0, wc_at_i0 + (wc_ramp - wc_at_i0) * (1.0 - w_support), wc_ramp)
+
+    wc = np.where(has_wor[:, None], wc_wor, wc_ramp)
+    water = oil * wc
+    oil_eff = np.maximum(0.0, oil - water)
+
+    has_gor, gor_a, gor_b = _model_coeffs([sc.gor_model for sc in scenarios])
+    GOR = gor_a + gor_b * t_idx[None, :]
+    gas = np.where(has_gor[:, None], np.maximum(0.0, oil_eff * np.maximum(GOR, 0.0)), gas)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gor = np.where(oil_eff > 0, gas / oil_eff, np.nan)
+
+    names = [sc.name for sc in scenarios]
+    return pd.DataFrame(
+        {
+            "scenario": pd.Categorical(np.repeat(names, T), categories=list(dict.fromkeys(names))),
+            "date": np.tile(pd.date_range(start=start_date, periods=T, freq="MS").to_numpy(), S),
+            "month": np.tile(t_idx.astype(np.int32), S),
+            "oil_rate": oil_eff.ravel(),
+            "gas_rate": gas.ravel(),
+            "water_rate": water.ravel(),
+            "water_cut": wc.ravel(),
+            "gor": gor.ravel(),
+            "cum_oil": np.cumsum(oil_eff * DAYS_PER_MONTH, axis=1).ravel(),
+            "cum_gas": np.cumsum(gas * DAYS_PER_MONTH, axis=1).ravel(),
+            "cum_water": np.cumsum(water * DAYS_PER_MONTH, axis=1).ravel(),
+        }
+    )
+
+
+def summarize_sweep(df: pd.DataFrame) -> pd.DataFrame:
+    """One row per scenario: peak oil rate, end-of-horizon cumulatives and final water cut."""
+    g = df.groupby("scenario", observed=True, sort=False)
+    return pd.DataFrame(
+        {
+            "peak_oil_rate": g["oil_rate"].max(),
+            "cum_oil": g["cum_oil"].last(),
+            "cum_gas": g["cum_gas"].last(),
+            "cum_water": g["cum_water"].last(),
+            "final_water_cut": g["water_cut"].last(),
+        }
+    ).reset_index()
+
+
+def sweep_grid(
+    gas_supports: Iterable[float] = (0.0,),
+    water_supports: Iterable[float] = (0.0,),
+    well_counts: Iterable[int] = (0,),
+    well_start=None,
+    well_spacing_months: int = 3,
+    qi_factor: float = 1.0,
+    gas_start=None,
+    water_start=None,
+    base_wc: float = 0.1,
+    wor_model: Optional[Dict[str, float]] = None,
+    gor_model: Optional[Dict[str, float]] = None,
+) -> List[ForecastScenario]:
+    """
+    Cartesian product of gas support × water support × number of new wells.
+    A support of 0 means no injection; wells come online every
+    `well_spacing_months` from `well_start`. Injection rules follow run():
+    oil support is 0.8 × gas support. Repeated values are dropped, and names
+    that still collide after rounding get a "#k" suffix so every scenario keeps
+    its own rows in simulate_batch().
+    """
+    first = to_date(well_start)
+    out = []
+    seen: Dict[str, int] = {}
+    for g, w, n in itertools.product(*(dict.fromkeys(v) for v in (gas_supports, water_supports, well_counts))):
+        rules: Dict[str, dict] = {}
+        if g > 0:
+            rules["gas"] = {"start": to_date(gas_start) or date.today(), "support": float(g)}
+            rules["oil"] = {"start": to_date(gas_start) or date.today(), "support": float(g) * 0.8}
+        if w > 0:
+            rules["water"] = {"start": to_date(water_start) or date.today(), "support": float(w)}
+        wells = []
+        if first and n:
+            for k in range(int(n)):
+                m = first.month - 1 + k * int(well_spacing_months)
+                wells.append({"start": date(first.year + m // 12, m % 12 + 1, 1), "qi_factor": float(qi_factor)})
+        name = f"gas{g:.2f}_wat{w:.2f}_wells{int(n)}"
+        seen[name] = seen.get(name, 0) + 1
+        out.append(ForecastScenario(
+            name=name if seen[name] == 1 else f"{name}#{seen[name]}",
+            base_wc=base_wc, inj_rules=rules, new_wells=wells,
+            wor_model=wor_model, gor_model=gor_model,
+        ))
+    return out
+
@@ -14,11 +14,11 @@ def run(T):
     density = st.number_input(T.get("density", "Density (kg/m³)"), value=1000.0)
     cp = st.number_input(T.get("specific_heat", "Specific Heat (kJ/kg·°C)"), value=4.18)
 
-    # Energy balance Q = m * Cp * deltaT
+    # Energy balance Q = m * Cp * deltaT (shared with the flowsheet Heater unit)
+    from modules.unit_operations.heater import duty_kw
     mass_flow_kg_hr = flowrate * density
     delta_t = outlet_temp - inlet_temp
-    energy_kj_hr = mass_flow_kg_hr * cp * delta_t
-    energy_kw = energy_kj_hr / 3600
+    energy_kw = float(duty_kw(mass_flow_kg_hr, cp, inlet_temp, outlet_temp))
 
     st.subheader(T.get("results", "Results"))
     st.markdown(f"**{T.get('energy_required_kw', 'Energy Required')}:** {energy_kw:.2f} kW")
@@ -2,6 +2,9 @@ import streamlit as st
 import io
 from fpdf import FPDF
 from firebase_db import save_project, load_project_data
+from modules.unit_operations.mixer import Mixer
+from modules.unit_operations.splitter import Splitter
+from modules.unit_operations.stream_batch import StreamBatch
 
 def run(T):
     st.header(T.get("mixer_splitter_title", "Mixer & Splitter Tool"))
@@ -14,11 +17,12 @@ def run(T):
     flow2 = st.number_input(T.get("flow_stream_2", "Flowrate of Stream 2 (kg/h)"), min_value=0.0, value=150.0)
     conc2 = st.number_input(T.get("conc_stream_2", "Concentration of Stream 2 (%)"), min_value=0.0, max_value=100.0, value=40.0)
 
-    total_flow = flow1 + flow2
-    if total_flow > 0:
-        mixed_conc = (flow1 * conc1 + flow2 * conc2) / total_flow
-    else:
-        mixed_conc = 0.0
+    # same models as the flowsheet Mixer / Splitter units (concentration as a 2-component stream)
+    streams = StreamBatch(components=("solute", "solvent"), flow=[flow1, flow2], P=0.0, T=0.0,
+                          z=[[conc1 / 100, 1 - conc1 / 100], [conc2 / 100, 1 - conc2 / 100]])
+    mixed, = Mixer("mix").evaluate([streams[[0]], streams[[1]]])
+    total_flow = float(mixed.flow[0])
+    mixed_conc = float(mixed.z[0, 0]) * 100 if total_flow > 0 else 0.0
 
     st.success(f"{T.get('mixed_flow', 'Mixed Flowrate')}: {total_flow:.2f} kg/h")
     st.success(f"{T.get('mixed_concentration', 'Mixed Concentration')}: {mixed_conc:.2f} %")
@@ -26,8 +30,10 @@ def run(T):
     st.subheader(T.get("splitter_section", "Splitter"))
     split_ratio = st.slider(T.get("split_ratio", "Split Ratio (Stream A %)"), 0, 100, 50)
 
-    flow_a = total_flow * (split_ratio / 100)
-    flow_b = total_flow - flow_a
+    splitter = Splitter("split")
+    splitter.split_ratio = split_ratio / 100
+    out_a, out_b = splitter.evaluate([mixed])
+    flow_a, flow_b = float(out_a.flow[0]), float(out_b.flow[0])
 
     st.success(f"{T.get('stream_a_flow', 'Stream A Flowrate')}: {flow_a:.2f} kg/h")
     st.success(f"{T.get('stream_b_flow', 'Stream B Flowrate')}: {flow_b:.2f} kg/h")
@@ -9,6 +9,14 @@ def run(T):
     from fpdf import FPDF
     import streamlit.components.v1 as components
     from firebase_db import save_project, load_project_data
+    try:
+        from modules.schedule_engine import CycleError, compile_network
+        from modules.schedule_incremental import IncrementalCPM
+        from modules.resource_schedule import RULES, SCHEMES, Calendar, capacity_array, demand_matrix, level
+    except ImportError:
+        from schedule_engine import CycleError, compile_network  # type: ignore
+        from schedule_incremental import IncrementalCPM  # type: ignore
+        from resource_schedule import RULES, SCHEMES, Calendar, capacity_array, demand_matrix, level  # type: ignore
 
     st.set_page_config(page_title="P6-Style Scheduler", layout="wide")
     st.title("📅 P6-Style Project Scheduler")
@@ -18,71 +26,52 @@ def run(T):
         if key not in st.session_state:
             st.session_state[key] = [] if key != "p6_baseline" else None
 
+    if "p6_engines" not in st.session_state:
+        st.session_state.p6_engines = {}
+
+    def link_of(dep):
+        return (dep['pred'].split("(")[-1].strip(")"), dep['succ'].split("(")[-1].strip(")"),
+                dep['type'], dep['lag'])
+
+    def schedule_engine(activities, dependencies):
+        """Cached incremental CPM for the open schedule, brought up to date with the current edits."""
+        key = st.session_state.get("p6_schedule", "")
+        durations = {a['id']: a['duration'] for a in activities}
+        links = [link_of(dep) for dep in dependencies]
+        eng = st.session_state.p6_engines.get(key)
+        try:
+            if eng is None:
+                eng = IncrementalCPM.from_network(list(durations), list(durations.values()), links)
+            else:
+                eng.sync(durations, links)
+        except CycleError:
+            st.session_state.p6_engines.pop(key, None)
+            raise
+        st.session_state.p6_engines[key] = eng
+        return eng
+
     def compute_advanced_cpm(activities, dependencies):
-        G = nx.DiGraph()
         act_map = {a['id']: a for a in activities}
-        for act in activities:
-            G.add_node(act['id'], duration=act['duration'])
-        for dep in dependencies:
-            pred = dep['pred'].split("(")[-1].strip(")")
-            succ = dep['succ'].split("(")[-1].strip(")")
-            lag = dep['lag']
-            G.add_edge(pred, succ, type=dep['type'], lag=lag)
         try:
-            order = list(nx.topological_sort(G))
-        except:
+            eng = schedule_engine(activities, dependencies)
+        except CycleError:
             return [], "Cycle detected in schedule."
-        es, ef = {}, {}
-        for node in order:
-            preds = list(G.predecessors(node))
-            max_time = 0
-            for p in preds:
-                p_ef = ef[p]
-                lag = G.edges[p, node]['lag']
-                link_type = G.edges[p, node]['type']
-                if link_type == 'FS':
-                    max_time = max(max_time, p_ef + lag)
-                elif link_type == 'SS':
-                    max_time = max(max_time, es[p] + lag)
-                elif link_type == 'FF':
-                    max_time = max(max_time, p_ef + lag - act_map[node]['duration'])
-                elif link_type == 'SF':
-                    max_time = max(max_time, es[p] + lag - act_map[node]['duration'])
-            es[node] = max_time
-            ef[node] = es[node] + act_map[node]['duration']
-        lf, ls = {}, {}
-        max_finish = max(ef.values())
-        for node in reversed(order):
-            succs = list(G.successors(node))
-            min_lf = max_finish
-            for s in succs:
-                s_ls = ls[s]
-                lag = G.edges[node, s]['lag']
-                link_type = G.edges[node, s]['type']
-                if link_type == 'FS':
-                    min_lf = min(min_lf, s_ls - lag)
-                elif link_type == 'SS':
-                    min_lf = min(min_lf, es[s] - lag)
-                elif link_type == 'FF':
-                    min_lf = min(min_lf, ef[s] - lag)
-                elif link_type == 'SF':
-                    min_lf = min(min_lf, s_ls + lag)
-            lf[node] = min_lf
-            ls[node] = lf[node] - act_map[node]['duration']
+        cpm = eng.result()
         result = []
-        for node in order:
-            float_val = ls[node] - es[node]
+        for i in eng.order:
+            node = eng.ids[i]
             result.append({
                 "id": node,
                 "name": act_map[node]['name'],
-                "ES": es[node], "EF": ef[node],
-                "LS": ls[node], "LF": lf[node],
-                "Float": float_val,
-                "Critical": float_val == 0
+                "ES": cpm.es[i].item(), "EF": cpm.ef[i].item(),
+                "LS": cpm.ls[i].item(), "LF": cpm.lf[i].item(),
+                "Float": cpm.total_float[i].item(),
+                "FreeFloat": cpm.free_float[i].item(),
+                "Critical": bool(cpm.critical[i])
             })
         return result, None
 
-    tabs = st.tabs(["Activities", "Dependencies", "Gantt Chart", "Network", "Dashboard", "Save/Load", "Export"])
+    tabs = st.tabs(["Activities", "Dependencies", "Gantt Chart", "Network", "Dashboard", "Save/Load", "Export", "Leveling"])
 
     with tabs[0]:
         st.subheader("📋 Define Activities")
@@ -116,6 +105,16 @@ def run(T):
                 })
         if st.session_state.p6_activities:
             st.dataframe(pd.DataFrame(st.session_state.p6_activities))
+            with st.form("duration_form"):
+                col1, col2 = st.columns(2)
+                with col1:
+                    pick = st.selectbox("Activity", [a['id'] for a in st.session_state.p6_activities])
+                with col2:
+                    new_duration = st.number_input("New Duration (days)", min_value=1, value=5)
+                if st.form_submit_button("Update Duration"):
+                    for a in st.session_state.p6_activities:
+                        if a['id'] == pick:
+                            a['duration'] = new_duration
 
     with tabs[1]:
         st.subheader("🔗 Define Dependencies")
@@ -129,13 +128,14 @@ def run(T):
             with col3:
                 link_type = st.selectbox("Link Type", ["FS", "SS", "FF", "SF"])
                 lag = st.number_input("Lag (days)", value=0)
-            if st.form_submit_button("Add Link"):
-                st.session_state.p6_dependencies.append({
-                    "pred": pred,
-                    "succ": succ,
-                    "type": link_type,
-                    "lag": lag
-                })
+            if st.form_submit_button("Add Link") and pred and succ:
+                dep = {"pred": pred, "succ": succ, "type": link_type, "lag": lag}
+                try:
+                    schedule_engine(st.session_state.p6_activities,
+                                    st.session_state.p6_dependencies).add_link(*link_of(dep))
+                    st.session_state.p6_dependencies.append(dep)
+                except CycleError as e:
+                    st.error(str(e))
         if st.session_state.p6_dependencies:
             st.dataframe(pd.DataFrame(st.session_state.p6_dependencies))
 
@@ -211,6 +211,7 @@ def run(T):
                     st.session_state.p6_activities = data.get("activities", [])
                     st.session_state.p6_dependencies = data.get("dependencies", [])
                     st.session_state.p6_baseline = data.get("baseline", None)
+                    st.session_state.p6_schedule = project_name
                     st.success("Loaded.")
 
     with tabs[6]:
@@ -229,3 +230,56 @@ def run(T):
             pdf_out = io.BytesIO()
             pdf.output(pdf_out)
             st.download_button("📄 Download PDF", data=pdf_out.getvalue(), file_name="p6_schedule.pdf")
+
+    with tabs[7]:
+        st.subheader("⚖️ Resource Leveling")
+        acts = st.session_state.p6_activities
+        names, demand = demand_matrix([a.get('resource') for a in acts])
+        if not names:
+            st.info("Assign resources to activities on the Activities tab to level them.")
+        else:
+            caps = st.data_editor(pd.DataFrame({"resource": names, "capacity": 1.0}),
+                                  disabled=["resource"], hide_index=True, key="p6_capacity")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                rule = st.selectbox("Priority Rule", RULES, help="LFT = min late finish, FLOAT = min total float")
+            with col2:
+                scheme = st.radio("Scheme", SCHEMES, horizontal=True)
+            with col3:
+                days = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+                workdays = st.multiselect("Working Days", days, default=days[:5])
+            start = min(pd.to_datetime(a['start']).date() for a in acts)
+            links = [link_of(dep) for dep in st.session_state.p6_dependencies]
+            # re-level only when an input changes, not on every rerun of the page
+            key = (tuple((a['id'], a['duration'], a.get('resource')) for a in acts), tuple(links),
+                   tuple(zip(caps["resource"], caps["capacity"])), rule, scheme, start, tuple(workdays))
+            cached = st.session_state.get("p6_leveling")
+            if cached is None or cached[0] != key:
+                try:
+                    net = compile_network([a['id'] for a in acts], [a['duration'] for a in acts], links)
+                    res = level(net, demand, capacity_array(names, dict(zip(caps["resource"], caps["capacity"]))),
+                                calendar=Calendar(start, tuple(days.index(d) for d in workdays)),
+                                rule=rule, scheme=scheme, resources=names)
+                except (CycleError, ValueError) as e:
+                    res = e
+                cached = st.session_state.p6_leveling = (key, res)
+            res = cached[1]
+            if isinstance(res, Exception):
+                st.error(str(res))
+            else:
+                c1, c2 = st.columns(2)
+                c1.metric("Leveled Finish (working days)", res.makespan, delta=res.makespan - res.cpm_makespan,
+                          delta_color="inverse")
+                c2.metric("Unconstrained CPM Finish", res.cpm_makespan)
+                out = res.to_frame()
+                out.insert(1, "name", [a['name'] for a in acts])
+                st.dataframe(out)
+                prof = res.profile_frame()
+                fig = go.Figure()
+                for r in names:
+                    p = prof[prof["resource"] == r]
+                    fig.add_trace(go.Bar(x=p["period"], y=p["usage"], name=f"{r} usage"))
+                    fig.add_trace(go.Scatter(x=p["period"], y=p["capacity"], name=f"{r} capacity",
+                                             line=dict(dash="dash", shape="hv")))
+                fig.update_layout(barmode="group", xaxis_title="Working day", yaxis_title="Units")
+                st.plotly_chart(fig, use_container_width=True)
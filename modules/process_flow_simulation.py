@@ -2,6 +2,10 @@ import streamlit as st
 from modules.unit_operations.pump import Pump
 from modules.unit_operations.pipe import Pipe
 from modules.unit_operations.separator import Separator
+from modules.unit_operations.mixer import Mixer
+from modules.unit_operations.splitter import Splitter
+from modules.unit_operations.heater import Heater
+from modules.unit_operations.flowsheet import Flowsheet, outlet_names
 
 import graphviz
 from fpdf import FPDF
@@ -9,6 +13,10 @@ import io
 import datetime
 import time
 
+UNIT_TYPES = {"Pump": Pump, "Pipe": Pipe, "Separator": Separator, "Mixer": Mixer,
+              "Splitter": Splitter, "Heater": Heater}
+FEED = "Feed (own inputs)"
+
 from artifact_registry import get_latest, save_artifact
 
 # Try Firebase helpers; fall back to session memory
@@ -40,6 +48,9 @@ def generate_pdf(units):
 
         if isinstance(unit.outputs, dict) and "Outlet1" in unit.outputs:
             for outlet_name, data in unit.outputs.items():
+                if not isinstance(data, dict):
+                    pdf.cell(200, 10, txt=f"{outlet_name}: {data}", ln=True)
+                    continue
                 pdf.cell(200, 10, txt=f"{outlet_name}:", ln=True)
                 for key, value in data.items():
                     if key == "composition" and isinstance(value, dict):
@@ -118,15 +129,13 @@ def run(stage: str):
 
     # === Sidebar: Add Equipment ===
     st.sidebar.header("Add Equipment")
-    unit_type = st.sidebar.selectbox("Select Equipment Type", ["Pump", "Pipe", "Separator"], key="selected_unit_type")
+    unit_type = st.sidebar.selectbox("Select Equipment Type", list(UNIT_TYPES), key="selected_unit_type")
     if st.sidebar.button("Add Unit"):
         uid = f"{unit_type}{len(st.session_state.process_units) + 1}"
-        if unit_type == "Pump":
-            st.session_state.process_units.append(Pump(uid))
-        elif unit_type == "Pipe":
-            st.session_state.process_units.append(Pipe(uid))
-        elif unit_type == "Separator":
-            st.session_state.process_units.append(Separator(uid))
+        unit = UNIT_TYPES[unit_type](uid)
+        if st.session_state.process_units:  # default: fed by the previous unit's first outlet
+            unit.inlets = [outlet_names(st.session_state.process_units[-1])[0]]
+        st.session_state.process_units.append(unit)
     st.sidebar.write("Units so far:", [u.name for u in st.session_state.process_units])
 
     # === Load Past Simulations ===
@@ -151,38 +160,64 @@ def run(stage: str):
             for unit_info in sim_data.get("units", []):
                 unit_type = unit_info.get("type")
                 name = unit_info.get("name", unit_type)
-
-                if unit_type == "Pump":
-                    unit = Pump(name)
-                elif unit_type == "Pipe":
-                    unit = Pipe(name)
-                elif unit_type == "Separator":
-                    unit = Separator(name)
-                else:
+                if unit_type not in UNIT_TYPES:
                     continue
+                unit = UNIT_TYPES[unit_type](name)
 
                 unit.inputs = unit_info.get("inputs", {}) or {}
                 unit.outputs = unit_info.get("outputs", {}) or {}
+                for k, v in (unit_info.get("params") or {}).items():  # dp_bar, split_ratio, cp, use_flash, ...
+                    if k in unit.params():
+                        setattr(unit, k, v)
+                if "inlets" in unit_info:
+                    unit.inlets = unit_info["inlets"] or None
+                elif st.session_state.process_units:  # runs saved before stream connections: a chain
+                    unit.inlets = [outlet_names(st.session_state.process_units[-1])[0]]
                 st.session_state.process_units.append(unit)
 
             st.success(f"✅ Loaded simulation: {selected_label}")
             st.session_state.simulate_now = True
 
     # === Inputs for Each Unit ===
+    all_streams = [s for u in st.session_state.process_units for s in outlet_names(u)]
     for unit in st.session_state.process_units:
         # ensure keys exist
         unit.inputs.setdefault("flowrate", 1000.0)
         unit.inputs.setdefault("pressure", default_P)
         unit.inputs.setdefault("temperature", default_T)
         unit.inputs.setdefault("composition", {"Methane": 1.0})
+        if not hasattr(unit, "inlets"):
+            unit.inlets = None
 
         with st.expander(f"{unit.name} - Inputs"):
+            # stream connections (recycles allowed: pick a downstream outlet)
+            options = [s for s in all_streams if not s.startswith(f"{unit.name}.")]
+            current = [s for s in (unit.inlets or []) if s in options]
+            if unit.n_inlets is None:
+                picked = st.multiselect(f"{unit.name} - Inlet streams", options, default=current,
+                                        key=f"{unit.name}_inlets")
+                unit.inlets = picked or None
+            else:
+                choice = st.selectbox(f"{unit.name} - Inlet stream", [FEED] + options,
+                                      index=(options.index(current[0]) + 1) if current else 0,
+                                      key=f"{unit.name}_inlet")
+                unit.inlets = None if choice == FEED else [choice]
+            if unit.inlets:
+                st.caption("Fed by " + ", ".join(unit.inlets) + "; the values below are only used when disconnected.")
             unit.inputs["flowrate"] = st.number_input(f"{unit.name} - Flowrate (kg/h)", value=float(unit.inputs["flowrate"]))
             unit.inputs["pressure"] = st.number_input(f"{unit.name} - Pressure (bar)", value=float(unit.inputs["pressure"]))
             unit.inputs["temperature"] = st.number_input(f"{unit.name} - Temperature (°C)", value=float(unit.inputs["temperature"]))
 
-            if hasattr(unit, "split_ratio"):
+            if hasattr(unit, "use_flash"):
+                unit.use_flash = st.checkbox(f"{unit.name} - Flash split (Wilson K / Rachford–Rice)",
+                                             value=bool(unit.use_flash), key=f"{unit.name}_flash",
+                                             help="Outlet 1 vapour, Outlet 2 liquid; the split ratio is used "
+                                                  "when off or when a component has no flash data.")
+            if hasattr(unit, "split_ratio") and not getattr(unit, "use_flash", False):
                 unit.split_ratio = st.slider(f"{unit.name} - Split Ratio (Outlet 1)", 0.0, 1.0, float(getattr(unit, "split_ratio", 0.5)))
+            if hasattr(unit, "outlet_temperature"):
+                unit.outlet_temperature = st.number_input(f"{unit.name} - Outlet Temperature (°C)", value=float(unit.outlet_temperature))
+                unit.cp = st.number_input(f"{unit.name} - Specific Heat (kJ/kg·°C)", value=float(unit.cp))
 
             st.markdown(f"**{unit.name} - Select Components**")
             available_components = default_components
@@ -215,16 +250,21 @@ def run(stage: str):
     # === Show Results ===
     if st.session_state.get("simulate_now"):
         st.subheader("🔄 Simulation Results")
+        # one solver per session: its unit cache makes re-runs only recompute changed units
+        solver = st.session_state.setdefault("flowsheet_solver", Flowsheet())
+        result = solver.solve(st.session_state.process_units)
+        for msg in result.warnings:
+            st.warning(msg)
+        for loop in result.recycles:
+            status = "converged" if loop["converged"] else "NOT converged"
+            st.info(f"Recycle {' → '.join(loop['units'])} (tear: {', '.join(loop['tears'])}): "
+                    f"{status} in {loop['iterations']} iterations, error {loop['error']:.1e}")
+        st.caption(f"Units computed: {result.stats['computed']}, reused from cache: {result.stats['cached']}")
+
+        units_by_name = {u.name: u for u in st.session_state.process_units}
         previous_output = None
-
-        for idx, unit in enumerate(st.session_state.process_units):
-            if idx != 0 and previous_output:
-                unit.inputs["flowrate"] = previous_output.get("flowrate", unit.inputs["flowrate"])
-                unit.inputs["pressure"] = previous_output.get("pressure", unit.inputs["pressure"])
-                unit.inputs["temperature"] = previous_output.get("temperature", unit.inputs["temperature"])
-                unit.inputs["composition"] = previous_output.get("composition", unit.inputs["composition"])
-
-            unit.calculate()
+        for name in result.order:
+            unit = units_by_name[name]
             previous_output = unit.outputs
 
             st.write(f"**{unit.name} Outputs:**")
@@ -233,6 +273,9 @@ def run(stage: str):
                 st.json(unit.outputs["Outlet1"])
                 st.write("➡️ Outlet 2:")
                 st.json(unit.outputs["Outlet2"])
+                extra = {k: v for k, v in unit.outputs.items() if not k.startswith("Outlet")}
+                if extra:
+                    st.json(extra)
             else:
                 st.json(unit.outputs)
 
@@ -240,8 +283,9 @@ def run(stage: str):
         with st.expander("🧭 Auto-Generated Flow Diagram"):
             for unit in st.session_state.process_units:
                 dot.node(unit.name, shape="box")
-            for i in range(len(st.session_state.process_units) - 1):
-                dot.edge(st.session_state.process_units[i].name, st.session_state.process_units[i + 1].name)
+            for unit in st.session_state.process_units:
+                for s in unit.inlets or []:
+                    dot.edge(s.rsplit(".", 1)[0], unit.name, label=s.rsplit(".", 1)[-1])
             st.graphviz_chart(dot)
 
         # === PDF Export ===
@@ -261,6 +305,8 @@ def run(stage: str):
                 "units": [{
                     "name": u.name,
                     "type": type(u).__name__,
+                    "inlets": u.inlets,
+                    "params": u.params(),
                     "inputs": u.inputs,
                     "outputs": u.outputs
                 } for u in st.session_state.process_units]
@@ -0,0 +1,183 @@
+# modules/reserves_engine.py
+"""
+Probabilistic (P90/P50/P10) reserves for the Decline Curve Analyzer and the
+Volumetric Reserves Estimator (modules/decline_curve.py, volumetric_reserves.py).
+
+Every uncertain input is one array of draws; EUR for all draws is a single
+array expression:
+- decline: Arps cumulative in closed form (exponential / hyperbolic /
+  harmonic) up to the earlier of the economic limit and the horizon
+- volumetric: 7758·A·h·φ·(1-Sw)/Bo·RF  (oil, stb)  or  43560·A·h·φ·(1-Sw)/Bg·RF  (gas, scf)
+
+    specs = {"qi": Uncertain(800, 1000, 1300), "Di": Uncertain(0.15, 0.25, 0.4),
+             "b": Uncertain(0.2, 0.5, 0.9)}
+    res = monte_carlo("decline", specs, n=100_000, seed=42, t_max=20.0, q_econ=10.0)
+    res.percentiles["P50"], res.tornado
+
+Each variable draws from its own stream spawned from the seed, so a result is
+reproducible and fixing one input does not reshuffle the others. Percentiles
+follow the reserves convention: P90 is the value exceeded by 90 % of draws.
+"""
+from __future__ import annotations
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Mapping
+
+import numpy as np
+import pandas as pd
+
+DAYS_PER_YEAR = 365.0
+OIL_FACTOR = 7758.0     # bbl per acre-ft
+GAS_FACTOR = 43560.0    # ft³ per acre-ft
+DISTS = ("triangular", "uniform", "normal", "lognormal", "fixed")
+
+
+@dataclass
+class Uncertain:
+    """
+    An uncertain input. `low`/`high` are the P90/P10-style bounds for normal
+    (10th/90th percentiles), the hard range for triangular/uniform. For
+    lognormal they set the log-spread as 10th/90th percentiles and μ is fitted
+    so the distribution peaks at `mode` (centred on low/high when mode <= 0).
+    """
+    low: float
+    mode: float
+    high: float
+    dist: str = "triangular"
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        lo, md, hi = float(self.low), float(self.mode), float(self.high)
+        if self.dist == "fixed" or hi <= lo:
+            return np.full(n, md)
+        if self.dist == "triangular":
+            return rng.triangular(lo, min(max(md, lo), hi), hi, n)
+        if self.dist == "uniform":
+            return rng.uniform(lo, hi, n)
+        z90 = 1.2815515655446004   # standard normal 90th percentile
+        if self.dist == "normal":
+            return rng.normal(md, (hi - lo) / (2.0 * z90), n)
+        if self.dist == "lognormal":
+            if lo <= 0:
+                raise ValueError("lognormal inputs need low > 0")
+            sigma = (np.log(hi) - np.log(lo)) / (2.0 * z90)
+            mu = np.log(md) + sigma ** 2 if md > 0 else 0.5 * (np.log(lo) + np.log(hi))
+            return rng.lognormal(mu, sigma, n)
+        raise ValueError(f"Unknown distribution '{self.dist}' (expected one of {DISTS})")
+
+
+@dataclass
+class ReservesResult:
+    eur: np.ndarray
+    percentiles: Dict[str, float]
+    tornado: pd.DataFrame
+    samples: Dict[str, np.ndarray] = field(default_factory=dict)
+    seconds: float = 0.0
+
+
+# ---------- EUR models ----------
+def arps_cum(qi, Di, b, t_years) -> np.ndarray:
+    """
+    Cumulative volume (rate unit × days) of an Arps decline from 0 to t_years.
+    Di is nominal per year; b≈0 exponential, b≈1 harmonic.
+    """
+    qi, Di, b, t = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (qi, Di, b, t_years)))
+    D = np.maximum(Di, 1e-12)
+    expo = np.abs(b) < 1e-6
+    harm = np.abs(b - 1.0) < 1e-6
+    b_h = np.where(expo | harm, 0.5, b)
+    with np.errstate(over="ignore", invalid="ignore"):
+        cum_exp = qi / D * -np.expm1(-D * t)
+        cum_harm = qi / D * np.log1p(D * t)
+        cum_hyp = qi / ((1.0 - b_h) * D) * (1.0 - np.power(1.0 + b_h * D * t, 1.0 - 1.0 / b_h))
+    return np.where(expo, cum_exp, np.where(harm, cum_harm, cum_hyp)) * DAYS_PER_YEAR
+
+
+def time_to_rate(qi, Di, b, q_limit) -> np.ndarray:
+    """Years until the Arps rate falls to q_limit (0 when qi <= q_limit, inf when q_limit <= 0)."""
+    qi, Di, b, q = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (qi, Di, b, q_limit)))
+    D = np.maximum(Di, 1e-12)
+    ratio = np.where(q > 0, qi / np.where(q > 0, q, 1.0), np.inf)
+    expo = np.abs(b) < 1e-6
+    b_s = np.where(expo, 1.0, b)
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        t = np.where(expo, np.log(ratio) / D, (np.power(ratio, b_s) - 1.0) / (b_s * D))
+    return np.where(ratio <= 1.0, 0.0, t)
+
+
+def decline_eur(qi, Di, b, t_max: float = 30.0, q_econ: float = 0.0) -> np.ndarray:
+    """EUR to the earlier of the economic-limit rate and the t_max horizon."""
+    t_end = np.minimum(time_to_rate(qi, Di, b, q_econ), float(t_max))
+    return arps_cum(qi, Di, b, t_end)
+
+
+def volumetric_eur(area, h, phi, sw, fvf, rf, fluid: str = "Oil") -> np.ndarray:
+    """Recoverable volume: oil in stb (Bo in rb/stb), gas in scf (Bg in rcf/scf)."""
+    factor = OIL_FACTOR if fluid == "Oil" else GAS_FACTOR
+    return factor * np.asarray(area) * h * phi * (1.0 - np.asarray(sw)) / fvf * rf
+
+
+MODELS: Dict[str, Callable[..., np.ndarray]] = {"decline": decline_eur, "volumetric": volumetric_eur}
+MODEL_INPUTS = {"decline": ("qi", "Di", "b"), "volumetric": ("area", "h", "phi", "sw", "fvf", "rf")}
+
+
+# ---------- Monte Carlo ----------
+def sample_inputs(specs: Mapping[str, Uncertain], n: int, seed: int | None = None) -> Dict[str, np.ndarray]:
+    """n draws per variable, one independent stream per variable (in sorted-name order)."""
+    names = sorted(specs)
+    streams = np.random.SeedSequence(seed).spawn(len(names))
+    return {k: specs[k].sample(np.random.default_rng(s), int(n)) for k, s in zip(names, streams)}
+
+
+def percentiles(x: np.ndarray) -> Dict[str, float]:
+    """Reserves-convention P90/P50/P10 (P90 = 10th percentile) plus the mean."""
+    x = np.asarray(x, dtype=float)
+    x = x[np.isfinite(x)]
+    if x.size == 0:
+        return {"P90": float("nan"), "P50": float("nan"), "P10": float("nan"), "mean": float("nan")}
+    p10, p50, p90 = np.percentile(x, [10, 50, 90])
+    return {"P90": float(p10), "P50": float(p50), "P10": float(p90), "mean": float(x.mean())}
+
+
+def tornado(model: str, samples: Mapping[str, np.ndarray], **fixed) -> pd.DataFrame:
+    """
+    One-at-a-time swings: each input at its sampled 10th / 90th percentile with
+    every other input at its median. All 2k+1 cases are one model evaluation.
+    """
+    names = [k for k in MODEL_INPUTS[model] if k in samples]
+    q = {k: np.percentile(samples[k], [10, 50, 90]) for k in names}
+    k = len(names)
+    cases = {n: np.full(2 * k + 1, q[n][1]) for n in names}
+    for i, n in enumerate(names):
+        cases[n][2 * i], cases[n][2 * i + 1] = q[n][0], q[n][2]
+    out = MODELS[model](**cases, **fixed)
+    base = float(out[-1])
+    df = pd.DataFrame({
+        "input": names,
+        "input_low": [q[n][0] for n in names],
+        "input_high": [q[n][2] for n in names],
+        "eur_low": out[0:2 * k:2],
+        "eur_high": out[1:2 * k:2],
+    })
+    df["swing"] = (df["eur_high"] - df["eur_low"]).abs()
+    df["base"] = base
+    return df.sort_values("swing", ascending=False).reset_index(drop=True)
+
+
+def monte_carlo(model: str, specs: Mapping[str, Uncertain], n: int = 100_000,
+                seed: int | None = 42, **fixed) -> ReservesResult:
+    """
+    Sample `specs`, evaluate MODELS[model] once over all draws and summarise.
+    Inputs of the model missing from `specs` must be passed in `fixed`.
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unknown reserves model '{model}' (expected one of {sorted(MODELS)})")
+    t0 = time.perf_counter()
+    samples = sample_inputs(specs, n, seed)
+    args = {k: v for k, v in samples.items() if k in MODEL_INPUTS[model]}
+    params = {k: v for k, v in fixed.items() if k not in MODEL_INPUTS[model]}
+    args.update({k: v for k, v in fixed.items() if k in MODEL_INPUTS[model] and k not in args})
+    eur = MODELS[model](**args, **params)
+    tor = tornado(model, {k: np.atleast_1d(v) for k, v in args.items()}, **params)
+    return ReservesResult(eur=eur, percentiles=percentiles(eur), tornado=tor,
+                          samples=samples, seconds=time.perf_counter() - t0)
+
@@ -0,0 +1,207 @@
+# modules/reservoir_frames.py
+"""
+Pre-rendered animations for Reservoir Flow Simulator results.
+
+Instead of redrawing a matplotlib figure per step with time.sleep() in the
+session thread, all saved frames of a run are turned into one animated
+GIF (or APNG) blob:
+- values are mapped to palette indices of a colormap lookup table in one
+  array expression over the whole frame stack (no figures), and the
+  palette-mode frames are written directly as GIF/APNG
+- frames are upscaled by pixel repetition and wells are stamped in
+- encoding runs on a shared worker thread; blobs are cached in memory
+  and as files next to the results, keyed by the simulation hash
+- animation_bytes() does not wait for the worker: it returns None until
+  the blob is ready, and the page polls for it
+
+    blob = animation_bytes(store, "pressure", injectors, producers)
+    st.image(blob) if blob is not None else st.info("Rendering...")
+"""
+from __future__ import annotations
+import hashlib, io, json, os, threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from modules.reservoir_results import ResultStore, FIELDS
+except ImportError:
+    from reservoir_results import ResultStore, FIELDS
+
+CMAPS = {"pressure": "coolwarm", "saturation": "Blues"}
+TARGET_PX = 360                      # longest image side
+FRAME_MS = 400                       # same pace as the old sleep(0.4) loop
+MEM_CACHE_BYTES = 64 * 2**20
+LEVELS = 254                         # colormap steps; palette slots 254/255 are the wells
+INJECTOR_RGB = (0, 0, 255)
+PRODUCER_RGB = (255, 0, 0)
+
+_lut_cache: Dict[str, np.ndarray] = {}
+_blobs: "OrderedDict[str, bytes]" = OrderedDict()
+_inflight: Dict[str, Future] = {}
+_lock = threading.Lock()
+_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dm-frames")
+
+
+def simulation_key(params: Dict[str, Any]) -> str:
+    """Stable hash of everything that determines a run's frames."""
+    blob = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:20]
+
+
+def colormap_lut(name: str, levels: int = 256) -> np.ndarray:
+    """(levels, 3) uint8 RGB table for a matplotlib colormap."""
+    key = f"{name}:{levels}"
+    lut = _lut_cache.get(key)
+    if lut is None:
+        import matplotlib
+        cmap = matplotlib.colormaps[name]
+        lut = (cmap(np.linspace(0.0, 1.0, levels))[:, :3] * 255.0 + 0.5).astype(np.uint8)
+        _lut_cache[key] = lut
+    return lut
+
+
+def value_range(store: ResultStore, field: str) -> Tuple[float, float]:
+    """Global (min, max) over all saved frames, frame by frame (memmap friendly)."""
+    if field == "saturation":
+        return 0.0, 1.0  # fixed scale, as in the static plot
+    k = FIELDS.index(field)
+    lo, hi = np.inf, -np.inf
+    for i in range(len(store)):
+        a = store.frames[i, k]
+        lo = min(lo, float(np.nanmin(a)))
+        hi = max(hi, float(np.nanmax(a)))
+    if not np.isfinite(lo) or not np.isfinite(hi):
+        return 0.0, 1.0
+    return (lo, hi) if hi > lo else (lo - 0.5, hi + 0.5)
+
+
+def render_frames(frames: np.ndarray, vmin: float, vmax: float, scale: int = 1,
+                  wells: Optional[List[Tuple[Tuple[int, int], int]]] = None) -> np.ndarray:
+    """
+    (n, nx, ny) values -> (n, nx·scale, ny·scale) uint8 colour indices in
+    [0, LEVELS), drawn like imshow(origin="lower"): array row 0 is the bottom
+    image row. Well blocks get their own palette index.
+    """
+    norm = (np.asarray(frames, dtype=np.float32) - vmin) / (vmax - vmin)
+    idx = np.clip(np.nan_to_num(norm, nan=0.0) * (LEVELS - 1) + 0.5, 0, LEVELS - 1).astype(np.uint8)
+    for (i, j), colour_index in wells or []:
+        if 0 <= i < idx.shape[1] and 0 <= j < idx.shape[2]:
+            idx[:, i, j] = colour_index
+    idx = idx[:, ::-1]
+    if scale > 1:
+        idx = idx.repeat(scale, axis=1).repeat(scale, axis=2)
+    return np.ascontiguousarray(idx)
+
+
+def palette_for(field: str) -> np.ndarray:
+    """(256, 3) palette: colormap ramp, then injector and producer colours."""
+    return np.vstack([colormap_lut(CMAPS[field], LEVELS), [INJECTOR_RGB, PRODUCER_RGB]]).astype(np.uint8)
+
+
+def to_rgb(idx: np.ndarray, palette: np.ndarray) -> np.ndarray:
+    """Index frames -> RGB arrays (one fancy-index, e.g. for previews or video writers)."""
+    return palette[idx]
+
+
+def encode(idx: np.ndarray, palette: np.ndarray, fmt: str = "gif", frame_ms: int = FRAME_MS) -> bytes:
+    """Palette-mode frames straight into an animated GIF/APNG (no quantisation pass)."""
+    from PIL import Image
+
+    flat_palette = palette.reshape(-1).tolist()
+    images = []
+    for f in idx:
+        im = Image.frombytes("P", (f.shape[1], f.shape[0]), f.tobytes())
+        im.putpalette(flat_palette)
+        images.append(im)
+    buf = io.BytesIO()
+    images[0].save(buf, format="PNG" if fmt == "png" else "GIF", save_all=True,
+                   append_images=images[1:], duration=frame_ms, loop=0, optimize=False)
+    return buf.getvalue()
+
+
+def _render(store: ResultStore, field: str, wells, fmt: str, frame_ms: int) -> bytes:
+    k = FIELDS.index(field)
+    vmin, vmax = value_range(store, field)
+    nx, ny = store.meta["nx"], store.meta["ny"]
+    scale = max(1, TARGET_PX // max(nx, ny))
+    chunks = []
+    for start in range(0, len(store), 64):                 # bounded working set
+        block = store.frames[start:start + 64, k]
+        chunks.append(render_frames(block, vmin, vmax, scale, wells))
+    return encode(np.concatenate(chunks), palette_for(field), fmt, frame_ms)
+
+
+def _cache_path(store: ResultStore, key: str, fmt: str) -> str:
+    return os.path.join(os.path.dirname(store.meta["path"]), f"anim_{key}.{fmt}")
+
+
+def _remember(key: str, blob: bytes) -> None:
+    with _lock:
+        _blobs[key] = blob
+        _blobs.move_to_end(key)
+        while sum(len(b) for b in _blobs.values()) > MEM_CACHE_BYTES and len(_blobs) > 1:
+            _blobs.popitem(last=False)
+
+
+def _render_to_cache(key: str, path: str, store: ResultStore, field: str, wells, fmt: str,
+                     frame_ms: int) -> bytes:
+    try:
+        blob = _render(store, field, wells, fmt, frame_ms)
+        _remember(key, blob)
+        try:
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(blob)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+        return blob
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
+
+
+def animation_bytes(store: ResultStore, field: str,
+                    injectors: Optional[List[Tuple[int, int]]] = None,
+                    producers: Optional[List[Tuple[int, int]]] = None,
+                    fmt: str = "gif", frame_ms: int = FRAME_MS,
+                    timeout: Optional[float] = 0.0) -> Optional[bytes]:
+    """
+    Animated GIF/APNG of every saved frame of `field`. Rendered once per
+    (simulation, field, wells, format) on the worker thread, then served from cache.
+    Returns None while the render is still running after `timeout` seconds
+    (default: do not wait; None waits for it); call again to pick up the blob.
+    A failed render raises here and is retried on the next call.
+    """
+    wells = [((int(x), int(y)), LEVELS) for x, y in injectors or []]
+    wells += [((int(x), int(y)), LEVELS + 1) for x, y in producers or []]
+    sim = store.meta.get("sim_key") or os.path.basename(store.meta["path"])
+    key = simulation_key({"sim": sim, "field": field, "wells": wells, "fmt": fmt, "ms": frame_ms,
+                          "steps": store.meta["steps"]})
+
+    with _lock:
+        blob = _blobs.get(key)
+        if blob is not None:
+            _blobs.move_to_end(key)
+            return blob
+    path = _cache_path(store, key, fmt)
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            blob = f.read()
+        _remember(key, blob)
+        return blob
+
+    with _lock:
+        if key in _blobs:                       # finished since the first look
+            return _blobs[key]
+        fut = _inflight.get(key)
+        if fut is None:
+            fut = _pool.submit(_render_to_cache, key, path, store, field, wells, fmt, frame_ms)
+            _inflight[key] = fut
+    try:
+        return fut.result(timeout=timeout)
+    except FutureTimeout:
+        return None
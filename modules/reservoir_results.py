@@ -0,0 +1,159 @@
+# modules/reservoir_results.py
+"""
+Disk-backed result store for Reservoir Flow Simulator runs.
+
+Frames (pressure + Sw) are written as float32 into one preallocated
+memory-mapped .npy file, shape (n_frames, 2, nx, ny), instead of keeping
+two Python lists of float64 arrays in st.session_state:
+- only every k-th step is kept (plus the last); k is raised automatically
+  so a run never exceeds MAX_FRAMES frames
+- the session keeps only `store.meta` (path + step/rate arrays); frames are
+  read back by index from the memmap
+- CSV/ZIP exports are produced row-block by row-block from the memmap
+
+    store = ResultStore.create(nx, ny, n_steps, every=1)
+    for state in simulate(...):
+        store.record(state)
+    store.close()
+    P, Sw = ResultStore.open(store.meta).frame(-1)
+"""
+from __future__ import annotations
+import io, math, os, tempfile, time, uuid, zipfile
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+MAX_FRAMES = 400                 # per run, whatever n_steps is
+MAX_AGE_S = 6 * 3600             # stale result files are removed on the next create()
+CSV_ROWS_PER_CHUNK = 256
+FIELDS = ("pressure", "saturation")
+
+
+def results_dir() -> str:
+    """Result files location; override with DECISIONMATE_SIM_RESULTS_DIR."""
+    path = os.environ.get("DECISIONMATE_SIM_RESULTS_DIR") or os.path.join(os.getcwd(), "data", "local_store", "sim_results")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _sweep(folder: str, max_age_s: float = MAX_AGE_S) -> None:
+    cutoff = time.time() - max_age_s
+    for fname in os.listdir(folder):
+        if not fname.endswith((".npy", ".zip", ".gif", ".png")):
+            continue
+        path = os.path.join(folder, fname)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+class ResultStore:
+    def __init__(self, meta: Dict[str, Any], frames: np.ndarray):
+        self.meta = meta
+        self.frames = frames
+
+    # ---- writing ----
+    @classmethod
+    def create(cls, nx: int, ny: int, n_steps: int, every: int = 1,
+               max_frames: int = MAX_FRAMES, folder: Optional[str] = None) -> "ResultStore":
+        n_steps = int(n_steps)
+        every = max(1, int(every), math.ceil(n_steps / max(1, max_frames)))
+        # steps every, 2·every, ... plus the last step when it is not a multiple
+        n_frames = n_steps // every + (1 if n_steps % every else 0)
+        folder = folder or results_dir()
+        _sweep(folder)
+        path = os.path.join(folder, f"sim_{uuid.uuid4().hex}.npy")
+        frames = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(n_frames, 2, int(nx), int(ny)))
+        meta = {
+            "path": path, "nx": int(nx), "ny": int(ny), "n_steps": n_steps, "every": every,
+            "steps": [], "t": [], "cum_water_injected": [], "cum_fluids_produced": [],
+        }
+        return cls(meta, frames)
+
+    def record(self, state) -> bool:
+        """Store `state` if its step is a saved one; returns True when written."""
+        m = self.meta
+        if state.step % m["every"] and state.step != m["n_steps"]:
+            return False
+        i = len(m["steps"])
+        if i >= self.frames.shape[0]:
+            return False
+        self.frames[i, 0] = state.P
+        self.frames[i, 1] = state.Sw
+        m["steps"].append(int(state.step))
+        m["t"].append(float(state.t))
+        m["cum_water_injected"].append(float(state.cum_water_injected))
+        m["cum_fluids_produced"].append(float(state.cum_fluids_produced))
+        return True
+
+    def close(self) -> None:
+        self.frames.flush()
+        self.frames = np.load(self.meta["path"], mmap_mode="r")
+
+    # ---- reading ----
+    @classmethod
+    def open(cls, meta: Dict[str, Any]) -> Optional["ResultStore"]:
+        """Re-attach to a finished run (None if the file has been swept)."""
+        try:
+            return cls(meta, np.load(meta["path"], mmap_mode="r"))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def __len__(self) -> int:
+        return len(self.meta["steps"])
+
+    def frame(self, index: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(P, Sw) views of saved frame `index` (negative indices allowed)."""
+        i = range(len(self))[index]
+        return self.frames[i, 0], self.frames[i, 1]
+
+    def index_of_step(self, step: int) -> int:
+        """Saved frame at or just before simulation step `step`."""
+        steps = self.meta["steps"]
+        return max(0, int(np.searchsorted(steps, step, side="right")) - 1)
+
+    # ---- export ----
+    def iter_csv(self, index: int, field: str = "pressure") -> Iterator[bytes]:
+        """CSV of one frame (header = column numbers, like DataFrame.to_csv(index=False)), in chunks."""
+        arr = self.frame(index)[FIELDS.index(field)]
+        yield (",".join(str(j) for j in range(arr.shape[1])) + "\n").encode("utf-8")
+        for r0 in range(0, arr.shape[0], CSV_ROWS_PER_CHUNK):
+            buf = io.StringIO()
+            np.savetxt(buf, np.asarray(arr[r0:r0 + CSV_ROWS_PER_CHUNK], dtype=np.float64), delimiter=",", fmt="%.7g")
+            yield buf.getvalue().encode("utf-8")
+
+    def csv_bytes(self, index: int, field: str = "pressure") -> bytes:
+        return b"".join(self.iter_csv(index, field))
+
+    def summary_csv(self) -> bytes:
+        m = self.meta
+        lines = ["step,day,cum_water_injected,cum_fluids_produced"]
+        lines += [f"{s},{t:.6g},{qi:.6g},{qp:.6g}" for s, t, qi, qp in
+                  zip(m["steps"], m["t"], m["cum_water_injected"], m["cum_fluids_produced"])]
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+    def write_zip(self, indices: Optional[Iterable[int]] = None,
+                  extra: Optional[Dict[str, bytes]] = None) -> str:
+        """
+        Stream the chosen frames (default: all saved) into a ZIP file on disk and
+        return its path; hand an open file to st.download_button.
+        """
+        indices = list(range(len(self))) if indices is None else list(indices)
+        fd, path = tempfile.mkstemp(suffix=".zip", dir=os.path.dirname(self.meta["path"]))
+        os.close(fd)
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for i in indices:
+                step = self.meta["steps"][i]
+                for field in FIELDS:
+                    with zf.open(f"{field}_step_{step}.csv", "w") as out:
+                        for chunk in self.iter_csv(i, field):
+                            out.write(chunk)
+            zf.writestr("time_steps.csv", self.summary_csv())
+            for name, data in (extra or {}).items():
+                zf.writestr(name, data)
+        return path
+
+    def nbytes(self) -> int:
+        return int(self.frames.nbytes)
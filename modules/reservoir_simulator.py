@@ -1,10 +1,26 @@
 import streamlit as st
-import numpy as np
 import matplotlib.pyplot as plt
-import time
 import pandas as pd
-import io
-import zipfile
+import os
+from dataclasses import asdict
+
+try:
+    from modules.reservoir_engine import ReservoirGrid, simulate, explicit_dt_limit, _SCIPY_OK
+    from modules.reservoir_results import ResultStore, MAX_FRAMES
+    from modules.reservoir_frames import animation_bytes, simulation_key
+except ImportError:
+    from reservoir_engine import ReservoirGrid, simulate, explicit_dt_limit, _SCIPY_OK
+    from reservoir_results import ResultStore, MAX_FRAMES
+    from reservoir_frames import animation_bytes, simulation_key
+
+@st.fragment(run_every=1.0)
+def _await_animation(store, field, injectors, producers):
+    """Polls the background render once a second without rerunning the page; reruns it once ready."""
+    if animation_bytes(store, field, injectors, producers) is None:
+        st.info("⏳ Rendering frames in the background; the animation appears here when ready.")
+    else:
+        st.rerun()
+
 
 def run(T):
     st.title("🧪 Reservoir Flow Simulator (Black Oil – Pressure + Sw + Production)")
@@ -17,6 +33,8 @@ def run(T):
     dx = st.number_input("Grid Block Size (ft)", min_value=10.0, value=100.0)
     dt = st.number_input("Time Step (days)", min_value=0.1, value=1.0)
     n_steps = st.number_input("Number of Time Steps", min_value=1, value=10)
+    save_every = st.number_input("Save every k-th step", min_value=1, value=1,
+                                 help=f"Frames kept for the slider/export; raised automatically to stay within {MAX_FRAMES} frames.")
 
     # Step 2: Reservoir Properties
     st.subheader("Step 2: Reservoir Properties")
@@ -54,118 +72,63 @@ def run(T):
             y = st.number_input(f"Producer {i+1} Y", 0, ny - 1, ny // 2)
         producers.append((x, y))
 
+    st.markdown("### ⚙️ Pressure Solver")
+    solver_opts = ["Explicit", "Implicit (IMPES)"] if _SCIPY_OK else ["Explicit"]
+    solver_label = st.radio("Pressure Solver", solver_opts, horizontal=True,
+                            help="Implicit pressure is stable for any time step; sub-steps adapt to the pressure change.")
+    solver = "implicit" if solver_label.startswith("Implicit") else "explicit"
+    dt_limit = explicit_dt_limit(ReservoirGrid(dx=dx, phi=phi, perm=perm, mu=mu, ct=ct))
+    if solver == "explicit" and dt > dt_limit:
+        st.warning(f"Time step {dt:g} d exceeds the explicit stability limit ≈ {dt_limit:.3g} d; "
+                   "results will oscillate. Reduce dt or use the implicit solver.")
+
     run_sim = st.button("Run Simulation")
 
     if run_sim:
-        # Initialize
-        P = np.full((nx, ny), p_init)
-        Sw = np.zeros((nx, ny))
-
-        for inj_x, inj_y in injectors:
-            Sw[inj_x, inj_y] = 1.0
-
-
-
-
-        D = (0.001127 * perm) / (phi * mu * ct)
-        pressure_maps = []
-        saturation_maps = []
-
-        cum_water_injected = 0.0
-        cum_fluids_produced = 0.0
-        flow_factor = 0.001  # arbitrary scaling unit
-
-        # Main simulation loop
-        for step in range(n_steps):
-            P_new = P.copy()
-            Sw_new = Sw.copy()
-
-            for i in range(1, nx - 1):
-                for j in range(1, ny - 1):
-                    # Pressure update
-                    laplacian = (P[i+1,j] + P[i-1,j] + P[i,j+1] + P[i,j-1] - 4*P[i,j]) / (dx ** 2)
-                    P_new[i,j] = P[i,j] + D * dt * laplacian
-
-                    # Fractional flow (simple)
-                    sw = Sw[i, j]
-                    mu_w = 1.0
-                    mu_o = 5.0
-                    fw = (sw / mu_w) / (sw / mu_w + (1 - sw) / mu_o)
-
-                    for di, dj in [(-1,0), (1,0), (0,-1), (0,1)]:
-                        ni, nj = i + di, j + dj
-                        if 0 <= ni < nx and 0 <= nj < ny:
-                            dP = P[ni, nj] - P[i, j]
-                            if dP > 0:
-                                Sw_new[i, j] += 0.01 * fw
-
-                    Sw_new[i, j] = max(0.0, min(1.0, Sw_new[i, j]))
-
-            # Apply boundary & well conditions
-            P_new[0, :] = P_new[-1, :] = p_boundary
-            P_new[:, 0] = P_new[:, -1] = p_boundary
-        for prod_x, prod_y in producers:
-            P_new[prod_x, prod_y] = p_prod
-        for inj_x, inj_y in injectors:
-            Sw_new[inj_x, inj_y] = 1.0
-
-
-            # Track production & injection
-            q_inj = 0.0
-            for inj_x, inj_y in injectors:
-                for di, dj in [(-1,0), (1,0), (0,-1), (0,1)]:
-                    ni, nj = inj_x + di, inj_y + dj
-                    if 0 <= ni < nx and 0 <= nj < ny:
-                        dP = P[ni, nj] - P[inj_x, inj_y]
-                        if dP > 0:
-                            q_inj += flow_factor * dP
-            cum_water_injected += q_inj * dt
-
-
-            q_prod = 0.0
-            for prod_x, prod_y in producers:
-                for di, dj in [(-1,0), (1,0), (0,-1), (0,1)]:
-                    ni, nj = prod_x + di, prod_y + dj
-                    if 0 <= ni < nx and 0 <= nj < ny:
-                        dP = P[prod_x, prod_y] - P[ni, nj]
-                        if dP > 0:
-                            q_prod += flow_factor * dP
-            cum_fluids_produced += q_prod * dt
-
-            # Save maps
-            P = P_new
-            Sw = Sw_new
-            pressure_maps.append(P.copy())
-            saturation_maps.append(Sw.copy())
-
-        # Store for display
-        st.session_state["pressure_maps"] = pressure_maps
-        st.session_state["saturation_maps"] = saturation_maps
-        st.session_state["n_steps"] = n_steps
+        grid = ReservoirGrid(
+            nx=int(nx), ny=int(ny), dx=dx, phi=phi, perm=perm, mu=mu, ct=ct,
+            p_init=p_init, p_boundary=p_boundary, p_prod=p_prod,
+            injectors=[(int(x), int(y)) for x, y in injectors],
+            producers=[(int(x), int(y)) for x, y in producers],
+        )
+        store = ResultStore.create(grid.nx, grid.ny, n_steps, every=save_every)
+
+        # Main simulation loop (vectorized engine, see modules/reservoir_engine.py)
+        state = grid.initial_state()
+        for state in simulate(grid, dt, n_steps, solver=solver):
+            store.record(state)
+        store.close()
+        store.meta["sim_key"] = simulation_key({"grid": asdict(grid), "dt": dt, "n_steps": n_steps,
+                                                "solver": solver, "every": store.meta["every"]})
+
+        # Store for display: only the result-file handle, frames stay on disk
+        st.session_state["reservoir_results"] = store.meta
         st.session_state["dt"] = dt
-        st.session_state["cum_water_injected"] = cum_water_injected
-        st.session_state["cum_fluids_produced"] = cum_fluids_produced
+        st.session_state["cum_water_injected"] = state.cum_water_injected
+        st.session_state["cum_fluids_produced"] = state.cum_fluids_produced
 
-        st.success(f"✅ Simulation completed for {n_steps} steps.")
+        st.success(f"✅ Simulation completed for {n_steps} steps "
+                   f"({len(store)} frames saved, {store.nbytes() / 2**20:.1f} MB on disk).")
 
     # Display results
-    if "pressure_maps" in st.session_state and st.session_state["pressure_maps"]:
-        pressure_maps = st.session_state["pressure_maps"]
-        saturation_maps = st.session_state["saturation_maps"]
-        n_steps = len(pressure_maps)
+    store = ResultStore.open(st.session_state["reservoir_results"]) if "reservoir_results" in st.session_state else None
+    if store is not None and len(store):
+        steps = store.meta["steps"]
         dt = st.session_state["dt"]
         cum_water_injected = st.session_state["cum_water_injected"]
         cum_fluids_produced = st.session_state["cum_fluids_produced"]
 
-        if n_steps > 1:
-            step_select = st.slider("Select Time Step", 1, n_steps, n_steps)
+        if len(steps) > 1:
+            step_select = st.select_slider("Select Time Step", options=steps, value=steps[-1])
         else:
-            step_select = 1
+            step_select = steps[0]
+        frame_idx = store.index_of_step(step_select)
+        P_sel, Sw_sel = store.frame(frame_idx)
 
 
         st.subheader(f"📈 Pressure Distribution – Step {step_select}")
         fig, ax = plt.subplots()
-        c = ax.imshow(pressure_maps[step_select - 1], cmap='coolwarm', origin='lower')
+        c = ax.imshow(P_sel, cmap='coolwarm', origin='lower')
 
 
         for x, y in injectors:
@@ -182,7 +145,7 @@ def run(T):
         st.subheader(f"💧 Water Saturation – Step {step_select}")
 
         fig2, ax2 = plt.subplots()
-        s = ax2.imshow(saturation_maps[step_select - 1], cmap="Blues", origin="lower", vmin=0, vmax=1)
+        s = ax2.imshow(Sw_sel, cmap="Blues", origin="lower", vmin=0, vmax=1)
         for x, y in injectors:
             ax2.plot(y, x, 'bo')  # blue for injector
         for x, y in producers:
@@ -194,55 +157,23 @@ def run(T):
 
 
         for i, (px, py) in enumerate(producers):
-            st.markdown(f"📍 Pressure at Producer {i+1} ({px},{py}): **{pressure_maps[step_select-1][px, py]:.2f} psi**")
+            if px < P_sel.shape[0] and py < P_sel.shape[1]:
+                st.markdown(f"📍 Pressure at Producer {i+1} ({px},{py}): **{P_sel[px, py]:.2f} psi**")
 
-        # ✅ Animate Pressure
+        # ✅ Animations: every saved frame pre-rendered once into a GIF (cached per simulation)
+        anim_fields = []
         if st.checkbox("▶️ Animate Pressure"):
-            st.subheader("🎞️ Pressure Animation")
-            fig, ax = plt.subplots()
-            plot = ax.imshow(pressure_maps[0], cmap="coolwarm", origin="lower")
-            for x, y in injectors:
-                ax.plot(y, x, 'bo', label="Injector")
-            for x, y in producers:
-                ax.plot(y, x, 'ro', label="Producer")
-
-            ax.legend(loc="upper right")
-            cbar = plt.colorbar(plot, ax=ax, label="Pressure (psi)")
-            title = ax.set_title("")
-            placeholder = st.empty()
-
-            for step in range(n_steps):
-                plot.set_data(pressure_maps[step])
-                title.set_text(f"Step {step+1} - Day {dt*(step+1):.1f}")
-                with placeholder:
-                    st.pyplot(fig)
-                time.sleep(0.4)
-
-            st.success("🎬 Pressure animation completed")
-
-        # ✅ Animate Saturation
+            anim_fields.append(("pressure", "🎞️ Pressure Animation"))
         if st.checkbox("💧 Animate Saturation"):
-            st.subheader("🎞️ Water Saturation Animation")
-            fig, ax = plt.subplots()
-            plot = ax.imshow(saturation_maps[0], cmap="Blues", origin="lower", vmin=0, vmax=1)
-            for x, y in injectors:
-                ax.plot(y, x, 'bo', label="Injector")
-            for x, y in producers:
-                ax.plot(y, x, 'ro', label="Producer")
-
-            ax.legend(loc="upper right")
-            cbar = plt.colorbar(plot, ax=ax, label="Sw")
-            title = ax.set_title("")
-            placeholder = st.empty()
-
-            for step in range(n_steps):
-                plot.set_data(saturation_maps[step])
-                title.set_text(f"Step {step+1} - Day {dt*(step+1):.1f}")
-                with placeholder:
-                    st.pyplot(fig)
-                time.sleep(0.4)
-
-            st.success("💧 Saturation animation completed")
+            anim_fields.append(("saturation", "🎞️ Water Saturation Animation"))
+        for field, heading in anim_fields:
+            st.subheader(heading)
+            blob = animation_bytes(store, field, injectors, producers)
+            if blob is None:
+                _await_animation(store, field, injectors, producers)
+            else:
+                st.image(blob, caption=f"Steps {steps[0]}–{steps[-1]} (day {dt*steps[0]:.1f}–{dt*steps[-1]:.1f}); "
+                                       "🔵 injector, 🔴 producer")
 
         # ✅ Production Summary
         st.subheader("📊 Production Summary")
@@ -252,14 +183,8 @@ def run(T):
         # 🔽 BEGIN EXPORT BLOCK
         st.subheader("📤 Export Simulation Results")
 
-        step_data = step_select - 1  # Python index
-
-        # Convert pressure & saturation maps for selected step to DataFrame
-        df_pressure = pd.DataFrame(pressure_maps[step_data])
-        df_saturation = pd.DataFrame(saturation_maps[step_data])
-
-        # Button to download pressure CSV
-        csv_pressure = df_pressure.to_csv(index=False).encode('utf-8')
+        # Pressure & saturation maps for the selected step, streamed from the result file
+        csv_pressure = store.csv_bytes(frame_idx, "pressure")
         st.download_button(
             label="⬇️ Download Pressure Map (CSV)",
             data=csv_pressure,
@@ -267,8 +192,7 @@ def run(T):
             mime='text/csv'
         )
 
-        # Button to download saturation CSV
-        csv_saturation = df_saturation.to_csv(index=False).encode('utf-8')
+        csv_saturation = store.csv_bytes(frame_idx, "saturation")
         st.download_button(
             label="⬇️ Download Saturation Map (CSV)",
             data=csv_saturation,
@@ -289,17 +213,27 @@ def run(T):
             mime='text/csv'
         )
 
-        # Optional: Export everything as ZIP
-        if st.checkbox("🗜️ Export All as ZIP"):
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, "w") as zf:
-                zf.writestr(f"pressure_step_{step_select}.csv", csv_pressure.decode("utf-8"))
-                zf.writestr(f"saturation_step_{step_select}.csv", csv_saturation.decode("utf-8"))
-                zf.writestr("production_summary.csv", csv_summary.decode("utf-8"))
-            st.download_button(
-                label="⬇️ Download All Results (ZIP)",
-                data=zip_buffer.getvalue(),
-                file_name="simulation_results.zip",
-                mime="application/zip"
-            )
+        # Optional: every saved frame as ZIP, built on request and written to disk chunk
+        # by chunk, then kept per simulation. st.download_button still reads the whole
+        # file into memory each time it renders, so very long runs are better taken per step.
+        sim_key = store.meta.get("sim_key") or store.meta["path"]
+        zipped = st.session_state.get("reservoir_zip")
+        if zipped and (zipped[0] != sim_key or not os.path.exists(zipped[1])):
+            if os.path.exists(zipped[1]):
+                os.remove(zipped[1])
+            zipped = st.session_state["reservoir_zip"] = None
+        if zipped is None and st.button(f"🗜️ Build ZIP of all {len(store)} frames"):
+            with st.spinner("Writing ZIP..."):
+                zipped = (sim_key, store.write_zip(extra={"production_summary.csv": csv_summary}))
+            st.session_state["reservoir_zip"] = zipped
+        if zipped is not None:
+            with open(zipped[1], "rb") as zf:
+                st.download_button(
+                    label=f"⬇️ Download All Results (ZIP, {len(store)} frames)",
+                    data=zf,
+                    file_name="simulation_results.zip",
+                    mime="application/zip"
+                )
         # 🔼 END EXPORT BLOCK
+    elif "reservoir_results" in st.session_state:
+        st.info("Previous simulation results have expired. Run the simulation again.")
@@ -0,0 +1,394 @@
+# modules/resource_schedule.py
+"""
+Resource-constrained scheduling for the P6-style scheduler (modules/p6_scheduler.py),
+the Schedule Developer (modules/schedule_developer.py), the Schedule_Network
+artifact (modules/schedule.py) and the AI Optimizer's heuristic mode
+(ai/ai_optimizer.py).
+
+Priority-rule schedule generation on the compiled CPM network
+(modules/schedule_engine.py):
+- serial SGS: activities in priority order, each once all its predecessors
+  are placed, at the first start from its precedence bound where every
+  resource it uses fits for its whole duration
+- parallel SGS: steps through decision points (finishes, releases, capacity
+  changes) and starts the eligible activities that fit, in priority order
+- priority rules: LFT (min late finish), FLOAT (min total float), LST, EST,
+  SPT (shortest first), GRD (greatest resource demand first); ties go to the
+  earlier late finish, then the earlier activity
+- capacity per resource and period, (R,) or (R, T); the last column holds
+  beyond T
+- calendars: activities progress on working periods only, so scheduling runs
+  on the working-period axis and maps back to calendar periods and dates
+
+Durations are whole working periods (rounded up), lags are rounded. The
+resource checks are vectorised over periods: a window fit is one comparison
+on the (resources used, window) slice of remaining capacity plus a cumsum.
+
+    net = compile_network(ids, durations, links)
+    res = level(net, demand, capacity, calendar=Calendar(date(2026, 1, 5)), rule="LFT")
+    res.to_frame()        # id, duration, ES, start, finish, delay (+ dates with a calendar)
+    res.profile_frame()   # period, resource, usage, capacity
+
+`python scripts/bench_resource_leveling.py` levels a 10 000-activity network
+on three resources with both schemes; tests/test_resource_schedule.py checks
+feasibility and compares the serial scheme with a period-by-period reference.
+"""
+from __future__ import annotations
+import datetime
+import heapq
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from modules.schedule_engine import LINK_TYPES, Link, Network, compile_network, links_from_predecessors
+except ImportError:
+    from schedule_engine import LINK_TYPES, Link, Network, compile_network, links_from_predecessors  # type: ignore
+
+RULES = ("LFT", "FLOAT", "LST", "EST", "SPT", "GRD")
+SCHEMES = ("serial", "parallel")
+_FS, _SS, _FF, _SF = range(4)
+
+
+@dataclass
+class Calendar:
+    start: datetime.date
+    workdays: Tuple[int, ...] = (0, 1, 2, 3, 4)        # Monday = 0
+    holidays: Tuple[datetime.date, ...] = ()
+
+    def mask(self, n: int) -> np.ndarray:
+        """Working flag for the first n calendar days."""
+        days = np.datetime64(self.start, "D") + np.arange(n)
+        ok = np.isin((days.astype(np.int64) + 3) % 7, self.workdays)   # 1970-01-01 was a Thursday
+        if self.holidays:
+            ok &= ~np.isin(days, np.array(self.holidays, dtype="datetime64[D]"))
+        return ok
+
+    def working(self, n: int) -> np.ndarray:
+        """Calendar-day index of the first n working days."""
+        if not self.workdays:
+            raise ValueError("Calendar has no working days")
+        span = int(n * 7 / len(self.workdays)) + 7 + len(self.holidays)
+        while True:
+            idx = np.flatnonzero(self.mask(span))
+            if len(idx) >= n:
+                return idx[:n]
+            span *= 2
+
+    def dates(self, periods) -> np.ndarray:
+        return np.datetime64(self.start, "D") + np.asarray(periods, dtype=np.int64)
+
+
+@dataclass
+class LevelingResult:
+    ids: List[str]
+    duration: np.ndarray          # working periods
+    early_start: np.ndarray       # unconstrained CPM start
+    start: np.ndarray             # resource-feasible start
+    resources: List[str]
+    usage: np.ndarray             # (R, H) on the working-period axis
+    capacity: np.ndarray          # (R, H)
+    working: np.ndarray           # (H,) calendar period of each working period
+    rule: str
+    scheme: str
+    calendar: Optional[Calendar] = None
+    seconds: float = 0.0
+
+    @property
+    def finish(self) -> np.ndarray:
+        return self.start + self.duration
+
+    @property
+    def makespan(self) -> int:
+        return int(self.finish.max(initial=0))
+
+    @property
+    def cpm_makespan(self) -> int:
+        return int((self.early_start + self.duration).max(initial=0))
+
+    @property
+    def delay(self) -> np.ndarray:
+        return self.start - self.early_start
+
+    def calendar_periods(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(start, finish) in calendar periods; finish is exclusive, milestones finish where they start."""
+        start = self.working[self.start]
+        last = self.working[np.maximum(self.finish - 1, self.start)]
+        return start, np.where(self.duration > 0, last + 1, start)
+
+    def to_frame(self) -> pd.DataFrame:
+        start, finish = self.calendar_periods()
+        df = pd.DataFrame({"id": self.ids, "duration": self.duration, "ES": self.early_start,
+                           "start": self.start, "finish": self.finish, "delay": self.delay,
+                           "start_period": start, "finish_period": finish})
+        if self.calendar is not None:
+            df["start_date"] = self.calendar.dates(start)
+            df["finish_date"] = self.calendar.dates(np.where(self.duration > 0, finish - 1, start))
+        return df
+
+    def profile_frame(self) -> pd.DataFrame:
+        """Usage against capacity per working period up to the makespan (long format)."""
+        h = self.makespan
+        R = len(self.resources)
+        return pd.DataFrame({"period": np.tile(np.arange(h), R),
+                             "calendar_period": np.tile(self.working[:h], R),
+                             "resource": np.repeat(self.resources, h),
+                             "usage": self.usage[:, :h].ravel(),
+                             "capacity": self.capacity[:, :h].ravel()})
+
+
+class _Profile:
+    """Remaining capacity on the working-period axis, grown on demand."""
+
+    def __init__(self, capacity: np.ndarray, working: Callable[[int], np.ndarray], h: int):
+        self.capacity, self._working = capacity, working
+        self.free = np.zeros((capacity.shape[0], 0))
+        self.cap = self.free.copy()
+        self.W = np.zeros(0, dtype=np.int64)
+        self.changes = np.zeros(0, dtype=np.int64)
+        self.grow(h)
+
+    def grow(self, h: int) -> None:
+        old = self.free.shape[1]
+        if h <= old:
+            return
+        h = max(h, 2 * old)
+        self.W = np.asarray(self._working(h), dtype=np.int64)
+        self.cap = self.capacity[:, np.minimum(self.W, self.capacity.shape[1] - 1)]
+        free = self.cap.copy()
+        free[:, :old] = self.free
+        self.free = free
+        self.changes = np.flatnonzero(np.any(self.cap[:, 1:] != self.cap[:, :-1], axis=0)) + 1
+
+    def next_change(self, t: int) -> Optional[int]:
+        k = np.searchsorted(self.changes, t, side="right")
+        if k < len(self.changes):
+            return int(self.changes[k])
+        # beyond the grown horizon the capacity may still vary (calendar columns not reached yet)
+        return self.free.shape[1] if self.W[-1] < self.capacity.shape[1] - 1 else None
+
+    def fits(self, rows: np.ndarray, need: np.ndarray, t: int, d: int) -> bool:
+        self.grow(t + d)
+        return bool(np.all(self.free[rows, t:t + d] >= need[:, None]))
+
+    def first_fit(self, rows: np.ndarray, need: np.ndarray, t: int, d: int) -> int:
+        """First start >= t where the remaining capacity covers `need` on `rows` for d periods."""
+        span = max(4 * d, 64)
+        while True:
+            self.grow(t + d + span)
+            ok = np.all(self.free[rows, t:t + d + span] >= need[:, None], axis=0)
+            bad = np.concatenate(([0], np.cumsum(~ok)))
+            win = bad[d:] - bad[:-d] == 0                  # window starting at t + k is clear
+            if win.any():
+                return t + int(np.argmax(win))
+            t += int(np.flatnonzero(~ok)[-1]) + 1          # every window up to the last blocked period fails
+            span *= 2
+
+    def take(self, rows: np.ndarray, need: np.ndarray, t: int, d: int) -> None:
+        self.free[rows, t:t + d] -= need[:, None]
+
+
+def priority_order(net: Network, d: np.ndarray, demand: np.ndarray, rule: str = "LFT") -> Tuple[np.ndarray, np.ndarray]:
+    """Activities best-first under `rule` (ties: earlier LF, then index) and the CPM early starts."""
+    rule = str(rule).upper()
+    if rule not in RULES:
+        raise ValueError(f"Unknown priority rule '{rule}' (expected one of {RULES})")
+    cpm = net.cpm(d.astype(float))
+    key = {"LFT": cpm.lf, "FLOAT": cpm.total_float, "LST": cpm.ls, "EST": cpm.es, "SPT": d,
+           "GRD": -(demand.sum(axis=1) * d)}[rule]
+    return np.lexsort((np.arange(len(d)), cpm.lf, key)), np.rint(cpm.es).astype(np.int64)
+
+
+def _release(j: int, S: List[int], d: List[int], preds: List[list]) -> int:
+    t, dj = 0, d[j]
+    for p, ty, g in preds[j]:
+        c = S[p] + g
+        if ty == _FS or ty == _FF:
+            c += d[p]
+        if ty >= _FF:
+            c -= dj
+        if c > t:
+            t = c
+    return t
+
+
+def _serial(d, preds, succs, rows, need, prank, prof) -> List[int]:
+    V = len(d)
+    S = [-1] * V
+    indeg = [len(p) for p in preds]
+    heap = [(prank[j], j) for j in range(V) if not indeg[j]]
+    heapq.heapify(heap)
+    while heap:
+        _, j = heapq.heappop(heap)
+        t = _release(j, S, d, preds)
+        if d[j] and len(rows[j]):
+            t = prof.first_fit(rows[j], need[j], t, d[j])
+            prof.take(rows[j], need[j], t, d[j])
+        S[j] = t
+        for s in succs[j]:
+            indeg[s] -= 1
+            if not indeg[s]:
+                heapq.heappush(heap, (prank[s], s))
+    return S
+
+
+def _parallel(d, preds, succs, rows, need, demand, porder, prank, prof) -> List[int]:
+    V = len(d)
+    S = [-1] * V
+    indeg = [len(p) for p in preds]
+    ready = np.zeros(V, dtype=bool)                # by priority position: eligible and released
+    pending = [(0, j) for j in range(V) if not indeg[j]]
+    finishes: List[int] = []
+    started, t, dmax = 0, 0, max(d, default=0)
+    pairs = [list(zip(r.tolist(), q.tolist())) for r, q in zip(rows, need)]
+    while started < V:
+        while pending and pending[0][0] <= t:
+            ready[prank[heapq.heappop(pending)[1]]] = True
+        progress = True
+        while progress:
+            progress = False
+            cand = porder[np.flatnonzero(ready)]
+            if not len(cand):
+                break
+            prof.grow(t + dmax + 1)
+            avail = prof.free[:, t].tolist()
+            for j in cand[np.all(demand[cand] <= prof.free[:, t], axis=1)].tolist():   # first-period prefilter
+                if d[j] and len(rows[j]):
+                    # usage after t never rises in this scheme, so period t is the usual bottleneck
+                    if any(avail[r] < q for r, q in pairs[j]) or not prof.fits(rows[j], need[j], t, d[j]):
+                        continue
+                    prof.take(rows[j], need[j], t, d[j])
+                    for r, q in pairs[j]:
+                        avail[r] -= q
+                S[j] = t
+                ready[prank[j]] = False
+                started += 1
+                heapq.heappush(finishes, t + d[j])
+                for s in succs[j]:
+                    indeg[s] -= 1
+                    if not indeg[s]:
+                        r = _release(s, S, d, preds)
+                        if r <= t:
+                            ready[prank[s]] = progress = True
+                        else:
+                            heapq.heappush(pending, (r, s))
+        while finishes and finishes[0] <= t:
+            heapq.heappop(finishes)
+        nxt = [x for x in (finishes[0] if finishes else None, pending[0][0] if pending else None,
+                           prof.next_change(t)) if x is not None]
+        t = min(nxt) if nxt else t + 1
+    return S
+
+
+def level(net: Network, demand, capacity, calendar: Optional[Calendar] = None, rule: str = "LFT",
+          scheme: str = "serial", resources: Optional[Sequence[str]] = None) -> LevelingResult:
+    """
+    Resource-feasible schedule for `net`. `demand` is (V, R) units per working
+    period, `capacity` (R,) or (R, T) per calendar period (T counts calendar days
+    when a calendar is given).
+    """
+    t0 = time.perf_counter()
+    scheme = str(scheme).lower()
+    if scheme not in SCHEMES:
+        raise ValueError(f"Unknown scheme '{scheme}' (expected one of {SCHEMES})")
+    V = len(net)
+    d = np.ceil(np.maximum(net.duration, 0.0)).astype(np.int64)
+    lag = np.rint(net.lag).astype(np.int64)
+    if np.any(lag != net.lag):
+        net = compile_network(net.ids, d, [(net.ids[s], net.ids[t], LINK_TYPES[ty], float(g))
+                                           for s, t, ty, g in zip(net.src, net.dst, net.ltype, lag)])
+    demand = np.asarray(demand, dtype=float)
+    if V == 0:
+        R = demand.shape[1] if demand.ndim == 2 else len(resources or ())
+        none = np.zeros(0, dtype=np.int64)
+        return LevelingResult(ids=[], duration=none, early_start=none, start=none,
+                              resources=list(resources) if resources is not None else [f"R{r + 1}" for r in range(R)],
+                              usage=np.zeros((R, 0)), capacity=np.zeros((R, 0)), working=none,
+                              rule=str(rule).upper(), scheme=scheme, calendar=calendar,
+                              seconds=time.perf_counter() - t0)
+    demand = demand.reshape(V, -1)
+    R = demand.shape[1]
+    cap = np.asarray(capacity, dtype=float)
+    cap = cap.reshape(R, -1) if cap.size else np.full((R, 1), np.inf)
+    names = list(resources) if resources is not None else [f"R{r + 1}" for r in range(R)]
+    over = np.flatnonzero(np.any((demand > cap[:, -1]) & (d > 0)[:, None], axis=1))
+    if len(over):
+        shown = ", ".join(net.ids[i] for i in over[:10]) + (" ..." if len(over) > 10 else "")
+        raise ValueError(f"Demand exceeds the available capacity for {len(over)} activities: {shown}")
+
+    porder, es = priority_order(net, d, demand, rule)
+    prank = np.empty(V, dtype=np.int64)
+    prank[porder] = np.arange(V)
+    preds: List[list] = [[] for _ in range(V)]
+    succs: List[list] = [[] for _ in range(V)]
+    for s, t, ty, g in zip(net.src.tolist(), net.dst.tolist(), net.ltype.tolist(), lag.tolist()):
+        preds[t].append((s, ty, g))
+        succs[s].append(t)
+    rows = [np.flatnonzero(r) for r in demand > 0]
+    need = [demand[j, rows[j]] for j in range(V)]
+    working = calendar.working if calendar is not None else (lambda n: np.arange(n))
+    prof = _Profile(cap, working, int(es.max(initial=0)) + int(d.max(initial=0)) + 1)
+    dl, pl = d.tolist(), prank.tolist()
+    if scheme == "serial":
+        S = _serial(dl, preds, succs, rows, need, pl, prof)
+    else:
+        S = _parallel(dl, preds, succs, rows, need, demand, porder, pl, prof)
+    start = np.asarray(S, dtype=np.int64)
+    h = int((start + d).max(initial=0)) + 1
+    prof.grow(h)
+    step = np.zeros((h + 1, R))                    # usage from a start/finish difference array
+    np.add.at(step, start, demand)
+    np.add.at(step, start + d, -demand)
+    return LevelingResult(ids=list(net.ids), duration=d, early_start=es, start=start, resources=names,
+                          usage=np.cumsum(step, axis=0)[:h].T, capacity=prof.cap[:, :h], working=prof.W[:h],
+                          rule=str(rule).upper(), scheme=scheme, calendar=calendar,
+                          seconds=time.perf_counter() - t0)
+
+
+# ---------- table helpers ----------
+def demand_matrix(resource: Sequence, units=None) -> Tuple[List[str], np.ndarray]:
+    """
+    One resource cell per activity ("Crew", "Crane, Welder" or blank) with its
+    units per period (default 1) -> (resource names, (V, R) demand).
+    """
+    cells = [[r.strip() for r in str(x).split(",") if r.strip()] if x is not None and str(x) != "nan" else []
+             for x in resource]
+    names = sorted({r for c in cells for r in c})
+    col = {r: i for i, r in enumerate(names)}
+    qty = np.ones(len(cells)) if units is None else pd.to_numeric(pd.Series(list(units)), errors="coerce").fillna(0.0).to_numpy()
+    demand = np.zeros((len(cells), len(names)))
+    for j, c in enumerate(cells):
+        for r in c:
+            demand[j, col[r]] = qty[j]
+    return names, demand
+
+
+def capacity_array(names: Sequence[str], capacity: Mapping[str, object], default: float = np.inf) -> np.ndarray:
+    """(R, T) capacity from name -> units or per-period list (a shorter list holds its last value)."""
+    rows = [np.atleast_1d(np.asarray(capacity.get(r, default), dtype=float)) for r in names]
+    T = max((len(r) for r in rows), default=1)
+    out = np.empty((len(rows), T))
+    for i, r in enumerate(rows):
+        out[i, :len(r)] = r
+        out[i, len(r):] = r[-1]
+    return out
+
+
+def level_frame(df: pd.DataFrame, id_col: str, duration_col: str, pred_col: Optional[str] = None,
+                resource_col: Optional[str] = None, units_col: Optional[str] = None,
+                capacity: Mapping[str, object] = None, links: Iterable[Link] = (), **options) -> LevelingResult:
+    """Level a task table; resources from `resource_col` ("A, B") with `units_col` per period."""
+    ids = df[id_col].astype(str).tolist()
+    dur = pd.to_numeric(df[duration_col], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+    all_links = list(links)
+    if pred_col is not None and pred_col in df.columns:
+        all_links += links_from_predecessors(ids, df[pred_col].tolist())
+    net = compile_network(ids, dur, all_links)
+    cells = df[resource_col].tolist() if resource_col and resource_col in df.columns else [None] * len(ids)
+    units = df[units_col].tolist() if units_col and units_col in df.columns else None
+    names, demand = demand_matrix(cells, units)
+    return level(net, demand, capacity_array(names, capacity or {}), resources=names, **options)
+
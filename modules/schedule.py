@@ -4,6 +4,12 @@ from artifact_registry import save_artifact
 import streamlit as st
 from artifact_registry import get_latest, save_artifact
 import datetime
+try:
+    from modules.schedule_engine import compile_network, links_from_predecessors
+    from modules.resource_schedule import Calendar, capacity_array, demand_matrix, level
+except ImportError:
+    from schedule_engine import compile_network, links_from_predecessors  # type: ignore
+    from resource_schedule import Calendar, capacity_array, demand_matrix, level  # type: ignore
 
 DELIV_WBS_BY_STAGE = {
     "FEL1": "WBS (Schedule)",
@@ -29,6 +35,32 @@ BENCH = {
     "_default":  {"proc_cost":  50_000, "install_days": 10, "lead_weeks": 12},
 }
 
+INSTALL_CREW = "Install crew"
+INSTALL_CREWS = 2   # installation crews working in parallel
+
+def level_network(activities, start: datetime.date, capacity=None):
+    """
+    CPM + resource leveling for Schedule_Network activities (dur_days on a 7-day
+    calendar, optional "resource" per activity). Adds start/finish dates in place;
+    returns (CPM critical ids, CPM finish date, leveled finish date). The critical
+    path is the unconstrained one, so it ends at the CPM finish, not the leveled one.
+    """
+    ids = [a["id"] for a in activities]
+    net = compile_network(ids, [a["dur_days"] for a in activities],
+                          links_from_predecessors(ids, [a.get("predecessors", []) for a in activities]))
+    cpm = net.cpm()
+    names, demand = demand_matrix([a.get("resource") for a in activities])
+    res = level(net, demand, capacity_array(names, capacity or {INSTALL_CREW: INSTALL_CREWS}),
+                calendar=Calendar(start, workdays=tuple(range(7))), resources=names)
+    out = res.to_frame()
+    for a, row in zip(activities, out.itertuples()):
+        a["early_start_date"] = (start + datetime.timedelta(days=int(row.ES))).isoformat()
+        a["start_date"] = row.start_date.date().isoformat()
+        a["finish_date"] = row.finish_date.date().isoformat()
+    critical = [ids[i] for i in net.order if cpm.critical[i]]
+    return (critical, start + datetime.timedelta(days=res.cpm_makespan),
+            start + datetime.timedelta(days=res.makespan))
+
 def generate_schedule_from_engineering(project_id: str, phase_id: str):
     """Create WBS + Schedule_Network from Engineering/Equipment_List."""
     equip = get_latest(project_id, "Equipment_List", phase_id)
@@ -62,16 +94,19 @@ def generate_schedule_from_engineering(project_id: str, phase_id: str):
         }
         a_install = {
             "id": f"IN{idx}", "name": f"Install {tag}", "wbs_id": wbs_id,
-            "dur_days": int(bench["install_days"]), "predecessors": [a_order["id"]]
+            "dur_days": int(bench["install_days"]), "predecessors": [a_order["id"]],
+            "resource": INSTALL_CREW
         }
         activities += [a_order, a_install]
 
-    finish = start + datetime.timedelta(days=sum(a["dur_days"] for a in activities))
+    critical, cpm_finish, finish = level_network(activities, start)
     schedule_net = {
         "activities": activities,
-        "critical_path_ids": [a["id"] for a in activities],  # placeholder
+        "critical_path_ids": critical,          # unconstrained CPM path, ends at cpm_finish_date
         "start_date": start.isoformat(),
-        "finish_date": finish.isoformat(),
+        "cpm_finish_date": cpm_finish.isoformat(),
+        "finish_date": finish.isoformat(),      # resource-leveled (install crews)
+        "install_crews": INSTALL_CREWS,
     }
 
     save_artifact(project_id, phase_id, "Schedule", "WBS", {"nodes": wbs_nodes}, status="Pending")
@@ -3,6 +3,10 @@ import pandas as pd
 import io
 from fpdf import FPDF
 from firebase_db import save_project, load_project_data
+try:
+    from modules.resource_schedule import RULES, SCHEMES, Calendar, level_frame
+except ImportError:
+    from resource_schedule import RULES, SCHEMES, Calendar, level_frame  # type: ignore
 
 def run(T):
     title = T.get("schedule_developer_title", "Simple Schedule Developer")
@@ -18,13 +22,17 @@ def run(T):
     activity = st.text_input(T.get("activity", "Activity"))
     duration = st.number_input(T.get("duration", "Duration (days)"), min_value=1, max_value=365, value=5)
     dependency = st.text_input(T.get("dependency", "Dependencies (comma-separated)"))
+    resource = st.text_input(T.get("resource", "Resource (optional)"))
+    units = st.number_input(T.get("units", "Units per day"), min_value=0.0, value=1.0)
 
     if st.button(T.get("add_activity", "Add Activity")) and wbs and activity:
         st.session_state.schedule_data.append({
             "WBS": wbs,
             "Activity": activity,
             "Duration": duration,
-            "Dependencies": [d.strip() for d in dependency.split(",") if d.strip()]
+            "Dependencies": [d.strip() for d in dependency.split(",") if d.strip()],
+            "Resource": resource.strip(),
+            "Units": units
         })
 
     df = pd.DataFrame(st.session_state.schedule_data)
@@ -33,6 +41,28 @@ def run(T):
         st.subheader(T.get("schedule_table", "Schedule Table"))
         st.dataframe(df)
 
+        if "Resource" in df.columns and df["Resource"].fillna("").astype(str).str.strip().any():
+            with st.expander(T.get("resource_leveling", "Resource-Leveled Schedule")):
+                peak = {}
+                units = pd.to_numeric(df.get("Units", pd.Series(1.0, index=df.index)), errors="coerce").fillna(1.0)
+                for cell, u in zip(df["Resource"].fillna(""), units):
+                    for r in (x.strip() for x in str(cell).split(",") if x.strip()):
+                        peak[r] = max(peak.get(r, 0.0), float(u))
+                caps = st.data_editor(pd.DataFrame({"Resource": sorted(peak), "Capacity": [peak[r] for r in sorted(peak)]}),
+                                      disabled=["Resource"], hide_index=True, key="schedule_capacity")
+                c1, c2, c3 = st.columns(3)
+                rule = c1.selectbox(T.get("priority_rule", "Priority rule"), RULES)
+                scheme = c2.selectbox(T.get("scheme", "Scheme"), SCHEMES)
+                start = c3.date_input(T.get("start_date", "Start date"))
+                try:
+                    res = level_frame(df, "Activity", "Duration", "Dependencies", "Resource", "Units",
+                                      dict(zip(caps["Resource"], caps["Capacity"])),
+                                      calendar=Calendar(start), rule=rule, scheme=scheme)
+                    st.dataframe(res.to_frame())
+                    st.caption(f"{res.makespan} working days leveled vs {res.cpm_makespan} unconstrained (Mon–Fri).")
+                except ValueError as e:
+                    st.error(str(e))
+
         # Export to Excel
         towrite = io.BytesIO()
         df.to_excel(towrite, index=False)
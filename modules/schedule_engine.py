@@ -0,0 +1,363 @@
+# modules/schedule_engine.py
+"""
+CPM engine shared by the Critical Path Analyzer (modules/critical_path.py), the
+P6-style scheduler (modules/p6_scheduler.py) and AI PM Analytics
+(ai/ai_pm_analytics.py).
+
+A network is compiled once into integer-indexed arrays:
+- activities 0..V-1 with durations, links as (src, dst, type, lag) arrays with
+  FS/SS/FF/SF relationships and lags (negative lag = lead)
+- topological levels from a level-synchronous Kahn sort (cycles raise CycleError)
+- per level, the incoming links grouped by successor (forward pass) and the
+  outgoing links grouped by predecessor (backward pass)
+
+Each pass is one max/min-reduceat per level, O(V+E) overall, and accepts
+durations of shape (..., V) so a Monte Carlo batch of duration draws runs
+through the same passes (internally task-major, (V, n), so per-link gathers
+are row copies).
+
+    net = compile_network(["A", "B", "C"], [5, 3, 2], [("A", "B", "FS", 0), ("A", "C", "SS", 2)])
+    res = net.cpm()
+    res.to_frame()          # id, duration, ES, EF, LS, LF, total_float, free_float, critical
+    net.critical_chain(res)
+
+tests/test_schedule_engine.py checks parity with a dict-based reference on
+random networks.
+"""
+from __future__ import annotations
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+LINK_TYPES = ("FS", "SS", "FF", "SF")
+_PRED_RE = re.compile(r"^(?P<id>.+?)(?:[\s:]+(?P<type>FS|SS|FF|SF)(?P<lag>[+-]\d+(?:\.\d+)?)?)?$", re.IGNORECASE)
+
+
+class CycleError(ValueError):
+    """The precedence network has a loop; `nodes` are the activities left unscheduled."""
+
+    def __init__(self, nodes: Sequence[str]):
+        self.nodes = list(nodes)
+        shown = ", ".join(map(str, self.nodes[:10])) + (" ..." if len(self.nodes) > 10 else "")
+        super().__init__(f"Cycle detected in schedule ({len(self.nodes)} activities involved: {shown})")
+
+
+Link = Tuple[str, str, str, float]   # (predecessor, successor, type, lag)
+
+
+def parse_predecessors(text) -> List[Tuple[str, str, float]]:
+    """'A, B SS+2, C:FF-1' -> [(A, FS, 0), (B, SS, 2), (C, FF, -1)]."""
+    if isinstance(text, (list, tuple)):
+        tokens = [str(t) for t in text]
+    elif text is None or (isinstance(text, float) and np.isnan(text)):
+        tokens = []
+    else:
+        tokens = str(text).split(",")
+    out = []
+    for tok in tokens:
+        tok = tok.strip()
+        if not tok:
+            continue
+        m = _PRED_RE.match(tok)
+        out.append((m.group("id").strip(), (m.group("type") or "FS").upper(), float(m.group("lag") or 0.0)))
+    return out
+
+
+def links_from_predecessors(ids: Sequence[str], predecessors: Sequence) -> List[Link]:
+    """Links from one predecessor list/string per activity (see parse_predecessors)."""
+    return [(p, str(a), t, lag) for a, preds in zip(ids, predecessors) for p, t, lag in parse_predecessors(preds)]
+
+
+@dataclass
+class CPMResult:
+    ids: List[str]
+    duration: np.ndarray
+    es: np.ndarray
+    ef: np.ndarray
+    ls: np.ndarray
+    lf: np.ndarray
+    total_float: np.ndarray
+    free_float: np.ndarray
+    finish: np.ndarray       # project finish; scalar for a single duration vector
+    tol: float = 1e-9
+
+    @property
+    def critical(self) -> np.ndarray:
+        return self.total_float <= self.tol
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({"id": self.ids, "duration": self.duration, "ES": self.es, "EF": self.ef,
+                             "LS": self.ls, "LF": self.lf, "total_float": self.total_float,
+                             "free_float": self.free_float, "critical": self.critical})
+
+
+@dataclass
+class Network:
+    ids: List[str]
+    index: Dict[str, int]
+    duration: np.ndarray          # (V,)
+    src: np.ndarray               # (E,) link arrays
+    dst: np.ndarray
+    ltype: np.ndarray             # index into LINK_TYPES
+    lag: np.ndarray
+    level: np.ndarray             # (V,) topological level
+    dropped: List[Link] = field(default_factory=list)   # links naming unknown activities
+
+    def __post_init__(self):
+        V = len(self.ids)
+        self.order = np.argsort(self.level, kind="stable")
+        self.levels = int(self.level.max()) + 1 if V else 0
+        self.integral = bool(np.all(self.duration == np.round(self.duration))
+                             and np.all(self.lag == np.round(self.lag)))
+        # forward: links grouped by (level of dst, dst); backward: by (level of src, src)
+        fwd = np.lexsort((self.dst, self.level[self.dst])) if len(self.src) else np.zeros(0, dtype=np.int64)
+        bwd = np.lexsort((self.src, self.level[self.src])) if len(self.src) else np.zeros(0, dtype=np.int64)
+        self._fwd = self._groups(fwd, self.dst, self.level[self.dst], forward=True)
+        self._bwd = self._groups(bwd, self.src, self.level[self.src], forward=False)
+        self._level_nodes = np.split(self.order, np.searchsorted(self.level[self.order], np.arange(1, self.levels)))
+        # out-CSR (links sorted by src) for free float / successors; in-CSR for predecessors
+        self.out_ptr = np.concatenate([[0], np.cumsum(np.bincount(self.src, minlength=V))]).astype(np.int64)
+        self.in_ptr = np.concatenate([[0], np.cumsum(np.bincount(self.dst, minlength=V))]).astype(np.int64)
+        self._by_src = np.argsort(self.src, kind="stable")
+        self._by_dst = np.argsort(self.dst, kind="stable")
+
+    def _groups(self, perm: np.ndarray, key: np.ndarray, lvl: np.ndarray, forward: bool) -> Dict[int, tuple]:
+        """
+        Per level: (gather, alt, lag, adjust, starts, seg) for its links in perm order.
+        `gather` indexes the row read for every link (pred finish forward, succ
+        start backward); `alt` = (link positions, rows) read from the other
+        date array instead; `adjust` = (link positions, rows) of the duration
+        term; `seg` are the rows reduced into, `starts` their segment offsets.
+        """
+        out = {}
+        if not len(perm):
+            return out
+        k, lv = key[perm], lvl[perm]
+        bounds = np.flatnonzero(np.diff(lv)) + 1
+        for a, b in zip(np.concatenate([[0], bounds]), np.concatenate([bounds, [len(perm)]])):
+            e = perm[a:b]
+            t, src, dst = self.ltype[e], self.src[e], self.dst[e]
+            starts = np.concatenate([[0], np.flatnonzero(np.diff(k[a:b])) + 1])
+            if forward:    # FS, FF read pred finish, SS, SF pred start; FF, SF subtract succ duration
+                gather, alt, adj = src, np.flatnonzero(t % 2 == 1), np.flatnonzero(t >= 2)
+                alt, adj = (alt, src[alt]), (adj, dst[adj])
+            else:          # FS, SS read succ late start, FF, SF late finish; SS, SF add pred duration
+                gather, alt, adj = dst, np.flatnonzero(t >= 2), np.flatnonzero(t % 2 == 1)
+                alt, adj = (alt, dst[alt]), (adj, src[adj])
+            lag = self.lag[e] if np.any(self.lag[e]) else None
+            out[int(lv[a])] = (gather, alt if len(alt[0]) else None, lag, adj if len(adj[0]) else None,
+                               (starts, _rounds(starts, len(e))), k[a:b][starts])
+        return out
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ---- passes (task-major: arrays are (V,) or (V, n) for n duration samples) ----
+    @staticmethod
+    def _col(x: np.ndarray, like: np.ndarray) -> np.ndarray:
+        return x.reshape((-1,) + (1,) * (like.ndim - 1))
+
+    def forward_tm(self, d: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        es = np.zeros(d.shape)
+        ef = d.copy()
+        for L in range(1, self.levels):
+            gather, alt, lag, adj, starts, seg = self._fwd[L]
+            cand = ef[gather]
+            if alt is not None:
+                cand[alt[0]] = es[alt[1]]
+            if lag is not None:
+                cand += self._col(lag, cand)
+            if adj is not None:
+                cand[adj[0]] -= d[adj[1]]
+            es[seg] = np.maximum(_segment_reduce(np.maximum, cand, starts), 0.0)
+            nodes = self._level_nodes[L]
+            ef[nodes] = es[nodes] + d[nodes]
+        return es, ef
+
+    def backward_tm(self, d: np.ndarray, finish) -> Tuple[np.ndarray, np.ndarray]:
+        finish = np.asarray(finish, dtype=float)
+        lf = np.broadcast_to(finish, d.shape).copy()
+        ls = lf - d
+        for L in range(self.levels - 1, -1, -1):
+            if L in self._bwd:
+                gather, alt, lag, adj, starts, seg = self._bwd[L]
+                cand = ls[gather]
+                if alt is not None:
+                    cand[alt[0]] = lf[alt[1]]
+                if lag is not None:
+                    cand -= self._col(lag, cand)
+                if adj is not None:
+                    cand[adj[0]] += d[adj[1]]
+                lf[seg] = np.minimum(_segment_reduce(np.minimum, cand, starts), finish)
+            nodes = self._level_nodes[L]
+            ls[nodes] = lf[nodes] - d[nodes]
+        return ls, lf
+
+    def free_float_tm(self, es: np.ndarray, ef: np.ndarray, finish) -> np.ndarray:
+        ff = np.asarray(finish, dtype=float) - ef
+        if not len(self.src):
+            return ff
+        e = self._by_src
+        src, dst, t = self.src[e], self.dst[e], self.ltype[e]
+        succ = np.where(self._col(t <= 1, es), es[dst], ef[dst]) - self._col(self.lag[e], es)
+        pred = np.where(self._col(t % 2 == 0, es), ef[src], es[src])
+        has = np.diff(self.out_ptr) > 0
+        ff[has] = np.minimum.reduceat(succ - pred, self.out_ptr[:-1][has], axis=0)
+        return ff
+
+    @staticmethod
+    def _tm(x: np.ndarray) -> np.ndarray:
+        """(..., V) -> (V, n) contiguous."""
+        return np.ascontiguousarray(x.reshape(-1, x.shape[-1]).T) if x.ndim > 1 else x
+
+    @staticmethod
+    def _untm(x: np.ndarray, shape) -> np.ndarray:
+        return x.T.reshape(shape) if len(shape) > 1 else x
+
+    def forward(self, duration: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Early start/finish for durations of shape (..., V); activities start no earlier than 0."""
+        d = self.duration if duration is None else np.asarray(duration, dtype=float)
+        es, ef = self.forward_tm(self._tm(d))
+        return self._untm(es, d.shape), self._untm(ef, d.shape)
+
+    def backward(self, es: np.ndarray, ef: np.ndarray, duration: Optional[np.ndarray] = None,
+                 finish=None) -> Tuple[np.ndarray, np.ndarray]:
+        """Late start/finish against `finish` (default: the early finish of the project)."""
+        d = self.duration if duration is None else np.asarray(duration, dtype=float)
+        if finish is None:
+            finish = ef.max(axis=-1, initial=0.0)
+        ls, lf = self.backward_tm(self._tm(d), np.asarray(finish, dtype=float).reshape(-1) if d.ndim > 1 else finish)
+        return self._untm(ls, d.shape), self._untm(lf, d.shape)
+
+    def free_float(self, es: np.ndarray, ef: np.ndarray, finish) -> np.ndarray:
+        """Delay an activity can absorb without moving any successor's early dates."""
+        fin = np.asarray(finish, dtype=float)
+        ff = self.free_float_tm(self._tm(es), self._tm(ef), fin.reshape(-1) if es.ndim > 1 else fin)
+        return self._untm(ff, es.shape)
+
+    def cpm(self, duration: Optional[np.ndarray] = None, finish=None, tol: float = 1e-9) -> CPMResult:
+        d = self.duration if duration is None else np.asarray(duration, dtype=float)
+        es, ef = self.forward(d)
+        project = ef.max(axis=-1, initial=0.0) if finish is None else np.asarray(finish, dtype=float)
+        ls, lf = self.backward(es, ef, d, project)
+        tf = ls - es
+        fr = self.free_float(es, ef, project)
+        arrays = [d, es, ef, ls, lf, tf, fr, project]
+        if duration is None and self.integral:
+            arrays = [np.rint(a).astype(np.int64) for a in arrays]
+        return CPMResult(list(self.ids), *arrays, tol=tol)
+
+    # ---- queries ----
+    def predecessors(self, i: int) -> np.ndarray:
+        return self.src[self._by_dst[self.in_ptr[i]:self.in_ptr[i + 1]]]
+
+    def successors(self, i: int) -> np.ndarray:
+        return self.dst[self._by_src[self.out_ptr[i]:self.out_ptr[i + 1]]]
+
+    def critical_chain(self, res: CPMResult) -> List[str]:
+        """One critical path, start to finish: back from a critical activity finishing last."""
+        crit = res.critical
+        ends = np.flatnonzero(crit & (res.ef == res.ef.max(initial=0)))
+        if not len(ends):
+            return []
+        chain = [int(ends[0])]
+        while True:
+            preds = [p for p in self.predecessors(chain[-1]) if crit[p]]
+            if not preds:
+                break
+            chain.append(max(preds, key=lambda p: res.ef[p]))
+        return [self.ids[i] for i in reversed(chain)]
+
+
+def _rounds(starts: np.ndarray, n: int, max_rounds: int = 32):
+    """
+    Segmented reduction plan: round r pairs the r-th element of every segment
+    longer than r with its segment. None (use reduceat) for very long segments.
+    """
+    lengths = np.diff(np.concatenate([starts, [n]]))
+    if lengths.max(initial=0) > max_rounds:
+        return None
+    seg = np.repeat(np.arange(len(starts)), lengths)
+    rank = np.arange(n) - starts[seg]
+    return [(i, seg[i]) for i in (np.flatnonzero(rank == r) for r in range(1, int(lengths.max(initial=1))))]
+
+
+def _segment_reduce(ufunc, cand: np.ndarray, plan) -> np.ndarray:
+    """ufunc-reduce consecutive row segments of cand; row gathers beat reduceat on short segments."""
+    starts, rounds = plan
+    if rounds is None:
+        return ufunc.reduceat(cand, starts, axis=0)
+    acc = cand[starts]
+    for i, seg in rounds:
+        acc[seg] = ufunc(acc[seg], cand[i])
+    return acc
+
+
+def _levels(V: int, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """Topological level of every node (longest link count from a source); -1 left on cycles."""
+    level = np.full(V, -1, dtype=np.int64)
+    indeg = np.bincount(dst, minlength=V)
+    perm = np.argsort(src, kind="stable")
+    out_dst = dst[perm]
+    ptr = np.concatenate([[0], np.cumsum(np.bincount(src, minlength=V))])
+    frontier = np.flatnonzero(indeg == 0)
+    L = 0
+    while len(frontier):
+        level[frontier] = L
+        starts, counts = ptr[frontier], ptr[frontier + 1] - ptr[frontier]
+        total = int(counts.sum())
+        if not total:
+            break
+        offs = np.repeat(starts - np.concatenate([[0], np.cumsum(counts)[:-1]]), counts) + np.arange(total)
+        hit = out_dst[offs]
+        indeg -= np.bincount(hit, minlength=V)
+        cand = np.unique(hit)
+        frontier = cand[indeg[cand] == 0]
+        L += 1
+    return level
+
+
+def compile_network(ids: Sequence[str], durations: Sequence[float], links: Iterable[Link] = ()) -> Network:
+    """
+    Compile activities and (pred, succ, type, lag) links. Links naming an unknown
+    activity are kept in `Network.dropped`; duplicate ids raise ValueError.
+    """
+    ids = [str(i) for i in ids]
+    index = {a: i for i, a in enumerate(ids)}
+    if len(index) != len(ids):
+        dup = sorted({a for a in ids if ids.count(a) > 1})
+        raise ValueError(f"Duplicate activity id(s): {', '.join(dup[:10])}")
+    src, dst, typ, lag, dropped = [], [], [], [], []
+    for link in links:
+        p, s, t, g = (tuple(link) + ("FS", 0.0))[:4]
+        t = str(t or "FS").upper()
+        if t not in LINK_TYPES:
+            raise ValueError(f"Unknown link type '{t}' (expected one of {LINK_TYPES})")
+        p, s = str(p), str(s)
+        if p not in index or s not in index:
+            dropped.append((p, s, t, float(g or 0.0)))
+            continue
+        src.append(index[p]); dst.append(index[s]); typ.append(LINK_TYPES.index(t)); lag.append(float(g or 0.0))
+    src_a, dst_a = np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64)
+    level = _levels(len(ids), src_a, dst_a)
+    if (level < 0).any():
+        raise CycleError([ids[i] for i in np.flatnonzero(level < 0)])
+    return Network(ids=ids, index=index, duration=np.asarray(durations, dtype=float).reshape(len(ids)),
+                   src=src_a, dst=dst_a, ltype=np.array(typ, dtype=np.int64), lag=np.array(lag, dtype=float),
+                   level=level, dropped=dropped)
+
+
+def cpm_frame(df: pd.DataFrame, id_col: str, duration_col: str, pred_col: Optional[str] = None,
+              links: Iterable[Link] = ()) -> Tuple[Network, CPMResult]:
+    """Compile and schedule a task table; predecessors from `pred_col` and/or explicit links."""
+    ids = df[id_col].astype(str).tolist()
+    dur = pd.to_numeric(df[duration_col], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+    all_links = list(links)
+    if pred_col is not None and pred_col in df.columns:
+        all_links += links_from_predecessors(ids, df[pred_col].tolist())
+    net = compile_network(ids, dur, all_links)
+    return net, net.cpm()
+
@@ -0,0 +1,324 @@
+# modules/schedule_incremental.py
+"""
+Incremental CPM for interactive schedule editing (modules/p6_scheduler.py).
+
+IncrementalCPM keeps the network and its dates between Streamlit reruns and,
+after an edit, repropagates only what the edit can move:
+- early dates forward from the edited activity through its descendants, in
+  topological-rank order, stopping wherever a date comes out unchanged
+- late dates backward through the affected ancestors the same way
+
+Late dates are stored as tails measured from the project finish
+(tail = finish - LF), which do not depend on the finish itself; a longer or
+shorter project therefore does not touch every activity. The topological
+ranks are maintained under link insertion (Pearce–Kelly), so adding a link
+only reorders the region between its endpoints, and a link that would close
+a loop raises CycleError without changing anything.
+
+    eng = IncrementalCPM.from_network(ids, durations, links)
+    eng.set_duration("A12", 9)
+    eng.add_link("A12", "B40", "SS", 2)
+    eng.result().to_frame()
+    eng.sync(durations_by_id, links)     # apply whatever differs, e.g. once per rerun
+
+`python scripts/bench_incremental_cpm.py` benchmarks incremental edits against
+a full compile + CPM on a 20 000-activity network and checks they agree.
+"""
+from __future__ import annotations
+import heapq
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from modules.schedule_engine import LINK_TYPES, CPMResult, CycleError, Link, compile_network
+except ImportError:
+    from schedule_engine import LINK_TYPES, CPMResult, CycleError, Link, compile_network  # type: ignore
+
+_FS, _SS, _FF, _SF = range(4)
+
+
+class IncrementalCPM:
+    def __init__(self):
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.d: List[float] = []
+        self.succ: List[Dict[Tuple[int, int], float]] = []   # (succ, type) -> lag
+        self.pred: List[Dict[Tuple[int, int], float]] = []   # (pred, type) -> lag
+        self.rank: List[int] = []
+        self.es: List[float] = []
+        self.tail: List[float] = []                           # finish - LF
+        self.stats = {"forward": 0, "backward": 0, "full": 0}
+        self._slot: Dict[Tuple[int, int, int], int] = {}      # (pred, succ, type) -> row of the link arrays
+        self._links = [np.zeros(0, dtype=np.int64)] * 3 + [np.zeros(0)]   # src, dst, type, lag
+
+    # ---- construction ----
+    @classmethod
+    def from_network(cls, ids: Sequence[str], durations: Sequence[float], links: Iterable[Link] = ()) -> "IncrementalCPM":
+        eng = cls()
+        eng._rebuild([str(i) for i in ids], [float(x) for x in durations], list(links))
+        return eng
+
+    def _rebuild(self, ids: List[str], durations: List[float], links: List[Link]) -> None:
+        """Full compile + CPM (the vectorised engine), then adopt its order and dates."""
+        net = compile_network(ids, durations, links)
+        res = net.cpm(np.asarray(durations, dtype=float))
+        self.ids, self.index, self.d = list(ids), dict(net.index), [float(x) for x in durations]
+        self.succ = [dict() for _ in ids]
+        self.pred = [dict() for _ in ids]
+        for s, t, ty, g in zip(net.src.tolist(), net.dst.tolist(), net.ltype.tolist(), net.lag.tolist()):
+            g = max(g, self.succ[s].get((t, ty), g))       # parallel links of one type: the larger lag binds
+            self.succ[s][(t, ty)] = g
+            self.pred[t][(s, ty)] = g
+        keys = [(p, t, ty) for p in range(len(ids)) for (t, ty) in self.succ[p]]
+        self._slot = {k: r for r, k in enumerate(keys)}
+        cols = np.array(keys, dtype=np.int64).reshape(-1, 3).T
+        self._links = [cols[0], cols[1], cols[2], np.array([self.succ[p][(t, ty)] for p, t, ty in keys], dtype=float)]
+        rank = np.empty(len(ids), dtype=np.int64)
+        rank[net.order] = np.arange(len(ids))
+        self.rank = rank.tolist()
+        self.es = np.asarray(res.es, dtype=float).tolist()
+        self.tail = (float(res.finish) - np.asarray(res.lf, dtype=float)).tolist()
+        self.stats["full"] += 1
+
+    # ---- single-node recomputation ----
+    def _early(self, v: int) -> float:
+        es, d, dv = self.es, self.d, self.d[v]
+        best = 0.0
+        for (p, ty), g in self.pred[v].items():
+            if ty == _FS:
+                c = es[p] + d[p] + g
+            elif ty == _SS:
+                c = es[p] + g
+            elif ty == _FF:
+                c = es[p] + d[p] + g - dv
+            else:
+                c = es[p] + g - dv
+            if c > best:
+                best = c
+        return best
+
+    def _late_tail(self, u: int) -> float:
+        tail, d, du = self.tail, self.d, self.d[u]
+        best = 0.0
+        for (s, ty), g in self.succ[u].items():
+            if ty == _FS:
+                c = tail[s] + d[s] + g
+            elif ty == _SS:
+                c = tail[s] + d[s] + g - du
+            elif ty == _FF:
+                c = tail[s] + g
+            else:
+                c = tail[s] + g - du
+            if c > best:
+                best = c
+        return best
+
+    # ---- propagation ----
+    def _forward(self, seeds: Iterable[int]) -> None:
+        heap = [(self.rank[v], v) for v in set(seeds)]
+        heapq.heapify(heap)
+        queued = {v for _, v in heap}
+        seeds = set(queued)
+        while heap:
+            _, v = heapq.heappop(heap)
+            queued.discard(v)
+            self.stats["forward"] += 1
+            old = self.es[v]
+            new = self._early(v)
+            self.es[v] = new
+            if new != old or v in seeds:      # a seed's finish may move even when its start does not
+                for (s, _) in self.succ[v]:
+                    if s not in queued:
+                        queued.add(s)
+                        heapq.heappush(heap, (self.rank[s], s))
+
+    def _backward(self, seeds: Iterable[int]) -> None:
+        heap = [(-self.rank[v], v) for v in set(seeds)]
+        heapq.heapify(heap)
+        queued = {v for _, v in heap}
+        seeds = set(queued)
+        while heap:
+            _, u = heapq.heappop(heap)
+            queued.discard(u)
+            self.stats["backward"] += 1
+            old = self.tail[u]
+            new = self._late_tail(u)
+            self.tail[u] = new
+            if new != old or u in seeds:
+                for (p, _) in self.pred[u]:
+                    if p not in queued:
+                        queued.add(p)
+                        heapq.heappush(heap, (-self.rank[p], p))
+
+    # ---- edits ----
+    def _node(self, a: str) -> int:
+        try:
+            return self.index[str(a)]
+        except KeyError:
+            raise KeyError(f"Unknown activity '{a}'") from None
+
+    def set_duration(self, a: str, duration: float) -> None:
+        v = self._node(a)
+        if self.d[v] == float(duration):
+            return
+        self.d[v] = float(duration)
+        self._forward([v])
+        self._backward([v])
+
+    def add_activity(self, a: str, duration: float) -> None:
+        a = str(a)
+        if a in self.index:
+            raise ValueError(f"Duplicate activity id: {a}")
+        self.index[a] = len(self.ids)
+        self.ids.append(a)
+        self.d.append(float(duration))
+        self.succ.append({})
+        self.pred.append({})
+        self.rank.append(len(self.rank))
+        self.es.append(0.0)
+        self.tail.append(0.0)
+
+    def remove_activity(self, a: str) -> None:
+        """Drops the activity and its links (re-indexes: a full rebuild)."""
+        v = self._node(a)
+        keep = [i for i in range(len(self.ids)) if i != v]
+        links = [l for l in self.links() if l[0] != self.ids[v] and l[1] != self.ids[v]]
+        self._rebuild([self.ids[i] for i in keep], [self.d[i] for i in keep], links)
+
+    def _reorder(self, p: int, s: int) -> None:
+        """Pearce–Kelly: make rank[p] < rank[s] for a new link p -> s, or raise CycleError."""
+        lb, ub = self.rank[s], self.rank[p]
+        if lb > ub:
+            return
+        fwd, stack, seen = [], [s], {s}
+        while stack:                                   # descendants of s ranked up to rank[p]
+            x = stack.pop()
+            if x == p:
+                raise CycleError([self.ids[p], self.ids[s]])
+            fwd.append(x)
+            for (y, _) in self.succ[x]:
+                if y not in seen and self.rank[y] <= ub:
+                    seen.add(y)
+                    stack.append(y)
+        bwd, stack, seen_b = [], [p], {p}
+        while stack:                                   # ancestors of p ranked from rank[s]
+            x = stack.pop()
+            bwd.append(x)
+            for (y, _) in self.pred[x]:
+                if y not in seen_b and self.rank[y] >= lb:
+                    seen_b.add(y)
+                    stack.append(y)
+        bwd.sort(key=self.rank.__getitem__)
+        fwd.sort(key=self.rank.__getitem__)
+        slots = sorted(self.rank[x] for x in bwd + fwd)
+        for x, r in zip(bwd + fwd, slots):
+            self.rank[x] = r
+
+    def add_link(self, pred: str, succ: str, link_type: str = "FS", lag: float = 0.0) -> None:
+        p, s = self._node(pred), self._node(succ)
+        ty = LINK_TYPES.index(str(link_type).upper())
+        if p == s:
+            raise CycleError([self.ids[p]])
+        self._reorder(p, s)
+        lag = max(float(lag), self.succ[p].get((s, ty), float(lag)))
+        self.succ[p][(s, ty)] = lag
+        self.pred[s][(p, ty)] = lag
+        self._set_row((p, s, ty), lag)
+        self._forward([s])
+        self._backward([p])
+
+    def remove_link(self, pred: str, succ: str, link_type: str = "FS") -> None:
+        p, s = self._node(pred), self._node(succ)
+        ty = LINK_TYPES.index(str(link_type).upper())
+        if self.succ[p].pop((s, ty), None) is None:
+            return
+        self.pred[s].pop((p, ty), None)
+        self._set_row((p, s, ty), -np.inf)
+        self._forward([s])
+        self._backward([p])
+
+    def links(self) -> List[Link]:
+        return [(self.ids[p], self.ids[s], LINK_TYPES[ty], g)
+                for p in range(len(self.ids)) for (s, ty), g in self.succ[p].items()]
+
+    def sync(self, durations: Mapping[str, float], links: Iterable[Link]) -> Dict[str, int]:
+        """
+        Bring the engine to the given activities and links with incremental edits
+        (removed activities force a rebuild). Returns counts of applied edits.
+        """
+        changes = {"activities": 0, "durations": 0, "links": 0}
+        durations = {str(k): float(v) for k, v in durations.items()}
+        if any(a not in durations for a in self.ids):
+            ids = list(durations)
+            want = [l for l in self._norm(links) if l[0] in durations and l[1] in durations]
+            self._rebuild(ids, [durations[a] for a in ids], want)
+            changes["activities"] = len(ids)
+            return changes
+        for a, dur in durations.items():
+            if a not in self.index:
+                self.add_activity(a, dur)
+                changes["activities"] += 1
+            elif self.d[self.index[a]] != dur:
+                self.set_duration(a, dur)
+                changes["durations"] += 1
+        want: Dict[Tuple[str, str, str], float] = {}
+        for p, s, t, g in self._norm(links):
+            if p in self.index and s in self.index:
+                want[(p, s, t)] = max(g, want.get((p, s, t), g))
+        have = {(p, s, t): g for p, s, t, g in self.links()}
+        for key, g in have.items():
+            if key not in want or want[key] != g:
+                self.remove_link(*key)
+                changes["links"] += 1
+        for key, g in want.items():
+            if key not in have or have[key] != g:
+                self.add_link(*key, g)
+                changes["links"] += 1
+        return changes
+
+    @staticmethod
+    def _norm(links: Iterable[Link]) -> List[Link]:
+        return [(str(p), str(s), str(t or "FS").upper(), float(g or 0.0)) for p, s, t, g in
+                ((tuple(l) + ("FS", 0.0))[:4] for l in links)]
+
+    # ---- results ----
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def order(self) -> np.ndarray:
+        return np.argsort(np.asarray(self.rank, dtype=np.int64), kind="stable")
+
+    def _set_row(self, key: Tuple[int, int, int], lag: float) -> None:
+        """Keeps the link arrays in step with an edit; a removed link keeps its row with lag -inf."""
+        r = self._slot.get(key)
+        if r is None:
+            r = self._slot[key] = len(self._links[3])
+            self._links = [np.append(c, v) for c, v in zip(self._links, key + (lag,))]
+        else:
+            self._links[3][r] = lag
+
+    def result(self, tol: float = 1e-9) -> CPMResult:
+        d = np.asarray(self.d, dtype=float)
+        es = np.asarray(self.es, dtype=float)
+        ef = es + d
+        finish = float(ef.max(initial=0.0))
+        lf = finish - np.asarray(self.tail, dtype=float)
+        ls = lf - d
+        ff = finish - ef
+        src, dst, ty, lag = self._links
+        live = np.isfinite(lag)
+        if live.any():                                 # free float: tightest outgoing link
+            succ = np.where(ty <= _SS, es[dst], ef[dst]) - lag
+            slack = succ - np.where(ty % 2 == 0, ef[src], es[src])
+            tight = np.full(len(d), np.inf)
+            np.minimum.at(tight, src[live], slack[live])
+            has = np.isfinite(tight)
+            ff[has] = tight[has]
+            lag = lag[live]
+        arrays = [d, es, ef, ls, lf, ls - es, ff, np.float64(finish)]
+        if np.all(d == np.round(d)) and np.all(lag == np.round(lag)):
+            arrays = [np.rint(x).astype(np.int64) for x in arrays]
+        return CPMResult(list(self.ids), *arrays, tol=tol)
+
@@ -0,0 +1,390 @@
+# modules/schedule_risk.py
+"""
+Quantitative schedule risk analysis (QSRA) on the shared CPM engine
+(modules/schedule_engine.py), used by AI PM Analytics (ai/ai_pm_analytics.py).
+
+- durations: triangular (optimistic, most likely, pessimistic) per task, drawn
+  for a whole block of iterations at once as an (iterations × tasks) matrix
+- early dates: the engine's forward pass over the matrix, one array maximum
+  per topological level for all iterations together
+- criticality index: share of iterations in which a task has zero total float
+  (backward pass on the same block)
+- sensitivity: Pearson correlation of task duration with project finish,
+  accumulated from running sums so blocks are never kept
+
+- risk events: discrete per-iteration hits adding days to a task (RiskEvent)
+
+Iterations run in fixed-size blocks, each with its own generator spawned from
+the seed, so a result depends only on (seed, iterations, network). Blocks can
+run in a process pool (workers=N); they are merged in block order, so the
+result is the same for any worker count. With keep_finishes=False nothing
+per-iteration is kept: percentiles come from a fixed-range histogram sketch
+whose integer counts merge exactly.
+
+    net = compile_network(ids, durations, links)
+    res = simulate(net, low, mode, high, iterations=100_000, seed=42, workers=4,
+                   keep_finishes=False, progress=lambda done, total: ...)
+    res.percentiles(), res.task_table()
+
+`python scripts/bench_schedule_risk.py` times serial vs pool runs on a
+2 000-activity network and checks they agree.
+"""
+from __future__ import annotations
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from modules.schedule_engine import Network, compile_network, links_from_predecessors
+except ImportError:
+    from schedule_engine import Network, compile_network, links_from_predecessors  # type: ignore
+
+BLOCK_CELLS = 2_000_000     # iterations × tasks per block (bounds memory, fixes the seeding layout)
+FALLBACK_SPREAD = (0.8, 1.0, 1.2)
+
+
+@dataclass
+class RiskResult:
+    ids: List[str]
+    finish: Optional[np.ndarray]  # (iterations,) project finish per iteration; None when streamed
+    deterministic: float          # CPM finish with most-likely durations
+    criticality: np.ndarray       # (tasks,) share of iterations critical
+    sensitivity: np.ndarray       # (tasks,) corr(duration, finish)
+    mean_duration: np.ndarray
+    sketch: Optional["QuantileSketch"] = None
+    seconds: float = 0.0
+    meta: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def iterations(self) -> int:
+        return int(self.meta.get("iterations", 0))
+
+    def percentiles(self, ps: Sequence[int] = (10, 50, 80, 90)) -> Dict[str, float]:
+        """Exact when the finishes were kept, otherwise from the streaming sketch."""
+        if self.finish is not None and len(self.finish):
+            return {f"P{p}": float(v) for p, v in zip(ps, np.percentile(self.finish, ps))}
+        return {f"P{p}": self.sketch.quantile(p / 100.0) for p in ps}
+
+    def task_table(self) -> pd.DataFrame:
+        df = pd.DataFrame({"task_id": self.ids, "mean_duration": self.mean_duration,
+                           "criticality": self.criticality, "sensitivity": self.sensitivity})
+        df["cruciality"] = df["criticality"] * df["sensitivity"]
+        return df.sort_values(["criticality", "sensitivity"], ascending=False).reset_index(drop=True)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Finish per iteration, or the sketch histogram (bin centre, count) when streamed."""
+        if self.finish is None:
+            return self.sketch.to_frame()
+        return pd.DataFrame({"iteration": np.arange(1, len(self.finish) + 1), "finish_days": self.finish})
+
+
+@dataclass
+class RiskEvent:
+    """A discrete risk: with `probability` per iteration, `impact` days are added to task `task_id`."""
+    task_id: str
+    probability: float
+    impact: float
+
+
+def three_point(df: pd.DataFrame, base_col: str = "duration_days",
+                cols: Tuple[str, str, str] = ("optimistic_days", "most_likely_days", "pessimistic_days")
+                ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (low, mode, high) per task. Rows missing any estimate (or with low/high <= 0)
+    fall back to 80/100/120 % of the base duration, floored at 1 day.
+    """
+    base = pd.to_numeric(df[base_col], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+    est = [pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float) if c in df.columns
+           else np.full(len(df), np.nan) for c in cols]
+    a, m, b = est
+    bad = np.isnan(a) | np.isnan(m) | np.isnan(b) | (a <= 0) | (b <= 0)
+    lo, md, hi = (np.maximum(1.0, f * base) for f in FALLBACK_SPREAD)
+    a, m, b = np.where(bad, lo, a), np.where(bad, md, m), np.where(bad, hi, b)
+    a, b = np.minimum(a, b), np.maximum(a, b)
+    return a, np.clip(m, a, b), b
+
+
+def sample_durations(rng: np.random.Generator, low, mode, high, n: int) -> np.ndarray:
+    """
+    Task-major (tasks, n) triangular draws, the layout the engine's passes use.
+    Inverse-CDF sampling from one uniform block, without masked ufuncs
+    (several times faster than Generator.triangular on large blocks).
+    """
+    low, mode, high = (np.asarray(x, dtype=float)[:, None] for x in (low, mode, high))
+    span = high - low
+    c = (mode - low) / np.where(span > 0, span, 1.0)
+    u = rng.random((len(low), int(n)))
+    left = u < c
+    lo = u * (span * (mode - low))
+    np.sqrt(lo, out=lo)
+    lo += low
+    np.subtract(1.0, u, out=u)
+    u *= span * (high - mode)
+    np.sqrt(u, out=u)
+    np.subtract(high, u, out=u)
+    return np.where(left, lo, u)
+
+
+def blocks(iterations: int, tasks: int, block_cells: int = BLOCK_CELLS) -> List[int]:
+    """Iteration counts per block; depends only on the problem size."""
+    size = max(1, block_cells // max(tasks, 1))
+    full, rest = divmod(int(iterations), size)
+    return [size] * full + ([rest] if rest else [])
+
+
+@dataclass
+class _Moments:
+    """Running sums for duration/finish correlation and criticality counts."""
+    n: int = 0
+    sf: float = 0.0
+    sff: float = 0.0
+    sd: Optional[np.ndarray] = None
+    sdd: Optional[np.ndarray] = None
+    sdf: Optional[np.ndarray] = None
+    crit: Optional[np.ndarray] = None
+
+    def add(self, d: np.ndarray, f: np.ndarray, crit: Optional[np.ndarray]) -> "_Moments":
+        """d: task-major (tasks, n) durations, f: (n,) finishes, crit: (tasks,) critical counts."""
+        if self.sd is None:
+            V = d.shape[0]
+            self.sd, self.sdd, self.sdf, self.crit = np.zeros(V), np.zeros(V), np.zeros(V), np.zeros(V)
+        self.n += len(f)
+        self.sf += float(f.sum())
+        self.sff += float(f @ f)
+        self.sd += d.sum(axis=1)
+        self.sdd += np.einsum("ij,ij->i", d, d)
+        self.sdf += d @ f
+        if crit is not None:
+            self.crit += crit
+        return self
+
+    def merge(self, other: "_Moments") -> "_Moments":
+        if other.sd is None:
+            return self
+        if self.sd is None:
+            return other
+        self.n += other.n
+        self.sf += other.sf
+        self.sff += other.sff
+        for k in ("sd", "sdd", "sdf", "crit"):
+            setattr(self, k, getattr(self, k) + getattr(other, k))
+        return self
+
+    def correlation(self) -> np.ndarray:
+        n = max(self.n, 1)
+        cov = self.sdf / n - (self.sd / n) * (self.sf / n)
+        var_d = np.maximum(self.sdd / n - (self.sd / n) ** 2, 0.0)
+        var_f = max(self.sff / n - (self.sf / n) ** 2, 0.0)
+        den = np.sqrt(var_d * var_f)
+        return np.where(den > 1e-12, cov / np.where(den > 1e-12, den, 1.0), 0.0)
+
+
+class QuantileSketch:
+    """
+    Fixed-range histogram of project finishes. Counts are integers, so merging
+    sketches from any number of workers in any order gives identical quantiles;
+    the error is at most one bin width ((hi - lo) / bins). Values outside the
+    range land in the end bins; the exact min/max are tracked.
+    """
+
+    def __init__(self, lo: float, hi: float, bins: int = 4096):
+        self.lo, self.hi, self.bins = float(lo), float(max(hi, lo + 1e-9)), int(bins)
+        self.counts = np.zeros(self.bins, dtype=np.int64)
+        self.min, self.max = np.inf, -np.inf
+
+    @property
+    def n(self) -> int:
+        return int(self.counts.sum())
+
+    def add(self, x: np.ndarray) -> "QuantileSketch":
+        if len(x):
+            idx = ((x - self.lo) * (self.bins / (self.hi - self.lo))).astype(np.int64)
+            self.counts += np.bincount(np.clip(idx, 0, self.bins - 1), minlength=self.bins)
+            self.min, self.max = min(self.min, float(x.min())), max(self.max, float(x.max()))
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        self.counts += other.counts
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        return self
+
+    def quantile(self, q: float) -> float:
+        n = self.n
+        if not n:
+            return float("nan")
+        cum = np.cumsum(self.counts)
+        target = q * n
+        i = int(np.searchsorted(cum, target, side="left"))
+        i = min(i, self.bins - 1)
+        before = cum[i - 1] if i else 0
+        width = (self.hi - self.lo) / self.bins
+        x = self.lo + width * (i + (target - before) / max(self.counts[i], 1))
+        return float(np.clip(x, self.min, self.max))
+
+    def to_frame(self) -> pd.DataFrame:
+        width = (self.hi - self.lo) / self.bins
+        nz = np.flatnonzero(self.counts)
+        return pd.DataFrame({"finish_days": self.lo + width * (nz + 0.5), "count": self.counts[nz]})
+
+
+def run_block(net: Network, low, mode, high, n: int, seed_seq: np.random.SeedSequence,
+              criticality: bool = True, tol: float = 1e-9,
+              events: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None) -> Tuple[np.ndarray, _Moments]:
+    """
+    One block: draw durations (then risk-event hits from the same generator),
+    forward (and backward) pass; returns finishes and the block's moments.
+    `events` is (task index, probability, impact) arrays.
+    """
+    rng = np.random.default_rng(seed_seq)
+    d = sample_durations(rng, low, mode, high, n)
+    if events is not None and len(events[0]):
+        task, prob, impact = events
+        hits = rng.random((len(task), int(n))) < prob[:, None]
+        np.add.at(d, task, hits * impact[:, None])
+    es, ef = net.forward_tm(d)
+    f = ef.max(axis=0)
+    crit = None
+    if criticality:
+        ls, _ = net.backward_tm(d, f)
+        crit = ((ls - es) <= tol).sum(axis=1).astype(float)
+    return f, _Moments().add(d, f, crit)
+
+
+def _event_arrays(net: Network, events: Optional[Sequence[RiskEvent]]):
+    ev = [e for e in (events or ()) if str(e.task_id) in net.index and e.probability > 0]
+    return (np.array([net.index[str(e.task_id)] for e in ev], dtype=np.int64),
+            np.array([min(float(e.probability), 1.0) for e in ev]),
+            np.array([float(e.impact) for e in ev]))
+
+
+def _finish_range(net: Network, low, high, events) -> Tuple[float, float]:
+    """Sketch range: finishes with all-low and all-high durations (every adverse event hit), padded."""
+    hi_d = np.asarray(high, dtype=float).copy()
+    task, _, impact = events
+    np.add.at(hi_d, task, np.maximum(impact, 0.0))
+    lo_d = np.asarray(low, dtype=float).copy()
+    np.add.at(lo_d, task, np.minimum(impact, 0.0))
+    lo = float(net.forward(lo_d)[1].max(initial=0.0))
+    hi = float(net.forward(hi_d)[1].max(initial=0.0))
+    pad = 0.05 * max(hi - lo, 1.0)
+    return lo - pad, hi + pad
+
+
+# process-pool workers get the network once, through the initializer
+_WORKER: Dict[str, object] = {}
+
+
+def _init_worker(payload: dict) -> None:
+    _WORKER.clear()
+    _WORKER.update(payload)
+
+
+def _pool_block(job: Tuple[int, int, np.random.SeedSequence]):
+    i, n, ss = job
+    w = _WORKER
+    f, mom = run_block(w["net"], w["low"], w["mode"], w["high"], n, ss, w["criticality"], events=w["events"])
+    sk = QuantileSketch(*w["range"], bins=w["bins"]).add(f)
+    return i, (f if w["keep"] else None), sk, mom
+
+
+def simulate(net: Network, low, mode, high, iterations: int = 1000, seed: Optional[int] = None,
+             criticality: bool = True, block_cells: int = BLOCK_CELLS,
+             events: Optional[Sequence[RiskEvent]] = None, workers: int = 1,
+             keep_finishes: bool = True, bins: int = 4096,
+             progress: Optional[Callable[[int, int], None]] = None) -> RiskResult:
+    """
+    Monte Carlo over the compiled network; see the module docstring.
+
+    workers > 1 runs blocks in a process pool. Blocks are merged in block
+    order and each has its own spawned generator, so the result is identical
+    for any worker count. keep_finishes=False streams: only the quantile
+    sketch and running sums are kept. progress(done, total) is called in the
+    calling process after each block.
+    """
+    t0 = time.perf_counter()
+    low, mode, high = (np.asarray(x, dtype=float) for x in (low, mode, high))
+    ev = _event_arrays(net, events)
+    sizes = blocks(iterations, len(net), block_cells)
+    jobs = list(zip(range(len(sizes)), sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+    payload = {"net": net, "low": low, "mode": mode, "high": high, "criticality": criticality,
+               "events": ev, "range": _finish_range(net, low, high, ev), "bins": int(bins),
+               "keep": bool(keep_finishes)}
+    sketch = QuantileSketch(*payload["range"], bins=int(bins))
+    finishes: List[np.ndarray] = []
+    mom = _Moments()
+    pending: Dict[int, tuple] = {}
+    nxt, done = 0, 0
+
+    def collect(out):
+        nonlocal nxt, done, mom
+        pending[out[0]] = out[1:]
+        done += sizes[out[0]]
+        while nxt in pending:            # merge in block order: float sums independent of completion order
+            f, sk, m = pending.pop(nxt)
+            sketch.merge(sk)
+            mom = mom.merge(m)
+            if f is not None:
+                finishes.append(f)
+            nxt += 1
+        if progress is not None:
+            progress(done, int(iterations))
+
+    if workers and workers > 1 and len(jobs) > 1:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(max_workers=int(workers), initializer=_init_worker,
+                                 initargs=(payload,)) as pool:
+            for fut in as_completed([pool.submit(_pool_block, j) for j in jobs]):
+                collect(fut.result())
+    else:
+        _init_worker(payload)
+        for j in jobs:
+            collect(_pool_block(j))
+        _WORKER.clear()
+
+    finish = np.concatenate(finishes) if keep_finishes else None
+    if finish is not None and not len(finish):
+        finish = np.zeros(0)
+    return _result(net, mode, finish, sketch, mom, time.perf_counter() - t0, workers)
+
+
+def _result(net: Network, mode, finish: Optional[np.ndarray], sketch: QuantileSketch, mom: _Moments,
+            seconds: float, workers: int = 1) -> RiskResult:
+    V = len(net)
+    n = max(mom.n, 1)
+    return RiskResult(
+        ids=list(net.ids), finish=finish,
+        deterministic=float(net.forward(np.asarray(mode, dtype=float))[1].max(initial=0.0)),
+        criticality=(mom.crit / n) if mom.crit is not None else np.zeros(V),
+        sensitivity=mom.correlation() if mom.sd is not None else np.zeros(V),
+        mean_duration=(mom.sd / n) if mom.sd is not None else np.asarray(mode, dtype=float),
+        sketch=sketch, seconds=seconds,
+        meta={"iterations": float(mom.n), "workers": float(max(int(workers or 1), 1))})
+
+
+def simulate_frame(tasks_df: pd.DataFrame, iterations: int = 1000, seed: Optional[int] = None,
+                   id_col: str = "task_id", pred_col: str = "predecessor_ids", **options) -> RiskResult:
+    """
+    QSRA for a tasks.csv-style table (task_id, duration_days, three-point
+    estimates, predecessor_ids); `options` go to simulate() (workers, events, ...).
+    """
+    ids = tasks_df[id_col].astype(str).tolist()
+    low, mode, high = three_point(tasks_df)
+    links = links_from_predecessors(ids, tasks_df[pred_col].tolist()) if pred_col in tasks_df.columns else []
+    return simulate(compile_network(ids, mode, links), low, mode, high, iterations, seed, **options)
+
+
+def events_from_risks(risks_df: pd.DataFrame) -> List[RiskEvent]:
+    """RiskEvents from a risks.csv with task_id, probability (0-1) and impact_days columns."""
+    if risks_df is None or risks_df.empty or not {"task_id", "probability", "impact_days"}.issubset(risks_df.columns):
+        return []
+    df = risks_df.copy()
+    if "status" in df.columns:
+        df = df[~df["status"].astype(str).str.lower().isin(("closed", "retired"))]
+    p = pd.to_numeric(df["probability"], errors="coerce")
+    imp = pd.to_numeric(df["impact_days"], errors="coerce")
+    ok = p.notna() & imp.notna() & df["task_id"].notna()
+    return [RiskEvent(str(t), float(pp), float(ii)) for t, pp, ii in zip(df["task_id"][ok], p[ok], imp[ok])]
+
@@ -5,6 +5,30 @@ from fpdf import FPDF
 from firebase_db import save_project, load_project_data
 import matplotlib.pyplot as plt
 
+try:
+    from modules.flash_engine import DEFAULT_GAS, flash, known_components, reservoir_composition
+except ImportError:
+    from flash_engine import DEFAULT_GAS, flash, known_components, reservoir_composition  # type: ignore
+
+
+def _flash_gas_fraction(T):
+    """Gas wt% of the feed from a PT flash of the Reservoir_Profiles (or default) composition."""
+    z = reservoir_composition("oil") or reservoir_composition("gas") or dict(DEFAULT_GAS)
+    c1, c2 = st.columns(2)
+    P = c1.number_input(T.get("sep_pressure", "Separator Pressure (bar)"), min_value=0.1, value=20.0)
+    T_C = c2.number_input(T.get("sep_temperature", "Separator Temperature (°C)"), value=40.0)
+    edited = st.data_editor(pd.DataFrame({"component": list(z), "z": list(z.values())}),
+                            key="separator_flash_z", num_rows="dynamic")
+    z = {str(r.component): float(r.z) for r in edited.itertuples() if r.component and r.z and r.z > 0}
+    unknown = [c for c in z if not known_components([c])]
+    if not z or unknown:
+        st.warning(f"No flash data for: {', '.join(unknown) or 'empty composition'}; using the slider.")
+        return None
+    res = flash(P, T_C, z)
+    gas_wt = float(res.vapor_mass_fraction()[0]) * 100.0
+    st.caption(f"Flash: {res.phase[0]}, vapour fraction {res.beta[0]:.3f} mol/mol, {gas_wt:.1f} wt%")
+    return gas_wt
+
 def run(T):
     title = T.get("separator_sim_title", "Separator Simulation Tool")
     st.header(title)
@@ -13,7 +37,11 @@ def run(T):
     st.subheader(T.get("feed_conditions", "Feed Stream Conditions"))
 
     total_feed = st.number_input(T.get("total_feed", "Total Feed Flowrate (kg/h)"), min_value=1.0, value=10000.0)
-    gas_frac = st.slider(T.get("gas_fraction", "Gas Fraction (wt%)"), 0.0, 100.0, 40.0)
+    gas_frac = None
+    if st.checkbox(T.get("gas_frac_from_flash", "Gas fraction from composition (flash)"), value=False):
+        gas_frac = _flash_gas_fraction(T)
+    if gas_frac is None:
+        gas_frac = st.slider(T.get("gas_fraction", "Gas Fraction (wt%)"), 0.0, 100.0, 40.0)
     liq_frac = 100.0 - gas_frac
 
     st.subheader(T.get("split_efficiency", "Separation Efficiency (ideal = 100%)"))
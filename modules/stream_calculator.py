@@ -4,6 +4,11 @@ import io
 from fpdf import FPDF
 from firebase_db import save_project, load_project_data
 
+try:
+    from modules.flash_engine import DEFAULT_GAS, flash, known_components, reservoir_composition
+except ImportError:
+    from flash_engine import DEFAULT_GAS, flash, known_components, reservoir_composition  # type: ignore
+
 def run(T):
     title = T.get("stream_calc_title", "Stream Property Calculator")
     st.header(title)
@@ -13,10 +18,29 @@ def run(T):
 
     fluid_name = st.text_input(T.get("fluid_name", "Fluid Name"), value="Natural Gas")
     flowrate = st.number_input(T.get("flowrate_input", "Volumetric Flowrate (m³/h)"), min_value=0.0, value=1000.0)
-    density = st.number_input(T.get("density_input", "Density (kg/m³)"), min_value=0.0, value=0.8)
     temperature = st.number_input(T.get("temperature", "Temperature (°C)"), value=25.0)
     pressure = st.number_input(T.get("pressure", "Pressure (bar)"), value=10.0)
 
+    density, phase = None, None
+    if st.checkbox(T.get("density_from_flash", "Density from composition (flash, ideal gas)"), value=False):
+        z = reservoir_composition("gas") or dict(DEFAULT_GAS)
+        st.caption(", ".join(f"{c} {v:.3f}" for c, v in z.items()))
+        if known_components(z) and pressure > 0:
+            res = flash(pressure, temperature, z)
+            phase = str(res.phase[0])
+            mw = float(res.molar_masses()[0][0])
+            st.caption(f"Phase: {phase}, vapour fraction {res.beta[0]:.3f}, MW {mw:.2f} g/mol")
+            if phase == "vapor":
+                density = float(res.vapor_density()[0])
+            else:
+                st.warning(T.get("flash_not_vapor", "Stream is not all vapour at these conditions; enter the density."))
+        else:
+            st.warning(T.get("flash_no_data", "Composition has components without flash data."))
+    if density is None:
+        density = st.number_input(T.get("density_input", "Density (kg/m³)"), min_value=0.0, value=0.8)
+    else:
+        st.metric(T.get("density_input", "Density (kg/m³)"), f"{density:.3f}")
+
     if st.button(T.get("calculate", "Calculate")):
         mass_flow_kg_hr = flowrate * density
         mass_flow_kg_s = mass_flow_kg_hr / 3600
@@ -32,6 +56,8 @@ def run(T):
             "Temperature (°C)": temperature,
             "Pressure (bar)": pressure
         }
+        if phase is not None:
+            result["Phase (flash)"] = phase
 
         df = pd.DataFrame(list(result.items()), columns=["Property", "Value"])
         st.subheader(T.get("calculated_properties", "Calculated Properties"))
@@ -1,9 +1,8 @@
 import streamlit as st
 import io
-import math
 import numpy as np
 import pandas as pd
-from datetime import datetime, date
+from datetime import date
 from typing import List, Dict, Tuple
 from modules._common import SUBSURFACE_DELIV_BY_STAGE as DELIV_BY_STAGE
 from modules._common import _ensure_deliverable, _mark_deliverable, _set_artifact_status
@@ -32,6 +31,22 @@ except Exception:
         _ensure_deliverable, _mark_deliverable, _set_artifact_status,
     )
 
+# Array-based forecasting engine (see modules/forecast_engine.py)
+try:
+    from modules.forecast_engine import (
+        ForecastScenario, RATE_COLUMNS, simulate_batch, summarize_sweep, sweep_grid, to_date,
+    )
+except ImportError:
+    from forecast_engine import (  # type: ignore
+        ForecastScenario, RATE_COLUMNS, simulate_batch, summarize_sweep, sweep_grid, to_date,
+    )
+
+# Vectorised Arps fitting, single well and batched (see modules/decline_fit.py)
+try:
+    from modules.decline_fit import fit_arps, fit_arps_long
+except ImportError:
+    from decline_fit import fit_arps, fit_arps_long  # type: ignore
+
 ARTIFACT = "Reservoir_Profiles"
 # --- Composition helpers (add near other imports) ---
 DEFAULT_GAS = [
@@ -88,20 +103,6 @@ def _z_sum_ok(df: pd.DataFrame, tol: float = 1e-3) -> bool:
         return False
 
 
-# ---------- Small utils ----------
-def _to_date(x) -> date:
-    if isinstance(x, (datetime, date)):
-        return x.date() if isinstance(x, datetime) else x
-    for fmt in ("%Y-%m-%d", "%Y-%m"):
-        try:
-            return datetime.strptime(str(x), fmt).date()
-        except Exception:
-            pass
-    return None
-
-def _months_between(a: date, b: date) -> int:
-    return (b.year - a.year) * 12 + (b.month - a.month)
-
 def _ensure_datetime_index(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
     if "date" not in df.columns:
@@ -115,60 +116,6 @@ def _ensure_datetime_index(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-# ---------- Arps decline ----------
-def arps_rate(qi: float, Di: float, b: float, t_years: np.ndarray) -> np.ndarray:
-    if abs(b) < 1e-6:
-        return qi * np.exp(-Di * t_years)
-    return qi / np.power(1.0 + b * Di * t_years, 1.0 / b)
-
-def _fit_exp(dates: List[date], q: np.ndarray) -> Tuple[float, float]:
-    mask = q > 0
-    if mask.sum() < 3:
-        return float(q[mask][0] if mask.any() else 1000.0), 0.8
-    q = q[mask]
-    dts = np.array([dates[i] for i, m in enumerate(mask) if m])
-    t0 = dts[0]
-    t_years = np.array([(_months_between(t0, d) / 12.0) for d in dts], dtype=float)
-    lnq = np.log(q)
-    A = np.vstack([np.ones_like(t_years), -t_years]).T
-    x, *_ = np.linalg.lstsq(A, lnq, rcond=None)
-    qi = float(np.exp(x[0])); Di = float(x[1])
-    return qi, Di
-
-def fit_arps(dates: List[date], q: np.ndarray, prefer_hyperbolic: bool = True) -> Tuple[float, float, float]:
-    qi_exp, Di_exp = _fit_exp(dates, q)
-    best_qi, best_Di, best_b = qi_exp, Di_exp, 0.0
-    # compute exp fit error in log domain
-    mask = q > 0
-    if mask.sum() < 3:
-        return best_qi, best_Di, best_b
-    q_ = q[mask]
-    dts = np.array([dates[i] for i, m in enumerate(mask) if m])
-    t0 = dts[0]
-    t_years = np.array([(_months_between(t0, d) / 12.0) for d in dts], dtype=float)
-    lnq = np.log(q_)
-    base_err = float(((lnq - (math.log(qi_exp) - Di_exp * t_years)) ** 2).mean())
-    best_err = base_err
-
-    if not prefer_hyperbolic:
-        return best_qi, best_Di, best_b
-
-    for b in np.linspace(0.1, 1.0, 10):
-        # try small grids around Di and qi
-        for Di in Di_exp * np.array([0.5, 0.75, 1.0, 1.25, 1.5]):
-            f = arps_rate(qi_exp, max(1e-6, Di), b, t_years)
-            err = float(((np.log(q_) - np.log(np.maximum(f, 1e-9))) ** 2).mean())
-            if err < best_err:
-                best_qi, best_Di, best_b, best_err = qi_exp, float(Di), float(b), err
-        for qi in qi_exp * np.array([0.5, 0.75, 1.0, 1.25, 1.5]):
-            f = arps_rate(max(1e-6, qi), Di_exp, b, t_years)
-            err = float(((np.log(q_) - np.log(np.maximum(f, 1e-9))) ** 2).mean())
-            if err < best_err:
-                best_qi, best_Di, best_b, best_err = float(qi), Di_exp, float(b), err
-
-    return best_qi, best_Di, best_b
-
-
 # ---------- Scenario engine ----------
 def simulate_scenarios(
     start_date: date,
@@ -182,81 +129,10 @@ def simulate_scenarios(
     gor_model: Dict[str, float] | None,
 ) -> pd.DataFrame:
     """Monthly profile with columns: oil_rate, gas_rate, water_rate, cum_oil, cum_gas, cum_water."""
-    qi_o, Di_o, b_o = oil_fit
-    qi_g, Di_g, b_g = gas_fit
-
-    idx = pd.date_range(start=start_date, periods=months, freq="MS")
-    t_years = np.arange(months, dtype=float) / 12.0
-
-    def D_eff(D, inj: dict, i: int) -> float:
-        if not inj:
-            return D
-        i0 = max(0, _months_between(start_date, inj.get("start") or start_date))
-        support = float(inj.get("support", 0.0))
-        return D * (max(0.1, 1.0 - support) if i >= i0 else 1.0)
-
-    oil = np.zeros(months)
-    gas = np.zeros(months)
-
-    # base streams
-    for i in range(months):
-        Do = D_eff(Di_o, inj_rules.get("oil") or inj_rules.get("gas"), i)
-        Dg = D_eff(Di_g, inj_rules.get("gas"), i)
-        oil[i] = arps_rate(qi_o, Do, b_o, np.array([t_years[i]])).item()
-        gas[i] = arps_rate(qi_g, Dg, b_g, np.array([t_years[i]])).item()
-
-    # new wells (clone oil decline with qi_factor)
-    if new_wells:
-        for w in new_wells:
-            sdt = _to_date(w.get("start"))
-            if not sdt:
-                continue
-            i0 = max(0, _months_between(start_date, sdt))
-            qi_fac = float(w.get("qi_factor", 1.0))
-            for i in range(i0, months):
-                Do = D_eff(Di_o, inj_rules.get("oil") or inj_rules.get("gas"), i)
-                t = (i - i0) / 12.0
-                oil[i] += arps_rate(qi_o * qi_fac, Do, b_o, np.array([t])).item()
-
-    # WOR model overrides watercut if provided
-    if wor_model:
-        # WOR = a + b * Np   => wc = WOR/(1+WOR)
-        factor = 30.437  # days/month
-        cum_oil = np.cumsum(oil * factor)
-        WOR = wor_model["a"] + wor_model["b"] * cum_oil
-        wc = np.clip(WOR / (1.0 + np.maximum(WOR, 1e-9)), 0.0, 0.98)
-    else:
-        wc = np.clip(base_wc + np.linspace(0, 0.2, months), 0.0, 0.98)
-        if inj_rules.get("water"):
-            i0 = max(0, _months_between(start_date, inj_rules["water"].get("start") or start_date))
-            for i in range(i0, months):
-                wc[i] = wc[i0] + (wc[i] - wc[i0]) * (1.0 - float(inj_rules["water"].get("support", 0.2)))
-
-    water = oil * wc
-    oil_eff = np.maximum(0.0, oil - water)
-
-    # GOR model can override gas
-    if gor_model:
-        GOR = gor_model["a"] + gor_model["b"] * np.arange(months)  # simple time trend
-        gas = np.maximum(0.0, oil_eff * np.maximum(GOR, 0.0))
-
-    # Cum (assume daily rates → monthly volume)
-    factor = 30.437
-    cum_oil = np.cumsum(oil_eff * factor)
-    cum_gas = np.cumsum(gas * factor)
-    cum_water = np.cumsum(water * factor)
-
-    return pd.DataFrame(
-        {
-            "date": idx,
-            "oil_rate": oil_eff,
-            "gas_rate": gas,
-            "water_rate": water,
-            "cum_oil": cum_oil,
-            "cum_gas": cum_gas,
-            "cum_water": cum_water,
-        }
-    )
+    sc = ForecastScenario(base_wc=base_wc, inj_rules=inj_rules, new_wells=new_wells,
+                          wor_model=wor_model, gor_model=gor_model)
+    df = simulate_batch(start_date, months, oil_fit, gas_fit, [sc])
+    return df[["date"] + RATE_COLUMNS].reset_index(drop=True)
 
 
 # ---------- UI / Controller ----------
@@ -323,7 +199,7 @@ def run(stage: str):
     with cB:
         base_wc = st.slider("Base watercut fraction", 0.0, 0.95, 0.1, 0.01)
     with cC:
-        prefer_hyp = st.checkbox("Try hyperbolic (b∈[0.1..1])", True)
+        prefer_hyp = st.checkbox("Try hyperbolic (b∈(0..1])", True)
     with cD:
         smooth = st.checkbox("Smooth history (3-point)", True)
 
@@ -407,13 +283,30 @@ def run(stage: str):
     with c5: st.metric("Gas Di (1/yr)", f"{gas_fit[1]:.3f}")
     with c6: st.metric("Gas b", f"{gas_fit[2]:.2f}")
 
+    # Multi-well fitting (long format: one row per well and month)
+    with st.expander("Fit many wells (long-format CSV: well, date, rate)"):
+        fw = st.file_uploader("Well history CSV", type=["csv"], key="sub_multiwell_csv")
+        if fw:
+            try:
+                wells_hist = pd.read_csv(io.BytesIO(fw.read()))
+                rate_cols = [c for c in wells_hist.columns if c not in ("well", "date")]
+                rate_col = st.selectbox("Rate column", rate_cols, key="sub_multiwell_rate") if rate_cols else "oil_rate"
+                well_fits = fit_arps_long(wells_hist, well_col="well", date_col="date",
+                                          rate_col=rate_col, prefer_hyperbolic=prefer_hyp)
+                st.caption(f"Fitted {len(well_fits)} wells.")
+                st.dataframe(well_fits, use_container_width=True)
+                st.download_button("Download well fits (CSV)", data=well_fits.to_csv(index=False).encode("utf-8"),
+                                   file_name="arps_well_fits.csv", mime="text/csv")
+            except Exception as ex:
+                st.error(f"Multi-well fit failed: {ex}")
+
     # Build models
     inj_rules = {}
     if gas_inj:
-        inj_rules["gas"] = {"start": _to_date(g_start) or date.today(), "support": g_support}
-        inj_rules["oil"] = {"start": _to_date(g_start) or date.today(), "support": g_support * 0.8}
+        inj_rules["gas"] = {"start": to_date(g_start) or date.today(), "support": g_support}
+        inj_rules["oil"] = {"start": to_date(g_start) or date.today(), "support": g_support * 0.8}
     if water_inj:
-        inj_rules["water"] = {"start": _to_date(w_start) or date.today(), "support": w_support}
+        inj_rules["water"] = {"start": to_date(w_start) or date.today(), "support": w_support}
 
     new_wells = []
     if isinstance(wells_df, pd.DataFrame) and not wells_df.empty:
@@ -477,6 +370,47 @@ def run(stage: str):
     with cD2: st.metric("Oil reaches RF", str(dep_date_o) if dep_date_o else "—")
     with cD3: st.metric("Gas reaches RF", str(dep_date_g) if dep_date_g else "—")
 
+    # Scenario sweep (gas support × water support × new-well count, one batch run)
+    with st.expander("Scenario sweep (drilling / injection cases)"):
+        sw1, sw2, sw3 = st.columns(3)
+        with sw1:
+            sweep_gas = st.text_input("Gas support values", "0, 0.15, 0.3, 0.45")
+        with sw2:
+            sweep_wat = st.text_input("Water support values", "0, 0.2, 0.4")
+        with sw3:
+            sweep_wells = st.text_input("New-well counts", "0, 2, 4, 6, 8")
+        sw4, sw5, sw6 = st.columns(3)
+        with sw4:
+            sweep_start = st.text_input("First new well (YYYY-MM)", str(start_date)[:7])
+        with sw5:
+            sweep_spacing = st.number_input("Months between wells", 1, 24, 3)
+        with sw6:
+            sweep_qf = st.number_input("New-well qi factor", 0.0, 5.0, 1.0, 0.05)
+        if st.button("Run sweep"):
+            try:
+                gas_vals = [float(v) for v in sweep_gas.split(",") if v.strip()]
+                wat_vals = [float(v) for v in sweep_wat.split(",") if v.strip()]
+                well_vals = [int(v) for v in sweep_wells.split(",") if v.strip()]
+            except ValueError as ex:
+                st.error(f"Could not parse sweep values: {ex}")
+            else:
+                cases = sweep_grid(
+                    gas_supports=gas_vals or [0.0], water_supports=wat_vals or [0.0],
+                    well_counts=well_vals or [0], well_start=sweep_start,
+                    well_spacing_months=int(sweep_spacing), qi_factor=float(sweep_qf),
+                    gas_start=g_start, water_start=w_start, base_wc=base_wc,
+                    wor_model=wor_model, gor_model=gor_model,
+                )
+                sweep_df = simulate_batch(start_date, months, oil_fit, gas_fit, cases)
+                st.session_state["subsurface_sweep"] = summarize_sweep(sweep_df)
+                st.session_state["subsurface_sweep_csv"] = sweep_df.to_csv(index=False).encode("utf-8")
+        if "subsurface_sweep" in st.session_state:
+            summary = st.session_state["subsurface_sweep"]
+            st.caption(f"{len(summary)} scenarios, {months} months each.")
+            st.dataframe(summary.sort_values("cum_oil", ascending=False), use_container_width=True)
+            st.download_button("Download sweep profiles (CSV)", data=st.session_state["subsurface_sweep_csv"],
+                               file_name="reservoir_sweep.csv", mime="text/csv")
+
     # Exports
     st.markdown("#### Export")
     # CSV
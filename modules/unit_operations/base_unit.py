@@ -1,7 +1,20 @@
+import copy
+from typing import Dict, List
+
+import numpy as np
+
+from modules.unit_operations.stream_batch import StreamBatch, StreamDict
+
+STREAM_KEYS = ("flowrate", "pressure", "temperature", "composition")
+
+
 class BaseUnit:
+    n_inlets = 1     # Mixer accepts any number (None)
+    n_outlets = 1
+
     def __init__(self, name):
         self.name = name
-        self.inputs = {
+        self.inputs: StreamDict = {
     "flowrate": 1000,
     "pressure": 5,
     "temperature": 25,
@@ -12,6 +25,45 @@ class BaseUnit:
 }
 
         self.outputs = {}
+        self.inlets = None   # stream names feeding this unit; None = its own inputs (feed)
+
+    def evaluate(self, inlets: List[StreamBatch]) -> List[StreamBatch]:
+        """Vectorised unit model: inlet batches -> one batch per outlet (same number of cases)."""
+        raise NotImplementedError("Subclasses must implement the evaluate method.")
+
+    def summary(self, inlets: List[StreamBatch], outlets: List[StreamBatch]) -> Dict[str, np.ndarray]:
+        """Per-case results other than streams (duty, etc.); reported in outputs."""
+        return {}
+
+    def params(self):
+        """Settings other than the inlet stream (split ratio, etc.); part of the flowsheet cache key."""
+        return {k: v for k, v in vars(self).items() if k not in ("name", "inputs", "outputs", "inlets")}
+
+    def feed(self) -> StreamDict:
+        """The unit's own inputs as a stream, used when no inlet is connected."""
+        return {k: copy.deepcopy(self.inputs[k]) for k in STREAM_KEYS if k in self.inputs}
+
+    def _inlet_batches(self) -> List[StreamBatch]:
+        return [StreamBatch.from_dicts([self.feed()])]
+
+    def _apply(self, batches: List[StreamBatch]) -> List[StreamDict]:
+        outlets = self.evaluate(batches)
+        streams = [b.to_dicts()[0] for b in outlets]
+        extra = {k: float(np.asarray(v).reshape(-1)[0]) for k, v in self.summary(batches, outlets).items()}
+        if self.n_outlets == 1:
+            self.outputs = dict(copy.deepcopy(streams[0]), **extra)
+        else:
+            self.outputs = {f"Outlet{k + 1}": copy.deepcopy(s) for k, s in enumerate(streams)}
+            self.outputs.update(extra)
+        return streams
 
     def calculate(self):
-        raise NotImplementedError("Subclasses must implement the calculate method.")
+        """Single case from self.inputs (dict form); fills self.outputs."""
+        self._apply(self._inlet_batches())
+
+    def solve(self, inlets: List[StreamDict]) -> List[StreamDict]:
+        """Run the unit on inlet stream dicts; returns one stream dict per outlet."""
+        if not inlets:
+            return self._apply(self._inlet_batches())
+        self.inputs.update(copy.deepcopy(inlets[0]))
+        return self._apply([StreamBatch.from_dicts([s]) for s in inlets])
@@ -0,0 +1,220 @@
+"""
+Flowsheet solver for the Process Flow Simulation page.
+
+Units are connected by named streams: outlet k of unit U is "U.outK" and a
+unit without connected inlets reads its own inputs as the feed "U.feed".
+
+- the unit graph is split into strongly connected components (Tarjan); the
+  components are solved in topological order
+- a component with a cycle is a recycle loop: back edges (w.r.t. the unit
+  list order) are torn and the tear streams are converged with Wegstein
+  acceleration (or plain successive substitution)
+- every unit result is cached by (type, params, inlet streams); unchanged
+  upstream units are cache hits, so editing one unit recomputes only the
+  units whose inlets actually change
+
+    fs = Flowsheet()
+    res = fs.solve(units)            # units: list of BaseUnit with .inlets set
+    res.streams["Sep1.out1"], res.recycles, res.stats
+"""
+import copy
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+
+
+METHODS = ("wegstein", "substitution")
+
+
+def outlet_names(unit) -> List[str]:
+    return [f"{unit.name}.out{k + 1}" for k in range(unit.n_outlets)]
+
+
+def feed_name(unit) -> str:
+    return f"{unit.name}.feed"
+
+
+@dataclass
+class FlowsheetResult:
+    streams: Dict[str, dict]
+    order: List[str]                                  # unit names in solve order
+    recycles: List[dict] = field(default_factory=list)  # per loop: units, tears, iterations, converged, error
+    warnings: List[str] = field(default_factory=list)
+    stats: Dict[str, int] = field(default_factory=dict)
+
+
+def _key(unit, inlets: List[dict]) -> str:
+    raw = json.dumps([type(unit).__name__, unit.params(), inlets], sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _to_vec(stream: dict, comps: List[str]) -> np.ndarray:
+    z = stream.get("composition") or {}
+    return np.array([float(stream.get("flowrate", 0.0)), float(stream.get("pressure", 0.0)),
+                     float(stream.get("temperature", 0.0))] + [float(z.get(c, 0.0)) for c in comps])
+
+
+def _from_vec(v: np.ndarray, comps: List[str]) -> dict:
+    return {"flowrate": float(v[0]), "pressure": float(v[1]), "temperature": float(v[2]),
+            "composition": {c: float(x) for c, x in zip(comps, v[3:])}}
+
+
+def _sccs(names: List[str], edges: Dict[str, List[str]]) -> List[List[str]]:
+    """Tarjan's SCCs, returned in topological order of the condensed graph."""
+    index, low, on_stack, stack, out = {}, {}, set(), [], []
+    counter = [0]
+
+    def visit(v):
+        index[v] = low[v] = counter[0]
+        counter[0] += 1
+        stack.append(v)
+        on_stack.add(v)
+        for w in edges.get(v, ()):
+            if w not in index:
+                visit(w)
+                low[v] = min(low[v], low[w])
+            elif w in on_stack:
+                low[v] = min(low[v], index[w])
+        if low[v] == index[v]:
+            comp = []
+            while True:
+                w = stack.pop()
+                on_stack.discard(w)
+                comp.append(w)
+                if w == v:
+                    break
+            out.append(comp)
+
+    for v in names:
+        if v not in index:
+            visit(v)
+    return out[::-1]
+
+
+class Flowsheet:
+    def __init__(self, method: str = "wegstein", tol: float = 1e-6, max_iter: int = 100,
+                 cache_size: int = 512):
+        if method not in METHODS:
+            raise ValueError(f"Unknown recycle method '{method}' (expected one of {METHODS})")
+        self.method = method
+        self.tol = float(tol)
+        self.max_iter = int(max_iter)
+        self.cache_size = int(cache_size)
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._last_streams: Dict[str, dict] = {}
+        self._tear_guess: Dict[str, dict] = {}   # tear values fed in the last converged pass
+
+    # ---- single unit (cached) ----
+    def _run(self, unit, inlets: List[dict], stats: Dict[str, int]) -> List[dict]:
+        key = _key(unit, inlets)
+        hit = self._cache.get(key)
+        if hit is not None:
+            self._cache.move_to_end(key)
+            stats["cached"] += 1
+            outlets, outputs, inputs = hit
+            unit.outputs, unit.inputs = copy.deepcopy(outputs), copy.deepcopy(inputs)
+            return copy.deepcopy(outlets)
+        stats["computed"] += 1
+        outlets = unit.solve(copy.deepcopy(inlets))
+        self._cache[key] = (copy.deepcopy(outlets), copy.deepcopy(unit.outputs), copy.deepcopy(unit.inputs))
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return outlets
+
+    def _inlets(self, unit, names: List[str], streams: Dict[str, dict]) -> List[dict]:
+        if not names:
+            return [streams[feed_name(unit)]]
+        return [streams[s] for s in names if s in streams]
+
+    def _guess(self, name: str, consumer) -> dict:
+        prev = self._tear_guess.get(name) or self._last_streams.get(name)
+        if prev is not None:
+            return copy.deepcopy(prev)
+        feed = consumer.feed()
+        feed["flowrate"] = 0.0
+        return feed
+
+    # ---- whole flowsheet ----
+    def solve(self, units) -> FlowsheetResult:
+        units = list(units)
+        by_name = {u.name: u for u in units}
+        pos = {u.name: i for i, u in enumerate(units)}
+        producer = {s: u.name for u in units for s in outlet_names(u)}
+        stats = {"computed": 0, "cached": 0}
+        warnings: List[str] = []
+
+        streams: Dict[str, dict] = {}
+        edges: Dict[str, List[str]] = {u.name: [] for u in units}
+        inlets: Dict[str, List[str]] = {}    # connected inlets per unit; the units themselves are left as set
+        for u in units:
+            streams[feed_name(u)] = u.feed()
+            inlets[u.name] = []
+            for s in u.inlets or []:
+                if s not in producer:
+                    warnings.append(f"{u.name}: inlet '{s}' is not produced by any unit; using its own inputs.")
+                    continue
+                inlets[u.name].append(s)
+                edges[producer[s]].append(u.name)
+
+        order: List[str] = []
+        recycles: List[dict] = []
+        for comp in _sccs([u.name for u in units], edges):
+            members = sorted(comp, key=pos.get)
+            cyclic = len(members) > 1 or members[0] in edges[members[0]]
+            if not cyclic:
+                u = by_name[members[0]]
+                for s, out in zip(outlet_names(u), self._run(u, self._inlets(u, inlets[u.name], streams), stats)):
+                    streams[s] = out
+                order.append(u.name)
+                continue
+            recycles.append(self._converge([by_name[m] for m in members], inlets, pos, producer, streams, stats))
+            order.extend(members)
+
+        self._last_streams = {k: v for k, v in streams.items() if not k.endswith(".feed")}
+        return FlowsheetResult(streams=streams, order=order, recycles=recycles, warnings=warnings, stats=stats)
+
+    def _converge(self, members, inlets, pos, producer, streams, stats) -> dict:
+        names = {m.name for m in members}
+        # back edges within the loop (producer not earlier than consumer) are torn
+        tears = sorted({s for m in members for s in inlets[m.name]
+                        if producer.get(s) in names and pos[producer[s]] >= pos[m.name]})
+        consumer = {s: m for m in members for s in inlets[m.name]}
+        x_streams = {s: self._guess(s, consumer[s]) for s in tears}
+
+        x_prev = g_prev = None
+        err, it, converged = float("inf"), 0, False
+        for it in range(1, self.max_iter + 1):
+            fed = copy.deepcopy(x_streams)
+            streams.update(copy.deepcopy(fed))
+            g_streams: Dict[str, dict] = {}
+            for m in members:
+                for s, out in zip(outlet_names(m), self._run(m, self._inlets(m, inlets[m.name], streams), stats)):
+                    (g_streams if s in x_streams else streams)[s] = out
+            comps = sorted({c for d in (x_streams, g_streams) for st in d.values() for c in (st.get("composition") or {})})
+            x = np.concatenate([_to_vec(x_streams[s], comps) for s in tears])
+            g = np.concatenate([_to_vec(g_streams[s], comps) for s in tears])
+            err = float(np.max(np.abs(g - x) / np.maximum(np.abs(x), 1.0))) if x.size else 0.0
+            if err <= self.tol:
+                converged = True
+                x_new = g
+            elif self.method == "wegstein" and x_prev is not None and x_prev.shape == x.shape:
+                dx, dg = x - x_prev, g - g_prev
+                s_ = np.where(np.abs(dx) > 1e-12, dg / np.where(np.abs(dx) > 1e-12, dx, 1.0), 0.0)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    q = np.clip(np.nan_to_num(s_ / (s_ - 1.0), nan=0.0, posinf=0.0, neginf=-5.0), -5.0, 0.0)
+                x_new = q * x + (1.0 - q) * g
+            else:
+                x_new = g
+            x_prev, g_prev = x, g
+            n = 3 + len(comps)
+            x_streams = {s: _from_vec(x_new[i * n:(i + 1) * n], comps) for i, s in enumerate(tears)}
+            if converged:
+                self._tear_guess.update(fed)
+                break
+        streams.update(x_streams)
+        return {"units": [m.name for m in members], "tears": tears, "iterations": it,
+                "converged": converged, "error": err}
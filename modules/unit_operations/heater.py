@@ -0,0 +1,25 @@
+import numpy as np
+
+from modules.unit_operations.base_unit import BaseUnit
+
+
+def duty_kw(mass_flow_kg_h, cp_kj_kg_c, t_in_c, t_out_c):
+    """Q = m·Cp·ΔT in kW (positive = heating); works on scalars or arrays."""
+    return np.asarray(mass_flow_kg_h) * cp_kj_kg_c * (np.asarray(t_out_c) - t_in_c) / 3600.0
+
+
+class Heater(BaseUnit):
+    """Heats or cools a stream to outlet_temperature (°C); reports duty."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.outlet_temperature = 75.0
+        self.cp = 4.18  # kJ/kg·°C
+
+    def evaluate(self, inlets):
+        s = inlets[0]
+        return [s.replace(T=np.broadcast_to(np.asarray(self.outlet_temperature, dtype=float), s.T.shape))]
+
+    def summary(self, inlets, outlets):
+        q = duty_kw(inlets[0].flow, self.cp, inlets[0].T, outlets[0].T)
+        return {"duty_kW": q, "heating_MW": np.maximum(q, 0.0) / 1000.0}
@@ -0,0 +1,40 @@
+import numpy as np
+
+from modules.flash_engine import component_props, known_components
+from modules.unit_operations.base_unit import BaseUnit
+from modules.unit_operations.stream_batch import StreamBatch, align
+
+
+class Mixer(BaseUnit):
+    """
+    Combines any number of inlet streams: mass-weighted T, lowest P, and
+    mole-fraction z weighted by molar flow (flow / mixture MW). Composition
+    falls back to mass weighting when a component has no MW data.
+    """
+    n_inlets = None
+
+    def _inlet_batches(self):
+        streams = self.inputs.get("streams")
+        return [StreamBatch.from_dicts([s]) for s in streams] if streams else super()._inlet_batches()
+
+    def evaluate(self, inlets):
+        batches = align(inlets)
+        flows = np.stack([b.flow for b in batches])                       # (k, n)
+        total = flows.sum(axis=0)
+        w = np.where(total > 0, flows / np.where(total > 0, total, 1.0), 1.0 / len(batches))
+        zs = np.stack([b.z for b in batches])                             # (k, n, c)
+        wz = w
+        if known_components(batches[0].components):
+            mw = component_props(batches[0].components)[3]
+            mw_mix = zs @ mw                                              # (k, n)
+            moles = flows / np.where(mw_mix > 0, mw_mix, 1.0)
+            mtot = moles.sum(axis=0)
+            wz = np.where(mtot > 0, moles / np.where(mtot > 0, mtot, 1.0), w)
+        z = np.einsum("kn,knc->nc", wz, zs)
+        return [StreamBatch(components=batches[0].components, flow=total,
+                            P=np.min(np.stack([b.P for b in batches]), axis=0),
+                            T=(w * np.stack([b.T for b in batches])).sum(axis=0), z=z)]
+
+    def solve(self, inlets):
+        self.inputs["streams"] = [dict(s) for s in inlets] if inlets else None
+        return super().solve(inlets)
@@ -1,15 +1,11 @@
 from modules.unit_operations.base_unit import BaseUnit
 
 class Pipe(BaseUnit):
-    def calculate(self):
-        # Simulates pressure drop through a pipe (simplified)
-        flow = self.inputs["flowrate"]
-        pressure = self.inputs["pressure"]
-        temp = self.inputs["temperature"]
+    def __init__(self, name):
+        super().__init__(name)
+        self.drop_per_flow = 0.01 / 100  # bar per kg/h (simplified rule)
 
-        drop = 0.01 * flow / 100  # Pressure drop: simplified rule
-        self.outputs["flowrate"] = flow
-        self.outputs["pressure"] = pressure - drop
-        self.outputs["temperature"] = temp
-        self.outputs["composition"] = self.inputs["composition"]
-        self.outputs["composition"] = self.inputs["composition"]
+    def evaluate(self, inlets):
+        # Simulates pressure drop through a pipe (simplified)
+        s = inlets[0]
+        return [s.replace(P=s.P - self.drop_per_flow * s.flow)]
@@ -1,10 +1,11 @@
 from .base_unit import BaseUnit
 
+
 class Pump(BaseUnit):
-    def calculate(self):
-        self.outputs["flowrate"] = self.inputs["flowrate"]
-        self.outputs["temperature"] = self.inputs["temperature"]
-        self.outputs["pressure"] = self.inputs["pressure"] + 5  # Adds 5 bar
-        self.outputs["composition"] = self.inputs["composition"]
-        self.outputs["composition"] = self.inputs["composition"]
+    def __init__(self, name):
+        super().__init__(name)
+        self.dp_bar = 5.0  # pressure rise
 
+    def evaluate(self, inlets):
+        s = inlets[0]
+        return [s.replace(P=s.P + self.dp_bar)]
@@ -1,31 +1,33 @@
-from modules.unit_operations.base_unit import BaseUnit
+import numpy as np
+
+from modules.flash_engine import flash, known_components
+from modules.unit_operations.splitter import Splitter
+
+
+class Separator(Splitter):
+    """
+    Two-phase separator: Outlet1 vapour, Outlet2 liquid from a PT flash of the
+    inlet (Wilson K, Rachford–Rice). Falls back to the split ratio when flash
+    is off or a component has no flash data.
+    """
 
-class Separator(BaseUnit):
     def __init__(self, name):
         super().__init__(name)
-        self.split_ratio = 0.5  # default 50% flow to each outlet
+        self.use_flash = True
 
-    def calculate(self):
-        flow_in = self.inputs["flowrate"]
-        pressure = self.inputs["pressure"]
-        temperature = self.inputs["temperature"]
-        composition = self.inputs["composition"]
+    def _flashes(self, s) -> bool:
+        return bool(getattr(self, "use_flash", False)) and known_components(s.components)
 
-        # Use a simple split ratio (e.g., gas/liquid separator logic)
-        flow1 = flow_in * self.split_ratio
-        flow2 = flow_in * (1 - self.split_ratio)
+    def evaluate(self, inlets):
+        s = inlets[0]
+        if not self._flashes(s):
+            return super().evaluate(inlets)
+        res = flash(s.P, s.T, s.z, s.components)
+        vmf = res.vapor_mass_fraction()
+        return [s.replace(flow=s.flow * vmf, z=res.y), s.replace(flow=s.flow * (1.0 - vmf), z=res.x)]
 
-        self.outputs = {
-            "Outlet1": {
-                "flowrate": flow1,
-                "pressure": pressure,
-                "temperature": temperature,
-                "composition": composition
-            },
-            "Outlet2": {
-                "flowrate": flow2,
-                "pressure": pressure,
-                "temperature": temperature,
-                "composition": composition
-            }
-        }
+    def summary(self, inlets, outlets):
+        s = inlets[0]
+        if not self._flashes(s):
+            return {}
+        return {"vapor_fraction_wt": outlets[0].flow / np.where(s.flow > 0, s.flow, 1.0)}
@@ -0,0 +1,17 @@
+import numpy as np
+
+from modules.unit_operations.base_unit import BaseUnit
+
+
+class Splitter(BaseUnit):
+    """Splits one stream in two by flow; P, T and composition are unchanged."""
+    n_outlets = 2
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.split_ratio = 0.5  # default 50% flow to each outlet
+
+    def evaluate(self, inlets):
+        s = inlets[0]
+        r = np.asarray(self.split_ratio, dtype=float)
+        return [s.replace(flow=s.flow * r), s.replace(flow=s.flow * (1 - r))]
@@ -0,0 +1,122 @@
+"""
+StreamBatch: n process streams as arrays, shared by all unit operations.
+
+    components  tuple of names, the column order of z
+    flow        (n,) kg/h
+    P           (n,) bar
+    T           (n,) °C
+    z           (n, c) mole fractions
+
+Units evaluate whole batches with array expressions, so a sensitivity study
+over thousands of operating cases is one call per unit:
+
+    cases = StreamBatch.sweep({"flowrate": 1000, "pressure": 20, "temperature": 60,
+                               "composition": {"Methane": 0.9, "Ethane": 0.1}},
+                              flowrate=np.linspace(500, 5000, 10_000))
+    out, = Pump("P1").evaluate([cases])
+
+The legacy dict form ({"flowrate", "pressure", "temperature", "composition"})
+converts with from_dicts() / to_dicts().
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, TypedDict
+
+import numpy as np
+
+
+class StreamDict(TypedDict, total=False):
+    flowrate: float
+    pressure: float
+    temperature: float
+    composition: Dict[str, float]
+
+
+@dataclass
+class StreamBatch:
+    components: Tuple[str, ...]
+    flow: np.ndarray
+    P: np.ndarray
+    T: np.ndarray
+    z: np.ndarray
+
+    def __post_init__(self):
+        self.components = tuple(self.components)
+        self.flow = np.atleast_1d(np.asarray(self.flow, dtype=np.float64))
+        n = len(self.flow)
+        self.P = np.broadcast_to(np.asarray(self.P, dtype=np.float64), (n,)).copy()
+        self.T = np.broadcast_to(np.asarray(self.T, dtype=np.float64), (n,)).copy()
+        self.z = np.broadcast_to(np.asarray(self.z, dtype=np.float64).reshape(-1, len(self.components)),
+                                 (n, len(self.components))).copy()
+
+    def __len__(self) -> int:
+        return len(self.flow)
+
+    def __getitem__(self, idx) -> "StreamBatch":
+        """Subset of cases (int, slice, index array or mask); always a batch."""
+        idx = np.atleast_1d(np.arange(len(self))[idx])
+        return self.replace(flow=self.flow[idx], P=self.P[idx], T=self.T[idx], z=self.z[idx])
+
+    # ---- construction / conversion ----
+    @classmethod
+    def from_dicts(cls, streams: Sequence[StreamDict], components: Optional[Sequence[str]] = None) -> "StreamBatch":
+        if components is None:
+            components = list(dict.fromkeys(c for s in streams for c in (s.get("composition") or {})))
+        idx = {c: i for i, c in enumerate(components)}
+        z = np.zeros((len(streams), len(components)))
+        for k, s in enumerate(streams):
+            for c, v in (s.get("composition") or {}).items():
+                if c in idx:
+                    z[k, idx[c]] = float(v)
+        return cls(components=tuple(components),
+                   flow=np.array([float(s.get("flowrate", 0.0)) for s in streams]),
+                   P=np.array([float(s.get("pressure", 0.0)) for s in streams]),
+                   T=np.array([float(s.get("temperature", 0.0)) for s in streams]),
+                   z=z)
+
+    @classmethod
+    def sweep(cls, base: StreamDict, **cases) -> "StreamBatch":
+        """Broadcast a base stream over case arrays (flowrate=, pressure=, temperature=)."""
+        b = cls.from_dicts([base])
+        n = max([len(np.atleast_1d(v)) for v in cases.values()] or [1])
+        return cls(components=b.components,
+                   flow=np.broadcast_to(cases.get("flowrate", b.flow), (n,)),
+                   P=cases.get("pressure", b.P), T=cases.get("temperature", b.T), z=b.z)
+
+    def to_dicts(self) -> List[StreamDict]:
+        return [
+            {"flowrate": float(f), "pressure": float(p), "temperature": float(t),
+             "composition": {c: float(x) for c, x in zip(self.components, zz)}}
+            for f, p, t, zz in zip(self.flow, self.P, self.T, self.z)
+        ]
+
+    def replace(self, **changes) -> "StreamBatch":
+        fields = {"components": self.components, "flow": self.flow, "P": self.P, "T": self.T, "z": self.z}
+        fields.update(changes)
+        return StreamBatch(**fields)
+
+    def reindex(self, components: Sequence[str]) -> "StreamBatch":
+        """Same streams over another component list (missing components get z = 0)."""
+        if tuple(components) == self.components:
+            return self
+        z = np.zeros((len(self), len(components)))
+        idx = {c: i for i, c in enumerate(self.components)}
+        for j, c in enumerate(components):
+            if c in idx:
+                z[:, j] = self.z[:, idx[c]]
+        return self.replace(components=tuple(components), z=z)
+
+
+def align(batches: Sequence[StreamBatch]) -> List[StreamBatch]:
+    """Reindex batches to their union of components, broadcast to a common length."""
+    comps = tuple(dict.fromkeys(c for b in batches for c in b.components))
+    n = max(len(b) for b in batches)
+    out = []
+    for b in batches:
+        b = b.reindex(comps)
+        if len(b) != n:
+            if len(b) != 1:
+                raise ValueError(f"Cannot combine stream batches of length {len(b)} and {n}")
+            b = b.replace(flow=np.repeat(b.flow, n))
+        out.append(b)
+    return out
+
@@ -1,4 +1,10 @@
 import streamlit as st
+import matplotlib.pyplot as plt
+
+try:
+    from modules.reserves_engine import Uncertain, monte_carlo
+except ImportError:
+    from reserves_engine import Uncertain, monte_carlo
 
 def run(T):
     st.header("🛢️ Volumetric Reserves Estimator")
@@ -20,3 +26,56 @@ def run(T):
         elif fluid_type == "Gas":
             ogip = (43560 * area * net_pay * (porosity / 100) * (saturation / 100)) / fv_factor
             st.success(f"Estimated OGIP: {ogip:,.2f} standard cubic feet (scf)")
+
+    # ----- Probabilistic reserves (P90 / P50 / P10) -----
+    st.markdown("### Probabilistic Reserves (Monte Carlo)")
+    st.caption("Low / most likely / high per input (triangular); area is lognormal peaking at the most likely "
+               "value, with its spread set by low/high as P90/P10.")
+    unit = "stb" if fluid_type == "Oil" else "scf"
+    defaults = {
+        "area": ("Area (acres)", 800.0, 1200.0, 2000.0),
+        "h": ("Net pay (ft)", 20.0, 35.0, 50.0),
+        "phi": ("Porosity (frac)", 0.15, 0.20, 0.25),
+        "sw": ("Water saturation (frac)", 0.20, 0.30, 0.40),
+        "fvf": ("Bo (rb/stb)" if fluid_type == "Oil" else "Bg (rcf/scf)", *((1.10, 1.20, 1.35) if fluid_type == "Oil" else (0.004, 0.005, 0.006))),
+        "rf": ("Recovery factor (frac)", 0.20, 0.30, 0.40),
+    }
+    specs = {}
+    for key, (label, lo, ml, hi) in defaults.items():
+        c1, c2, c3 = st.columns(3)
+        lo = c1.number_input(f"{label} — low", value=lo, format="%.4f", key=f"vr_{fluid_type}_{key}_lo")
+        ml = c2.number_input(f"{label} — most likely", value=ml, format="%.4f", key=f"vr_{fluid_type}_{key}_ml")
+        hi = c3.number_input(f"{label} — high", value=hi, format="%.4f", key=f"vr_{fluid_type}_{key}_hi")
+        specs[key] = Uncertain(lo, ml, hi, "lognormal" if key == "area" and lo > 0 else "triangular")
+    c1, c2 = st.columns(2)
+    n_draws = c1.select_slider("Draws", [10_000, 50_000, 100_000, 250_000, 500_000], 100_000)
+    seed = c2.number_input("Seed", min_value=0, value=42, step=1)
+
+    if st.button("Run Monte Carlo"):
+        try:
+            res = monte_carlo("volumetric", specs, n=int(n_draws), seed=int(seed), fluid=fluid_type)
+        except ValueError as ex:
+            st.error(str(ex))
+            return
+        p = res.percentiles
+        k1, k2, k3, k4 = st.columns(4)
+        k1.metric(f"P90 ({unit})", f"{p['P90']:,.0f}")
+        k2.metric(f"P50 ({unit})", f"{p['P50']:,.0f}")
+        k3.metric(f"P10 ({unit})", f"{p['P10']:,.0f}")
+        k4.metric(f"Mean ({unit})", f"{p['mean']:,.0f}")
+        st.caption(f"{int(n_draws):,} draws in {res.seconds * 1000:.0f} ms")
+
+        fig, (ax_h, ax_t) = plt.subplots(1, 2, figsize=(10, 3.5))
+        ax_h.hist(res.eur, bins=60, color="steelblue")
+        for key, ls in (("P90", "--"), ("P50", "-"), ("P10", "--")):
+            ax_h.axvline(p[key], color="k", linestyle=ls)
+        ax_h.set_xlabel(f"Recoverable ({unit})")
+        tor = res.tornado.iloc[::-1]
+        base = float(tor["base"].iloc[0])
+        ax_t.barh(tor["input"], tor["eur_high"] - base, left=base, color="seagreen")
+        ax_t.barh(tor["input"], tor["eur_low"] - base, left=base, color="indianred")
+        ax_t.axvline(base, color="k")
+        ax_t.set_title("Tornado (P10/P90 swing)")
+        fig.tight_layout()
+        st.pyplot(fig)
+        st.dataframe(res.tornado, use_container_width=True)
@@ -0,0 +1,36 @@
+# scripts/bench_flash_grid.py
+"""
+Batch PT flash (modules/flash_engine.py) timing on a P × T phase grid:
+
+    python scripts/bench_flash_grid.py                # 200 x 200 points
+    python scripts/bench_flash_grid.py --side 1000
+"""
+from __future__ import annotations
+import argparse, os, sys, time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.flash_engine import phase_grid  # noqa: E402
+
+Z = {"N2": 0.01, "CO2": 0.02, "C1": 0.55, "C2": 0.08, "C3": 0.07, "iC4": 0.03, "nC4": 0.04,
+     "iC5": 0.03, "nC5": 0.03, "C6+": 0.06, "C7+": 0.08}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--side", type=int, default=200)
+    args = ap.parse_args(argv)
+
+    n = args.side
+    t0 = time.perf_counter()
+    beta = phase_grid(Z, np.linspace(1.0, 250.0, n), np.linspace(-100.0, 300.0, n))
+    dt = time.perf_counter() - t0
+    print(f"{n * n} flashes in {dt * 1e3:.0f} ms; two-phase share {((beta > 0) & (beta < 1)).mean():.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
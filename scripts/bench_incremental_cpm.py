@@ -0,0 +1,65 @@
+# scripts/bench_incremental_cpm.py
+"""
+Incremental CPM (modules/schedule_incremental.py) against a full compile +
+CPM after every edit of a random network. Exits non-zero if the two ever
+disagree:
+
+    python scripts/bench_incremental_cpm.py                    # 20 000 activities, 200 edits
+    python scripts/bench_incremental_cpm.py --activities 5000 --edits 1000
+"""
+from __future__ import annotations
+import argparse, os, sys, time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.schedule_engine import LINK_TYPES, compile_network  # noqa: E402
+from modules.schedule_incremental import IncrementalCPM  # noqa: E402
+from tests.schedule_fixtures import random_network  # noqa: E402
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--activities", type=int, default=20_000)
+    ap.add_argument("--edits", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=4)
+    args = ap.parse_args(argv)
+
+    n, edits = args.activities, args.edits
+    ids, dur, links = random_network(n, seed=args.seed)
+    eng = IncrementalCPM.from_network(ids, dur, links)
+    rng = np.random.default_rng(args.seed + 1)
+    dur = dur.copy()
+    t_inc = t_full = 0.0
+    worst = 0.0
+    for k in range(edits):
+        i = int(rng.integers(n))
+        t0 = time.perf_counter()
+        if k % 4 == 3:        # a new link between two random activities (always forward, so acyclic)
+            a, b = sorted((i, int(rng.integers(n))))
+            if a == b:
+                continue
+            link = (ids[a], ids[b], str(rng.choice(LINK_TYPES)), float(rng.integers(0, 5)))
+            eng.add_link(*link)
+            links.append(link)
+        else:
+            dur[i] = float(rng.integers(1, 40))
+            eng.set_duration(ids[i], dur[i])
+        inc = eng.result()
+        t1 = time.perf_counter()
+        full = compile_network(ids, dur, links).cpm()
+        t2 = time.perf_counter()
+        t_inc += t1 - t0
+        t_full += t2 - t1
+        worst = max(worst, float(np.max(np.abs(inc.es - full.es))), float(np.max(np.abs(inc.lf - full.lf))),
+                    float(np.max(np.abs(inc.free_float - full.free_float))))
+    print(f"{n} activities, {edits} edits: incremental {t_inc / edits * 1e3:.1f} ms/edit "
+          f"(nodes touched fwd {eng.stats['forward'] / edits:.0f}, bwd {eng.stats['backward'] / edits:.0f}), "
+          f"full compile+CPM {t_full / edits * 1e3:.1f} ms/edit; max |diff| {worst:.1e}")
+    return 0 if worst < 1e-9 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
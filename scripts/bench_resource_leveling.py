@@ -0,0 +1,43 @@
+# scripts/bench_resource_leveling.py
+"""
+Resource leveling (modules/resource_schedule.py) timing: a random network on
+three resources and a Mon-Fri calendar, both schemes, LFT and FLOAT:
+
+    python scripts/bench_resource_leveling.py                      # 10 000 activities
+    python scripts/bench_resource_leveling.py --activities 2000
+"""
+from __future__ import annotations
+import argparse, datetime, os, sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.resource_schedule import SCHEMES, Calendar, level  # noqa: E402
+from modules.schedule_engine import compile_network  # noqa: E402
+from tests.schedule_fixtures import random_demand, random_network  # noqa: E402
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--activities", type=int, default=10_000)
+    ap.add_argument("--seed", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    n = args.activities
+    ids, dur, links = random_network(n, seed=args.seed)
+    net = compile_network(ids, dur, links)
+    demand = random_demand(n, seed=args.seed)
+    cap = np.array([8.0, 10.0, 6.0])
+    cal = Calendar(datetime.date(2026, 1, 5))
+    for scheme in SCHEMES:
+        for rule in ("LFT", "FLOAT"):
+            res = level(net, demand, cap, calendar=cal, rule=rule, scheme=scheme)
+            print(f"{scheme:8s} {rule:5s}: {res.seconds:.2f} s, makespan {res.makespan} working days "
+                  f"(CPM {res.cpm_makespan})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+# scripts/bench_schedule_engine.py
+"""
+CPM engine (modules/schedule_engine.py) timing on a random network: compile,
+forward/backward passes, and the dict-based reference for comparison:
+
+    python scripts/bench_schedule_engine.py                        # 20 000 activities
+    python scripts/bench_schedule_engine.py --activities 100000
+"""
+from __future__ import annotations
+import argparse, os, sys, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.schedule_engine import compile_network  # noqa: E402
+from tests.schedule_fixtures import cpm_reference, random_network  # noqa: E402
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--activities", type=int, default=20_000)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args(argv)
+
+    n = args.activities
+    ids, dur, links = random_network(n, seed=args.seed)
+    t0 = time.perf_counter()
+    net = compile_network(ids, dur, links)
+    t1 = time.perf_counter()
+    res = net.cpm()
+    t2 = time.perf_counter()
+    cpm_reference(ids, dur, links)
+    t3 = time.perf_counter()
+    print(f"{n} activities / {len(links)} links, {net.levels} levels: compile {(t1 - t0) * 1e3:.0f} ms, "
+          f"cpm {(t2 - t1) * 1e3:.0f} ms, dict reference {(t3 - t2) * 1e3:.0f} ms; "
+          f"finish {res.finish}, critical {int(res.critical.sum())}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
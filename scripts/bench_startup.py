@@ -0,0 +1,137 @@
+# scripts/bench_startup.py
+"""
+Cold-start benchmark for app.py.
+
+Each view is rendered headless (streamlit.testing AppTest) in a fresh Python
+process with utils.startup_profiler active, so every run pays the full
+import cost. Writes one JSON report and exits non-zero on a regression:
+
+    python scripts/bench_startup.py                                 # all views
+    python scripts/bench_startup.py --views "PM Hub" "Modules" --out prof.json
+    python scripts/bench_startup.py --budget-s 4 --baseline prof_main.json --tolerance 0.2
+"""
+from __future__ import annotations
+import argparse, json, os, subprocess, sys, tempfile, time
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VIEWS = ["PM Hub", "Ops Hub", "Modules", "Quick Modules", "AI Services"]
+DEFAULT_BUDGET_S = float(os.environ.get("DECISIONMATE_COLD_START_BUDGET_S", "0") or 0)
+
+
+def _child(view: str, out: str, timeout: float) -> None:
+    """Runs inside the fresh process: profile one headless render of `view`."""
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    from utils.startup_profiler import ImportProfiler
+
+    prof = ImportProfiler().start()
+    errors: List[str] = []
+    with prof.phase("import:streamlit"):
+        from streamlit.testing.v1 import AppTest
+    with prof.phase(f"render:{view}") as row:
+        at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=timeout)
+        at.session_state["auth_state"] = "guest"
+        at.session_state["view"] = view
+        try:
+            at.run()
+            errors = [str(getattr(e, "value", e)) for e in at.exception]
+        except Exception as e:
+            errors = [repr(e)]
+        row["errors"] = errors[:5]
+    prof.stop()
+    prof.write(out, top=40)
+
+
+def _run_view(view: str, timeout: float) -> Dict[str, Any]:
+    fd, tmp = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", view, "--out", tmp, "--timeout", str(timeout)],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - t0
+    try:
+        with open(tmp, "r", encoding="utf-8") as f:
+            rep = json.load(f)
+    except Exception:
+        rep = {"error": (proc.stderr or proc.stdout)[-2000:]}
+    finally:
+        os.remove(tmp)
+    rep["process_s"] = round(wall, 3)
+    render = next((p for p in rep.get("phases", []) if p["name"].startswith("render:")), {})
+    rep["cold_start_s"] = round(sum(p.get("wall_s", 0.0) for p in rep.get("phases", [])), 3)
+    rep["render"] = render
+    return rep
+
+
+def _check(views: Dict[str, Dict[str, Any]], budget_s: float,
+           baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    problems = []
+    for view, rep in views.items():
+        if "error" in rep:
+            problems.append(f"{view}: benchmark failed")
+            continue
+        t = rep["cold_start_s"]
+        if budget_s and t > budget_s:
+            problems.append(f"{view}: cold start {t:.2f}s > budget {budget_s:.2f}s")
+        base = (baseline.get("views") or {}).get(view)
+        if base and base.get("cold_start_s"):
+            limit = base["cold_start_s"] * (1.0 + tolerance)
+            if t > limit:
+                problems.append(f"{view}: cold start {t:.2f}s > baseline {base['cold_start_s']:.2f}s +{tolerance:.0%}")
+            mem, base_mem = rep.get("traced_mb"), base.get("traced_mb")
+            if mem and base_mem and mem > base_mem * (1.0 + tolerance):
+                problems.append(f"{view}: {mem:.0f} MB traced > baseline {base_mem:.0f} MB +{tolerance:.0%}")
+    return problems
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--views", nargs="+", default=VIEWS)
+    ap.add_argument("--out", default=os.path.join(ROOT, "data", "local_store", "startup_bench.json"))
+    ap.add_argument("--budget-s", type=float, default=DEFAULT_BUDGET_S, help="max cold start per view (0 = off)")
+    ap.add_argument("--baseline", help="earlier report to compare against")
+    ap.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown vs baseline (0.2 = 20%%)")
+    ap.add_argument("--timeout", type=float, default=120.0)
+    ap.add_argument("--top", type=int, default=10, help="slowest imports to print per view")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.child:
+        _child(args.child, args.out, args.timeout)
+        return 0
+
+    views: Dict[str, Dict[str, Any]] = {}
+    for view in args.views:
+        rep = _run_view(view, args.timeout)
+        views[view] = rep
+        if "error" in rep:
+            print(f"{view:<14} FAILED\n{rep['error']}")
+            continue
+        errs = rep["render"].get("errors") or []
+        print(f"{view:<14} cold {rep['cold_start_s']:6.2f}s  imports {rep['module_count']:5d} "
+              f"({rep['import_s']:.2f}s)  traced {rep.get('traced_mb', 0):7.1f} MB"
+              + (f"  [{len(errs)} app error(s)]" if errs else ""))
+        for m in rep["modules"][:args.top]:
+            print(f"    {m['cum_ms']:9.1f} ms  {m['mem_kb'] / 1024:7.1f} MB  {m['name']}")
+
+    report = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": sys.version.split()[0], "views": views}
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"report: {args.out}")
+
+    baseline: Dict[str, Any] = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    problems = _check(views, args.budget_s, baseline, args.tolerance)
+    for p in problems:
+        print(f"REGRESSION {p}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
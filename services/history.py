@@ -1,15 +1,232 @@
 # services/history.py
+"""
+Snapshot history stored as chunks of a base snapshot plus JSON-patch deltas.
+
+Layout per doc_key:
+  history__<doc_key>            {"format": "delta", "seq": next_seq, "chunk_size": K}
+  history__<doc_key>__c<slot>   {"chunk": n, "base_ts", "base": {...}, "deltas": [{"ts", "patch"|"data"}, ...]}
+
+Every chunk starts with a full snapshot (periodic re-base every K saves),
+and chunk slots are reused as a ring so only the last MAX_HISTORY
+versions are kept. The write path keeps the open chunk in process memory
+(an LRU of MAX_TAILS keys), so an autosave never reloads earlier history.
+Before each append the cached tail is checked against the meta doc's
+(seq, writer); if another process has written since, the tail is reloaded.
+"""
 from __future__ import annotations
-from typing import Dict, Any, List, Optional
-import time
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+import copy, json, threading, time, uuid
 
-from data.firestore import load_project_doc, save_project_doc
+from data.firestore import load_project_doc, save_project_docs
 
 MAX_HISTORY = 200  # keep last N snapshots per doc_key
+CHUNK_SIZE = 20    # one full base snapshot every N saves
+_SLOTS = -(-MAX_HISTORY // CHUNK_SIZE) + 1
+MAX_TAILS = 256    # open chunks cached per process (least recently used dropped)
+
+# open chunk per (username, namespace, project_id, doc_key):
+# {"seq": next_seq, "chunk": {...}, "last": latest snapshot,
+#  "stored": (seq, writer) of the meta doc as last seen in the store}
+_TAILS: "OrderedDict[Tuple[str, str, str, str], Dict[str, Any]]" = OrderedDict()
+_LOCK = threading.Lock()
+_WRITER = uuid.uuid4().hex  # stamped on the meta doc to tell this process's writes apart
 
 def _hist_key(doc_key: str) -> str:
     return f"history__{doc_key}"
 
+def _chunk_key(doc_key: str, chunk_no: int) -> str:
+    return f"{_hist_key(doc_key)}__c{chunk_no % _SLOTS}"
+
+# ---- JSON patch (RFC 6902 subset: add / remove / replace) ----
+
+def _esc(key: Any) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+def _unesc(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+def _diff(a: Any, b: Any, path: str, ops: List[Dict[str, Any]]) -> None:
+    if isinstance(a, dict) and isinstance(b, dict):
+        for k in a:
+            if k not in b:
+                ops.append({"op": "remove", "path": f"{path}/{_esc(k)}"})
+        for k, v in b.items():
+            p = f"{path}/{_esc(k)}"
+            if k not in a:
+                ops.append({"op": "add", "path": p, "value": v})
+            else:
+                _diff(a[k], v, p, ops)
+    elif type(a) is not type(b) or a != b:
+        # lists and scalars are replaced as a whole
+        ops.append({"op": "replace", "path": path, "value": b})
+
+def make_patch(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    ops: List[Dict[str, Any]] = []
+    _diff(old, new, "", ops)
+    return ops
+
+def apply_patch(doc: Any, patch: List[Dict[str, Any]]) -> Any:
+    """Applies `patch` in place where possible and returns the resulting doc."""
+    for op in patch:
+        path = op["path"]
+        if path == "":
+            doc = copy.deepcopy(op["value"])
+            continue
+        tokens = [_unesc(t) for t in path.split("/")[1:]]
+        parent = doc
+        for t in tokens[:-1]:
+            parent = parent[t]
+        if op["op"] == "remove":
+            parent.pop(tokens[-1], None)
+        else:
+            parent[tokens[-1]] = copy.deepcopy(op["value"])
+    return doc
+
+def _project(doc: Any, fields: Tuple[str, ...]) -> Dict[str, Any]:
+    src = doc if isinstance(doc, dict) else {}
+    return {f: copy.deepcopy(src.get(f)) for f in fields}
+
+def _apply_fields(proj: Dict[str, Any], patch: List[Dict[str, Any]], fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """Like apply_patch, but only tracks the given top-level fields."""
+    for op in patch:
+        path = op["path"]
+        if path == "":
+            proj = _project(op["value"], fields)
+            continue
+        tokens = [_unesc(t) for t in path.split("/")[1:]]
+        if tokens[0] not in proj:
+            continue
+        if len(tokens) == 1:
+            proj[tokens[0]] = None if op["op"] == "remove" else copy.deepcopy(op["value"])
+        else:
+            apply_patch(proj, [op])
+    return proj
+
+# ---- write path ----
+
+def _normalise(snapshot: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    blob = json.dumps(snapshot, default=str)
+    return json.loads(blob), len(blob)
+
+def _new_chunk(chunk_no: int, ts: float, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    return {"chunk": chunk_no, "base_ts": ts, "base": snapshot, "deltas": []}
+
+def _rebuild_last(chunk: Dict[str, Any]) -> Dict[str, Any]:
+    doc = copy.deepcopy(chunk["base"])
+    for d in chunk["deltas"]:
+        doc = copy.deepcopy(d["data"]) if "data" in d else apply_patch(doc, d["patch"])
+    return doc
+
+def _meta_state(meta: Any) -> Tuple[int, Optional[str]]:
+    if not isinstance(meta, dict) or meta.get("format") != "delta":
+        return 0, None
+    return int(meta.get("seq", 0)), meta.get("writer")
+
+def _meta(seq: int) -> Dict[str, Any]:
+    return {"format": "delta", "seq": seq, "chunk_size": CHUNK_SIZE, "writer": _WRITER}
+
+def _load_tail(username: str, namespace: str, project_id: str, doc_key: str,
+               meta: Any = None) -> Dict[str, Any]:
+    """Cold start (or stale tail): read the meta doc and the open chunk (at most CHUNK_SIZE entries)."""
+    if meta is None:
+        meta = load_project_doc(username, namespace, project_id, _hist_key(doc_key))
+    if isinstance(meta, dict) and isinstance(meta.get("items"), list) and meta.get("format") != "delta":
+        return _convert_legacy(username, namespace, project_id, doc_key, meta["items"])
+    stored = _meta_state(meta)
+    if stored[0] <= 0:
+        return {"seq": 0, "chunk": None, "last": None, "stored": stored}
+
+    seq = stored[0]
+    chunk_no = (seq - 1) // CHUNK_SIZE
+    chunk = load_project_doc(username, namespace, project_id, _chunk_key(doc_key, chunk_no))
+    if not isinstance(chunk, dict) or chunk.get("chunk") != chunk_no:
+        return {"seq": seq, "chunk": None, "last": None, "stored": stored}
+    return {"seq": seq, "chunk": chunk, "last": _rebuild_last(chunk), "stored": stored}
+
+def _current_tail(username: str, namespace: str, project_id: str, doc_key: str) -> Dict[str, Any]:
+    """
+    The cached tail if the store still agrees with it, else a reload. The
+    store may show either the state the tail was loaded/confirmed at (our
+    staged appends not written yet) or our own latest append; anything else
+    means another process wrote this history since.
+    """
+    key = (username, namespace, project_id, doc_key)
+    meta = load_project_doc(username, namespace, project_id, _hist_key(doc_key))
+    tail = _TAILS.get(key)
+    if tail is not None:
+        now = _meta_state(meta)
+        if now == (tail["seq"], _WRITER):
+            tail["stored"] = now
+            return tail
+        if now == tail["stored"]:
+            return tail
+    return _load_tail(username, namespace, project_id, doc_key, meta)
+
+def _convert_legacy(username: str, namespace: str, project_id: str, doc_key: str,
+                    items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """One-time rewrite of the old {"items": [full copies]} doc into chunks."""
+    tail: Dict[str, Any] = {"seq": 0, "chunk": None, "last": None}
+    docs: Dict[str, Dict[str, Any]] = {}
+    for it in items[-MAX_HISTORY:]:
+        _append(tail, float(it.get("ts", 0.0)), *_normalise(it.get("data") or {}))
+        docs[_chunk_key(doc_key, tail["chunk"]["chunk"])] = tail["chunk"]
+    docs[_hist_key(doc_key)] = _meta(tail["seq"])
+    save_project_docs(username, namespace, project_id, docs)
+    tail["stored"] = (tail["seq"], _WRITER)
+    return tail
+
+def _append(tail: Dict[str, Any], ts: float, snapshot: Dict[str, Any], size: int) -> None:
+    seq = tail["seq"]
+    chunk_no = seq // CHUNK_SIZE
+    if seq % CHUNK_SIZE == 0 or tail["chunk"] is None or tail["chunk"].get("chunk") != chunk_no:
+        if seq % CHUNK_SIZE != 0:
+            # open chunk lost (slot overwritten / partial write): restart on a clean boundary
+            seq = (chunk_no + 1) * CHUNK_SIZE
+            chunk_no += 1
+        tail["chunk"] = _new_chunk(chunk_no, ts, snapshot)
+    else:
+        patch = make_patch(tail["last"], snapshot)
+        if len(json.dumps(patch, default=str)) < size:
+            tail["chunk"]["deltas"].append({"ts": ts, "patch": patch})
+        else:
+            tail["chunk"]["deltas"].append({"ts": ts, "data": snapshot})
+    tail["last"] = snapshot
+    tail["seq"] = seq + 1
+
+def stage_snapshot(
+    username: str,
+    namespace: str,
+    project_id: str,
+    doc_key: str,
+    snapshot: Dict[str, Any],
+    ts: Optional[float] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Advances the in-memory history tail and returns the project docs to write
+    ({doc: data}), so callers can batch them with other writes. Call
+    discard_tail() if that write fails.
+    """
+    key = (username, namespace, project_id, doc_key)
+    snap, size = _normalise(snapshot)
+    with _LOCK:
+        tail = _current_tail(username, namespace, project_id, doc_key)
+        _append(tail, time.time() if ts is None else ts, snap, size)
+        _TAILS[key] = tail
+        _TAILS.move_to_end(key)
+        while len(_TAILS) > MAX_TAILS:
+            _TAILS.popitem(last=False)
+        chunk = tail["chunk"]
+        return {
+            _chunk_key(doc_key, chunk["chunk"]): dict(chunk, deltas=list(chunk["deltas"])),
+            _hist_key(doc_key): _meta(tail["seq"]),
+        }
+
+def discard_tail(username: str, namespace: str, project_id: str, doc_key: str) -> None:
+    """Drops the cached tail; the next append reloads it from the store."""
+    with _LOCK:
+        _TAILS.pop((username, namespace, project_id, doc_key), None)
+
 def append_snapshot(
     username: str,
     namespace: str,
@@ -17,12 +234,93 @@ def append_snapshot(
     doc_key: str,
     snapshot: Dict[str, Any],
 ) -> None:
-    hist_key = _hist_key(doc_key)
-    current: Optional[Dict[str, Any]] = load_project_doc(username, namespace, project_id, hist_key)
-    items: List[Dict[str, Any]] = current.get("items", []) if isinstance(current, dict) else []
-    items.append({"ts": time.time(), "data": snapshot})
-    items = items[-MAX_HISTORY:]
-    save_project_doc(username, namespace, project_id, hist_key, {"items": items})
+    docs = stage_snapshot(username, namespace, project_id, doc_key, snapshot)
+    try:
+        save_project_docs(username, namespace, project_id, docs)
+    except Exception:
+        discard_tail(username, namespace, project_id, doc_key)
+        raise
+
+# ---- read path ----
+
+def _window(username: str, namespace: str, project_id: str, doc_key: str):
+    """Returns (meta, first_seq, next_seq); meta is the raw legacy doc when not yet converted."""
+    meta = load_project_doc(username, namespace, project_id, _hist_key(doc_key))
+    if not isinstance(meta, dict):
+        return None, 0, 0
+    if meta.get("format") != "delta":
+        return meta, 0, 0
+    seq = int(meta.get("seq", 0))
+    return meta, max(0, seq - MAX_HISTORY), seq
+
+def _iter_chunk_entries(chunk: Dict[str, Any]) -> Iterator[Tuple[float, Optional[Dict[str, Any]], Optional[List[Dict[str, Any]]]]]:
+    yield float(chunk.get("base_ts", 0.0)), chunk.get("base") or {}, None
+    for d in chunk.get("deltas", []):
+        yield float(d.get("ts", 0.0)), d.get("data"), d.get("patch")
+
+def iter_history(
+    username: str,
+    namespace: str,
+    project_id: str,
+    doc_key: str,
+    fields: Optional[Iterable[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields {"ts", "data"} oldest first, rebuilding versions one chunk at a time.
+    With `fields`, only those top-level keys are reconstructed (cheap trend reads).
+    """
+    wanted = tuple(fields) if fields is not None else None
+    meta, first, seq = _window(username, namespace, project_id, doc_key)
+    if meta is not None and meta.get("format") != "delta":
+        for it in meta.get("items", []) if isinstance(meta.get("items"), list) else []:
+            data = it.get("data") or {}
+            yield {"ts": it.get("ts"), "data": _project(data, wanted) if wanted else data}
+        return
+
+    for chunk_no in range(first // CHUNK_SIZE, (seq - 1) // CHUNK_SIZE + 1 if seq else 0):
+        chunk = load_project_doc(username, namespace, project_id, _chunk_key(doc_key, chunk_no))
+        if not isinstance(chunk, dict) or chunk.get("chunk") != chunk_no:
+            continue
+        doc: Any = None
+        for offset, (ts, data, patch) in enumerate(_iter_chunk_entries(chunk)):
+            pos = chunk_no * CHUNK_SIZE + offset
+            if data is not None:
+                doc = _project(data, wanted) if wanted else data
+            elif wanted:
+                doc = _apply_fields(doc, patch or [], wanted)
+            else:
+                doc = apply_patch(doc, patch or [])
+            if first <= pos < seq:
+                yield {"ts": ts, "data": copy.deepcopy(doc)}
+
+def get_version(
+    username: str,
+    namespace: str,
+    project_id: str,
+    doc_key: str,
+    index: int = -1,
+) -> Optional[Dict[str, Any]]:
+    """Rebuilds a single version ({"ts", "data"}); negative indexes count from the newest."""
+    meta, first, seq = _window(username, namespace, project_id, doc_key)
+    if meta is not None and meta.get("format") != "delta":
+        items = meta.get("items", []) if isinstance(meta.get("items"), list) else []
+        try:
+            return items[index]
+        except IndexError:
+            return None
+    pos = (seq if index < 0 else first) + index
+    if not first <= pos < seq:
+        return None
+    chunk_no = pos // CHUNK_SIZE
+    chunk = load_project_doc(username, namespace, project_id, _chunk_key(doc_key, chunk_no))
+    if not isinstance(chunk, dict) or chunk.get("chunk") != chunk_no:
+        return None
+    doc: Any = None
+    for offset, (ts, data, patch) in enumerate(_iter_chunk_entries(chunk)):
+        doc = data if data is not None else apply_patch(doc, patch or [])
+        if chunk_no * CHUNK_SIZE + offset == pos:
+            return {"ts": ts, "data": doc}
+    return None
 
 def get_history(
     username: str,
@@ -30,11 +328,7 @@ def get_history(
     project_id: str,
     doc_key: str,
 ) -> List[Dict[str, Any]]:
-    hist_key = _hist_key(doc_key)
-    current: Optional[Dict[str, Any]] = load_project_doc(username, namespace, project_id, hist_key)
-    if isinstance(current, dict) and isinstance(current.get("items"), list):
-        return current["items"]
-    return []
+    return list(iter_history(username, namespace, project_id, doc_key))
 import streamlit as st
 
 def render_timeline(industry: str, phase_code: str):
@@ -0,0 +1,200 @@
+# services/module_catalog.py
+"""
+Static catalog of launchable tool modules (Modules / Quick Modules views).
+
+Modules are found by parsing their source with `ast` instead of importing
+them, so building the catalog does not pull in streamlit/matplotlib/plotly
+for 140+ files. A module is listed when it defines (or imports) a top-level
+`run`, `main` or `<module_basename>`; it is only imported when opened.
+
+The scan result is persisted as a JSON manifest and revalidated against
+file mtimes/sizes, so only new or edited files are parsed again:
+
+    entries = load_manifest(["modules", "decisionmate_core"])
+    # {Nice Title: {"module": "modules.foo", "entry": "run", "file": ..., "group": None}}
+"""
+from __future__ import annotations
+import ast, importlib.util, json, os, threading
+from typing import Any, Dict, List, Optional
+
+MANIFEST_VERSION = 1
+ENTRY_NAMES = ("run", "main")
+SKIP_SEGMENTS = (".tests", ".test", ".fixtures", ".unit_operations")
+
+_lock = threading.Lock()
+_memo: Dict[str, Dict[str, Any]] = {}  # manifest path -> loaded manifest
+
+
+def manifest_path() -> str:
+    """Manifest location; override with DECISIONMATE_MODULE_MANIFEST."""
+    path = os.environ.get("DECISIONMATE_MODULE_MANIFEST")
+    if path:
+        return path
+    base = os.path.join(os.getcwd(), "data", "local_store")
+    os.makedirs(base, exist_ok=True)
+    return os.path.join(base, "module_manifest.json")
+
+
+def title_for(module_path: str) -> str:
+    # "foo_bar" -> "Foo Bar"
+    return module_path.split(".")[-1].replace("_", " ").title()
+
+
+def _top_level_names(body: List[ast.stmt]) -> set:
+    """Names bound at module level, including inside top-level if/try blocks."""
+    names = set()
+    for node in body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                names.add((alias.asname or alias.name).split(".")[0])
+        elif isinstance(node, ast.Assign):
+            names.update(t.id for t in node.targets if isinstance(t, ast.Name))
+        elif isinstance(node, ast.If):
+            names |= _top_level_names(node.body) | _top_level_names(node.orelse)
+        elif isinstance(node, ast.Try):
+            names |= _top_level_names(node.body)
+            for h in node.handlers:
+                names |= _top_level_names(h.body)
+            names |= _top_level_names(node.orelse) | _top_level_names(node.finalbody)
+    return names
+
+
+def scan_entry(file_path: str, module_path: str) -> Optional[str]:
+    """Entry-point name for a module source file (None when there is none or it does not parse)."""
+    try:
+        with open(file_path, "rb") as f:
+            tree = ast.parse(f.read(), filename=file_path)
+    except (OSError, SyntaxError, ValueError):
+        return None
+    names = _top_level_names(tree.body)
+    for cand in ENTRY_NAMES + (module_path.split(".")[-1],):
+        if cand in names:
+            return cand
+    return None
+
+
+def _package_dirs(pkg_name: str) -> List[str]:
+    """Locate a package on disk without executing its __init__."""
+    try:
+        spec = importlib.util.find_spec(pkg_name)
+    except (ImportError, ValueError):
+        return []
+    if spec is None or not spec.submodule_search_locations:
+        return []
+    return list(spec.submodule_search_locations)
+
+
+def iter_module_files(pkg_name: str):
+    """(module_path, file_path) for every module below a package, like pkgutil.walk_packages."""
+    for base in _package_dirs(pkg_name):
+        stack = [(base, pkg_name)]
+        while stack:
+            folder, prefix = stack.pop()
+            try:
+                listing = sorted(os.listdir(folder))
+            except OSError:
+                continue
+            for fname in listing:
+                full = os.path.join(folder, fname)
+                if fname.endswith(".py") and fname != "__init__.py" and fname[:-3].isidentifier():
+                    yield f"{prefix}.{fname[:-3]}", full
+                elif fname.isidentifier() and os.path.isfile(os.path.join(full, "__init__.py")):
+                    yield f"{prefix}.{fname}", os.path.join(full, "__init__.py")
+                    stack.append((full, f"{prefix}.{fname}"))
+
+
+def _read_manifest(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == MANIFEST_VERSION:
+            return data
+    except Exception:
+        pass
+    return {"version": MANIFEST_VERSION, "files": {}}
+
+
+def _write_manifest(path: str, data: Dict[str, Any]) -> None:
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=0, sort_keys=True)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # read-only checkout: keep the in-process copy only
+
+
+def refresh(package_names: List[str], path: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Revalidate the manifest for `package_names` and return its file records
+    {module_path: {"file", "mtime", "size", "entry"}}. Unchanged files are not re-parsed.
+    """
+    path = path or manifest_path()
+    with _lock:
+        manifest = _memo.get(path) or _read_manifest(path)
+        old = manifest["files"]
+        files: Dict[str, Dict[str, Any]] = {}
+        dirty = False
+        for pkg_name in package_names:
+            for module_path, file_path in iter_module_files(pkg_name):
+                try:
+                    info = os.stat(file_path)
+                except OSError:
+                    continue
+                rec = old.get(module_path)
+                if rec and rec.get("file") == file_path and rec.get("mtime") == info.st_mtime and rec.get("size") == info.st_size:
+                    files[module_path] = rec
+                    continue
+                files[module_path] = {
+                    "file": file_path,
+                    "mtime": info.st_mtime,
+                    "size": info.st_size,
+                    "entry": scan_entry(file_path, module_path),
+                }
+                dirty = True
+        # records of packages not scanned this time are kept for other callers
+        scanned = tuple(p + "." for p in package_names)
+        for module_path, rec in old.items():
+            if not module_path.startswith(scanned):
+                files.setdefault(module_path, rec)
+            elif module_path not in files:
+                dirty = True  # deleted file
+        manifest = {"version": MANIFEST_VERSION, "files": files}
+        _memo[path] = manifest
+        if dirty or not os.path.exists(path):
+            _write_manifest(path, manifest)
+    return {m: r for m, r in files.items() if m.startswith(scanned)}
+
+
+def load_manifest(package_names: List[str], groups: Optional[Dict[str, str]] = None,
+                  path: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    {Nice Title: {"module", "entry", "file", "group"}} for every launchable module.
+    `groups` maps module_path -> group label (e.g. from REV3_GROUPS).
+    """
+    groups = groups or {}
+    out: Dict[str, Dict[str, Any]] = {}
+    for module_path, rec in sorted(refresh(package_names, path).items()):
+        if not rec.get("entry"):
+            continue
+        if any(seg in module_path for seg in SKIP_SEGMENTS):
+            continue
+        # Ops Hub packages are not part of the Modules catalog
+        if module_path.split(".")[-1].startswith("ops"):
+            continue
+        out[title_for(module_path)] = {
+            "module": module_path,
+            "entry": rec["entry"],
+            "file": rec["file"],
+            "group": groups.get(module_path),
+        }
+    return out
+
+
+if __name__ == "__main__":  # python -m services.module_catalog [pkg ...]
+    import sys
+    pkgs = sys.argv[1:] or ["modules", "decisionmate_core"]
+    for title, e in load_manifest(pkgs).items():
+        print(f"{e['module']:<55} {e['entry']:<28} {title}")
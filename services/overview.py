@@ -2,7 +2,7 @@
 from typing import Dict, Any, List
 import streamlit as st
 from data.firestore import load_project_doc
-from services.history import get_history
+from services.history import iter_history
 
 def _stat(label: str, value: Any):
     c = st.container(border=True)
@@ -10,7 +10,8 @@ def _stat(label: str, value: Any):
     c.subheader(f"{value}")
 
 def _trend_section(username: str, namespace: str, project_id: str, doc_key: str):
-    hist = get_history(username, namespace, project_id, doc_key)
+    # stream only the charted fields; full snapshots are never rebuilt here
+    hist = list(iter_history(username, namespace, project_id, doc_key, fields=("capex", "schedule_months")))
     if not hist:
         st.info("No history yet. Save a few times to build trends.")
         return
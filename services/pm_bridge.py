@@ -13,19 +13,11 @@ except Exception:  # pragma: no cover
         def info(self, *a, **k): pass
     st = _Dummy()
 
-# --- Firestore (optional) ---
-_firestore_ready = False
-_db = None
-_doc_root = None
-
+# --- Firestore (optional; shared client from data/storage_clients.py) ---
 try:
-    import firebase_admin
-    from firebase_admin import firestore
-    if getattr(firebase_admin, "_apps", None):
-        _db = firestore.client()
-        _firestore_ready = True
-except Exception:
-    _firestore_ready = False
+    from data.storage_clients import get_firestore as _get_firestore
+except Exception:  # pragma: no cover
+    _get_firestore = lambda: None
 
 
 def _project_key() -> str:
@@ -48,9 +40,10 @@ def save_stage(stage: str, payload: Dict[str, Any]) -> None:
         "ts": time.time(),
     }
 
-    if _firestore_ready:
+    db = _get_firestore()
+    if db is not None:
         try:
-            col = _db.collection("pm_bridge").document(rec["project"]).collection("stages")
+            col = db.collection("pm_bridge").document(rec["project"]).collection("stages")
             col.document(stage).set(rec)
             return
         except Exception as e:
@@ -66,10 +59,11 @@ def load_stage(stage: str, default: Optional[Dict[str, Any]] = None) -> Dict[str
     """Load a stage payload or default.
     Returns the record dict {stage, project, payload, ts} or a default-wrapped record.
     """
-    if _firestore_ready:
+    db = _get_firestore()
+    if db is not None:
         try:
             doc = (
-                _db.collection("pm_bridge")
+                db.collection("pm_bridge")
                    .document(_project_key())
                    .collection("stages")
                    .document(stage)
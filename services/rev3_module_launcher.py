@@ -8,6 +8,8 @@ from decisionmate_core.dependencies import PRODUCER
 import importlib
 import inspect
 
+from services.module_catalog import load_manifest
+
 REV3_T = {
     "title": "DecisionMate",
     "select_module": "Select Module",
@@ -252,13 +254,20 @@ REV3_GROUPS = {
     },
 }
 
+def _group_by_module_path() -> dict[str, str]:
+    return {mpath: group for group, entries in REV3_GROUPS.items() for (mpath, _fn) in entries.values()}
+
 def discover_rev3_packages(package_names):
-    # Your dynamic discovery logic here
-    # For now, just return an empty dict or your actual implementation
-    return {}
+    """
+    Static scan (no imports) of packages for modules with a run/main/<basename> entry.
+    Returns: {Nice Title: (module_path, entry_name)}
+    """
+    found = load_manifest(list(package_names), groups=_group_by_module_path())
+    return {title: (e["module"], e["entry"]) for title, e in found.items()}
 
-@st.cache_data(show_spinner=False)
 def discover_rev3_packages_cached(package_names):
+    # the manifest is revalidated by file mtime on every call (stat only), so
+    # edited modules show up without clearing a Streamlit cache
     return discover_rev3_packages(package_names)
 def _qm_lookup_by_module_path(module_path: str):
     """Return (title, func_name) from REV3_GROUPS for a given module_path."""
@@ -0,0 +1,222 @@
+# services/write_behind.py
+"""
+Write-behind queue for autosave.
+
+The render path only enqueues; a background thread writes later:
+  - successive saves of the same (username, namespace, project_id, doc_key)
+    are coalesced (last one wins) until the key has been quiet for
+    DEBOUNCE_S, or MAX_DELAY_S after its first pending save
+  - each flush writes the doc and its history snapshot for a project in
+    one batched save_project_docs call
+  - flush() also waits for batches the worker has already taken, so a
+    "flush before load" never races an in-flight write
+  - pending saves are flushed when the user leaves or switches a project
+    (app.py) and at interpreter exit. Streamlit has no session-teardown
+    hook: saves from a closed tab are written by the worker once their
+    debounce expires, as long as the server process keeps running
+
+    enqueue(username, ns, project_id, doc_key, data, hist_key="projects_overview")
+    flush()        # synchronous; for tests, shutdown or "Save now" buttons
+"""
+from __future__ import annotations
+import atexit, json, threading, time
+from typing import Any, Dict, List, Optional, Tuple
+
+from data.firestore import save_project_docs
+from services.history import stage_snapshot, discard_tail
+
+DEBOUNCE_S = 2.0    # quiet period before a key is written
+MAX_DELAY_S = 10.0  # upper bound on how long a save may stay queued
+
+Key = Tuple[str, str, str, str]
+
+
+class WriteBehindQueue:
+    def __init__(self, debounce_s: float = DEBOUNCE_S, max_delay_s: float = MAX_DELAY_S):
+        self.debounce_s = debounce_s
+        self.max_delay_s = max_delay_s
+        self._pending: Dict[Key, Dict[str, Any]] = {}
+        self._inflight: Dict[Key, int] = {}     # keys taken for writing, not yet written
+        self._cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._stopped = False
+        self.last_result: Optional[Dict[str, Any]] = None
+        self.counters = {"enqueued": 0, "coalesced": 0, "written": 0, "batches": 0, "errors": 0}
+
+    # ---- producer side ----
+    def enqueue(self, username: str, namespace: str, project_id: str, doc_key: str,
+                data: Dict[str, Any], hist_key: Optional[str] = None,
+                serialized: Optional[str] = None) -> None:
+        """
+        Queue `data` for (username, namespace, project_id, doc_key).
+        `serialized` (json.dumps of data) may be passed to skip re-encoding;
+        the data is frozen either way, so later mutations are not seen.
+        """
+        blob = serialized if serialized is not None else json.dumps(data, default=str)
+        now = time.monotonic()
+        key = (username, namespace, project_id, doc_key)
+        with self._cond:
+            prev = self._pending.get(key)
+            self._pending[key] = {
+                "blob": blob,
+                "hist_key": hist_key,
+                "ts": time.time(),
+                "first_at": prev["first_at"] if prev else now,
+                "last_at": now,
+            }
+            self.counters["enqueued"] += 1
+            if prev:
+                self.counters["coalesced"] += 1
+            self._ensure_worker()
+            self._cond.notify()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    # ---- consumer side ----
+    def _due(self, now: float) -> List[Key]:
+        # a key being written stays queued until that write ends, so writes of one key never overlap
+        return [k for k, e in self._pending.items() if k not in self._inflight
+                and (now - e["last_at"] >= self.debounce_s or now - e["first_at"] >= self.max_delay_s)]
+
+    def _next_wakeup(self, now: float) -> Optional[float]:
+        ready = [e for k, e in self._pending.items() if k not in self._inflight]
+        if not ready:
+            return None     # woken by enqueue or by _done
+        return max(0.0, min(min(e["last_at"] + self.debounce_s, e["first_at"] + self.max_delay_s) - now
+                            for e in ready))
+
+    def _take(self, keys: List[Key]) -> Dict[Key, Dict[str, Any]]:
+        """Pops entries and marks them in flight; call under _cond, pair with _done."""
+        batch = {k: self._pending.pop(k) for k in keys if k in self._pending}
+        for k in batch:
+            self._inflight[k] = self._inflight.get(k, 0) + 1
+        return batch
+
+    def _done(self, batch: Dict[Key, Dict[str, Any]]) -> None:
+        with self._cond:
+            for k in batch:
+                n = self._inflight.pop(k, 1) - 1
+                if n > 0:
+                    self._inflight[k] = n
+            self._cond.notify_all()
+
+    def _write(self, batch: Dict[Key, Dict[str, Any]]) -> Dict[str, Any]:
+        """Writes taken entries, one save_project_docs call per project."""
+        by_project: Dict[Tuple[str, str, str], List[Tuple[str, Dict[str, Any]]]] = {}
+        for (username, namespace, project_id, doc_key), entry in batch.items():
+            by_project.setdefault((username, namespace, project_id), []).append((doc_key, entry))
+
+        result: Dict[str, Any] = {"ok": True, "written": 0, "batches": 0, "errors": []}
+        for (username, namespace, project_id), items in by_project.items():
+            docs: Dict[str, Dict[str, Any]] = {}
+            staged: List[str] = []
+            try:
+                for doc_key, entry in items:
+                    data = json.loads(entry["blob"])
+                    docs[doc_key] = data
+                    if entry["hist_key"]:
+                        docs.update(stage_snapshot(username, namespace, project_id,
+                                                   entry["hist_key"], data, ts=entry["ts"]))
+                        staged.append(entry["hist_key"])
+                status = save_project_docs(username, namespace, project_id, docs)
+                result["mode"] = status.get("mode")
+                result["written"] += len(items)
+                result["batches"] += 1
+            except Exception as e:
+                for hist_key in staged:
+                    discard_tail(username, namespace, project_id, hist_key)
+                result["ok"] = False
+                result["errors"].append(f"{namespace}/{project_id}: {e}")
+                # keep the data: re-queue unless a newer save arrived meanwhile
+                with self._cond:
+                    for doc_key, entry in items:
+                        self._pending.setdefault((username, namespace, project_id, doc_key), entry)
+
+        with self._cond:
+            self.counters["written"] += result["written"]
+            self.counters["batches"] += result["batches"]
+            self.counters["errors"] += len(result["errors"])
+            self.last_result = result
+        return result
+
+    def flush(self, project_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Synchronously write everything pending (optionally one project only),
+        after waiting for any of its writes already in flight on the worker.
+        """
+        def mine(k: Key) -> bool:
+            return project_id is None or k[2] == project_id
+
+        with self._cond:
+            while any(mine(k) for k in self._inflight):
+                self._cond.wait()
+            batch = self._take([k for k in self._pending if mine(k)])
+        if not batch:
+            return {"ok": True, "written": 0, "batches": 0, "errors": []}
+        try:
+            return self._write(batch)
+        finally:
+            self._done(batch)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    wait = self._next_wakeup(time.monotonic())
+                    if wait == 0.0:
+                        break
+                    self._cond.wait(wait)
+                if self._stopped:
+                    return
+                batch = self._take(self._due(time.monotonic()))
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception:
+                    with self._cond:
+                        self.counters["errors"] += 1
+                finally:
+                    self._done(batch)
+                # failed writes were re-queued; don't spin on a broken backend
+                if self.last_result and not self.last_result.get("ok"):
+                    time.sleep(self.debounce_s)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._stopped = False
+            self._worker = threading.Thread(target=self._run, name="dm-write-behind", daemon=True)
+            self._worker.start()
+
+    def stop(self, flush: bool = True) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout=5.0)
+        self._worker = None
+        if flush:
+            self.flush()
+
+
+_QUEUE = WriteBehindQueue()
+atexit.register(lambda: _QUEUE.stop(flush=True))
+
+
+def enqueue(username: str, namespace: str, project_id: str, doc_key: str,
+            data: Dict[str, Any], hist_key: Optional[str] = None,
+            serialized: Optional[str] = None) -> None:
+    _QUEUE.enqueue(username, namespace, project_id, doc_key, data, hist_key=hist_key, serialized=serialized)
+
+
+def flush(project_id: Optional[str] = None) -> Dict[str, Any]:
+    return _QUEUE.flush(project_id)
+
+
+def pending() -> int:
+    return _QUEUE.pending()
+
+
+def stats() -> Dict[str, Any]:
+    return {**_QUEUE.counters, "pending": _QUEUE.pending(), "last_result": _QUEUE.last_result}
@@ -0,0 +1,72 @@
+# tests/decline_fixtures.py
+"""
+Shared by tests/test_decline_fit.py and scripts/bench_decline_fit.py: the
+original one-parameter-at-a-time Arps grid search, a synthetic field, and the
+log-MSE a fit scores on a well.
+"""
+import math
+from datetime import date
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules.decline_fit import B_GRID, MIN_POINTS, MULTIPLIERS, _ln_rate, _mse
+from modules.forecast_engine import _months_between, arps_rate
+
+
+def fit_arps_grid(dates: List[date], q: np.ndarray, prefer_hyperbolic: bool = True) -> Tuple[float, float, float]:
+    """The original grid search that modules/decline_fit.py replaced."""
+    mask = q > 0
+    if mask.sum() < MIN_POINTS:
+        return float(q[mask][0] if mask.any() else 1000.0), 0.8, 0.0
+    dts = [d for d, m in zip(dates, mask) if m]
+    t_years = np.array([_months_between(dts[0], d) / 12.0 for d in dts], dtype=float)
+    lnq = np.log(q[mask])
+    A = np.vstack([np.ones_like(t_years), -t_years]).T
+    x, *_ = np.linalg.lstsq(A, lnq, rcond=None)
+    qi_exp, Di_exp = float(np.exp(x[0])), float(x[1])
+    best_qi, best_Di, best_b = qi_exp, Di_exp, 0.0
+    best_err = float(((lnq - (math.log(qi_exp) - Di_exp * t_years)) ** 2).mean())
+    if not prefer_hyperbolic:
+        return best_qi, best_Di, best_b
+    for b in B_GRID:
+        for Di in Di_exp * MULTIPLIERS:
+            f = arps_rate(qi_exp, max(1e-6, Di), b, t_years)
+            err = float(((lnq - np.log(np.maximum(f, 1e-9))) ** 2).mean())
+            if err < best_err:
+                best_qi, best_Di, best_b, best_err = qi_exp, float(Di), float(b), err
+        for qi in qi_exp * MULTIPLIERS:
+            f = arps_rate(max(1e-6, qi), Di_exp, b, t_years)
+            err = float(((lnq - np.log(np.maximum(f, 1e-9))) ** 2).mean())
+            if err < best_err:
+                best_qi, best_Di, best_b, best_err = float(qi), Di_exp, float(b), err
+    return best_qi, best_Di, best_b
+
+
+def synthetic_field(n_wells: int, months: int, seed: int = 0) -> pd.DataFrame:
+    """Monthly oil rates of `n_wells` Arps wells with 5 % log-normal noise."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    dates = pd.date_range("2020-01-01", periods=months, freq="MS")
+    t = np.arange(months) / 12.0
+    for w in range(n_wells):
+        qi, Di, b = rng.uniform(500, 5000), rng.uniform(0.1, 1.2), rng.uniform(0.0, 1.0)
+        q = arps_rate(qi, Di, b, t) * np.exp(rng.normal(0, 0.05, months))
+        rows.append(pd.DataFrame({"well": f"W{w:03d}", "date": dates, "oil_rate": q}))
+    return pd.concat(rows, ignore_index=True)
+
+
+def log_mse(q: np.ndarray, qi: float, Di: float, b: float) -> float:
+    """Mean squared log residual of (qi, Di, b) on a well with every month positive."""
+    return float(_mse(np.log(q)[None], np.ones((1, len(q)), bool),
+                      _ln_rate(np.log(qi), Di, b, np.arange(len(q)) / 12.0)[None])[0])
+
+
+def grid_errors(field: pd.DataFrame) -> List[float]:
+    """log_mse of fit_arps_grid on every well of a synthetic_field, in well order."""
+    out = []
+    for _, g in field.groupby("well", sort=False):
+        q = g["oil_rate"].to_numpy()
+        out.append(log_mse(q, *fit_arps_grid([x.date() for x in g["date"]], q)))
+    return out
@@ -0,0 +1,67 @@
+# tests/schedule_fixtures.py
+"""
+Shared by the scheduling tests and scripts/ benchmarks: random networks and
+demand, and a dict-based CPM used as the parity reference for the engines.
+"""
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from modules.schedule_engine import Link
+
+
+def cpm_reference(ids: Sequence[str], durations: Sequence[float], links: Iterable[Link]) -> Dict[str, Dict[str, float]]:
+    """ES/EF/LS/LF per activity from a plain Kahn sort and dict passes."""
+    dur = {a: float(d) for a, d in zip(ids, durations)}
+    succ: Dict[str, list] = {a: [] for a in ids}
+    pred: Dict[str, list] = {a: [] for a in ids}
+    for p, s, t, g in links:
+        if p in dur and s in dur:
+            succ[p].append((s, t, float(g)))
+            pred[s].append((p, t, float(g)))
+    indeg = {a: len(pred[a]) for a in ids}
+    q = deque(a for a in ids if indeg[a] == 0)
+    order = []
+    while q:
+        a = q.popleft()
+        order.append(a)
+        for s, _, _ in succ[a]:
+            indeg[s] -= 1
+            if indeg[s] == 0:
+                q.append(s)
+    es, ef = {}, {}
+    for a in order:
+        v = 0.0
+        for p, t, g in pred[a]:
+            v = max(v, {"FS": ef[p] + g, "SS": es[p] + g, "FF": ef[p] + g - dur[a], "SF": es[p] + g - dur[a]}[t])
+        es[a], ef[a] = v, v + dur[a]
+    fin = max(ef.values(), default=0.0)
+    ls, lf = {}, {}
+    for a in reversed(order):
+        v = fin
+        for s, t, g in succ[a]:
+            v = min(v, {"FS": ls[s] - g, "SS": ls[s] - g + dur[a], "FF": lf[s] - g, "SF": lf[s] - g + dur[a]}[t])
+        lf[a], ls[a] = v, v - dur[a]
+    return {a: {"ES": es[a], "EF": ef[a], "LS": ls[a], "LF": lf[a]} for a in order}
+
+
+def random_network(n: int, links_per_activity: float = 2.0, seed: int = 0,
+                   link_mix: Mapping[str, float] = None) -> Tuple[List[str], np.ndarray, List[Link]]:
+    """Random acyclic network (links always point to a later activity) for benchmarks."""
+    rng = np.random.default_rng(seed)
+    ids = [f"A{i:05d}" for i in range(n)]
+    dur = rng.integers(1, 30, n).astype(float)
+    m = int(n * links_per_activity)
+    a = rng.integers(0, n - 1, m)
+    b = a + 1 + (rng.random(m) * np.minimum(n - 1 - a, 200)).astype(int)
+    mix = link_mix or {"FS": 0.7, "SS": 0.15, "FF": 0.1, "SF": 0.05}
+    types = rng.choice(list(mix), m, p=np.array(list(mix.values())) / sum(mix.values()))
+    lags = rng.integers(-2, 5, m)
+    return ids, dur, [(ids[i], ids[j], t, float(g)) for i, j, t, g in zip(a, b, types, lags)]
+
+
+def random_demand(n: int, resources: int = 3, seed: int = 0, density: float = 0.5) -> np.ndarray:
+    """(n, resources) units per period; about `density` of the cells are 1-3 units, the rest 0."""
+    rng = np.random.default_rng(seed)
+    return np.where(rng.random((n, resources)) < density, rng.integers(1, 4, (n, resources)), 0).astype(float)
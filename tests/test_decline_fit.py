@@ -0,0 +1,39 @@
+# tests/test_decline_fit.py
+"""Batched Arps fitting against the original grid search."""
+from datetime import date
+
+import numpy as np
+import pytest
+
+from modules.decline_fit import fit_arps, fit_arps_long
+from modules.forecast_engine import arps_rate
+from tests.decline_fixtures import grid_errors, log_mse, synthetic_field
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_batched_fit_no_worse_than_grid(seed):
+    field = synthetic_field(60, 48, seed=seed)
+    fast = fit_arps_long(field)
+    ref = np.array(grid_errors(field))
+    assert fast["well"].tolist() == list(dict.fromkeys(field["well"]))
+    assert (fast["n_points"] == 48).all()
+    assert (fast["mse_log"].to_numpy() <= ref + 1e-12).all()
+
+
+def test_reported_error_matches_parameters():
+    field = synthetic_field(20, 36, seed=3)
+    fast = fit_arps_long(field)
+    for (_, g), row in zip(field.groupby("well", sort=False), fast.itertuples()):
+        assert row.mse_log == pytest.approx(log_mse(g["oil_rate"].to_numpy(), row.qi, row.Di, row.b), rel=1e-9)
+
+
+def test_recovers_noise_free_curve():
+    dates = [date(2021 + m // 12, m % 12 + 1, 1) for m in range(60)]
+    q = arps_rate(3000.0, 0.6, 0.4, np.arange(60) / 12.0)
+    qi, Di, b = fit_arps(dates, q)
+    assert (qi, Di, b) == pytest.approx((3000.0, 0.6, 0.4), rel=1e-3)
+
+
+def test_too_few_points_falls_back():
+    dates = [date(2024, m, 1) for m in range(1, 5)]
+    assert fit_arps(dates, np.array([0.0, 250.0, 0.0, 240.0])) == (250.0, 0.8, 0.0)
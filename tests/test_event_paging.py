@@ -0,0 +1,101 @@
+# tests/test_event_paging.py
+"""read_events_since cursor paging against a fake Firestore collection."""
+from collections import namedtuple
+
+import pytest
+
+import artifact_registry
+from utils.ids import new_id
+
+_Filter = namedtuple("_Filter", "field_path op_string value")
+_OPS = {"==": lambda a, b: a == b, ">": lambda a, b: a > b}
+
+
+class _Doc:
+    def __init__(self, data):
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class _Query:
+    """order_by / start_after / limit / stream on a list, with Firestore's keyset semantics."""
+
+    def __init__(self, rows, fields=(), after=None, n=None, composite=True):
+        self.rows, self.fields, self.after, self.n, self.composite = rows, fields, after, n, composite
+
+    def _with(self, **kw):
+        args = dict(rows=self.rows, fields=self.fields, after=self.after, n=self.n, composite=self.composite)
+        return _Query(**dict(args, **kw))
+
+    def where(self, filter):
+        op = _OPS[filter.op_string]
+        return self._with(rows=[r for r in self.rows if op(r.get(filter.field_path), filter.value)])
+
+    def order_by(self, field, direction=None):
+        return self._with(fields=self.fields + (field,))
+
+    def start_after(self, values):
+        return self._with(after=tuple(values[f] for f in self.fields))
+
+    def limit(self, n):
+        return self._with(n=n)
+
+    def stream(self):
+        if len(self.fields) > 1 and not self.composite:
+            raise artifact_registry.FailedPrecondition("The query requires an index.")
+        rows = [r for r in self.rows if all(f in r for f in self.fields)]   # missing field: not indexed
+        rows.sort(key=lambda r: tuple(r[f] for f in self.fields))
+        if self.after is not None:
+            rows = [r for r in rows if tuple(r[f] for f in self.fields) > self.after]
+        return [_Doc(r) for r in rows[:self.n]]
+
+
+class _Db:
+    def __init__(self, rows, composite=True):
+        self.rows, self.composite = rows, composite
+
+    def collection(self, name):
+        return _Query(self.rows, composite=self.composite) if name == "events" else self
+
+    def document(self, name):
+        return self
+
+
+def _read_all(limit):
+    cursor, seen = {"ts": 0, "seq": 0, "id": ""}, []
+    while True:
+        page, cursor = artifact_registry.read_events_since("P", cursor, limit=limit)
+        if not page:
+            return seen
+        seen += [e["i"] for e in page]
+
+
+def _events(n, start=0, per_second=250, ts0=1000, ids=True):
+    return [dict({"ts": ts0 + i // per_second, "i": i}, **({"event_id": new_id("E-")} if ids else {}))
+            for i in range(start, start + n)]
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    monkeypatch.setattr(artifact_registry, "FieldFilter", _Filter)
+
+    def use(rows, composite=True):
+        stored = sorted(rows, key=lambda e: hash(e.get("event_id", e["i"])))   # document-name order
+        monkeypatch.setattr(artifact_registry, "_get_db", lambda: _Db(stored, composite))
+    return use
+
+
+@pytest.mark.parametrize("composite", [True, False])
+def test_pages_through_seconds_with_more_events_than_limit(fake_db, composite):
+    fake_db(_events(600), composite=composite)      # 250 events per second > limit
+    assert _read_all(limit=100) == list(range(600))
+
+
+def test_events_without_event_id_are_not_skipped(fake_db):
+    legacy = _events(150, per_second=60, ts0=900, ids=False)
+    fake_db(legacy + _events(300, start=150))
+    seen = _read_all(limit=40)
+    assert sorted(seen) == list(range(450))
+    assert seen[150:] == list(range(150, 450))
@@ -0,0 +1,58 @@
+# tests/test_flash_engine.py
+"""Batch PT flash: Rachford–Rice residual, phase detection and mass balance."""
+import numpy as np
+import pytest
+
+from modules.flash_engine import canonical, component_props, flash, phase_grid, rachford_rice
+
+Z = {"N2": 0.01, "CO2": 0.02, "C1": 0.55, "C2": 0.08, "C3": 0.07, "iC4": 0.03, "nC4": 0.04,
+     "iC5": 0.03, "nC5": 0.03, "C6+": 0.06, "C7+": 0.08}
+
+
+def _rr(z, K, beta):
+    Km1 = K - 1.0
+    return (z * Km1 / (1.0 + beta[:, None] * Km1)).sum(axis=1)
+
+
+@pytest.mark.parametrize("T_C", [-60.0, 40.0, 150.0])
+def test_rachford_rice_residual(T_C):
+    res = flash(np.linspace(1.0, 250.0, 5000), T_C, Z)
+    two = (res.beta > 0) & (res.beta < 1)
+    assert two.any()
+    assert np.abs(_rr(res.z, res.K, res.beta)[two]).max() < 1e-10
+    # single-phase cases: the residual has one sign over the whole [0, 1] interval
+    f0, f1 = _rr(res.z, res.K, np.zeros(len(res.beta))), _rr(res.z, res.K, np.ones(len(res.beta)))
+    assert (f0[res.beta == 0.0] <= 0).all() and (f1[res.beta == 1.0] >= 0).all()
+
+
+def test_rachford_rice_random_k():
+    rng = np.random.default_rng(0)
+    z = rng.dirichlet(np.ones(6), 2000)
+    K = np.exp(rng.normal(0.0, 2.0, (2000, 6)))
+    beta = rachford_rice(z, K)
+    two = (beta > 0) & (beta < 1)
+    assert ((beta >= 0) & (beta <= 1)).all() and two.sum() > 100
+    assert np.abs(_rr(z[two], K[two], beta[two])).max() < 1e-10
+
+
+def test_phase_split_balances():
+    res = flash([5.0, 30.0, 80.0], [20.0, 40.0, 60.0], Z)
+    np.testing.assert_allclose(res.beta[:, None] * res.y + (1 - res.beta[:, None]) * res.x, res.z, atol=1e-10)
+    np.testing.assert_allclose(res.x.sum(axis=1), 1.0)
+    np.testing.assert_allclose(res.y.sum(axis=1), 1.0)
+    mw_f, mw_v, mw_l = res.molar_masses()
+    np.testing.assert_allclose(res.beta * mw_v + (1 - res.beta) * mw_l, mw_f, rtol=1e-10)
+
+
+def test_phase_grid_matches_flash():
+    P, T = np.linspace(1.0, 250.0, 12), np.linspace(-100.0, 300.0, 9)
+    grid = phase_grid(Z, P, T)
+    assert grid.shape == (12, 9)
+    np.testing.assert_array_equal(grid[:, 4], flash(P, T[4], Z).beta)
+    assert (grid[0, -1] == 1.0) and (grid[-1, 0] == 0.0)
+
+
+def test_component_names():
+    assert canonical("Methane") == "C1" and canonical(" n-Butane ") == "nC4" and canonical("xenon") is None
+    with pytest.raises(KeyError, match="xenon"):
+        component_props(["C1", "xenon"])
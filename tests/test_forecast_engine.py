@@ -0,0 +1,112 @@
+# tests/test_forecast_engine.py
+"""Batch forecast sweep against the original month-by-month simulate_scenarios loop."""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.forecast_engine import (DAYS_PER_MONTH, RATE_COLUMNS, Fit, ForecastScenario, arps_rate,
+                                     simulate_batch, summarize_sweep, sweep_grid, to_date)
+
+START = date(2026, 1, 1)
+OIL, GAS = (12000.0, 0.25, 0.5), (1.5e7, 0.2, 0.0)
+
+
+def _months(a: date, b: date) -> int:
+    return (b.year - a.year) * 12 + (b.month - a.month)
+
+
+def simulate_loop(start_date: date, months: int, oil_fit: Fit, gas_fit: Fit, sc: ForecastScenario) -> pd.DataFrame:
+    """The original per-month simulate_scenarios loop, kept as the parity reference."""
+    qi_o, Di_o, b_o = oil_fit
+    qi_g, Di_g, b_g = gas_fit
+    inj_rules, new_wells, wor_model, gor_model = sc.inj_rules, sc.new_wells, sc.wor_model, sc.gor_model
+    t_years = np.arange(months, dtype=float) / 12.0
+
+    def D_eff(D, inj: dict, i: int) -> float:
+        if not inj:
+            return D
+        i0 = max(0, _months(start_date, inj.get("start") or start_date))
+        support = float(inj.get("support", 0.0))
+        return D * (max(0.1, 1.0 - support) if i >= i0 else 1.0)
+
+    oil = np.zeros(months)
+    gas = np.zeros(months)
+    for i in range(months):
+        Do = D_eff(Di_o, inj_rules.get("oil") or inj_rules.get("gas"), i)
+        Dg = D_eff(Di_g, inj_rules.get("gas"), i)
+        oil[i] = arps_rate(qi_o, Do, b_o, np.array([t_years[i]])).item()
+        gas[i] = arps_rate(qi_g, Dg, b_g, np.array([t_years[i]])).item()
+    for w in new_wells or []:
+        sdt = to_date(w.get("start"))
+        if not sdt:
+            continue
+        i0 = max(0, _months(start_date, sdt))
+        qi_fac = float(w.get("qi_factor", 1.0))
+        for i in range(i0, months):
+            Do = D_eff(Di_o, inj_rules.get("oil") or inj_rules.get("gas"), i)
+            oil[i] += arps_rate(qi_o * qi_fac, Do, b_o, np.array([(i - i0) / 12.0])).item()
+
+    if wor_model:
+        WOR = wor_model["a"] + wor_model["b"] * np.cumsum(oil * DAYS_PER_MONTH)
+        wc = np.clip(WOR / (1.0 + np.maximum(WOR, 1e-9)), 0.0, 0.98)
+    else:
+        wc = np.clip(sc.base_wc + np.linspace(0, 0.2, months), 0.0, 0.98)
+        if inj_rules.get("water"):
+            i0 = max(0, _months(start_date, inj_rules["water"].get("start") or start_date))
+            for i in range(i0, months):
+                wc[i] = wc[i0] + (wc[i] - wc[i0]) * (1.0 - float(inj_rules["water"].get("support", 0.2)))
+    water = oil * wc
+    oil_eff = np.maximum(0.0, oil - water)
+    if gor_model:
+        GOR = gor_model["a"] + gor_model["b"] * np.arange(months)
+        gas = np.maximum(0.0, oil_eff * np.maximum(GOR, 0.0))
+    return pd.DataFrame(
+        {
+            "date": pd.date_range(start=start_date, periods=months, freq="MS"),
+            "oil_rate": oil_eff,
+            "gas_rate": gas,
+            "water_rate": water,
+            "cum_oil": np.cumsum(oil_eff * DAYS_PER_MONTH),
+            "cum_gas": np.cumsum(gas * DAYS_PER_MONTH),
+            "cum_water": np.cumsum(water * DAYS_PER_MONTH),
+        }
+    )
+
+
+def _cases():
+    cases = sweep_grid(
+        gas_supports=[0.0, 0.3, 0.6], water_supports=[0.0, 0.4],
+        well_counts=[0, 1, 4], well_start="2026-07", gas_start="2027-01", water_start="2026-04",
+    )
+    cases += [ForecastScenario(name="wor+gor", wor_model={"a": 0.1, "b": 2e-8}, gor_model={"a": 1200.0, "b": 1.5},
+                               new_wells=[{"start": "2027-03", "qi_factor": 0.6}, {"start": "bad", "qi_factor": 2.0}]),
+              ForecastScenario(name="exp-oil", base_wc=0.5, inj_rules={"water": {"start": date(2025, 6, 1)}})]
+    return cases
+
+
+@pytest.mark.parametrize("months", [1, 36, 240])
+def test_batch_matches_loop(months):
+    cases = _cases()
+    df = simulate_batch(START, months, OIL, GAS, cases)
+    got = df[RATE_COLUMNS].to_numpy().reshape(len(cases), months, len(RATE_COLUMNS))
+    for s, sc in enumerate(cases):
+        ref = simulate_loop(START, months, OIL, GAS, sc)[RATE_COLUMNS].to_numpy()
+        np.testing.assert_allclose(got[s], ref, rtol=1e-12, atol=1e-6, err_msg=sc.name)
+
+
+def test_summary_has_one_row_per_scenario():
+    cases = _cases()
+    summary = summarize_sweep(simulate_batch(START, 60, OIL, GAS, cases))
+    assert summary["scenario"].tolist() == [sc.name for sc in cases]
+
+
+def test_sweep_names_are_unique():
+    cases = sweep_grid(gas_supports=[0.3, 0.3, 0.301], water_supports=[0.0, 0.0], well_counts=[1, 1, 2],
+                       well_start="2026-07", gas_start="2027-01")
+    names = [sc.name for sc in cases]
+    assert len(cases) == 4 and len(set(names)) == 4
+    assert "gas0.30_wat0.00_wells1#2" in names
+    summary = summarize_sweep(simulate_batch(START, 24, OIL, GAS, cases))
+    assert summary["scenario"].tolist() == names
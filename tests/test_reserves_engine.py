@@ -0,0 +1,74 @@
+# tests/test_reserves_engine.py
+"""Reserves Monte Carlo: input distributions, closed-form Arps cumulative, percentiles."""
+import numpy as np
+import pytest
+
+from modules.reserves_engine import (DAYS_PER_YEAR, Uncertain, arps_cum, decline_eur, monte_carlo, percentiles,
+                                     sample_inputs, time_to_rate)
+
+Z90 = 1.2815515655446004
+
+
+def test_lognormal_peaks_at_mode():
+    x = Uncertain(800, 1200, 2000, "lognormal").sample(np.random.default_rng(0), 400_000)
+    lx = np.log(x)
+    mu, sigma = lx.mean(), lx.std()
+    assert np.exp(mu - sigma ** 2) == pytest.approx(1200, rel=5e-3)
+    assert sigma == pytest.approx((np.log(2000) - np.log(800)) / (2 * Z90), rel=5e-3)
+
+
+def test_lognormal_without_mode_is_centred():
+    x = Uncertain(10, 0, 1000, "lognormal").sample(np.random.default_rng(1), 400_000)
+    np.testing.assert_allclose(np.percentile(x, [10, 50, 90]), [10, 100, 1000], rtol=2e-2)
+    with pytest.raises(ValueError):
+        Uncertain(0, 1, 2, "lognormal").sample(np.random.default_rng(0), 10)
+
+
+def test_normal_bounds_are_10th_and_90th_percentiles():
+    x = Uncertain(10, 20, 30, "normal").sample(np.random.default_rng(2), 400_000)
+    np.testing.assert_allclose(np.percentile(x, [10, 50, 90]), [10, 20, 30], rtol=5e-3)
+
+
+@pytest.mark.parametrize("b", [0.0, 0.3, 0.5, 0.9, 1.0])
+def test_arps_cum_matches_trapezoid(b):
+    qi, Di, T = 1000.0, 0.3, 20.0
+    t = np.linspace(0, T, 200_001)
+    q = qi * np.exp(-Di * t) if b == 0 else qi / np.power(1 + b * Di * t, 1 / b)
+    ref = float(np.sum((q[1:] + q[:-1]) * np.diff(t)) / 2 * DAYS_PER_YEAR)
+    assert float(arps_cum(qi, Di, b, T)) == pytest.approx(ref, rel=1e-9)
+
+
+@pytest.mark.parametrize("b", [0.0, 0.5, 1.0])
+def test_decline_eur_stops_at_economic_limit(b):
+    qi, Di, q_econ = 1000.0, 0.3, 50.0
+    t_end = float(time_to_rate(qi, Di, b, q_econ))
+    q_end = qi * np.exp(-Di * t_end) if b == 0 else qi / (1 + b * Di * t_end) ** (1 / b)
+    assert q_end == pytest.approx(q_econ, rel=1e-9)
+    assert float(decline_eur(qi, Di, b, t_max=1e6, q_econ=q_econ)) == pytest.approx(float(arps_cum(qi, Di, b, t_end)))
+    assert float(decline_eur(qi, Di, b, t_max=1.0, q_econ=q_econ)) == pytest.approx(float(arps_cum(qi, Di, b, 1.0)))
+
+
+def test_percentiles_follow_reserves_convention():
+    p = percentiles(np.r_[np.arange(1.0, 101.0), np.nan, np.inf])
+    assert p["P90"] < p["P50"] < p["P10"]
+    assert (p["P90"], p["P50"], p["P10"]) == pytest.approx(tuple(np.percentile(np.arange(1.0, 101.0), [10, 50, 90])))
+    assert np.isnan(percentiles(np.array([]))["P50"])
+
+
+def test_fixing_one_input_keeps_the_others():
+    specs = {"qi": Uncertain(800, 1000, 1300), "Di": Uncertain(0.15, 0.25, 0.4), "b": Uncertain(0.2, 0.5, 0.9)}
+    a = sample_inputs(specs, 1000, seed=3)
+    b = sample_inputs(dict(specs, b=Uncertain(0.5, 0.5, 0.5, "fixed")), 1000, seed=3)
+    np.testing.assert_array_equal(a["qi"], b["qi"])
+    np.testing.assert_array_equal(a["Di"], b["Di"])
+    assert (b["b"] == 0.5).all()
+
+
+def test_monte_carlo_tornado_ranks_drivers():
+    res = monte_carlo("volumetric", {"area": Uncertain(800, 1200, 2000, "lognormal"), "h": Uncertain(34, 35, 36),
+                                     "phi": Uncertain(0.15, 0.2, 0.25), "sw": Uncertain(0.2, 0.3, 0.4),
+                                     "fvf": Uncertain(1.1, 1.2, 1.35), "rf": Uncertain(0.2, 0.3, 0.4)}, n=50_000, seed=7)
+    assert res.percentiles["P90"] < res.percentiles["P50"] < res.percentiles["P10"]
+    assert res.tornado["input"].iloc[0] == "area" and res.tornado["input"].iloc[-1] == "h"
+    with pytest.raises(ValueError):
+        monte_carlo("material_balance", {})
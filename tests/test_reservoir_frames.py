@@ -0,0 +1,69 @@
+# tests/test_reservoir_frames.py
+"""Background GIF rendering: animation_bytes() never waits unless asked to."""
+import threading
+
+import pytest
+
+from modules import reservoir_frames as rf
+from modules.reservoir_engine import ReservoirGrid, simulate
+from modules.reservoir_results import ResultStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    grid = ReservoirGrid(nx=6, ny=4, injectors=[(0, 0)], producers=[(5, 3)])
+    s = ResultStore.create(grid.nx, grid.ny, 5, folder=str(tmp_path))
+    for state in simulate(grid, 1.0, 5):
+        s.record(state)
+    s.close()
+    return s
+
+
+@pytest.fixture
+def gated(monkeypatch):
+    """Renders block on `gate`; `calls` counts them."""
+    gate, calls, render = threading.Event(), [], rf._render
+
+    def slow(*args):
+        calls.append(args[1])
+        assert gate.wait(10)
+        return render(*args)
+
+    monkeypatch.setattr(rf, "_render", slow)
+    monkeypatch.setattr(rf, "_blobs", type(rf._blobs)())
+    yield gate, calls
+    gate.set()
+
+
+def test_returns_none_while_rendering(store, gated):
+    gate, calls = gated
+    assert rf.animation_bytes(store, "pressure", [(0, 0)], [(5, 3)]) is None
+    assert rf.animation_bytes(store, "pressure", [(0, 0)], [(5, 3)]) is None
+    gate.set()
+    blob = rf.animation_bytes(store, "pressure", [(0, 0)], [(5, 3)], timeout=None)
+    assert blob[:6] == b"GIF89a"
+    assert calls == ["pressure"]
+    assert rf.animation_bytes(store, "pressure", [(0, 0)], [(5, 3)]) == blob
+
+
+def test_finished_render_is_cached_without_a_caller(store, gated):
+    gate, calls = gated
+    assert rf.animation_bytes(store, "saturation") is None
+    gate.set()
+    rf._pool.submit(lambda: None).result()          # single worker: the render is done
+    rf._blobs.clear()
+    assert rf.animation_bytes(store, "saturation")[:6] == b"GIF89a"   # from the file next to the results
+    assert calls == ["saturation"]
+
+
+def test_failed_render_raises_and_retries(store, monkeypatch):
+    def broken(*args):
+        raise RuntimeError("encoder")
+
+    monkeypatch.setattr(rf, "_blobs", type(rf._blobs)())
+    monkeypatch.setattr(rf, "_render", broken)
+    with pytest.raises(RuntimeError):
+        rf.animation_bytes(store, "pressure", timeout=None)
+    assert not rf._inflight
+    monkeypatch.undo()
+    assert rf.animation_bytes(store, "pressure", timeout=None)[:6] == b"GIF89a"
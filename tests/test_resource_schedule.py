@@ -0,0 +1,108 @@
+# tests/test_resource_schedule.py
+"""Resource leveling: feasibility of both schemes and the serial scheme against a period-by-period reference."""
+import datetime
+import heapq
+from typing import Dict, Iterable, Mapping, Sequence, Tuple
+
+import numpy as np
+import pytest
+
+from modules.resource_schedule import RULES, SCHEMES, Calendar, LevelingResult, level
+from modules.schedule_engine import LINK_TYPES, Link, Network, compile_network
+from tests.schedule_fixtures import cpm_reference, random_demand, random_network
+
+SS = LINK_TYPES.index("SS")
+
+
+def violations(res: LevelingResult, net: Network, demand: np.ndarray) -> Dict[str, int]:
+    """Broken links and over-capacity (resource, period) cells in a result."""
+    S, F = res.start, res.finish
+    lag = np.rint(net.lag).astype(np.int64)
+    t, s, dd = net.ltype, net.src, net.dst
+    succ = np.where(t <= SS, S[dd], F[dd])
+    pred = np.where(t % 2 == 0, F[s], S[s])
+    usage = np.zeros_like(res.capacity)
+    for j in np.flatnonzero(res.duration > 0):
+        usage[:, S[j]:F[j]] += demand[j][:, None]
+    return {"links": int(np.sum(succ < pred + lag)), "capacity": int(np.sum(usage > res.capacity + 1e-9)),
+            "negative_starts": int(np.sum(S < 0))}
+
+
+def level_reference(ids: Sequence[str], durations: Sequence[float], links: Iterable[Link],
+                    demand: Sequence[Mapping[str, float]], capacity: Mapping[str, float],
+                    rule: str = "LFT") -> Dict[str, int]:
+    """Serial SGS, constant capacity, no calendar; one period at a time."""
+    links = list(links)
+    dur = {a: int(np.ceil(max(float(x), 0.0))) for a, x in zip(ids, durations)}
+    ref = cpm_reference(ids, [dur[a] for a in ids], links)
+    load = {a: sum(q * dur[a] for q in demand[i].values()) for i, a in enumerate(ids)}
+    key = {"LFT": lambda a: ref[a]["LF"], "FLOAT": lambda a: ref[a]["LS"] - ref[a]["ES"],
+           "LST": lambda a: ref[a]["LS"], "EST": lambda a: ref[a]["ES"], "SPT": lambda a: dur[a],
+           "GRD": lambda a: -load[a]}[rule.upper()]
+    pos = {a: i for i, a in enumerate(ids)}
+    need = {a: demand[i] for i, a in enumerate(ids)}
+    pred: Dict[str, list] = {a: [] for a in ids}
+    succ: Dict[str, list] = {a: [] for a in ids}
+    for p, s, t, g in links:
+        pred[s].append((p, t, int(round(g))))
+        succ[p].append(s)
+    used: Dict[Tuple[str, int], float] = {}
+    start: Dict[str, int] = {}
+    indeg = {a: len(pred[a]) for a in ids}
+    heap = [((key(a), ref[a]["LF"], pos[a]), a) for a in ids if not indeg[a]]
+    heapq.heapify(heap)
+    while heap:
+        _, a = heapq.heappop(heap)
+        t = 0
+        for p, typ, g in pred[a]:
+            t = max(t, {"FS": start[p] + dur[p] + g, "SS": start[p] + g,
+                        "FF": start[p] + dur[p] + g - dur[a], "SF": start[p] + g - dur[a]}[typ])
+        while any(used.get((r, k), 0.0) + q > capacity[r] for k in range(t, t + dur[a]) for r, q in need[a].items()):
+            t += 1
+        for k in range(t, t + dur[a]):
+            for r, q in need[a].items():
+                used[(r, k)] = used.get((r, k), 0.0) + q
+        start[a] = t
+        for s in succ[a]:
+            indeg[s] -= 1
+            if not indeg[s]:
+                heapq.heappush(heap, ((key(s), ref[s]["LF"], pos[s]), s))
+    return start
+
+
+@pytest.mark.parametrize("rule", RULES)
+def test_serial_matches_reference(rule):
+    ids, dur, links = random_network(300, seed=0)
+    demand = random_demand(300, seed=0)
+    cap = np.array([4.0, 5.0, 3.0])
+    res = level(compile_network(ids, dur, links), demand, cap, rule=rule)
+    names = [f"R{r + 1}" for r in range(3)]
+    ref = level_reference(ids, dur, links, [{names[r]: q for r, q in enumerate(row) if q} for row in demand],
+                          dict(zip(names, cap)), rule=rule)
+    np.testing.assert_array_equal(res.start, [ref[a] for a in ids])
+
+
+@pytest.mark.parametrize("scheme", SCHEMES)
+@pytest.mark.parametrize("rule", ["LFT", "FLOAT", "GRD"])
+def test_schedules_are_feasible(scheme, rule):
+    n = 500
+    ids, dur, links = random_network(n, seed=3)
+    net = compile_network(ids, dur, links)
+    demand = random_demand(n, seed=3)
+    cap = np.array([[3.0] * 30 + [6.0], [4.0] * 30 + [8.0], [3.0] * 30 + [5.0]])   # capacity ramps up
+    res = level(net, demand, cap, calendar=Calendar(datetime.date(2026, 1, 5)), rule=rule, scheme=scheme)
+    assert violations(res, net, demand) == {"links": 0, "capacity": 0, "negative_starts": 0}
+    assert res.makespan >= res.cpm_makespan
+    assert np.all(res.start >= 0)
+
+
+def test_empty_network():
+    res = level(compile_network([], [], []), np.zeros((0, 0)), [], calendar=Calendar(datetime.date(2026, 1, 5)))
+    assert isinstance(res, LevelingResult)
+    assert res.makespan == 0 and res.to_frame().empty
+
+
+def test_demand_over_capacity_raises():
+    net = compile_network(["A", "B"], [2, 3], [("A", "B", "FS", 0)])
+    with pytest.raises(ValueError, match="exceeds the available capacity"):
+        level(net, [[1.0], [5.0]], [4.0])
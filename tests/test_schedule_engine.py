@@ -0,0 +1,36 @@
+# tests/test_schedule_engine.py
+"""Compiled CPM passes against the dict-based reference."""
+import numpy as np
+import pytest
+
+from modules.schedule_engine import CycleError, compile_network, links_from_predecessors
+from tests.schedule_fixtures import cpm_reference, random_network
+
+
+def _assert_matches_reference(ids, dur, links):
+    res = compile_network(ids, dur, links).cpm()
+    ref = cpm_reference(ids, dur, links)
+    for k, col in (("ES", res.es), ("EF", res.ef), ("LS", res.ls), ("LF", res.lf)):
+        np.testing.assert_allclose(col, [ref[a][k] for a in ids], rtol=0, atol=1e-9, err_msg=k)
+    np.testing.assert_allclose(res.total_float, res.ls - res.es)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_random_networks_match_reference(seed):
+    _assert_matches_reference(*random_network(2000, seed=seed))
+
+
+def test_all_link_types_with_leads_and_lags():
+    ids = ["A", "B", "C", "D", "E"]
+    links = [("A", "B", "FS", 2), ("A", "C", "SS", 1), ("B", "D", "FF", -1), ("C", "D", "SF", 4), ("D", "E", "FS", -3)]
+    _assert_matches_reference(ids, [5, 3, 4, 6, 2], links)
+
+
+def test_predecessor_strings():
+    links = links_from_predecessors(["A", "B", "C"], ["", "A", "A SS+2, B"])
+    assert sorted(links) == [("A", "B", "FS", 0.0), ("A", "C", "SS", 2.0), ("B", "C", "FS", 0.0)]
+
+
+def test_cycle_raises():
+    with pytest.raises(CycleError):
+        compile_network(["A", "B"], [1, 1], [("A", "B", "FS", 0), ("B", "A", "FS", 0)])
@@ -0,0 +1,45 @@
+# tests/test_schedule_incremental.py
+"""IncrementalCPM.sync() against a full compile + CPM after random edits."""
+import numpy as np
+import pytest
+
+from modules.schedule_engine import LINK_TYPES, CycleError, compile_network
+from modules.schedule_incremental import IncrementalCPM
+from tests.schedule_fixtures import random_network
+
+FIELDS = ("es", "ef", "ls", "lf", "total_float", "free_float")
+
+
+def _assert_same(inc, full):
+    assert inc.ids == full.ids
+    for f in FIELDS:
+        np.testing.assert_allclose(getattr(inc, f), getattr(full, f), rtol=0, atol=1e-9, err_msg=f)
+    assert float(inc.finish) == pytest.approx(float(full.finish))
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_random_sync_edits_match_full_cpm(seed):
+    ids, dur, links = random_network(300, seed=seed)
+    eng = IncrementalCPM.from_network(ids, dur, links)
+    rng = np.random.default_rng(seed + 100)
+    durations = dict(zip(ids, dur.tolist()))
+    for _ in range(200):
+        kind = rng.integers(3)
+        if kind == 0 and links:                       # link removal
+            links.pop(int(rng.integers(len(links))))
+        elif kind == 1:                               # duration change
+            durations[ids[int(rng.integers(len(ids)))]] = float(rng.integers(0, 40))
+        else:                                         # forward link addition (stays acyclic)
+            a, b = sorted(rng.choice(len(ids), 2, replace=False).tolist())
+            links.append((ids[a], ids[b], str(rng.choice(LINK_TYPES)), float(rng.integers(-2, 5))))
+        eng.sync(durations, links)
+        _assert_same(eng.result(), compile_network(ids, [durations[a] for a in ids], links).cpm())
+
+
+def test_link_closing_a_loop_is_rejected_unchanged():
+    ids, dur, links = random_network(50, seed=7)
+    links.append((ids[0], ids[-1], "FS", 0.0))
+    eng = IncrementalCPM.from_network(ids, dur, links)
+    with pytest.raises(CycleError):
+        eng.add_link(ids[-1], ids[0])
+    _assert_same(eng.result(), compile_network(ids, dur, links).cpm())
@@ -0,0 +1,41 @@
+# tests/test_schedule_risk.py
+"""Schedule risk Monte Carlo against a per-iteration dict-based CPM."""
+import numpy as np
+import pytest
+
+from modules.schedule_engine import compile_network
+from modules.schedule_risk import BLOCK_CELLS, RiskEvent, blocks, sample_durations, simulate
+from tests.schedule_fixtures import cpm_reference, random_network
+
+
+def simulate_loop(ids, low, mode, high, links, iterations, seed=None, block_cells=BLOCK_CELLS):
+    """Same draws as simulate(), one dict-based CPM per iteration."""
+    out = []
+    sizes = blocks(iterations, len(ids), block_cells)
+    for n, ss in zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))):
+        for d in sample_durations(np.random.default_rng(ss), low, mode, high, n).T:
+            ref = cpm_reference(ids, d, links)
+            out.append(max((r["EF"] for r in ref.values()), default=0.0))
+    return np.array(out)
+
+
+@pytest.mark.parametrize("seed", [0, 3])
+def test_finishes_match_loop(seed):
+    ids, dur, links = random_network(300, seed=seed)
+    low, high = 0.8 * dur, 1.5 * dur
+    res = simulate(compile_network(ids, dur, links), low, dur, high, 200, seed, block_cells=20_000)
+    ref = simulate_loop(ids, low, dur, high, links, 200, seed, block_cells=20_000)
+    np.testing.assert_allclose(res.finish, ref, rtol=0, atol=1e-9)
+
+
+def test_same_result_for_any_worker_count():
+    ids, dur, links = random_network(200, seed=5)
+    net = compile_network(ids, dur, links)
+    events = [RiskEvent(ids[i], 0.3, 10.0) for i in range(0, 200, 25)]
+    runs = [simulate(net, 0.8 * dur, dur, 1.5 * dur, 3000, seed=11, events=events, workers=w,
+                     keep_finishes=False, block_cells=100_000) for w in (1, 2)]
+    assert len(blocks(3000, 200, 100_000)) > 2
+    serial, pooled = runs
+    assert pooled.percentiles() == serial.percentiles()
+    np.testing.assert_array_equal(pooled.sensitivity, serial.sensitivity)
+    np.testing.assert_array_equal(pooled.criticality, serial.criticality)
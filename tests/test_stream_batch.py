@@ -0,0 +1,61 @@
+# tests/test_stream_batch.py
+"""Unit operations on a StreamBatch against one solve() per case."""
+import numpy as np
+import pytest
+
+from modules.unit_operations.pipe import Pipe
+from modules.unit_operations.pump import Pump
+from modules.unit_operations.separator import Separator
+from modules.unit_operations.stream_batch import StreamBatch, align
+
+BASE = {"flowrate": 1000.0, "pressure": 20.0, "temperature": 60.0,
+        "composition": {"Methane": 0.85, "Ethane": 0.1, "Propane": 0.05}}
+
+
+def _per_case(cases):
+    pump, pipe, sep = Pump("P1"), Pipe("L1"), Separator("S1")
+    out = []
+    for s in cases.to_dicts():
+        s = pump.solve([s])[0]
+        s = pipe.solve([s])[0]
+        out.append(sep.solve([s]))
+    return out
+
+
+@pytest.mark.parametrize("sweep", [
+    {"flowrate": np.linspace(500.0, 5000.0, 40)},
+    {"pressure": np.linspace(5.0, 80.0, 40)},
+    {"temperature": np.linspace(-40.0, 120.0, 40), "flowrate": np.full(40, 2500.0)},
+])
+def test_batch_matches_per_case(sweep):
+    cases = StreamBatch.sweep(BASE, **sweep)
+    b, = Pump("P1").evaluate([cases])
+    b, = Pipe("L1").evaluate([b])
+    gas, liq = Separator("S1").evaluate([b])
+    ref = _per_case(cases)
+    for k, outlet in enumerate((gas, liq)):
+        want = StreamBatch.from_dicts([r[k] for r in ref], components=outlet.components)
+        np.testing.assert_allclose(outlet.flow, want.flow, rtol=1e-12, atol=1e-9)
+        np.testing.assert_allclose(outlet.P, want.P, rtol=1e-12)
+        np.testing.assert_allclose(outlet.T, want.T, rtol=1e-12)
+        np.testing.assert_allclose(outlet.z, want.z, rtol=1e-12, atol=1e-15)
+
+
+def test_dict_round_trip():
+    cases = StreamBatch.sweep(BASE, flowrate=[100.0, 200.0], temperature=[10.0, 20.0])
+    back = StreamBatch.from_dicts(cases.to_dicts())
+    assert back.components == cases.components
+    for f in ("flow", "P", "T", "z"):
+        np.testing.assert_array_equal(getattr(back, f), getattr(cases, f))
+    assert cases.to_dicts()[1] == dict(BASE, flowrate=200.0, temperature=20.0)
+
+
+def test_align_broadcasts_single_case():
+    a = StreamBatch.sweep(BASE, flowrate=[1.0, 2.0, 3.0])
+    b = StreamBatch.from_dicts([{"flowrate": 5.0, "pressure": 1.0, "temperature": 0.0,
+                                 "composition": {"Water": 1.0}}])
+    a2, b2 = align([a, b])
+    assert a2.components == b2.components == ("Methane", "Ethane", "Propane", "Water")
+    np.testing.assert_array_equal(b2.flow, [5.0, 5.0, 5.0])
+    with pytest.raises(ValueError):
+        align([a, StreamBatch.sweep(BASE, flowrate=[1.0, 2.0])])
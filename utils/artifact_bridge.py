@@ -3,6 +3,11 @@ from __future__ import annotations
 import time
 from typing import Any, Dict, Optional
 
+try:
+    from utils.ids import new_id
+except Exception:
+    from ids import new_id
+
 # Try real backend first
 _HAS_BACKEND = False
 try:
@@ -53,16 +58,19 @@ def _workstream_for(stage_or_type: Optional[str]) -> str:
 # ---------------- Public API (used by IT modules) ----------------
 
 def save_artifact(project_id: str, artifact_type: str, data: Dict[str, Any],
-                  stage: Optional[str] = None, meta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+                  stage: Optional[str] = None, meta: Optional[Dict[str, Any]] = None,
+                  idempotency_key: Optional[str] = None) -> Dict[str, Any]:
     """
     Save an artifact and return a normalized record with 'approved' boolean.
+    A repeated `idempotency_key` returns the first record instead of a duplicate.
     """
     if _HAS_BACKEND:
         pid, phid = _current_ids(project_id)
         workstream = _workstream_for(stage or artifact_type)
         rec = _save_artifact(
             pid, phid, workstream, artifact_type, data,
-            status="Draft", tags=[stage] if stage else None
+            status="Draft", tags=[stage] if stage else None,
+            idempotency_key=idempotency_key,
         )
         return {
             "id": rec["artifact_id"],
@@ -78,8 +86,12 @@ def save_artifact(project_id: str, artifact_type: str, data: Dict[str, Any],
     # Fallback (in-session)
     store = _ss()
     key = (project_id, artifact_type)
+    if idempotency_key:
+        for r in store.get(key, []):
+            if r.get("idempotency_key") == idempotency_key:
+                return r
     record = {
-        "id": f"{artifact_type}-{int(time.time())}",
+        "id": new_id(f"{artifact_type}-"),
         "ts": int(time.time()),
         "project_id": project_id,
         "artifact_type": artifact_type,
@@ -88,6 +100,8 @@ def save_artifact(project_id: str, artifact_type: str, data: Dict[str, Any],
         "data": data,
         "approved": False,
     }
+    if idempotency_key:
+        record["idempotency_key"] = idempotency_key
     store.setdefault(key, []).append(record)
     return record
 
@@ -115,7 +129,8 @@ def get_latest(project_id: str, artifact_type: str) -> Optional[Dict[str, Any]]:
     key = (project_id, artifact_type)
     if key not in store or not store[key]:
         return None
-    return sorted(store[key], key=lambda r: r["ts"])[-1]
+    # ids are ULID-style, so they break same-second ties in creation order
+    return max(store[key], key=lambda r: (r["ts"], r["id"]))
 
 def approve_artifact(project_id: str, artifact_type: str) -> bool:
     """
@@ -0,0 +1,54 @@
+# utils/ids.py
+"""
+ULID-style identifiers: 26 Crockford base32 chars = 48-bit millisecond
+timestamp + 80 random bits. IDs sort by creation time, and ids created in
+the same millisecond by this process are strictly increasing (the random
+part is incremented), so two saves in the same second never collide.
+"""
+from __future__ import annotations
+import os, threading, time
+
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_RAND_MAX = (1 << 80) - 1
+
+_lock = threading.Lock()
+_last_ms = -1
+_last_rand = 0
+
+
+def _encode(value: int, length: int) -> str:
+    out = []
+    for _ in range(length):
+        out.append(_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(out))
+
+
+def new_ulid() -> str:
+    global _last_ms, _last_rand
+    with _lock:
+        ms = int(time.time() * 1000)
+        if ms <= _last_ms:
+            # same (or skewed-back) millisecond: stay monotonic
+            ms = _last_ms
+            rand = _last_rand + 1
+            if rand > _RAND_MAX:
+                ms += 1
+                rand = int.from_bytes(os.urandom(10), "big")
+        else:
+            rand = int.from_bytes(os.urandom(10), "big")
+        _last_ms, _last_rand = ms, rand
+    return _encode(ms, 10) + _encode(rand, 16)
+
+
+def new_id(prefix: str = "") -> str:
+    """new_id("A-") -> "A-01J9Z3K6Q0..." (prefix + ULID)."""
+    return f"{prefix}{new_ulid()}"
+
+
+def ulid_time(value: str) -> float:
+    """Creation time (epoch seconds) encoded in a ULID, with or without prefix."""
+    ms = 0
+    for ch in value[-26:][:10]:
+        ms = (ms << 5) | _ALPHABET.index(ch)
+    return ms / 1000.0
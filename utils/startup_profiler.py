@@ -0,0 +1,199 @@
+# utils/startup_profiler.py
+"""
+Import-time / memory profiler for app start-up.
+
+Wraps every module load (sys.meta_path hook) and records, per module:
+cumulative and self import time and, with tracemalloc on, the memory still
+allocated when the import finished. Off unless enabled:
+
+    DECISIONMATE_PROFILE_STARTUP=1              # report at data/local_store/startup_profile.json
+    DECISIONMATE_PROFILE_STARTUP=/tmp/prof.json # custom report path
+
+    prof = ImportProfiler().start()
+    with prof.phase("render:PM Hub"):
+        ...
+    prof.write("report.json")
+
+scripts/bench_startup.py runs each main view headless in a fresh process
+and checks the numbers against a cold-start budget / baseline.
+"""
+from __future__ import annotations
+import atexit, json, os, sys, threading, time, tracemalloc
+from contextlib import contextmanager
+from importlib.abc import MetaPathFinder
+from typing import Any, Dict, Iterator, List, Optional
+
+ENV_VAR = "DECISIONMATE_PROFILE_STARTUP"
+
+
+class _Finder(MetaPathFinder):
+    """Delegates to the real finders and wraps the returned loader's exec_module."""
+
+    def __init__(self, profiler: "ImportProfiler"):
+        self.profiler = profiler
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, "busy", False):
+            return None
+        self._local.busy = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.busy = False
+        loader = spec.loader
+        # class-level loaders (builtin/frozen importers) are shared; leave them alone
+        if loader is None or isinstance(loader, type) or not hasattr(loader, "exec_module"):
+            return spec
+        if not getattr(loader, "_dm_profiled", False):
+            inner = loader.exec_module
+            prof = self.profiler
+
+            def exec_module(module, _inner=inner):
+                with prof._measure(module.__name__):
+                    _inner(module)
+
+            try:
+                loader.exec_module = exec_module
+                loader._dm_profiled = True
+            except (AttributeError, TypeError):
+                pass  # loader with __slots__: import proceeds unprofiled
+        return spec
+
+
+class ImportProfiler:
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.modules: Dict[str, Dict[str, Any]] = {}
+        self.phases: List[Dict[str, Any]] = []
+        self._stack: List[List[float]] = []  # [child_seconds] per open import
+        self._finder: Optional[_Finder] = None
+        self._lock = threading.RLock()
+        self._t0 = time.perf_counter()
+
+    # ---- lifecycle ----
+    def start(self) -> "ImportProfiler":
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self._finder is None:
+            self._finder = _Finder(self)
+            sys.meta_path.insert(0, self._finder)
+        self._t0 = time.perf_counter()
+        return self
+
+    def stop(self) -> None:
+        if self._finder is not None and self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+
+    @contextmanager
+    def _measure(self, name: str) -> Iterator[None]:
+        mem0 = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        frame = [0.0]
+        with self._lock:
+            self._stack.append(frame)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            cum = time.perf_counter() - t0
+            mem = (tracemalloc.get_traced_memory()[0] - mem0) if tracemalloc.is_tracing() else 0
+            with self._lock:
+                self._stack.pop()
+                if self._stack:
+                    self._stack[-1][0] += cum
+                self.modules[name] = {
+                    "cum_ms": round(cum * 1000.0, 3),
+                    "self_ms": round((cum - frame[0]) * 1000.0, 3),
+                    "mem_kb": round(mem / 1024.0, 1),
+                    "parent_depth": len(self._stack),
+                }
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[Dict[str, Any]]:
+        """Time a block (e.g. a headless render) and count the modules it imported."""
+        before = set(self.modules)
+        mem0 = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        row: Dict[str, Any] = {"name": name}
+        t0 = time.perf_counter()
+        try:
+            yield row
+        finally:
+            row["wall_s"] = round(time.perf_counter() - t0, 4)
+            new = [m for m in self.modules if m not in before]
+            row["imports"] = len(new)
+            row["import_s"] = round(sum(self.modules[m]["self_ms"] for m in new) / 1000.0, 4)
+            if tracemalloc.is_tracing():
+                cur, peak = tracemalloc.get_traced_memory()
+                row["mem_mb"] = round((cur - mem0) / 2**20, 2)
+                row["peak_mb"] = round(peak / 2**20, 2)
+            self.phases.append(row)
+
+    # ---- output ----
+    def report(self, top: int = 50) -> Dict[str, Any]:
+        mods = sorted(self.modules.items(), key=lambda kv: kv[1]["cum_ms"], reverse=True)
+        # top-level packages by summed self time ("plotly", "matplotlib", "services", ...)
+        packages: Dict[str, float] = {}
+        for name, m in self.modules.items():
+            root = name.split(".")[0]
+            packages[root] = packages.get(root, 0.0) + m["self_ms"]
+        out = {
+            "python": sys.version.split()[0],
+            "elapsed_s": round(time.perf_counter() - self._t0, 4),
+            "module_count": len(self.modules),
+            "import_s": round(sum(m["self_ms"] for m in self.modules.values()) / 1000.0, 4),
+            "phases": self.phases,
+            "packages_ms": dict(sorted(((k, round(v, 1)) for k, v in packages.items()),
+                                       key=lambda kv: kv[1], reverse=True)[:top]),
+            "modules": [{"name": n, **m} for n, m in mods[:top]],
+        }
+        if tracemalloc.is_tracing():
+            cur, peak = tracemalloc.get_traced_memory()
+            out["traced_mb"] = round(cur / 2**20, 2)
+            out["traced_peak_mb"] = round(peak / 2**20, 2)
+        return out
+
+    def write(self, path: str, top: int = 50) -> Dict[str, Any]:
+        rep = self.report(top=top)
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(rep, f, indent=2)
+        return rep
+
+
+def report_path(value: Optional[str] = None) -> str:
+    value = value if value is not None else os.environ.get(ENV_VAR, "")
+    if value and value.strip().lower() not in ("1", "true", "yes", "on"):
+        return value
+    return os.path.join(os.getcwd(), "data", "local_store", "startup_profile.json")
+
+
+_PROFILER: Optional[ImportProfiler] = None
+
+
+def install_from_env() -> Optional[ImportProfiler]:
+    """Start the process-wide profiler if DECISIONMATE_PROFILE_STARTUP is set; report written at exit."""
+    global _PROFILER
+    value = os.environ.get(ENV_VAR, "")
+    if not value or value.strip().lower() in ("0", "false", "off", "no"):
+        return None
+    if _PROFILER is None:
+        _PROFILER = ImportProfiler().start()
+        path = report_path(value)
+        atexit.register(lambda: _PROFILER.write(path))
+    return _PROFILER
+
+
+def get_profiler() -> Optional[ImportProfiler]:
+    return _PROFILER
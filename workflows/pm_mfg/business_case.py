@@ -3,7 +3,7 @@ from __future__ import annotations
 import streamlit as st
 import pandas as pd
 import numpy as np
-import uuid
+from utils.ids import new_id
 
 # ----------------- simple artifact registry (fallback if your service isn't wired) -----------------
 def _ensure_fallback():
@@ -16,7 +16,7 @@ def _save_fallback(project_id: str, phase_id: str, workstream: str, a_type: str,
                    status: str = "Draft", sources: list[str] | None = None):
     _ensure_fallback()
     rec = {
-        "artifact_id": uuid.uuid4().hex,
+        "artifact_id": new_id("A-"),
         "project_id": project_id, "phase_id": phase_id,
         "workstream": workstream, "type": a_type,
         "data": data or {}, "status": status or "Draft",
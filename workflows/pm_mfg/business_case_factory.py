@@ -1,5 +1,6 @@
 from __future__ import annotations
-import math, uuid
+import math
+from utils.ids import new_id
 from typing import Optional, List, Dict
 import pandas as pd
 import streamlit as st
@@ -10,7 +11,7 @@ def _key(pid, ph): return f"{pid}::{ph}"
 
 def _fallback_save(pid, ph, ws, typ, data, status="Draft", sources=None):
     _ensure_store()
-    rec = {"artifact_id": uuid.uuid4().hex, "project_id": pid, "phase_id": ph,
+    rec = {"artifact_id": new_id("A-"), "project_id": pid, "phase_id": ph,
            "workstream": ws, "type": typ, "data": data or {}, "status": status or "Draft",
            "sources": sources or []}
     st.session_state["_artifacts_store"].setdefault(_key(pid, ph), []).append(rec); return rec
@@ -3,7 +3,7 @@ from __future__ import annotations
 import streamlit as st
 import pandas as pd
 import numpy as np
-import uuid
+from utils.ids import new_id
 from datetime import date
 
 # ---- artifact registry (real or fallback) ----
@@ -12,7 +12,7 @@ def _key(pid, phid): return f"{pid}::{phid}"
 def _save_fallback(pid, phid, ws, t, data, status="Draft", sources=None):
     _ensure_fallback()
     rec = {
-        "artifact_id": uuid.uuid4().hex, "project_id": pid, "phase_id": phid,
+        "artifact_id": new_id("A-"), "project_id": pid, "phase_id": phid,
         "workstream": ws, "type": t, "data": data or {}, "status": status or "Draft",
         "sources": sources or [],
     }
@@ -1,11 +1,12 @@
 from __future__ import annotations
-import uuid, streamlit as st
+import streamlit as st
+from utils.ids import new_id
 
 def _ensure_store(): st.session_state.setdefault("_artifacts_store", {})
 def _key(pid, ph): return f"{pid}::{ph}"
 def _save(pid, ph, ws, typ, data, status="Draft"):
     _ensure_store()
-    rec = {"artifact_id": uuid.uuid4().hex, "project_id": pid, "phase_id": ph,
+    rec = {"artifact_id": new_id("A-"), "project_id": pid, "phase_id": ph,
            "workstream": ws, "type": typ, "data": data or {}, "status": status}
     st.session_state["_artifacts_store"].setdefault(_key(pid,ph), []).append(rec); return rec
 try:
@@ -2,7 +2,7 @@
 from __future__ import annotations
 import streamlit as st
 import pandas as pd
-import uuid
+from utils.ids import new_id
 
 # ---- artifact registry (real or fallback) ----
 def _ensure_fallback():
@@ -10,7 +10,7 @@ def _ensure_fallback():
 def _key(pid, phid): return f"{pid}::{phid}"
 def _save_fallback(pid, phid, ws, t, data, status="Draft", sources=None):
     _ensure_fallback()
-    rec = {"artifact_id": uuid.uuid4().hex, "project_id": pid, "phase_id": phid,
+    rec = {"artifact_id": new_id("A-"), "project_id": pid, "phase_id": phid,
            "workstream": ws, "type": t, "data": data or {}, "status": status or "Draft",
            "sources": sources or []}
     st.session_state["_artifacts_store"].setdefault(_key(pid, phid), []).append(rec); return rec